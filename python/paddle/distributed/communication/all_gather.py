@@ -19,8 +19,12 @@ from paddle import framework
 from paddle.distributed.communication import stream
 
 from .serialization_utils import (
-    convert_object_to_tensor,
-    convert_tensor_to_object,
+    _deserialize_object,
+    _pack_inline,
+    _parse_meta,
+    _serialize_object,
+    _split_buffers,
+    _unpack_inline,
 )
 
 
@@ -105,23 +109,44 @@ def all_gather_object(object_list, obj, group=None):
         framework.in_dynamic_mode()
     ), "all_gather_object doesn't support static graph mode."
 
-    tensor, len_of_tensor = convert_object_to_tensor(obj)
+    meta, buffers = _serialize_object(obj)
+
+    # gather the meta inlined in a fixed size frame, the sizes of the larger
+    # ones are gathered with it
+    frame_list = []
+    all_gather(frame_list, paddle.to_tensor(_pack_inline(meta)), group)
+    inlined = [_unpack_inline(frame.numpy()) for frame in frame_list]
+    meta_list = [m for _, m in inlined]
+    if any(m is None for m in meta_list):
+        max_len = max(size for size, _ in inlined)
+        meta_list = [
+            data[:size]
+            for data, (size, _) in zip(
+                _all_gather_padded([meta], max_len, group), inlined
+            )
+        ]
+
+    parsed = [_parse_meta(m) for m in meta_list]
+    max_buffers_len = max(sum(sizes) for _, sizes in parsed)
+    if max_buffers_len > 0:
+        # NOTE: all_gather needs the same size on all ranks, the out-of-band
+        # buffers of every rank are sent in one tensor padded to the max size
+        data_list = _all_gather_padded(buffers, max_buffers_len, group)
+    else:
+        data_list = [None] * len(parsed)
+    for data, (payload, sizes) in zip(data_list, parsed):
+        object_list.append(
+            _deserialize_object(payload, _split_buffers(data, sizes))
+        )
 
-    # gather len_of_tensor from all ranks
-    list_len_of_tensor = []
-    all_gather(list_len_of_tensor, len_of_tensor, group)
-    # get the max length from list
-    max_len_of_tensor = int(max(list_len_of_tensor).item())
-    # resize the input tensor to max length avoid hang in all gather
-    # Note(liyurui): Maybe we should support various length all_gather?
-    # Now this operation is efficient for we don't support resize in python.
-    numpy_data = tensor.numpy()
-    numpy_data = np.resize(numpy_data, [max_len_of_tensor])
-    input_tensor = paddle.to_tensor(numpy_data)
 
+def _all_gather_padded(arrays, size, group):
+    # concat the uint8 arrays, pad to size and all gather, return numpy arrays
+    data = np.zeros([size], dtype=np.uint8)
+    offset = 0
+    for array in arrays:
+        data[offset : offset + array.size] = array
+        offset += array.size
     tensor_list = []
-    all_gather(tensor_list, input_tensor, group)
-    for i, tensor in enumerate(tensor_list):
-        object_list.append(
-            convert_tensor_to_object(tensor, list_len_of_tensor[i])
-        )
+    all_gather(tensor_list, paddle.to_tensor(data), group)
+    return [tensor.numpy() for tensor in tensor_list]
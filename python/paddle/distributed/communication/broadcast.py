@@ -18,8 +18,11 @@ from paddle import framework
 from paddle.distributed.communication import stream
 
 from .serialization_utils import (
-    convert_object_to_tensor,
-    convert_tensor_to_object,
+    _deserialize_object,
+    _pack_inline,
+    _parse_meta,
+    _serialize_object,
+    _unpack_inline,
 )
 
 
@@ -106,32 +109,43 @@ def broadcast_object_list(object_list, src, group=None):
     ), "broadcast_object_list doesn't support static graph mode."
 
     rank = dist.get_rank()
-    obj_tensors = []
     obj_nums = len(object_list)
 
-    if rank == src:
-        obj_sizes = []
-        for obj in object_list:
-            obj_tensor, obj_size = convert_object_to_tensor(obj)
-            obj_tensors.append(obj_tensor)
-            obj_sizes.append(obj_size)
-        obj_size_tensor = paddle.stack(obj_sizes)
-    else:
-        obj_size_tensor = paddle.empty([obj_nums], dtype="int64")
-    broadcast(obj_size_tensor, src, group)
-
-    if rank == src:
-        # cast to uint8 to keep the same dtype
-        obj_data_tensor = paddle.concat(obj_tensors).cast("uint8")
-    else:
-        data_len = paddle.sum(obj_size_tensor).item()
-        obj_data_tensor = paddle.empty([data_len], dtype="uint8")
-    broadcast(obj_data_tensor, src, group)
-
-    offset = 0
-    for i in range(obj_nums):
-        data_len = obj_size_tensor[i]
-        object_list[i] = convert_tensor_to_object(
-            obj_data_tensor[offset : offset + data_len], data_len
+    # the objects are pickled together, the meta is inlined in a fixed size
+    # frame if it fits, otherwise broadcast after its size
+    meta, buffers = (
+        _serialize_object(list(object_list)) if rank == src else (None, [])
+    )
+    frame = paddle.to_tensor(_pack_inline(meta))
+    broadcast(frame, src, group)
+    meta_len, inlined = _unpack_inline(frame.numpy())
+    if inlined is None:
+        meta_tensor = (
+            paddle.to_tensor(meta)
+            if rank == src
+            else paddle.empty([meta_len], dtype="uint8")
+        )
+        broadcast(meta_tensor, src, group)
+        inlined = meta_tensor.numpy()
+    payload, sizes = _parse_meta(inlined)
+
+    # the out-of-band buffers, i.e. the data of large arrays, are broadcast
+    # as separate tensors without being copied into the pickle stream
+    received = []
+    for i, size in enumerate(sizes):
+        buffer_tensor = (
+            paddle.to_tensor(buffers[i])
+            if rank == src
+            else paddle.empty([size], dtype="uint8")
         )
-        offset += data_len
+        broadcast(buffer_tensor, src, group)
+        if rank != src:
+            received.append(buffer_tensor.numpy())
+
+    if rank != src:
+        objs = _deserialize_object(payload, received)
+        assert (
+            len(objs) == obj_nums
+        ), "The length of object_list should be the same on all ranks."
+        for i in range(obj_nums):
+            object_list[i] = objs[i]
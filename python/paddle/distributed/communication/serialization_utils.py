@@ -12,23 +12,117 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import io
 import pickle
+import sys
 
 import numpy as np
 
 import paddle
 
+# The object collectives send the pickled object in a fixed size frame first,
+# so the objects whose meta fit in it (e.g. the metadata of a checkpoint or the
+# state of a sampler) take a single collective, and the larger ones take a
+# second collective after the sizes are known.
+_INLINE_SIZE = 4096
+# the buffers of numpy arrays not smaller than this are pickled out-of-band
+# and sent as separate tensors without being copied into the pickle stream
+_OUT_OF_BAND_SIZE = 1 << 16
+_INT64_SIZE = 8
+# the out-of-band buffers of pickle protocol 5 need python 3.8, otherwise the
+# objects are pickled in-band with protocol 4
+_OUT_OF_BAND = sys.version_info >= (3, 8)
+
 
 def convert_object_to_tensor(obj):
-    _pickler = pickle.Pickler
-    f = io.BytesIO()
-    _pickler(f).dump(obj)
-    data = np.frombuffer(f.getvalue(), dtype=np.uint8)
+    data = np.frombuffer(pickle.dumps(obj), dtype=np.uint8)
     tensor = paddle.to_tensor(data)
     return tensor, tensor.numel()
 
 
 def convert_tensor_to_object(tensor, len_of_tensor):
-    _unpickler = pickle.Unpickler
-    return _unpickler(io.BytesIO(tensor.numpy()[:len_of_tensor])).load()
+    return pickle.loads(tensor.numpy()[:len_of_tensor])
+
+
+def _serialize_object(obj):
+    """
+    Pickle ``obj`` with protocol 5. Return the meta, a uint8 array holding the
+    sizes of the out-of-band buffers and the pickle stream, and the out-of-band
+    buffers as uint8 arrays sharing the memory of the pickled arrays. Before
+    python 3.8, ``obj`` is pickled with protocol 4 without out-of-band buffers.
+    """
+    buffers = []
+
+    def _buffer_callback(buffer):
+        raw = buffer.raw()
+        if raw.nbytes < _OUT_OF_BAND_SIZE:
+            # a true value keeps the buffer in the pickle stream
+            return True
+        buffers.append(np.frombuffer(raw, dtype=np.uint8))
+        return False
+
+    if _OUT_OF_BAND:
+        payload = pickle.dumps(
+            obj, protocol=5, buffer_callback=_buffer_callback
+        )
+    else:
+        payload = pickle.dumps(obj, protocol=4)
+    header = np.array(
+        [len(payload), len(buffers)] + [b.size for b in buffers],
+        dtype=np.int64,
+    )
+    meta = np.empty(header.nbytes + len(payload), dtype=np.uint8)
+    meta[: header.nbytes] = header.view(np.uint8)
+    meta[header.nbytes :] = np.frombuffer(payload, dtype=np.uint8)
+    return meta, buffers
+
+
+def _parse_meta(meta):
+    """
+    Return the pickle stream and the sizes of the out-of-band buffers in the
+    meta built by ``_serialize_object``.
+    """
+    payload_len, num_buffers = meta[: 2 * _INT64_SIZE].view(np.int64)
+    start = (2 + num_buffers) * _INT64_SIZE
+    sizes = meta[2 * _INT64_SIZE : start].view(np.int64).tolist()
+    return meta[start : start + payload_len], sizes
+
+
+def _split_buffers(data, sizes):
+    buffers = []
+    offset = 0
+    for size in sizes:
+        buffers.append(data[offset : offset + size])
+        offset += size
+    return buffers
+
+
+def _deserialize_object(payload, buffers):
+    if not _OUT_OF_BAND:
+        assert not buffers, "Out-of-band buffers need python 3.8 or later."
+        return pickle.loads(payload)
+    # the arrays pickled out-of-band are views of the received buffers
+    return pickle.loads(payload, buffers=buffers)
+
+
+def _pack_inline(meta):
+    """
+    Return the fixed size frame holding the size of ``meta``, and ``meta``
+    itself if it fits.
+    """
+    frame = np.zeros(_INT64_SIZE + _INLINE_SIZE, dtype=np.uint8)
+    size = 0 if meta is None else meta.size
+    frame[:_INT64_SIZE] = np.array([size], dtype=np.int64).view(np.uint8)
+    if 0 < size <= _INLINE_SIZE:
+        frame[_INT64_SIZE : _INT64_SIZE + size] = meta
+    return frame
+
+
+def _unpack_inline(frame):
+    """
+    Return the size of the meta in ``frame``, and the meta if it is inlined
+    or None.
+    """
+    size = int(frame[:_INT64_SIZE].view(np.int64)[0])
+    if size > _INLINE_SIZE:
+        return size, None
+    return size, frame[_INT64_SIZE : _INT64_SIZE + size]
@@ -41,6 +41,7 @@ else:
 from paddle.distributed.fleet.utils.tensor_fusion_helper import (
     HOOK_ACTION,
     FusedCommBuffer,
+    ReorderedCommBuffers,
     assign_group_by_size,
 )
 
@@ -180,6 +181,9 @@ class PipelineParallel(MetaParallelBase):
         self._sharding_comm_overlap = self._strategy.hybrid_configs[
             "pp_configs"
         ].sharding_comm_overlap
+        self._comm_buffer_reorder = self._strategy.hybrid_configs[
+            "pp_configs"
+        ].comm_buffer_reorder
         self._enable_timer = self._strategy.hybrid_configs[
             "pp_configs"
         ].enable_timer
@@ -261,7 +265,11 @@ class PipelineParallel(MetaParallelBase):
 
         if self._dp_comm_overlap:
             self.register_allreduce_overlap_hook(
-                self._layers, self.dp_group, self.accumulate_steps, True
+                self._layers,
+                self.dp_group,
+                self.accumulate_steps,
+                True,
+                reorder=self._comm_buffer_reorder,
             )
 
     def is_pipeline_first_stage(self, ignore_virtual=False):
@@ -294,7 +302,13 @@ class PipelineParallel(MetaParallelBase):
         return fused_allreduce
 
     def register_allreduce_overlap_hook(
-        self, model, comm_group, acc_steps, dp, group_size=128 * 1024 * 1024
+        self,
+        model,
+        comm_group,
+        acc_steps,
+        dp,
+        group_size=128 * 1024 * 1024,
+        reorder=False,
     ):
         if model.get_num_virtual_stages() > 1:
             models = model.get_model_chunks()
@@ -342,6 +356,19 @@ class PipelineParallel(MetaParallelBase):
                     dst = comm_group.ranks[dst]
                 else:
                     dst = -1
+                if reorder:
+                    # the buckets are rebuilt in the order the gradients are
+                    # ready after the first step, with a measured size
+                    buffers = ReorderedCommBuffers(
+                        parameter_list,
+                        comm_group,
+                        acc_steps,
+                        act,
+                        dst,
+                        group_size=group_size,
+                    )
+                    self._chunk_2_comm_buffers[chunk_idx].append(buffers)
+                    continue
                 var_groups = assign_group_by_size(parameter_list, group_size)
                 for group_idx, parameters in var_groups.items():
                     buffer = FusedCommBuffer(
@@ -566,7 +593,11 @@ class PipelineParallel(MetaParallelBase):
 
         if self._sharding_comm_overlap and len(self._chunk_2_comm_buffers) == 0:
             self.register_allreduce_overlap_hook(
-                self._layers, self.sharding_group, self.accumulate_steps, False
+                self._layers,
+                self.sharding_group,
+                self.accumulate_steps,
+                False,
+                reorder=self._comm_buffer_reorder,
             )
 
         return data
@@ -1008,7 +1039,12 @@ class PipelineParallelWithInterleave(PipelineParallel):
 
         return fused_allreduce
 
-    def register_allreduce_overlap_hook(self, model, comm_group, acc_steps, dp):
+    def register_allreduce_overlap_hook(
+        self, model, comm_group, acc_steps, dp, reorder=False
+    ):
+        # the params of a chunk are fused into one buffer communicated by the
+        # scheduler after the backward of the chunk, there is no bucket order
+        # to rebuild
         super().register_allreduce_overlap_hook(
             model, comm_group, acc_steps, dp, group_size=sys.maxsize
         )
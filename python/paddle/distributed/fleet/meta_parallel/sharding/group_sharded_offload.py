@@ -0,0 +1,270 @@
+#   Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# The parameter slices offloaded to CPU by GroupShardedStage3 are copied to
+# the device through pinned staging buffers on a copy stream, a few layers
+# ahead of the layer computing, and the gradient slices are copied back on
+# another stream and only accumulated on CPU once the copies are done. The
+# staging buffers on both sides are reused across the layers and the steps.
+# On CPUPlace there are no streams and the copies are synchronous, but the
+# scheduling and the buffer reuse are the same.
+
+from collections import OrderedDict, defaultdict
+
+import paddle
+from paddle.framework import core
+
+from .group_sharded_utils import Type, device_guard
+
+
+def _empty(size, dtype, place):
+    with device_guard():
+        buffer = paddle.empty([size], dtype=dtype)
+    if isinstance(place, core.CPUPlace):
+        return buffer
+    return buffer._copy_to(place, True)
+
+
+def _record(stream):
+    return stream.record_event() if stream is not None else None
+
+
+class StagingBufferPool:
+    """
+    Flat buffers on a place reused by their dtype and size.
+
+    A released buffer may still be used by the work recorded by its event.
+    The stream writing into a reused buffer waits for that event, or the host
+    waits for it if ``host_wait`` is True.
+    """
+
+    def __init__(self, place, host_wait=False):
+        self._place = place
+        self._host_wait = host_wait
+        self._free = defaultdict(list)  # {(dtype, size): [(buffer, event)]}
+        self.num_allocated = 0
+        self.num_reused = 0
+
+    def acquire(self, dtype, size, stream=None):
+        free = self._free[(dtype, size)]
+        if not free:
+            self.num_allocated += 1
+            return _empty(size, dtype, self._place)
+
+        # prefer a buffer that is not in use any more
+        index = 0
+        for i, (_, event) in enumerate(free):
+            if event is None or event.query():
+                index = i
+                break
+        buffer, event = free.pop(index)
+        if event is not None:
+            if self._host_wait:
+                event.synchronize()
+            elif stream is not None:
+                stream.wait_event(event)
+        self.num_reused += 1
+        return buffer
+
+    def release(self, buffer, event=None):
+        self._free[(buffer.dtype, buffer._numel())].append((buffer, event))
+
+    def clear(self):
+        self._free.clear()
+
+
+class OffloadPrefetcher:
+    """
+    Fetch the parameter slices offloaded to CPU to the device ahead of their
+    layers, and write the gradient slices back to CPU without blocking.
+
+    Args:
+        place(Place): The device computing, CPUPlace makes the copies
+            synchronous.
+        param2dtype(dict): The dtype of the parameters on the device by name.
+        depth(int): The number of layers to fetch ahead.
+    """
+
+    def __init__(self, place, param2dtype, depth=2):
+        assert depth > 0, "depth must be greater than 0."
+        self.depth = depth
+        self._place = place
+        self._param2dtype = param2dtype
+        self._on_device = not isinstance(place, core.CPUPlace)
+        if self._on_device:
+            self._h2d_stream = paddle.device.Stream(place)
+            self._d2h_stream = paddle.device.Stream(place)
+        else:
+            self._h2d_stream = self._d2h_stream = None
+        pinned = (
+            core.CUDAPinnedPlace()
+            if isinstance(place, core.CUDAPlace)
+            else core.CPUPlace()
+        )
+        self._host_pool = StagingBufferPool(pinned, host_wait=True)
+        self._device_pool = StagingBufferPool(place)
+
+        # {param.name: (cpu slice, device buffer, event of the copy)}
+        self._fetched = OrderedDict()
+        # {param.name: device buffer}
+        self._in_use = {}
+        # {param.name: cpu slice}, the slices fetched in the current pass
+        self._sources = {}
+        # {param.name: (param, pinned grad, event of the copy, device grad)}
+        self._grads = OrderedDict()
+
+        self.num_prefetched = 0
+        self.num_missed = 0
+
+    def _calc_stream(self):
+        if not self._on_device:
+            return None
+        return paddle.device.current_stream(self._place)
+
+    def _copy_in(self, src):
+        size = src._numel()
+        with paddle.device.stream_guard(self._h2d_stream):
+            pinned = self._host_pool.acquire(src.dtype, size)
+            pinned.copy_(src, True)
+            buffer = self._device_pool.acquire(
+                src.dtype, size, self._h2d_stream
+            )
+            buffer.copy_(pinned, False)
+            event = _record(self._h2d_stream)
+        self._host_pool.release(pinned, event)
+        return src, buffer, event
+
+    def prefetch(self, layers):
+        """
+        Start copying the parameter slices of the next layers to the device.
+
+        Args:
+            layers(list): The trainable parameters of the layers in the order
+                they run, only the first ``depth`` ones are fetched.
+        """
+        for params in layers[: self.depth]:
+            for param in params:
+                if (
+                    param.status == "all"
+                    or param.name in self._fetched
+                    or param.name in self._in_use
+                ):
+                    continue
+                self._fetched[param.name] = self._copy_in(param.fw_storage)
+                self.num_prefetched += 1
+
+    def fetch(self, param):
+        """
+        Get the parameter slice of ``param`` on the device in its dtype,
+        copying it now if it was not prefetched. It is used until ``release``.
+        """
+        entry = self._fetched.pop(param.name, None)
+        if entry is not None and entry[0] is not param.fw_storage:
+            # fw_storage was replaced since it was prefetched
+            self._device_pool.release(entry[1], entry[2])
+            entry = None
+        if entry is None:
+            entry = self._copy_in(param.fw_storage)
+            self.num_missed += 1
+
+        src, buffer, event = entry
+        if event is not None:
+            self._calc_stream().wait_event(event)
+        self._in_use[param.name] = buffer
+        self._sources[param.name] = src
+
+        # a view of the buffer, clearing it keeps the buffer
+        tensor = buffer._slice(0, buffer._numel())
+        dtype = self._param2dtype[param.name]
+        if tensor.dtype != dtype:
+            tensor = paddle.cast(tensor, dtype)
+        return tensor
+
+    def release(self, param):
+        """
+        Reuse the device buffer of ``param`` once the work queued on the
+        compute stream is done with it.
+        """
+        buffer = self._in_use.pop(param.name, None)
+        if buffer is not None:
+            self._device_pool.release(buffer, _record(self._calc_stream()))
+
+    def restore(self, param):
+        """
+        Get the CPU slice ``param`` was fetched from, which is unchanged until
+        the optimizer step, instead of copying the device slice back.
+        Returns None if it was not fetched in this pass.
+        """
+        return self._sources.pop(param.name, None)
+
+    def _fold(self, name):
+        param, pinned, event, grad = self._grads.pop(name)
+        if event is not None:
+            event.synchronize()
+        with device_guard():
+            cpu_grad = pinned.cpu() if self._on_device else grad
+            if param.bw_storage is None:
+                param.bw_storage = cpu_grad
+            else:
+                param.bw_storage = paddle.add(param.bw_storage, cpu_grad)
+        if self._on_device:
+            self._host_pool.release(pinned)
+
+    def write_back(self, param, grad):
+        """
+        Start copying the gradient slice ``grad`` of ``param`` to CPU, it is
+        accumulated into ``param.bw_storage`` in fp32 when the copy is done,
+        at the latest by ``flush``.
+        """
+        # the copies issued before are likely done
+        for name in list(self._grads.keys()):
+            event = self._grads[name][2]
+            if name == param.name or event is None or event.query():
+                self._fold(name)
+
+        if grad.dtype == Type.fp32.value:
+            grad = grad.clone()
+        else:
+            grad = paddle.cast(grad, Type.fp32.value)
+        if not self._on_device:
+            self._grads[param.name] = (param, None, None, grad)
+            self._fold(param.name)
+            return
+
+        self._d2h_stream.wait_event(_record(self._calc_stream()))
+        pinned = self._host_pool.acquire(grad.dtype, grad._numel())
+        with paddle.device.stream_guard(self._d2h_stream):
+            pinned.copy_(grad, False)
+            event = _record(self._d2h_stream)
+        # grad is kept alive until the copy is done
+        self._grads[param.name] = (param, pinned, event, grad)
+
+    def flush(self):
+        """
+        Wait for the gradient copies and accumulate them into bw_storage.
+        """
+        for name in list(self._grads.keys()):
+            self._fold(name)
+
+    def discard(self):
+        """
+        Drop the slices fetched but not used, e.g. before the optimizer step
+        changes the parameters on CPU.
+        """
+        for _, buffer, event in self._fetched.values():
+            self._device_pool.release(buffer, event)
+        self._fetched.clear()
+        # may still be read by an unfinished allgather, not reused
+        self._in_use.clear()
+        self._sources.clear()
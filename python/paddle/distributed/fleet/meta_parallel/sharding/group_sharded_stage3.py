@@ -27,6 +27,7 @@ from paddle.fluid.framework import EagerParamBase
 from paddle.framework import core
 from paddle.nn import ClipGradByGlobalNorm
 
+from .group_sharded_offload import OffloadPrefetcher
 from .group_sharded_storage import GradStorage
 from .group_sharded_utils import GroupShardedClipGrad, Type, device_guard
 
@@ -85,6 +86,7 @@ class GroupShardedStage3(nn.Layer):
         sync_comm=False,
         dp_group=None,
         exclude_layer=None,
+        offload_prefetch=2,
     ):
         super().__init__()
 
@@ -193,6 +195,13 @@ class GroupShardedStage3(nn.Layer):
         # Register task flow
         self._task_flow = TaskFlow()
 
+        # Fetch the offloaded params of the next layers while computing
+        assert offload_prefetch >= 0, "offload_prefetch must be GE than 0."
+        if self._offload and offload_prefetch > 0:
+            self._task_flow.offloader = OffloadPrefetcher(
+                _device_place(), param2dtype, offload_prefetch
+            )
+
         # Register forward hooks
         self._register_forward_hooks(self._layer)
 
@@ -223,6 +232,9 @@ class GroupShardedStage3(nn.Layer):
 
     def _clear_gradients(self):
         assert len(self._trainable_params.keys()) > 0
+        if self._task_flow.offloader is not None:
+            self._task_flow.offloader.flush()
+            self._task_flow.offloader.discard()
         current_layer_params = self._layer.parameters(include_sublayers=True)
         # 1.Handle param's slice
         trainable_params = list(
@@ -582,6 +594,9 @@ class GroupShardedStage3(nn.Layer):
         """
         update_list = []
         assert len(self._trainable_params.keys()) > 0
+        if self._task_flow.offloader is not None:
+            self._task_flow.offloader.flush()
+            self._task_flow.offloader.discard()
         current_layer_params = self._layer.parameters(include_sublayers=True)
         trainable_params = list(
             filter(
@@ -688,7 +703,11 @@ class GroupShardedStage3(nn.Layer):
                     dist.all_reduce(tensor=full_grad, group=self._dp_group)
 
                 start, end = self._param2buffer[param.name][self._rank]
-                if param.bw_storage is None:
+                if self._task_flow.offloader is not None:
+                    self._task_flow.offloader.write_back(
+                        param, full_grad._slice(start, end)
+                    )
+                elif param.bw_storage is None:
                     param.bw_storage = (
                         full_grad._slice(start, end).detach().clone()
                     )
@@ -812,6 +831,17 @@ def ForwardPreHooks(
         order_ = order_tracer[layer_id]
         layer_id = order_tracer["layer"][order_ + 1]
 
+        if task_flow.offloader is not None:
+            depth = task_flow.offloader.depth
+            task_flow.offloader.prefetch(
+                [
+                    trainable_params[i]
+                    for i in order_tracer["layer"][
+                        order_ + 1 : order_ + 1 + depth
+                    ]
+                ]
+            )
+
     _allgather_buffer(
         trainable_params[layer_id],
         group,
@@ -908,7 +938,18 @@ class ForwardPostHooks(PyLayer):
         # Whether to use calc stream
         task_flow.use_calc[layer_id] = use_calc
         if layer_id != order_tracer["layer"][0] and not sync_comm:
-            layer_next_id = order_tracer["layer"][order_tracer[layer_id] - 1]
+            order_ = order_tracer[layer_id]
+            layer_next_id = order_tracer["layer"][order_ - 1]
+            if task_flow.offloader is not None:
+                depth = task_flow.offloader.depth
+                task_flow.offloader.prefetch(
+                    [
+                        trainable_params[i]
+                        for i in order_tracer["layer"][
+                            max(order_ - depth, 0) : order_
+                        ][::-1]
+                    ]
+                )
             _allgather_buffer(
                 trainable_params[layer_next_id],
                 group,
@@ -935,6 +976,7 @@ class TaskFlow:
         self.full_grad = {}
         self.use_calc = {}
         self.callback = callback
+        self.offloader = None
 
 
 def _release_param(
@@ -958,7 +1000,15 @@ def _release_param(
                 del task_flow.full_param[param.name]
 
                 if offload:
-                    param.fw_storage = _device2cpu(param.fw_storage)
+                    cpu_storage = None
+                    if task_flow.offloader is not None:
+                        cpu_storage = task_flow.offloader.restore(param)
+                    if cpu_storage is None:
+                        param.fw_storage = _device2cpu(param.fw_storage)
+                    else:
+                        # the params are not changed by the forward
+                        param.fw_storage._clear_data()
+                        param.fw_storage = cpu_storage
     return
 
 
@@ -980,6 +1030,8 @@ def _wait_layer(
             full_param._slice(0, param._numel())._share_buffer_to(param)
             param.fw_storage._clear()
             param.fw_storage = None
+            if task_flow.offloader is not None:
+                task_flow.offloader.release(param)
             param.status = "all"
             param.use_count += 1
         else:
@@ -1015,7 +1067,10 @@ def _allgather_buffer(
             continue
 
         if offload:
-            param.fw_storage = _cpu2device(param)
+            if task_flow.offloader is not None:
+                param.fw_storage = task_flow.offloader.fetch(param)
+            else:
+                param.fw_storage = _cpu2device(param)
 
         buffer_size = param2buffer_size[param.name]
         with paddle.amp.auto_cast(enable=False):
@@ -1038,6 +1093,8 @@ def _allgather_buffer(
                 full_param._slice(0, param._numel())._share_buffer_to(param)
                 param.fw_storage._clear()
                 param.fw_storage = None
+                if task_flow.offloader is not None:
+                    task_flow.offloader.release(param)
                 param.status = "all"
                 param.use_count += 1
         task_flow.full_param[param.name] = (full_param, task)
@@ -1112,6 +1169,12 @@ def _device2cpu(trans_param, convert_dtype=False):
     return tmp_p
 
 
+def _device_place():
+    if DEV in paddle.device.get_all_custom_device_type():
+        return paddle.CustomPlace(DEV, DEV_ID)
+    return paddle.CUDAPlace(DEV_ID)
+
+
 def _cpu2device(param):
     if DEV in paddle.device.get_all_custom_device_type():
         tmp_p = param.fw_storage._copy_to(paddle.CustomPlace(DEV, DEV_ID), True)
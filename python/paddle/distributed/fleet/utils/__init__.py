@@ -14,6 +14,7 @@
 
 from .fs import LocalFS  # noqa: F401
 from .fs import HDFSClient  # noqa: F401
+from .fs import WebHDFSClient  # noqa: F401
 from .ps_util import DistributedInfer  # noqa: F401
 from paddle.utils import deprecated
 from paddle.distributed import fleet
@@ -26,7 +27,13 @@ from . import mix_precision_utils  # noqa: F401
 from . import sequence_parallel_utils
 
 
-__all__ = ["LocalFS", "recompute", "DistributedInfer", "HDFSClient"]  # noqa
+__all__ = [  # noqa
+    "LocalFS",
+    "recompute",
+    "DistributedInfer",
+    "HDFSClient",
+    "WebHDFSClient",
+]
 
 
 def recompute(function, *args, **kwargs):
@@ -14,11 +14,17 @@
 
 import abc
 import functools
+import http.client
+import json
 import multiprocessing
 import os
+import posixpath
 import re
 import shutil
+import threading
 import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 
 # (TODO: GhostScreaming) It will be removed later.
 from paddle.fluid import core
@@ -1560,3 +1566,656 @@ class AFSClient(FS):
             begin += blocks[i]
 
         return trainer_files[trainer_id]
+
+
+class WebHDFSClient(FS):
+    """
+    A tool of HDFS that talks to the WebHDFS REST API directly instead of
+    starting a ``hadoop fs`` process for every call.
+
+    Connections are kept alive and reused per thread, file status and
+    listings are cached for ``cache_ttl`` seconds, and files larger than
+    ``chunk_size`` are transferred as ranges by ``num_threads`` threads.
+    Large uploads are written as parts and merged with ``CONCAT``.
+
+    Args:
+        namenode_url(str): The WebHDFS endpoint of the namenode, e.g.
+            "http://xxx.hadoop.com:50070". The "/webhdfs/v1" prefix is added
+            when the url has no path.
+        user(str, optional): The user name passed as ``user.name``. Default is None.
+        time_out(int, optional): Timeout of an operation in ms, including retries. Default is 5 minutes.
+        sleep_inter(int, optional): Sleep interval between retries in ms. Default is 1000.
+        chunk_size(int, optional): The byte size of a transfer chunk. Default is 64MB.
+        num_threads(int, optional): The number of transfer threads. Default is 4.
+        cache_ttl(float, optional): Seconds that metadata is cached, 0 disables
+            the cache. Default is 10.
+
+    Examples:
+
+        .. code-block:: text
+
+            from paddle.distributed.fleet.utils import WebHDFSClient
+
+            client = WebHDFSClient("http://xxx.hadoop.com:50070", user="hello")
+            client.upload("./checkpoint", "hdfs:/test_hdfs_client")
+            client.ls_dir("hdfs:/test_hdfs_client")
+    """
+
+    def __init__(
+        self,
+        namenode_url,
+        user=None,
+        time_out=5 * 60 * 1000,  # ms
+        sleep_inter=1000,  # ms
+        chunk_size=64 << 20,
+        num_threads=4,
+        cache_ttl=10.0,
+    ):
+        url = urllib.parse.urlparse(namenode_url)
+        if url.scheme not in ('http', 'https') or not url.netloc:
+            raise ValueError(
+                "namenode_url should be like http://host:port, but received {}".format(
+                    namenode_url
+                )
+            )
+        if chunk_size <= 0 or num_threads <= 0:
+            raise ValueError("chunk_size and num_threads should be positive")
+        self._scheme = url.scheme
+        self._netloc = url.netloc
+        self._prefix = url.path.rstrip('/') or '/webhdfs/v1'
+        self._user = user
+        self._time_out = time_out
+        self._sleep_inter = sleep_inter
+        self._chunk_size = chunk_size
+        self._num_threads = num_threads
+        self._cache_ttl = cache_ttl
+        self._local = threading.local()
+        self._cache_lock = threading.Lock()
+        self._status_cache = {}
+        self._listing_cache = {}
+        self._pool = None
+
+    def close(self):
+        """
+        Stop the transfer threads and close the connections of the calling thread.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for conn in getattr(self._local, 'conns', {}).values():
+            conn.close()
+        self._local.conns = {}
+
+    def clear_cache(self, fs_path=None):
+        """
+        Drop the cached metadata of `fs_path` and everything under it, or of
+        all paths when `fs_path` is None. Use it when other clients modify
+        the file system while this one is running.
+
+        Args:
+            fs_path(str, optional): The HDFS path. Default is None.
+        """
+        if fs_path is None:
+            with self._cache_lock:
+                self._status_cache.clear()
+                self._listing_cache.clear()
+            return
+        self._invalidate(self._normalize(fs_path))
+
+    def _normalize(self, fs_path):
+        path = urllib.parse.urlparse(fs_path).path
+        return posixpath.normpath('/' + path.lstrip('/'))
+
+    def _connection(self, scheme, netloc):
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get((scheme, netloc))
+        if conn is None:
+            conn_cls = (
+                http.client.HTTPSConnection
+                if scheme == 'https'
+                else http.client.HTTPConnection
+            )
+            conn = conn_cls(netloc, timeout=self._time_out / 1000.0)
+            conns[(scheme, netloc)] = conn
+        return conn
+
+    def _send(self, scheme, netloc, method, url, body=None):
+        # a kept-alive connection may have been closed by the server while
+        # idle, so a failed request is sent once more on a new connection
+        for retry in range(2):
+            conn = self._connection(scheme, netloc)
+            try:
+                headers = {}
+                if body is not None:
+                    headers['Content-Type'] = 'application/octet-stream'
+                conn.request(method, url, body=body, headers=headers)
+                return conn.getresponse()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                self._local.conns.pop((scheme, netloc), None)
+                if retry:
+                    raise ExecuteError(f"{method} {url}: {e}")
+
+    def _open(self, method, path, op, body=None, **params):
+        query = {'op': op}
+        if self._user is not None:
+            query['user.name'] = self._user
+        query.update(params)
+        url = "{}{}?{}".format(
+            self._prefix,
+            urllib.parse.quote(path),
+            urllib.parse.urlencode(query),
+        )
+        # CREATE, APPEND and OPEN are redirected to a datanode, the data is
+        # only sent after the redirection as the protocol requires
+        resp = self._send(self._scheme, self._netloc, method, url)
+        if resp.status in (301, 302, 303, 307, 308):
+            location = urllib.parse.urlparse(resp.getheader('Location'))
+            resp.read()
+            url = location.path
+            if location.query:
+                url += '?' + location.query
+            resp = self._send(
+                location.scheme or self._scheme,
+                location.netloc or self._netloc,
+                method,
+                url,
+                body,
+            )
+        elif body is not None and resp.status < 300:
+            resp.read()
+            raise RuntimeError(
+                f"{op} {path} was not redirected, the data is not sent"
+            )
+
+        if resp.status >= 300:
+            self._raise_for_status(resp, f"{op} {path}")
+        return resp
+
+    def _raise_for_status(self, resp, cmd):
+        data = resp.read()
+        try:
+            exception = json.loads(data)['RemoteException']['exception']
+        except (ValueError, KeyError, TypeError):
+            exception = ''
+        message = "{} failed with status {}: {}".format(
+            cmd, resp.status, data.decode('utf-8', 'replace')
+        )
+        if exception == 'FileNotFoundException' or resp.status == 404:
+            raise FSFileNotExistsError(message)
+        if exception == 'FileAlreadyExistsException':
+            raise FSFileExistsError(message)
+        if resp.status >= 500:
+            raise ExecuteError(message)
+        raise RuntimeError(message)
+
+    def _request(self, method, path, op, body=None, **params):
+        resp = self._open(method, path, op, body, **params)
+        data = resp.read()
+        return json.loads(data) if data else {}
+
+    def _cache_get(self, cache, path):
+        with self._cache_lock:
+            item = cache.get(path)
+        if item is not None and item[0] > time.time():
+            return item[1]
+        return None
+
+    def _cache_put(self, cache, path, value):
+        if self._cache_ttl > 0:
+            with self._cache_lock:
+                cache[path] = (time.time() + self._cache_ttl, value)
+
+    def _invalidate(self, path):
+        prefix = path.rstrip('/') + '/'
+        parent = posixpath.dirname(path)
+        with self._cache_lock:
+            for cache in (self._status_cache, self._listing_cache):
+                for key in list(cache.keys()):
+                    if key == path or key.startswith(prefix):
+                        del cache[key]
+            self._listing_cache.pop(parent, None)
+
+    @_handle_errors()
+    def _status(self, path):
+        status = self._cache_get(self._status_cache, path)
+        if status is not None:
+            return status or None
+        try:
+            status = self._request('GET', path, 'GETFILESTATUS')['FileStatus']
+        except FSFileNotExistsError:
+            status = {}
+        # a missing path is cached as an empty status
+        self._cache_put(self._status_cache, path, status)
+        return status or None
+
+    @_handle_errors()
+    def _list_status(self, path):
+        statuses = self._cache_get(self._listing_cache, path)
+        if statuses is not None:
+            return statuses
+        statuses = self._request('GET', path, 'LISTSTATUS')['FileStatuses'][
+            'FileStatus'
+        ]
+        self._cache_put(self._listing_cache, path, statuses)
+        for status in statuses:
+            self._cache_put(
+                self._status_cache,
+                posixpath.join(path, status['pathSuffix']),
+                status,
+            )
+        return statuses
+
+    def list_dirs(self, fs_path):
+        """
+        Only list directorys under `fs_path` .
+
+        Args:
+            fs_path(str): The HDFS file path.
+
+        Returns:
+            List: A list of all its subdirectories, e.g. [subdirname1, subdirname1, ...].
+        """
+        dirs, _ = self.ls_dir(fs_path)
+        return dirs
+
+    def ls_dir(self, fs_path):
+        """
+        List directorys and files under `fs_path` .
+
+        Args:
+            fs_path(str): The HDFS file path.
+
+        Returns:
+            Tuple: Return a 2-tuple, the first element is the list of all its subdirectories,
+            and the second one is the list of all its subfiles, e.g. ([subdirname1, subdirname1, ...], [filename1, filename2, ...]).
+        """
+        path = self._normalize(fs_path)
+        status = self._status(path)
+        if status is None:
+            return [], []
+        if status['type'] != 'DIRECTORY':
+            return [], [posixpath.basename(path)]
+
+        dirs = []
+        files = []
+        for status in self._list_status(path):
+            if status['type'] == 'DIRECTORY':
+                dirs.append(status['pathSuffix'])
+            else:
+                files.append(status['pathSuffix'])
+        return dirs, files
+
+    def is_dir(self, fs_path):
+        """
+        Whether the remote HDFS path is a directory.
+
+        Args:
+            fs_path(str): The HDFS file path.
+
+        Returns:
+            Bool: Return true if the path exists and it's a directory, otherwise return false.
+        """
+        status = self._status(self._normalize(fs_path))
+        return status is not None and status['type'] == 'DIRECTORY'
+
+    def is_file(self, fs_path):
+        """
+        Whether the remote HDFS path is a file.
+
+        Args:
+            fs_path(str): The HDFS file path.
+
+        Returns:
+            Bool: Return true if the path exists and it's a file, otherwise return false.
+        """
+        status = self._status(self._normalize(fs_path))
+        return status is not None and status['type'] != 'DIRECTORY'
+
+    def is_exist(self, fs_path):
+        """
+        Whether the remote HDFS path exists.
+
+        Args:
+            fs_path(str): The hdfs file path.
+
+        Returns:
+            Bool: Whether it's is file or directory, return true if the path exists,
+            otherwise return false.
+        """
+        return self._status(self._normalize(fs_path)) is not None
+
+    def _thread_pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self._num_threads)
+        return self._pool
+
+    def _run_tasks(self, tasks, num_threads=None):
+        num_threads = num_threads or self._num_threads
+        if num_threads == 1 or len(tasks) <= 1:
+            for fn, args in tasks:
+                fn(*args)
+            return
+        if num_threads == self._num_threads:
+            pool = self._thread_pool()
+            futures = [pool.submit(fn, *args) for fn, args in tasks]
+            for future in futures:
+                future.result()
+            return
+        with ThreadPoolExecutor(num_threads) as pool:
+            futures = [pool.submit(fn, *args) for fn, args in tasks]
+            for future in futures:
+                future.result()
+
+    def upload_dir(self, local_dir, dest_dir, overwrite=False):
+        """
+        Upload a local directory into the remote HDFS directory `dest_dir` .
+
+        Args:
+            local_dir(str): The local directory.
+            dest_dir(str): The HDFS directory.
+            overwrite(bool): Whether to overwrite the existing remote directory. Default is False.
+        """
+        local_dir = local_dir.rstrip("/")
+        dest_dir = self._normalize(dest_dir)
+        target = posixpath.join(dest_dir, os.path.basename(local_dir))
+        if overwrite and self.is_exist(target):
+            self.delete(target)
+        self.mkdirs(dest_dir)
+        self.upload(local_dir, target)
+
+    def upload(
+        self, local_path, fs_path, multi_processes=None, overwrite=False
+    ):
+        """
+        Upload the local file or directory to remote HDFS. If `fs_path` is an
+        existing directory, `local_path` is uploaded into it.
+
+        Args:
+            local_path(str): The local path.
+            fs_path(str): The HDFS path.
+            multi_processes(int, optional): The number of transfer threads,
+                default is the `num_threads` of the client.
+            overwrite(bool): Whether to overwrite the existing remote files. Default is False.
+        """
+        if not os.path.exists(local_path):
+            raise FSFileNotExistsError(f"{local_path} not exists")
+        target = self._normalize(fs_path)
+        if self.is_dir(target):
+            target = posixpath.join(
+                target, os.path.basename(local_path.rstrip("/"))
+            )
+
+        files = []
+        if os.path.isdir(local_path):
+            for root, _, filenames in os.walk(local_path):
+                rel = os.path.relpath(root, local_path)
+                remote_root = posixpath.normpath(
+                    posixpath.join(target, rel.replace(os.sep, '/'))
+                )
+                self.mkdirs(remote_root)
+                for name in filenames:
+                    files.append(
+                        (
+                            os.path.join(root, name),
+                            posixpath.join(remote_root, name),
+                        )
+                    )
+        else:
+            files.append((local_path, target))
+
+        tasks = []
+        concats = []
+        for local_file, remote_file in files:
+            size = os.path.getsize(local_file)
+            if size <= self._chunk_size:
+                tasks.append(
+                    (
+                        self._put_chunk,
+                        (local_file, remote_file, 0, size, overwrite),
+                    )
+                )
+                continue
+            # large files are written as parts in parallel and merged
+            if not overwrite and self.is_exist(remote_file):
+                raise FSFileExistsError(f"{remote_file} exists already")
+            tmp_file = remote_file + "._COPYING_"
+            parts = []
+            for i, offset in enumerate(range(0, size, self._chunk_size)):
+                part = tmp_file if i == 0 else "%s.part-%05d" % (tmp_file, i)
+                length = min(self._chunk_size, size - offset)
+                parts.append(part)
+                tasks.append(
+                    (self._put_chunk, (local_file, part, offset, length, True))
+                )
+            concats.append((remote_file, parts))
+
+        self._run_tasks(tasks, multi_processes)
+        for remote_file, parts in concats:
+            self._concat(remote_file, parts, overwrite)
+
+    @_handle_errors()
+    def _put_chunk(self, local_file, remote_file, offset, length, overwrite):
+        with open(local_file, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+        self._invalidate(remote_file)
+        self._open(
+            'PUT',
+            remote_file,
+            'CREATE',
+            body=data,
+            overwrite='true' if overwrite else 'false',
+        ).read()
+
+    def _concat(self, remote_file, parts, overwrite):
+        tmp_file = parts[0]
+        self._invalidate(tmp_file)
+        for part in parts[1:]:
+            self._invalidate(part)
+        self._request('POST', tmp_file, 'CONCAT', sources=",".join(parts[1:]))
+        if overwrite and self.is_exist(remote_file):
+            self.delete(remote_file)
+        self._try_rename(tmp_file, remote_file)
+
+    def download(
+        self, fs_path, local_path, multi_processes=None, overwrite=False
+    ):
+        """
+        Download remote HDFS file or directory to the local. If `local_path`
+        is an existing directory, `fs_path` is downloaded into it.
+
+        Args:
+            fs_path(str):  The HDFS path.
+            local_path(str): The local path.
+            multi_processes(int, optional): The number of transfer threads,
+                default is the `num_threads` of the client.
+            overwrite(bool): Whether to overwrite the existing local files. Default is False.
+        """
+        path = self._normalize(fs_path)
+        status = self._status(path)
+        if status is None:
+            raise FSFileNotExistsError(f"{fs_path} not exits")
+        target = local_path
+        if os.path.isdir(target):
+            target = os.path.join(target, posixpath.basename(path))
+
+        files = []
+        pending = [(path, target, status)]
+        while pending:
+            remote, local, status = pending.pop()
+            if status['type'] != 'DIRECTORY':
+                files.append((remote, local, status['length']))
+                continue
+            os.makedirs(local, exist_ok=True)
+            for child in self._list_status(remote):
+                name = child['pathSuffix']
+                pending.append(
+                    (
+                        posixpath.join(remote, name),
+                        os.path.join(local, name),
+                        child,
+                    )
+                )
+
+        tasks = []
+        tmp_files = []
+        for remote, local, size in files:
+            if os.path.exists(local) and not overwrite:
+                raise FSFileExistsError(f"{local} exists already")
+            tmp_file = local + "._COPYING_"
+            # preallocate so that the chunks can be written in any order
+            with open(tmp_file, 'wb') as f:
+                f.truncate(size)
+            tmp_files.append((tmp_file, local))
+            for offset in range(0, size, self._chunk_size):
+                length = min(self._chunk_size, size - offset)
+                tasks.append(
+                    (self._get_chunk, (remote, tmp_file, offset, length))
+                )
+
+        try:
+            self._run_tasks(tasks, multi_processes)
+        except Exception:
+            for tmp_file, _ in tmp_files:
+                LocalFS().delete(tmp_file)
+            raise
+        for tmp_file, local in tmp_files:
+            os.replace(tmp_file, local)
+
+    @_handle_errors()
+    def _get_chunk(self, remote_file, local_file, offset, length):
+        resp = self._open(
+            'GET', remote_file, 'OPEN', offset=offset, length=length
+        )
+        with open(local_file, 'r+b') as f:
+            f.seek(offset)
+            shutil.copyfileobj(resp, f, 1 << 20)
+            written = f.tell() - offset
+        resp.read()
+        if written != length:
+            raise ExecuteError(
+                "read {} bytes of {} at offset {}, expected {}".format(
+                    written, remote_file, offset, length
+                )
+            )
+
+    @_handle_errors()
+    def mkdirs(self, fs_path):
+        """
+        Create a remote HDFS directory.
+
+        Args:
+            fs_path(str): The HDFS directory path.
+        """
+        path = self._normalize(fs_path)
+        if self.is_dir(path):
+            return
+        self._invalidate(path)
+        ret = self._request('PUT', path, 'MKDIRS')
+        if not ret.get('boolean', True):
+            raise ExecuteError(f"mkdirs {path}")
+
+    def rename(self, fs_src_path, fs_dst_path):
+        """
+        Rename the remote HDFS file or directory.
+
+        Args:
+            fs_src_path(str): The actual name of the file or directory
+            fs_dst_path(str): The new name of the file or directory.
+        """
+        self._try_rename(
+            self._normalize(fs_src_path), self._normalize(fs_dst_path)
+        )
+
+    def mv(self, fs_src_path, fs_dst_path, overwrite=False, test_exists=True):
+        """
+        Move a remote HDFS file or directory from `fs_src_path` to `fs_dst_path` .
+
+        Args:
+            fs_src_path(str):  Name of the file or directory, that's needed to be moved.
+            fs_dst_path(str):  Name of the file or directory to which to move to.
+            overwrite(bool): Whether to re-write `fs_dst_path` if that exists. Default is False.
+            test_exists(bool): Check the existence of `fs_src_path` and `fs_dst_path` . When `test_exists` is set true, if `fs_src_path` doesn't exist or `fs_dst_path` exists, program will throw an Excetption.
+        """
+        src = self._normalize(fs_src_path)
+        dst = self._normalize(fs_dst_path)
+        if overwrite and self.is_exist(dst):
+            self.delete(dst)
+
+        if test_exists:
+            if not self.is_exist(src):
+                raise FSFileNotExistsError(f"{fs_src_path} is not exists")
+
+            if self.is_exist(dst):
+                raise FSFileExistsError(f"{fs_dst_path} exists already")
+
+        self._try_rename(src, dst)
+
+    @_handle_errors()
+    def _try_rename(self, src, dst):
+        self._invalidate(src)
+        self._invalidate(dst)
+        ret = self._request('PUT', src, 'RENAME', destination=dst)
+        if not ret.get('boolean', True):
+            # the previous try may have succeeded without a response
+            if not self.is_exist(src) and self.is_exist(dst):
+                return
+            raise ExecuteError(f"rename {src} to {dst}")
+
+    @_handle_errors()
+    def delete(self, fs_path):
+        """
+        Delete a remote HDFS path, whether it's a file or directory.
+
+        Args:
+            fs_path(str): The HDFS file path.
+        """
+        path = self._normalize(fs_path)
+        if not self.is_exist(path):
+            return
+        self._invalidate(path)
+        self._request('DELETE', path, 'DELETE', recursive='true')
+
+    def touch(self, fs_path, exist_ok=True):
+        """
+        Create a remote HDFS file.
+
+        Args:
+            fs_path(str): The HDFS file path.
+            exist_ok(bool): When `fs_path` exists, if `exist_ok` is set false,
+            program will throw an Exception. Default is true.
+        """
+        path = self._normalize(fs_path)
+        if self.is_exist(path):
+            if exist_ok:
+                return
+            raise FSFileExistsError
+
+        self._invalidate(path)
+        self._open('PUT', path, 'CREATE', body=b'', overwrite='false').read()
+
+    def need_upload_download(self):
+        return True
+
+    def cat(self, fs_path=None):
+        """
+        Cat a remote HDFS file.
+
+        Args:
+            fs_path(str): The HDFS file path.
+
+        Returns:
+            file content
+        """
+        path = self._normalize(fs_path)
+        if not self.is_file(path):
+            return ""
+        return self._try_cat(path)
+
+    @_handle_errors()
+    def _try_cat(self, path):
+        data = self._open('GET', path, 'OPEN').read()
+        return "\n".join(data.decode('utf-8').splitlines())
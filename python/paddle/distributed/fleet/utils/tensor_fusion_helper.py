@@ -13,6 +13,7 @@
 # limitations under the License.
 import itertools
 import os
+import time
 from collections import OrderedDict
 
 import numpy as np
@@ -38,7 +39,16 @@ align = {
 }
 
 
-def assign_group_by_size(parameters, group_size=128 * 1024 * 1024):
+def assign_group_by_size(
+    parameters, group_size=128 * 1024 * 1024, ready_order=None
+):
+    if ready_order is not None:
+        # put the parameters in the order their gradients are ready, the ones
+        # not in ready_order keep their order at the end
+        rank = {name: i for i, name in enumerate(ready_order)}
+        parameters = sorted(
+            parameters, key=lambda p: rank.get(p.name, len(rank))
+        )
     is_sparse_gradient = [False] * len(parameters)
 
     group_indices = core.eager_assign_group_by_size(
@@ -270,6 +280,167 @@ class FusedCommBuffer:
         self._reset_params_checked_in()
 
 
+def _synchronize():
+    if paddle.is_compiled_with_cuda() and isinstance(
+        paddle.framework._current_expected_place(), paddle.CUDAPlace
+    ):
+        paddle.device.synchronize()
+
+
+def measure_bucket_size(
+    comm_group,
+    dtype=paddle.float32,
+    min_size=1024 * 1024,
+    max_size=256 * 1024 * 1024,
+    overhead=0.1,
+):
+    """
+    Choose the size in bytes of the gradient buckets from the measured
+    latency and bandwidth of all_reduce in comm_group, so that the latency of
+    a bucket is about ``overhead`` of its transfer time. Smaller buckets start
+    the communication earlier in the backward, larger ones amortize the
+    latency. All the ranks of comm_group get the same size.
+    """
+    elem_size = align[dtype.value] if dtype.value in align else 4
+    sizes = [1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024]
+    times = []
+    for nbytes in sizes:
+        tensor = paddle.zeros([nbytes // elem_size], dtype=dtype)
+        # warm up, e.g. to create the communicator
+        paddle.distributed.all_reduce(tensor, group=comm_group)
+        _synchronize()
+        repeat = 3
+        start = time.time()
+        for _ in range(repeat):
+            paddle.distributed.all_reduce(tensor, group=comm_group)
+        _synchronize()
+        times.append((time.time() - start) / repeat)
+
+    # fit time = latency + nbytes / bandwidth
+    inv_bandwidth, latency = np.polyfit(sizes, times, 1)
+    if inv_bandwidth <= 0:
+        bucket_size = max_size
+    else:
+        bucket_size = max(latency, 0) / (overhead * inv_bandwidth)
+    bucket_size = int(min(max(bucket_size, min_size), max_size))
+
+    # the buckets must be the same on all ranks
+    size_tensor = paddle.to_tensor([bucket_size], dtype="int64")
+    paddle.distributed.all_reduce(
+        size_tensor, op=paddle.distributed.ReduceOp.MAX, group=comm_group
+    )
+    return int(size_tensor.item())
+
+
+class ReorderedCommBuffers:
+    """
+    The FusedCommBuffers of ``params`` which are rebuilt after the first
+    step. In the first backward the buckets are in the declaration order of
+    the parameters, and the order in which their gradients are ready is
+    recorded by the backward hooks. Then the buckets are rebuilt in that order
+    with the size chosen by ``measure_bucket_size`` if ``auto_size``, so that
+    the communication of the first bucket starts as early as possible in the
+    backward.
+
+    Call ``scale_grads`` after every backward to wait for the communication.
+    """
+
+    def __init__(
+        self,
+        params,
+        comm_group,
+        acc_steps=1,
+        act=HOOK_ACTION.ALL_REDUCE,
+        dst=-1,
+        group_size=128 * 1024 * 1024,
+        use_main_grad=None,
+        scale_after_comm=True,
+        auto_size=True,
+    ):
+        self._params = params
+        self._comm_group = comm_group
+        self._buffer_kwargs = {
+            "comm_group": comm_group,
+            "acc_steps": acc_steps,
+            "act": act,
+            "dst": dst,
+            "use_main_grad": use_main_grad,
+            "scale_after_comm": scale_after_comm,
+        }
+        self._group_size = group_size
+        self._auto_size = auto_size
+        self._ready_order = []
+        self._rebuilt = False
+        self._param2buffer = {}
+        self._build(assign_group_by_size(params, group_size))
+        for param in params:
+            # the buffer of a param is looked up in add_grad, so the hooks are
+            # registered once and kept after rebuilding
+            param._register_backward_hook(bw_hook_func(self, param))
+
+    @property
+    def buffers(self):
+        return self._buffers
+
+    @property
+    def ready_order(self):
+        return self._ready_order
+
+    def _build(self, var_groups):
+        self._buffers = []
+        for group_idx, params in var_groups.items():
+            buffer = FusedCommBuffer(group_idx, params, **self._buffer_kwargs)
+            self._buffers.append(buffer)
+            for param in params:
+                self._param2buffer[param.name] = buffer
+
+    def add_grad(self, param, use_comm=True):
+        if not self._rebuilt and param.name not in self._ready_order:
+            self._ready_order.append(param.name)
+        self._param2buffer[param.name].add_grad(param, use_comm)
+
+    @imperative_base.no_grad
+    def scale_grads(self):
+        for buffer in self._buffers:
+            buffer.scale_grads()
+        if not self._rebuilt:
+            self._rebuild()
+
+    @imperative_base.no_grad
+    def _rebuild(self):
+        ready_order = self._ready_order
+        if self._comm_group is not None and self._comm_group.nranks > 1:
+            # the buckets must be the same on all ranks
+            order_list = [ready_order]
+            paddle.distributed.broadcast_object_list(
+                order_list,
+                src=self._comm_group.ranks[0],
+                group=self._comm_group,
+            )
+            ready_order = order_list[0]
+        # the buckets hold the gradients, which are float32 with main_grad
+        use_main_grad = self._buffers[0].use_main_grad
+        group_size = self._group_size
+        if self._auto_size and self._comm_group is not None:
+            group_size = measure_bucket_size(
+                self._comm_group, dtype=self._buffers[0].grad_storage.dtype
+            )
+
+        # the gradients of this step are copied into the new buffers
+        grads = [
+            (p.main_grad if use_main_grad else p.grad).clone()
+            for p in self._params
+        ]
+        self._build(assign_group_by_size(self._params, group_size, ready_order))
+        for param, grad in zip(self._params, grads):
+            paddle.assign(
+                grad, param.main_grad if use_main_grad else param.grad
+            )
+        self._group_size = group_size
+        self._ready_order = ready_order
+        self._rebuilt = True
+
+
 def obtain_storage(
     parameters,
     use_main_grad=False,
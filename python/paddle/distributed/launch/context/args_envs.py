@@ -25,6 +25,7 @@ env_args_mapping = {
     'PADDLE_LOG_LEVEL': ('log_level', str),
     'PADDLE_LOG_OVERWRITE': ('log_overwrite', strtobool),
     'PADDLE_SORT_IP': ('sort_ip', strtobool),
+    'PADDLE_RENDEZVOUS_FANOUT': ('rendezvous_fanout', int),
     'PADDLE_NPROC_PER_NODE': ('nproc_per_node', int),
     'PADDLE_JOB_ID': ('job_id', str),
     'PADDLE_RANK': ('rank', int),
@@ -89,6 +90,14 @@ def parse_args():
         help="rank node by ip. Default False",
     )
 
+    base_group.add_argument(
+        "--rendezvous_fanout",
+        type=int,
+        default=32,
+        help="the peers rendezvous in a tree of groups of this size if there "
+        "are more of them, with the http master. Default 32",
+    )
+
     base_group.add_argument(
         "--enable_gpu_log",
         type=strtobool,
@@ -25,6 +25,9 @@ from paddle.distributed.launch.utils.kv_server import KVServer
 
 ETCD_PROTOCAL = 'etcd://'
 
+# seconds a peer waits on the http master for the others in a single request
+SYNC_POLL_TIMEOUT = 10
+
 
 def _cmp_by_ip(x):
     x = json.loads(x)
@@ -154,34 +157,195 @@ class HTTPMaster(Master):
         ky = 'aaaaaa' if rank < 0 and self.role == Master.MAIN else key
         k = f"{prefix}/{ky}/{rank}"
 
+        fanout = self.ctx.args.rendezvous_fanout
+        if fanout > 1 and size > fanout:
+            rjson = self._sync_peers_tree(prefix, k, value, size, fanout)
+            if rjson is None:
+                return [], 0
+            return self._sort_peers(rjson, value, size, rank)
+
         while not self.ctx.status.is_done():
             if not self.client.put(k, value):
                 self.ctx.logger.warning("put value failed")
                 time.sleep(0.1)
                 continue
 
-            rjson = self.client.get_prefix(prefix)
+            # blocks on the server until all the peers arrive or the poll
+            # times out, the value is put again before the next poll in
+            # case the master restarted
+            rjson = self.client.get_prefix(
+                prefix, min_count=size, timeout=SYNC_POLL_TIMEOUT, packed=True
+            )
             self.ctx.logger.debug(f"sync peers {rjson}")
             if rjson and len(rjson) == size:
-                if self.ctx.args.sort_ip:
-                    ret = sorted(rjson.values(), key=_cmp_by_ip)
-                    idx = ret.index(value)
-                    return ret, idx
-                elif rank < 0:
-                    keys = list(rjson.keys())
-                    keys.sort()
-                    ret = [rjson[k] for k in keys]
-                    idx = ret.index(value)
-                    return ret, idx
-                else:
-                    ret = [None] * size
-                    for k, v in rjson.items():
-                        ret[int(k.split('/')[-1])] = v
-                    return ret, rank
-            else:
+                return self._sort_peers(rjson, value, size, rank)
+            elif not rjson or len(rjson) > size:
                 time.sleep(0.5)
         return [], 0
 
+    def _sort_peers(self, rjson, value, size, rank):
+        if self.ctx.args.sort_ip:
+            ret = sorted(rjson.values(), key=_cmp_by_ip)
+            idx = ret.index(value)
+            return ret, idx
+        elif rank < 0:
+            keys = list(rjson.keys())
+            keys.sort()
+            ret = [rjson[k] for k in keys]
+            idx = ret.index(value)
+            return ret, idx
+        else:
+            ret = [None] * size
+            for k, v in rjson.items():
+                ret[int(k.split('/')[-1])] = v
+            return ret, rank
+
+    def _poll(self, fetch):
+        # call fetch, which blocks for a while itself, until it succeeds
+        while not self.ctx.status.is_done():
+            ret = fetch()
+            if ret:
+                return ret
+            time.sleep(0.1)
+        return None
+
+    def _start_group_server(self):
+        while not self.ctx.status.is_done():
+            port = self.ctx.node.get_free_port()
+            try:
+                server = KVServer(port)
+            except Exception as e:
+                self.ctx.logger.warning(f"start group server failed {e}")
+                time.sleep(0.1)
+                continue
+            server.start()
+            return server, f"{self.ctx.node.ip}:{port}"
+        return None, None
+
+    def _sync_peers_tree(self, prefix, key, value, size, fanout):
+        '''
+        Gather the values of the peers in a tree of groups of `fanout` peers.
+        The master only places the peers in the tree, the first peer of each
+        group merges the values of the group and passes them to its group at
+        the next level, up to the root. The full list goes back down the same
+        way, each leader serving its group from its own KV server. The master
+        and every leader handle O(fanout) full lists, and the rendezvous
+        takes O(log(size)) rounds.
+        '''
+        tree = f"/_tree{prefix}"
+
+        # the position of the peer among the sorted keys, the values are
+        # not sent to the master
+        def place():
+            if not self.client.put(key, ''):
+                self.ctx.logger.warning("put value failed")
+                return None
+            ret = self.client.get_index(
+                prefix, key, min_count=size, timeout=SYNC_POLL_TIMEOUT
+            )
+            if ret and ret[1] > size:
+                time.sleep(0.5)
+            if ret and ret[0] >= 0 and ret[1] == size:
+                return ret
+
+        ret = self._poll(place)
+        if ret is None:
+            return None
+        pos = ret[0]
+
+        server, parent, led = None, None, []
+        try:
+            entries = json.dumps({key: value})
+            level, count = 0, size
+            while count > 1:
+                group, slot = divmod(pos, fanout)
+                group_size = min(fanout, count - group * fanout)
+                group_key = f"{tree}/{level}/{group}/leader"
+                if slot > 0:
+                    # hand the values over to the leader of the group
+                    leader = self._poll(
+                        lambda: (
+                            self.client.get_prefix(
+                                group_key,
+                                min_count=1,
+                                timeout=SYNC_POLL_TIMEOUT,
+                            )
+                            or {}
+                        ).get(group_key)
+                    )
+                    if leader is None:
+                        return None
+                    parent = KVClient(leader)
+                    if not self._poll(
+                        lambda: parent.put(f"/{level}/{slot}", entries)
+                    ):
+                        return None
+                    break
+
+                if group_size > 1:
+                    if server is None:
+                        server, endpoint = self._start_group_server()
+                        if server is None:
+                            return None
+                    if not self._poll(
+                        lambda: self.client.put(group_key, endpoint)
+                    ):
+                        return None
+                    server.store.put(f"/{level}/0", entries.encode())
+                    kv = self._poll(
+                        lambda: self._wait_local(
+                            server, f"/{level}/", group_size
+                        )
+                    )
+                    if kv is None:
+                        return None
+                    merged = {}
+                    for v in kv.values():
+                        merged.update(json.loads(v))
+                    entries = json.dumps(merged)
+                    led.append((level, group_size))
+                level, pos = level + 1, group
+                count = (count + fanout - 1) // fanout
+
+            if parent is not None:
+                result = self._poll(
+                    lambda: (
+                        parent.get_prefix(
+                            '/result',
+                            min_count=1,
+                            timeout=SYNC_POLL_TIMEOUT,
+                            packed=True,
+                        )
+                        or {}
+                    ).get('/result')
+                )
+                if result is None:
+                    return None
+                parent.put(f"/ack/{level}/{slot}", '')
+            else:
+                result = entries
+
+            if server is not None:
+                server.store.put('/result', result.encode())
+                # the server is kept until the groups got the result
+                for lvl, group_size in led:
+                    self._poll(
+                        lambda: self._wait_local(
+                            server, f"/ack/{lvl}/", group_size - 1
+                        )
+                    )
+            return json.loads(result)
+        finally:
+            # the early returns must not leave the server thread running
+            if server is not None:
+                server.stop()
+
+    def _wait_local(self, server, prefix, count):
+        _, kv = server.store.get_prefix(
+            prefix, min_count=count, timeout=SYNC_POLL_TIMEOUT
+        )
+        return kv if len(kv) >= count else None
+
 
 class ETCDMaster(Master):
     def __init__(self, ctx):
@@ -16,18 +16,29 @@ import time
 
 import httpx
 
+from .kv_server import unpack_kv
+
 
 class KVClient:
     def __init__(self, endpoint='localhost:2379'):
         self.endpoint = (
             endpoint if endpoint.startswith("http://") else f"http://{endpoint}"
         )
+        self._http = None
+
+    @property
+    def http(self):
+        # a client is costly to create, e.g. its ssl context, it is shared by
+        # the requests which are many in the rendezvous of large jobs
+        if self._http is None:
+            self._http = httpx.Client(timeout=None, follow_redirects=True)
+        return self._http
 
     def put(self, key, value):
         key = key if key.startswith('/') else f"/{key}"
         u = f"{self.endpoint}{key}"
         try:
-            r = httpx.post(u, data=value, timeout=None, follow_redirects=True)
+            r = self.http.post(u, data=value)
             if r.status_code == 200:
                 return True
             else:
@@ -39,7 +50,7 @@ class KVClient:
         key = key if key.startswith('/') else f"/{key}"
         u = f"{self.endpoint}{key}"
         try:
-            r = httpx.get(u, timeout=None, follow_redirects=True)
+            r = self.http.get(u)
             if r.status_code == 200:
                 ret = r.json()
                 return ret.get(key, '')
@@ -48,21 +59,52 @@ class KVClient:
         except:
             return ""
 
-    def get_prefix(self, key):
+    def get_prefix(self, key, min_count=0, timeout=0, packed=False):
+        '''
+        Get all the values under the prefix `key`. With `timeout` > 0 the
+        server holds the request until at least `min_count` keys exist or
+        `timeout` seconds pass, instead of the caller polling. With `packed`
+        the result is transferred in the compact binary encoding.
+        '''
         key = key if key.startswith('/') else f"/{key}"
         u = f"{self.endpoint}{key}"
+        params = {}
+        if timeout > 0:
+            params.update({'min_count': min_count, 'timeout': timeout})
+        if packed:
+            params['format'] = 'packed'
         try:
-            r = httpx.get(u, timeout=None, follow_redirects=True)
+            r = self.http.get(u, params=params or None)
             if r.status_code == 200:
-                return r.json()
+                return unpack_kv(r.content) if packed else r.json()
         except:
             return ""
 
+    def get_index(self, prefix, key, min_count=0, timeout=0):
+        '''
+        Get the (position of `key` among the sorted keys under `prefix`,
+        number of the keys), blocking like get_prefix. The position is -1 if
+        `key` does not exist.
+        '''
+        prefix = prefix if prefix.startswith('/') else f"/{prefix}"
+        key = key if key.startswith('/') else f"/{key}"
+        u = f"{self.endpoint}{prefix}"
+        params = {'index': key}
+        if timeout > 0:
+            params.update({'min_count': min_count, 'timeout': timeout})
+        try:
+            r = self.http.get(u, params=params)
+            if r.status_code == 200:
+                ret = r.json()
+                return ret['index'], ret['count']
+        except:
+            return None
+
     def delete(self, key):
         key = key if key.startswith('/') else f"/{key}"
         u = f"{self.endpoint}{key}"
         try:
-            r = httpx.delete(u, timeout=None, follow_redirects=True)
+            r = self.http.delete(u)
             if r.status_code == 200:
                 return True
             else:
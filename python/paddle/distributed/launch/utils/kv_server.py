@@ -12,24 +12,153 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import bisect
 import http.server as SimpleHTTPServer
 import json
+import struct
 import threading
-from http.server import HTTPServer
+import time
+import zlib
+from http.server import ThreadingHTTPServer
 from multiprocessing import Process
+from urllib.parse import parse_qs, urlsplit
+
+# upper bound of a single long poll, clients poll again after it
+MAX_WAIT_TIMEOUT = 60.0
+
+
+def pack_kv(kv):
+    '''
+    Encode {key: bytes} as length-prefixed records compressed with zlib,
+    which is much smaller and cheaper to build than json for the peer lists
+    of large jobs.
+    '''
+    buf = [struct.pack('<I', len(kv))]
+    for k, v in kv.items():
+        k = k.encode('utf-8')
+        buf.append(struct.pack('<II', len(k), len(v)))
+        buf.append(k)
+        buf.append(v)
+    return zlib.compress(b''.join(buf))
+
+
+def unpack_kv(data):
+    '''
+    Decode the result of pack_kv to {key: str}.
+    '''
+    data = zlib.decompress(data)
+    (num,) = struct.unpack_from('<I', data, 0)
+    offset = 4
+    ret = {}
+    for _ in range(num):
+        klen, vlen = struct.unpack_from('<II', data, offset)
+        offset += 8
+        k = data[offset : offset + klen].decode('utf-8')
+        offset += klen
+        ret[k] = data[offset : offset + vlen].decode('utf-8')
+        offset += vlen
+    return ret
+
+
+class KVStore:
+    '''
+    KVStore keeps the keys sorted so that a prefix query is a binary search
+    plus a scan of the matching keys, and lets readers wait for changes
+    instead of polling.
+    '''
+
+    def __init__(self, kv=None):
+        self.cond = threading.Condition()
+        self.kv = dict(kv or {})
+        self.keys = sorted(self.kv)
+        self.revision = 0
+
+    def put(self, key, value):
+        with self.cond:
+            if key not in self.kv:
+                bisect.insort(self.keys, key)
+            self.kv[key] = value
+            self.revision += 1
+            self.cond.notify_all()
+
+    def delete(self, key):
+        with self.cond:
+            if key not in self.kv:
+                return False
+            del self.kv[key]
+            del self.keys[bisect.bisect_left(self.keys, key)]
+            self.revision += 1
+            self.cond.notify_all()
+            return True
+
+    def _prefix_keys(self, prefix):
+        begin = bisect.bisect_left(self.keys, prefix)
+        end = begin
+        while end < len(self.keys) and self.keys[end].startswith(prefix):
+            end += 1
+        return self.keys[begin:end]
+
+    def get_prefix(self, prefix, min_count=0, revision=-1, timeout=0):
+        '''
+        Return the (revision, {key: value}) of the keys starting with
+        `prefix`, blocking up to `timeout` seconds until at least `min_count`
+        keys match and the store is newer than `revision`.
+        '''
+        end = time.time() + timeout
+        with self.cond:
+            while True:
+                keys = self._prefix_keys(prefix)
+                if len(keys) >= min_count and self.revision > revision:
+                    break
+                remaining = end - time.time()
+                if remaining <= 0:
+                    break
+                self.cond.wait(remaining)
+            return self.revision, {k: self.kv[k] for k in keys}
 
 
 class KVHandler(SimpleHTTPServer.SimpleHTTPRequestHandler):
     def do_GET(self):
-        with self.server.kv_lock:
-            ret = {}
-            for k, v in self.server.kv.items():
-                if k.startswith(self.path):
-                    ret[k] = v.decode(encoding="utf-8")
-            if ret:
-                self.output(200, json.dumps(ret).encode("utf-8"))
-            else:
-                self.output(404)
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        try:
+            min_count = int(query.get('min_count', [0])[0])
+            revision = int(query.get('revision', [-1])[0])
+            timeout = float(query.get('timeout', [0])[0])
+        except ValueError:
+            self.output(400)
+            return
+        timeout = min(max(timeout, 0), MAX_WAIT_TIMEOUT)
+
+        revision, kv = self.server.store.get_prefix(
+            url.path, min_count, revision, timeout
+        )
+        if 'index' in query:
+            # only the position of a key among the keys of the prefix, the
+            # peers need not download the keys to place themselves
+            key = query['index'][0]
+            index = list(kv).index(key) if key in kv else -1
+            self.output(
+                200,
+                json.dumps({'index': index, 'count': len(kv)}).encode("utf-8"),
+                {"X-KV-Revision": revision},
+            )
+        elif kv and query.get('format', [''])[0] == 'packed':
+            self.output(
+                200,
+                self.server.packed(url.path, revision, kv),
+                {"X-KV-Revision": revision},
+                content_type="application/octet-stream",
+            )
+        elif kv:
+            ret = {k: v.decode(encoding="utf-8") for k, v in kv.items()}
+            self.output(
+                200,
+                json.dumps(ret).encode("utf-8"),
+                {"X-KV-Revision": revision},
+            )
+        else:
+            self.output(404, headers={"X-KV-Revision": revision})
 
     def do_PUT(self):
         self.do_POST()
@@ -38,25 +167,29 @@ class KVHandler(SimpleHTTPServer.SimpleHTTPRequestHandler):
         content_length = int(self.headers['Content-Length'] or 0)
         try:
             value = self.rfile.read(content_length)
-            with self.server.kv_lock:
-                self.server.kv[self.path] = value
-                self.output(200)
-                return
+            self.server.store.put(self.path, value)
+            self.output(200)
         except:
             self.output(500)
 
     def do_DELETE(self):
-        with self.server.kv_lock:
-            if self.path in self.server.kv:
-                del self.server.kv[self.path]
-                self.output(200)
-            else:
-                self.output(404)
-
-    def output(self, code, value=''):
+        if self.server.store.delete(self.path):
+            self.output(200)
+        else:
+            self.output(404)
+
+    def output(
+        self,
+        code,
+        value='',
+        headers=None,
+        content_type="application/json; charset=utf8",
+    ):
         self.send_response(code)
         self.send_header("Content-Length", len(value))
-        self.send_header("Content-Type", "application/json; charset=utf8")
+        self.send_header("Content-Type", content_type)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
         self.end_headers()
         if value:
             self.wfile.write(value)
@@ -65,17 +198,39 @@ class KVHandler(SimpleHTTPServer.SimpleHTTPRequestHandler):
         return
 
 
-class KVServer(HTTPServer):
+class KVServer(ThreadingHTTPServer):
+    # long polls hold a thread each, they must not block the shutdown
+    daemon_threads = True
+    # all the peers connect at about the same time during rendezvous
+    request_queue_size = 1024
+
     def __init__(self, port):
         super().__init__(('', port), KVHandler)
-        self.kv_lock = threading.Lock()
-        self.kv = {'/healthy': b'ok'}
+        self.store = KVStore({'/healthy': b'ok'})
         self.port = port
         self.stopped = False
         self.started = False
+        self._packed_lock = threading.Lock()
+        self._packed = {}
+
+    @property
+    def kv(self):
+        return self.store.kv
+
+    def packed(self, prefix, revision, kv):
+        # the peers waiting for the same prefix wake up at the same revision,
+        # the result is encoded once and shared by all the responses
+        with self._packed_lock:
+            item = self._packed.get(prefix)
+            if item is None or item[0] != revision:
+                item = (revision, pack_kv(kv))
+                self._packed[prefix] = item
+            return item[1]
 
     def start(self):
-        self.listen_thread = threading.Thread(target=self.serve_forever)
+        self.listen_thread = threading.Thread(
+            target=self.serve_forever, daemon=True
+        )
         self.listen_thread.start()
         self.started = True
 
@@ -91,7 +246,8 @@ class PKVServer:
         self._server = KVServer(port)
 
     def start(self):
-        self.proc = Process(target=self._server.start)
+        # the listen thread is a daemon, the process serves in its main thread
+        self.proc = Process(target=self._server.serve_forever)
         self.proc.daemon = True
         self.proc.start()
 
@@ -112,7 +268,6 @@ if __name__ == '__main__':
     # kv = PKVServer(8090)
     kv = KVServer(8090)
     kv.start()
-    import time
 
     # print("serve at 8090 for 600 s")
 
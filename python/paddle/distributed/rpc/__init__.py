@@ -20,6 +20,8 @@ from paddle.distributed.rpc.rpc import (
     get_worker_info,
     get_all_worker_infos,
     get_current_worker_info,
+    BatchingRpcClient,
+    BatchFuture,
 )
 
 __all__ = [
@@ -30,4 +32,6 @@ __all__ = [
     "get_worker_info",
     "get_all_worker_infos",
     "get_current_worker_info",
+    "BatchingRpcClient",
+    "BatchFuture",
 ]
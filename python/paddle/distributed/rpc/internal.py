@@ -30,3 +30,15 @@ def _deserialize(obj):
 def _run_py_func(python_func):
     result = python_func.func(*python_func.args, **python_func.kwargs)
     return result
+
+
+def _run_py_func_batch(python_funcs):
+    # every call reports its own result or exception, so that one failed call
+    # does not fail the others in the batch
+    results = []
+    for python_func in python_funcs:
+        try:
+            results.append((True, _run_py_func(python_func)))
+        except Exception as e:
+            results.append((False, e))
+    return results
@@ -12,14 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import bisect
 import datetime
 import os
 import pickle
+import threading
 import time
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from paddle.distributed.launch.context import Node
-from paddle.distributed.rpc.internal import PythonFunc, _serialize
+from paddle.distributed.rpc.internal import (
+    PythonFunc,
+    _run_py_func_batch,
+    _serialize,
+)
 from paddle.distributed.utils.launch_utils import logger
 from paddle.fluid import core
 
@@ -33,6 +40,26 @@ _barrier_store = None
 # count the number of `_barrier_never_timeout` is called and
 # ensure that the barrier key is unique
 _barrier_count = 0
+# upper bounds in milliseconds of the buckets of the latency histograms
+_LATENCY_BUCKETS_MS = (
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+    float("inf"),
+)
 
 
 def _set_barrier_store(store):
@@ -375,3 +402,285 @@ def get_current_worker_info():
 
     """
     return core.rpc_get_current_worker_info()
+
+
+class _LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * len(_LATENCY_BUCKETS_MS)
+        self.calls = 0
+        self.batches = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, latency_ms, num_calls):
+        self.counts[bisect.bisect_left(_LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.calls += num_calls
+        self.batches += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, q):
+        # the upper bound of the bucket holding the q-th percentile
+        rank = q / 100 * self.batches
+        count = 0
+        for bound, n in zip(_LATENCY_BUCKETS_MS, self.counts):
+            count += n
+            if n > 0 and count >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        return {
+            "calls": self.calls,
+            "batches": self.batches,
+            "mean_ms": self.total_ms / self.batches if self.batches else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "histogram": {
+                bound: n
+                for bound, n in zip(_LATENCY_BUCKETS_MS, self.counts)
+                if n > 0
+            },
+        }
+
+
+class BatchFuture:
+    """
+    The result of a call made by :class:`BatchingRpcClient`, it is completed
+    when the batch holding the call returns.
+    """
+
+    def __init__(self):
+        self._sent = threading.Event()
+        self._batch = None
+        self._result = None
+
+    def _set_batch(self, batch):
+        self._batch = batch
+        self._sent.set()
+
+    def done(self):
+        return self._batch is not None and self._batch.done()
+
+    def wait(self):
+        """
+        Block until the call completes, return its result or raise the
+        exception it raised.
+        """
+        self._sent.wait()
+        self._batch.resolve()
+        ok, value = self._result
+        if not ok:
+            raise value
+        return value
+
+
+class _FailedFuture:
+    def __init__(self, error, num_calls):
+        self._results = [(False, error)] * num_calls
+
+    def wait(self):
+        return self._results
+
+
+class _Batch:
+    def __init__(self, to, future, call_futures, histogram):
+        self._to = to
+        self._future = future
+        self._call_futures = call_futures
+        self._histogram = histogram
+        self._start = time.time()
+        self._lock = threading.Lock()
+        self._done = False
+
+    def done(self):
+        return self._done
+
+    def resolve(self):
+        with self._lock:
+            if self._done:
+                return
+            try:
+                results = self._future.wait()
+            except Exception as e:
+                results = [(False, e)] * len(self._call_futures)
+            self._histogram.add(
+                (time.time() - self._start) * 1000, len(self._call_futures)
+            )
+            for call_future, result in zip(self._call_futures, results):
+                call_future._result = result
+            self._done = True
+
+
+class BatchingRpcClient:
+    """
+    A client coalescing the RPC calls to the same worker into one request.
+    The calls to a worker are sent together when ``max_batch_size`` calls are
+    pending, or ``max_delay_ms`` milliseconds after the first pending call,
+    every call gets its own :class:`BatchFuture`. The latency of the requests
+    to every worker is recorded in a histogram.
+
+    Args:
+        max_batch_size (int, optional): the maximum number of calls in a
+            request, default is 128.
+        max_delay_ms (float, optional): the maximum time in milliseconds a call
+            waits for the others before being sent, default is 1.
+        timeout (int, optional): timeout in seconds of every request, a value
+            less than or equal to 0 indicates an infinite timeout, default is -1.
+        num_threads (int, optional): the number of threads waiting for the
+            results of the requests, default is 4.
+
+    Examples:
+        .. code-block:: python
+
+            import paddle.distributed.rpc as rpc
+
+            def add(a, b):
+                return a + b
+
+            rpc.init_rpc("worker0", rank=0, world_size=1,
+                    master_endpoint="127.0.0.1:8008")
+            client = rpc.BatchingRpcClient(max_batch_size=64)
+            futs = [client.rpc_async("worker0", add, args=(i, 1)) for i in range(100)]
+            print([fut.wait() for fut in futs])
+            print(client.latency_stats()["worker0"]["p99_ms"])
+            client.close()
+            rpc.shutdown()
+
+    """
+
+    def __init__(
+        self,
+        max_batch_size=128,
+        max_delay_ms=1.0,
+        timeout=_DEFAULT_RPC_TIMEOUT,
+        num_threads=4,
+    ):
+        assert max_batch_size > 0, "max_batch_size should be positive."
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay_ms / 1000
+        self._timeout = timeout
+        self._cond = threading.Condition()
+        # the name of a worker -> the pending calls to it
+        self._pending = {}
+        # the name of a worker -> the time its pending calls should be sent
+        self._deadlines = {}
+        self._histograms = {}
+        self._closed = False
+        self._pool = ThreadPoolExecutor(num_threads)
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def rpc_async(self, to, fn, args=None, kwargs=None):
+        """
+        Queue a call of ``fn`` on worker ``to`` and return a
+        :class:`BatchFuture` of its result.
+        """
+        future = BatchFuture()
+        call = PythonFunc(fn, args if args else (), kwargs if kwargs else {})
+        with self._cond:
+            assert not self._closed, "The BatchingRpcClient is closed."
+            calls = self._pending.setdefault(to, [])
+            calls.append((call, future))
+            if len(calls) >= self._max_batch_size:
+                calls = self._take(to)
+            else:
+                if len(calls) == 1:
+                    self._deadlines[to] = time.time() + self._max_delay
+                    self._cond.notify()
+                calls = None
+        if calls:
+            self._send(to, calls)
+        return future
+
+    def rpc_sync(self, to, fn, args=None, kwargs=None):
+        """
+        Make a call of ``fn`` on worker ``to`` and wait for its result. The
+        pending calls to ``to`` are sent with it immediately.
+        """
+        future = self.rpc_async(to, fn, args, kwargs)
+        self.flush(to)
+        return future.wait()
+
+    def flush(self, to=None):
+        """
+        Send the pending calls to worker ``to``, or to all workers if ``to``
+        is None, without waiting for the others.
+        """
+        with self._cond:
+            names = list(self._pending) if to is None else [to]
+            batches = [(n, self._take(n)) for n in names if n in self._pending]
+        for name, calls in batches:
+            self._send(name, calls)
+
+    def latency_stats(self):
+        """
+        Return the statistics of the requests to every worker, a dict maps the
+        name of the worker to the number of ``calls`` and ``batches``, the
+        ``mean_ms``, ``max_ms``, ``p50_ms`` and ``p99_ms`` of the latency and
+        the ``histogram`` maps the upper bound in milliseconds of every bucket
+        to its count.
+        """
+        with self._cond:
+            histograms = dict(self._histograms)
+        return {to: h.summary() for to, h in histograms.items()}
+
+    def close(self):
+        """
+        Send the pending calls, wait for all the requests to complete and stop
+        the client.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._flusher.join()
+        self._pool.shutdown(wait=True)
+
+    def _take(self, to):
+        self._deadlines.pop(to, None)
+        return self._pending.pop(to)
+
+    def _due(self):
+        now = time.time()
+        return [
+            to
+            for to, deadline in self._deadlines.items()
+            if self._closed or deadline <= now
+        ]
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                due = self._due()
+                while not due:
+                    if self._closed:
+                        return
+                    wait_time = None
+                    if self._deadlines:
+                        wait_time = max(
+                            min(self._deadlines.values()) - time.time(), 0
+                        )
+                    self._cond.wait(wait_time)
+                    due = self._due()
+                batches = [(to, self._take(to)) for to in due]
+            for to, calls in batches:
+                self._send(to, calls)
+
+    def _send(self, to, calls):
+        with self._cond:
+            histogram = self._histograms.setdefault(to, _LatencyHistogram())
+        try:
+            future = _invoke_rpc(
+                to,
+                _run_py_func_batch,
+                ([call for call, _ in calls],),
+                None,
+                self._timeout,
+            )
+        except Exception as e:
+            future = _FailedFuture(e, len(calls))
+        batch = _Batch(to, future, [f for _, f in calls], histogram)
+        for _, call_future in calls:
+            call_future._set_batch(batch)
+        self._pool.submit(batch.resolve)
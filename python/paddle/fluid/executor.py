@@ -34,6 +34,7 @@ from . import framework
 from .incubate.checkpoint import auto_checkpoint as acp
 from .compiler import _prune_feed_ops
 
+from collections import OrderedDict
 from functools import lru_cache
 
 __all__ = ['Executor', 'global_scope', 'scope_guard']
@@ -544,33 +545,34 @@ def _prepare_fleet_executor():
 
 def _get_strong_program_cache_key_for_new_exe(program, scope, feed, fetch_list):
     return (
-        program.desc.cached_hash_str()
-        + str(scope.raw_address())
-        + _get_program_cache_key(feed, fetch_list)
-    )
+        program.desc.cached_hash_str(),
+        scope.raw_address(),
+    ) + _get_program_cache_key(feed, fetch_list)
 
 
 def _get_strong_program_cache_key(program, feed, fetch_list):
-    # TODO(zhiqiu): use hash_str to generate cache key as above
-    def _get_varname_from_block(block):
-        block_str = []
-        for var_name in list(block.vars.keys()):
-            block_str.append(var_name)
-        return "\n".join(block_str)
-
+    # NOTE: The key is a flat tuple instead of a string joined from every var
+    # name, so that building and hashing it do not allocate a large string on
+    # every run. The var names of block 0 are still part of the key so that
+    # adding vars into a cached program invalidates the cache entry.
     inner_program = (
         program._program
         if isinstance(program, compiler.CompiledProgram)
         else program
     )
     return (
-        _get_varname_from_block(inner_program.blocks[0])
-        + str(id(program))
-        + _get_program_cache_key(feed, fetch_list)
-    )
+        id(program),
+        hash(tuple(inner_program.blocks[0].vars.keys())),
+    ) + _get_program_cache_key(feed, fetch_list)
 
 
-def _get_program_cache_key(feed, fetch_list):
+def _get_fleet_executor_carrier_id(cache_key):
+    # the fleet executor identifies a carrier by a string, while the program
+    # cache is keyed by the tuple
+    return "_".join(map(str, cache_key))
+
+
+def _get_feed_fetch_var_names(feed, fetch_list):
     feed_var_names = []
     if isinstance(feed, dict):
         feed_var_names = list(feed.keys())
@@ -578,7 +580,129 @@ def _get_program_cache_key(feed, fetch_list):
         for i, each in enumerate(feed):
             feed_var_names += list(each.keys())
     fetch_var_names = list(map(_to_name_str, fetch_list))
-    return str(feed_var_names + fetch_var_names)
+    return feed_var_names + fetch_var_names
+
+
+def _get_program_cache_key(feed, fetch_list):
+    return tuple(_get_feed_fetch_var_names(feed, fetch_list))
+
+
+def _estimate_cache_entry_nbytes(value):
+    """
+    Roughly estimate the host memory retained by a cached value. Programs are
+    measured by the size of their serialized desc, other values fall back to
+    ``sys.getsizeof``.
+    """
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_cache_entry_nbytes(v) for v in value)
+    if isinstance(value, compiler.CompiledProgram):
+        value = value._program
+    if isinstance(value, Program):
+        return len(value.desc.serialize_to_string())
+    return sys.getsizeof(value)
+
+
+class _LRUCache:
+    """
+    A bounded cache with least-recently-used eviction used by Executor to hold
+    programs, scopes, trainer instances and so on.
+
+    Args:
+        capacity(int): The max number of entries. If it is None or not greater
+            than 0, the cache is unbounded.
+        on_evict(callable, optional): Called with ``(key, value)`` when an entry
+            is dropped from the cache.
+        sizeof(callable, optional): Used to estimate the bytes retained by a
+            value, it is evaluated once when the value is inserted.
+    """
+
+    def __init__(self, capacity=None, on_evict=None, sizeof=None):
+        self._capacity = capacity
+        self._on_evict = on_evict
+        self._sizeof = sizeof
+        self._data = OrderedDict()
+        self._nbytes = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def keys(self):
+        return self._data.keys()
+
+    def items(self):
+        return self._data.items()
+
+    def get(self, key, default=None):
+        if key in self._data:
+            self._hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+        self._misses += 1
+        return default
+
+    def put(self, key, value):
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = value
+        self._nbytes[key] = self._sizeof(value) if self._sizeof else 0
+        if self._capacity is not None and self._capacity > 0:
+            while len(self._data) > self._capacity:
+                self._evict(next(iter(self._data)))
+                self._evictions += 1
+
+    def pop(self, key):
+        if key in self._data:
+            self._evict(key)
+
+    def evict_if(self, predicate):
+        """
+        Drop all the entries whose key satisfies ``predicate``, return the
+        number of dropped entries.
+        """
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            self._evict(key)
+        return len(keys)
+
+    def clear(self):
+        for key in list(self._data.keys()):
+            self._evict(key)
+
+    def stats(self):
+        return {
+            'size': len(self._data),
+            'capacity': self._capacity,
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'bytes': sum(self._nbytes.values()),
+        }
+
+    def _evict(self, key):
+        value = self._data.pop(key)
+        self._nbytes.pop(key, None)
+        if self._on_evict is not None:
+            self._on_evict(key, value)
+
+
+def _get_program_cache_capacity():
+    """
+    The max number of entries of every program cache of an Executor, read
+    from the environment variable ``PADDLE_EXECUTOR_PROGRAM_CACHE_CAPACITY``
+    when the Executor is created, which is not a flag of ``paddle.set_flags``.
+    Default is 128, and a value not greater than 0 means no limit.
+    """
+    return int(os.getenv('PADDLE_EXECUTOR_PROGRAM_CACHE_CAPACITY', 128))
 
 
 def _as_lodtensor(data, place, dtype=None):
@@ -728,19 +852,15 @@ class _ExecutorCache:
                     self.program._program = framework.IrGraph(
                         self.program._graph
                     ).to_program()
-                self.key = hash(
-                    _get_strong_program_cache_key_for_new_exe(
-                        self.program._program,
-                        self.scope,
-                        self.feed,
-                        self.fetch_list,
-                    )
+                self.key = _get_strong_program_cache_key_for_new_exe(
+                    self.program._program,
+                    self.scope,
+                    self.feed,
+                    self.fetch_list,
                 )
             else:
-                self.key = hash(
-                    _get_strong_program_cache_key_for_new_exe(
-                        self.program, self.scope, self.feed, self.fetch_list
-                    )
+                self.key = _get_strong_program_cache_key_for_new_exe(
+                    self.program, self.scope, self.feed, self.fetch_list
                 )
 
         def __eq__(self, other):
@@ -750,18 +870,39 @@ class _ExecutorCache:
             )
 
         def __hash__(self):
-            return self.key
-
-    def __init__(self):
-        # NOTE(Ruibiao): Wrap the lru_cache in constructor so that the cache is local to
-        # the _ExecutorCache instance, otherwise a global cache may not be released after
-        # the Executor instance deleted
-        self._get_cached_program_and_executor = lru_cache(maxsize=8)(
-            self._get_program_and_executor
+            return hash(self.key)
+
+    def __init__(self, capacity=8):
+        # NOTE(Ruibiao): The cache is local to the _ExecutorCache instance, otherwise
+        # a global cache may not be released after the Executor instance deleted.
+        # NOTE: Only the structural key is stored in the cache rather than the
+        # _CachedData, which holds the feed data and would keep it alive.
+        self._cache = _LRUCache(
+            capacity,
+            sizeof=lambda value: _estimate_cache_entry_nbytes(value[0]),
         )
 
     def clear(self):
-        self._get_cached_program_and_executor.cache_clear()
+        self._cache.clear()
+
+    def evict(self, program=None):
+        """
+        Drop the cached programs and executors built from ``program``, or all
+        of them if ``program`` is None. Return the number of dropped entries.
+        """
+        if program is None:
+            num = len(self._cache)
+            self._cache.clear()
+            return num
+        if isinstance(program, compiler.CompiledProgram):
+            program = program._program
+        if program is None:
+            return 0
+        hash_str = program.desc.cached_hash_str()
+        return self._cache.evict_if(lambda key: key[0] == hash_str)
+
+    def stats(self):
+        return self._cache.stats()
 
     def get_program_and_executor(
         self,
@@ -773,17 +914,20 @@ class _ExecutorCache:
         place,
         scope,
     ):
-        return self._get_cached_program_and_executor(
-            self._CachedData(
-                program,
-                feed,
-                fetch_list,
-                feed_var_name,
-                fetch_var_name,
-                place,
-                scope,
-            )
+        cached_data = self._CachedData(
+            program,
+            feed,
+            fetch_list,
+            feed_var_name,
+            fetch_var_name,
+            place,
+            scope,
         )
+        cached = self._cache.get(cached_data.key)
+        if cached is None:
+            cached = self._get_program_and_executor(cached_data)
+            self._cache.put(cached_data.key, cached)
+        return cached
 
     def _get_program_and_executor(self, cached_data):
         program = cached_data.program
@@ -870,7 +1014,7 @@ class _ExecutorCache:
 
         if enable_inplace or enable_addto:
             # inplace should skip feed and fetch var
-            skip_var_names = eval(_get_program_cache_key(feed, fetch_list))
+            skip_var_names = _get_feed_fetch_var_names(feed, fetch_list)
             _apply_inplace_addto_pass(
                 program, enable_inplace, enable_addto, skip_var_names
             )
@@ -900,6 +1044,212 @@ class _ExecutorCache:
         return new_program, new_exe
 
 
+def _can_use_interpreter_core(program, place):
+    compiled = isinstance(program, compiler.CompiledProgram) or isinstance(
+        program._graph, compiler.CompiledProgram
+    )
+    if compiled:
+        compiled_program = (
+            program
+            if isinstance(program, compiler.CompiledProgram)
+            else program._graph
+        )
+
+        # Unsupported case 1: inference
+        if compiled_program._is_inference:
+            warnings.warn(
+                "Standalone executor is not used for inference",
+                UserWarning,
+            )
+            return False
+
+    return True
+
+
+def _set_sequential_run_flags(program):
+    """
+    Set the flags to run the ops sequentially if the build strategy of the
+    compiled program requires it, and return the flags to restore.
+    """
+    stored_flag = {}
+    if isinstance(program, compiler.CompiledProgram) or isinstance(
+        program._graph, compiler.CompiledProgram
+    ):
+        compiled_program = (
+            program
+            if isinstance(program, compiler.CompiledProgram)
+            else program._graph
+        )
+        build_strategy = compiled_program._build_strategy
+        if build_strategy is not None and build_strategy.sequential_run:
+            schedule_flag = [
+                'FLAGS_new_executor_serial_run',
+                'FLAGS_new_executor_sequential_run',
+            ]
+            for flag in schedule_flag:
+                value = os.getenv(flag, False)
+                if isinstance(value, str):
+                    value = value.lower()
+                    value = True if value == 'true' else False
+                stored_flag[flag] = bool(value)
+            set_flags({f: True for f in schedule_flag})
+    return stored_flag
+
+
+class _PreparedRun:
+    """
+    A handle to run a program repeatedly with feeds of the same signature. It is
+    created by :code:`Executor.prepare_run`, which validates the feed signature,
+    builds the program and the standalone executor only once.
+
+    For each run, numpy arrays whose dtype matches the feed variable and which
+    are C-contiguous are bound into preallocated feed tensors without going
+    through :code:`_as_lodtensor`, and on CPUPlace they share memory with the
+    numpy arrays. The shape of a feed is only checked the first time it is seen.
+    Other inputs fall back to the conversion and check of :code:`Executor.run`.
+    """
+
+    def __init__(
+        self,
+        executor,
+        program,
+        feed,
+        fetch_list,
+        feed_var_name,
+        fetch_var_name,
+        scope,
+        return_numpy,
+    ):
+        self._executor = executor
+        self._scope = scope
+        self._return_numpy = return_numpy
+        self._origin_program = program
+        self._feed_names = list(feed.keys())
+        if not _can_use_interpreter_core(program, executor.place):
+            # e.g. the compiled inference program, which is run as
+            # Executor.run does
+            self._program = program
+            self._new_exe = None
+            self._run_args = {
+                'fetch_list': fetch_list,
+                'feed_var_name': feed_var_name,
+                'fetch_var_name': fetch_var_name,
+                'scope': scope,
+                'return_numpy': return_numpy,
+                'use_program_cache': True,
+                'use_prune': False,
+            }
+            self.run(feed)
+            return
+
+        stored_flag = _set_sequential_run_flags(program)
+        (
+            self._program,
+            self._new_exe,
+        ) = executor._executor_cache.get_program_and_executor(
+            program,
+            feed,
+            fetch_list,
+            feed_var_name,
+            fetch_var_name,
+            executor.place,
+            scope,
+        )
+        set_flags(stored_flag)
+        self._zero_copy = isinstance(executor.place, core.CPUPlace)
+
+        new_ir_flag_name = 'FLAGS_enable_new_ir_in_executor'
+        use_target_name = get_flags(new_ir_flag_name)[new_ir_flag_name]
+        global_block = self._program.global_block()
+        self._slots = []
+        for op in global_block.ops:
+            if op.desc.type() != 'feed':
+                break
+            feed_target_name = op.desc.output('Out')[0]
+            var = global_block.var(feed_target_name)
+            np_dtype = None
+            if var.dtype != core.VarDesc.VarType.STRINGS:
+                np_dtype = np.dtype(convert_dtype(var.dtype))
+            self._slots.append(
+                (
+                    feed_target_name,
+                    feed_target_name if use_target_name else feed_var_name,
+                    op.desc.attr('col'),
+                    var,
+                    np_dtype,
+                    core.LoDTensor(),
+                    set(),
+                )
+            )
+        # Validate the example feed once, so that signature errors are raised
+        # when preparing instead of in the first run.
+        self.run(feed)
+
+    @property
+    def program(self):
+        return self._program
+
+    def run(self, feed):
+        """
+        Run the prepared program with ``feed``, whose keys must be the same as
+        the feed used to prepare.
+
+        Args:
+            feed(dict): A dict maps the feed name to numpy.ndarray or LoDTensor.
+
+        Returns:
+            List: The fetched result list.
+        """
+        if self._executor._closed:
+            raise RuntimeError("Attempted to use a closed Executor")
+        if len(feed) != len(self._feed_names):
+            raise ValueError(
+                "The prepared run expects feed names %s, but received %s"
+                % (self._feed_names, list(feed.keys()))
+            )
+        if self._new_exe is None:
+            ret = self._executor._run_impl(
+                program=self._program, feed=feed, **self._run_args
+            )
+            core.update_autotune_status()
+            return ret
+
+        place = self._executor.place
+        for (
+            name,
+            feed_var_name,
+            idx,
+            var,
+            np_dtype,
+            tensor,
+            checked_shapes,
+        ) in self._slots:
+            cur_feed = feed[name]
+            if np_dtype is not None:
+                if (
+                    isinstance(cur_feed, np.ndarray)
+                    and cur_feed.dtype == np_dtype
+                    and cur_feed.flags.c_contiguous
+                ):
+                    tensor.set(cur_feed, place, self._zero_copy)
+                    if cur_feed.shape not in checked_shapes:
+                        check_feed_shape_type(var, tensor)
+                        checked_shapes.add(cur_feed.shape)
+                    cur_feed = tensor
+                else:
+                    if not isinstance(cur_feed, core.LoDTensor):
+                        cur_feed = _as_lodtensor(cur_feed, place, var.dtype)
+                    check_feed_shape_type(var, cur_feed)
+            core.set_feed_variable(self._scope, cur_feed, feed_var_name, idx)
+
+        self._executor._update_lr_scheduler(self._program, self._scope)
+        stored_flag = _set_sequential_run_flags(self._origin_program)
+        ret = self._new_exe.run(self._feed_names, self._return_numpy)
+        set_flags(stored_flag)
+        core.update_autotune_status()
+        return ret
+
+
 class Executor:
     """
     :api_attr: Static Graph
@@ -969,18 +1319,25 @@ class Executor:
             self.place = expected_place
         else:
             self.place = framework._get_paddle_place(place)
-        self.program_caches = dict()
-        self.ctx_caches = dict()
-        self.trainer_caches = dict()
-        self.scope_caches = dict()
-        self.micro_scope_cache = dict()
+        capacity = _get_program_cache_capacity()
+        self.program_caches = _LRUCache(
+            capacity, sizeof=_estimate_cache_entry_nbytes
+        )
+        self.ctx_caches = _LRUCache(capacity)
+        self.trainer_caches = _LRUCache(
+            capacity, on_evict=self._release_evicted_trainer
+        )
+        self.scope_caches = _LRUCache(capacity)
+        self.micro_scope_cache = _LRUCache(capacity)
         self.var_caches = dict()
-        self.pruned_program_caches = dict()
+        self.pruned_program_caches = _LRUCache(
+            capacity, sizeof=_estimate_cache_entry_nbytes
+        )
         p = core.Place()
         p.set_place(self.place)
         self._default_executor = core.Executor(p)
         self._closed = False
-        self.pruned_program_scope_caches = dict()
+        self.pruned_program_scope_caches = _LRUCache(capacity)
         self._prepare_to_run_called = False
 
         self._auto_checkpoint_name = unique_name.generate(
@@ -1007,6 +1364,85 @@ class Executor:
         # that brings errors to mkl-dnn unit tests (see ClearMKLDNNCache in interpretercore.cc for why).
         self._executor_cache.clear()
 
+    def _release_evicted_trainer(self, trainer_cache_key, trainer_instance):
+        if not self._closed:
+            self._default_executor.release_trainer(trainer_instance)
+
+    def _named_caches(self):
+        return {
+            'program': self.program_caches,
+            'pruned_program': self.pruned_program_caches,
+            'pruned_program_scope': self.pruned_program_scope_caches,
+            'ctx': self.ctx_caches,
+            'trainer': self.trainer_caches,
+            'scope': self.scope_caches,
+            'micro_scope': self.micro_scope_cache,
+        }
+
+    def cache_info(self):
+        """
+        Get the statistics of the program caches held by the executor.
+
+        Returns:
+            dict: A dict maps the cache name to its statistics, which includes
+            ``size``, ``capacity``, ``hits``, ``misses``, ``evictions`` and
+            ``bytes``, i.e. the estimated host memory retained by the cache.
+
+        Examples:
+            .. code-block:: python
+
+                import paddle
+
+                paddle.enable_static()
+                exe = paddle.static.Executor(paddle.CPUPlace())
+                info = exe.cache_info()
+                print(info['executor']['size'])
+                # 0
+        """
+        info = {
+            name: cache.stats() for name, cache in self._named_caches().items()
+        }
+        info['executor'] = self._executor_cache.stats()
+        return info
+
+    def clear_cache(self, program=None):
+        """
+        Evict the cached programs, scopes and executors. If ``program`` is given,
+        only the entries built from it are evicted, otherwise all the caches are
+        cleared.
+
+        Args:
+            program(Program|CompiledProgram, optional): The program whose cache
+                entries are evicted. Default is None.
+
+        Returns:
+            int: The number of evicted entries.
+
+        Examples:
+            .. code-block:: python
+
+                import paddle
+
+                paddle.enable_static()
+                exe = paddle.static.Executor(paddle.CPUPlace())
+                exe.run(paddle.static.default_startup_program())
+                exe.clear_cache()
+        """
+        num = self._executor_cache.evict(program)
+        if program is None:
+            for cache in self._named_caches().values():
+                num += len(cache)
+                cache.clear()
+            return num
+
+        program_id = id(program)
+        for name, cache in self._named_caches().items():
+            if name == 'pruned_program_scope':
+                num += cache.evict_if(lambda key: key == str(program_id))
+            else:
+                num += cache.evict_if(lambda key: key[0] == program_id)
+        return num
+
     def _get_scope_cache(self, program_cache_key):
         return self.scope_caches.get(program_cache_key, None)
 
@@ -1020,31 +1456,31 @@ class Executor:
         return self.program_caches.get(program_cache_key, None)
 
     def _add_program_cache(self, program_cache_key, program):
-        self.program_caches[program_cache_key] = program
+        self.program_caches.put(program_cache_key, program)
 
     def _get_pruned_program_cache(self, program_cache_key):
         return self.pruned_program_caches.get(program_cache_key, None)
 
     def _add_pruned_program_cache(self, program_cache_key, program):
-        self.pruned_program_caches[program_cache_key] = program
+        self.pruned_program_caches.put(program_cache_key, program)
 
     def _get_pruned_program_scope_cache(self, program_cache_key):
         return self.pruned_program_scope_caches.get(program_cache_key, None)
 
     def _add_pruned_program_scope_cache(self, program_cache_key, program):
-        self.pruned_program_scope_caches[program_cache_key] = program
+        self.pruned_program_scope_caches.put(program_cache_key, program)
 
     def _add_ctx_cache(self, ctx_cache_key, ctx):
-        self.ctx_caches[ctx_cache_key] = ctx
+        self.ctx_caches.put(ctx_cache_key, ctx)
 
     def _add_trainer_cache(self, trainer_cache_key, ctx):
-        self.trainer_caches[trainer_cache_key] = ctx
+        self.trainer_caches.put(trainer_cache_key, ctx)
 
     def _add_scope_cache(self, scope_cache_key, scope):
-        self.scope_caches[scope_cache_key] = scope
+        self.scope_caches.put(scope_cache_key, scope)
 
     def _add_micro_scopes_cache(self, program_cache_key, micro_scopes: list):
-        self.micro_scope_cache[program_cache_key] = micro_scopes
+        self.micro_scope_cache.put(program_cache_key, micro_scopes)
 
     def _get_micro_scopes_cache(self, program_cache_key):
         return self.micro_scope_cache.get(program_cache_key, None)
@@ -1081,6 +1517,32 @@ class Executor:
             else:
                 break
 
+    def _update_lr_scheduler(self, program, scope):
+        if not hasattr(program, 'lr_scheduler'):
+            return
+        from paddle.optimizer.lr import LRScheduler
+
+        assert isinstance(
+            program.lr_scheduler, LRScheduler
+        ), "must be LRScheduler"
+        lr_scheduler = program.lr_scheduler
+        lr_value = lr_scheduler()
+        lr_var = program.global_block().vars[lr_scheduler._var_name]
+        data = np.array([lr_value]).astype(convert_dtype(lr_var.dtype))
+        tensor = core.get_variable_tensor(scope, lr_scheduler._var_name)
+        # NOTE(dev): `tensor.set(data, self.place)` always call TensorCopySync that is a blocking behavior. So we use `_copy_from` to replace it.
+        cpu_tensor = _as_lodtensor(data, core.CPUPlace())
+        if core.is_cuda_graph_capturing():
+            warnings.warn(
+                "Caution!!! When capturing CUDA Graph, the learning rate scheduler would not "
+                "take any effect! Please set the learning rate manually before each batch!"
+            )
+        elif core.is_compiled_with_ipu():
+            # for ipu, tensor is allocated on cpu
+            tensor._copy_from(cpu_tensor, tensor._place())
+        else:
+            tensor._copy_from(cpu_tensor, self.place)
+
     def _fetch_data(self, fetch_list, fetch_var_name, scope):
         outs = [
             core.get_fetch_variable(scope, fetch_var_name, i)
@@ -1453,6 +1915,99 @@ class Executor:
         core.update_autotune_status()
         return res
 
+    def prepare_run(
+        self,
+        program=None,
+        feed=None,
+        fetch_list=None,
+        feed_var_name='feed',
+        fetch_var_name='fetch',
+        scope=None,
+        return_numpy=True,
+    ):
+        """
+        Prepare to run the :code:`Program` repeatedly with feeds of the same
+        names, dtypes and compatible shapes as ``feed``. The returned handle
+        skips the program cache lookup and the feed conversion of :code:`run`,
+        and binds the numpy arrays into preallocated feed tensors, which shares
+        memory with them on CPUPlace. It is suitable for high-QPS inference.
+
+        Note that the program is run once with ``feed`` when preparing, and the
+        program is neither pruned nor run by the fleet executor. The program
+        which the standalone executor does not support, e.g. the compiled
+        inference program, is run as :code:`run` does for every feed.
+
+        Args:
+            program(Program|CompiledProgram): The program to be executed. If it is
+                None, :code:`paddle.static.default_main_program()` is used.
+            feed(dict): An example feed, which decides the feed signature.
+            fetch_list(list): The Tensors that need to be returned. The default is None.
+            feed_var_name(str): The name of the input Tensor of the feed operator.
+            fetch_var_name(str): The name of the output Tensor of the fetch operator.
+            scope(Scope): The scope used to run this program, default is
+                :code:`paddle.static.global_scope()`.
+            return_numpy(bool): Whether convert the fetched Tensors to numpy.ndarray.
+
+        Returns:
+            An object whose :code:`run(feed)` method runs the program and returns
+            the fetched result list.
+
+        Examples:
+            .. code-block:: python
+
+                import paddle
+                import numpy
+
+                paddle.enable_static()
+                exe = paddle.static.Executor(paddle.CPUPlace())
+
+                data = paddle.static.data(name='X', shape=[None, 1], dtype='float32')
+                hidden = paddle.static.nn.fc(data, 10)
+                exe.run(paddle.static.default_startup_program())
+
+                x = numpy.random.random(size=(10, 1)).astype('float32')
+                prepared = exe.prepare_run(feed={'X': x}, fetch_list=[hidden])
+                for _ in range(10):
+                    out, = prepared.run({'X': x})
+        """
+        if self._closed:
+            raise RuntimeError("Attempted to use a closed Executor")
+        if program is None:
+            program = default_main_program()
+        if isinstance(program, Program) and (
+            program._pipeline_opt or program._heter_pipeline_opt
+        ):
+            raise ValueError(
+                "prepare_run does not support the program with pipeline_opt."
+            )
+        if not isinstance(feed, dict):
+            raise TypeError(
+                "feed requires dict as its Parameter. But you passed in %s"
+                % (type(feed))
+            )
+        fetch_list = self._check_fetch_list(fetch_list)
+        fetch_list, optimize_ops = self._split_optimize_ops_in_fetch_list(
+            fetch_list
+        )
+        if optimize_ops:
+            raise ValueError(
+                "prepare_run does not support optimize operators in fetch_list."
+            )
+        if scope is None:
+            scope = global_scope()
+        feed = self._update_feed(program, dict(feed))
+
+        return _PreparedRun(
+            self,
+            program,
+            feed,
+            fetch_list,
+            feed_var_name,
+            fetch_var_name,
+            scope,
+            return_numpy,
+        )
+
     def _run_impl(
         self,
         program,
@@ -1580,27 +2135,6 @@ class Executor:
             feed = self._update_feed(pruned_program, feed)
             program = pruned_program
 
-        def _can_use_interpreter_core(program, place):
-            compiled = isinstance(
-                program, compiler.CompiledProgram
-            ) or isinstance(program._graph, compiler.CompiledProgram)
-            if compiled:
-                compiled_program = (
-                    program
-                    if isinstance(program, compiler.CompiledProgram)
-                    else program._graph
-                )
-
-                # Unsupported case 1: inference
-                if compiled_program._is_inference:
-                    warnings.warn(
-                        "Standalone executor is not used for inference",
-                        UserWarning,
-                    )
-                    return False
-
-            return True
-
         if _can_use_interpreter_core(program, self.place):
             if feed is None:
                 feed = {}
@@ -1614,28 +2148,7 @@ class Executor:
                 )
             feed = self._update_feed(program, feed)
 
-            stored_flag = {}
-            if isinstance(program, compiler.CompiledProgram) or isinstance(
-                program._graph, compiler.CompiledProgram
-            ):
-                compiled_program = (
-                    program
-                    if isinstance(program, compiler.CompiledProgram)
-                    else program._graph
-                )
-                build_strategy = compiled_program._build_strategy
-                if build_strategy is not None and build_strategy.sequential_run:
-                    schedule_flag = [
-                        'FLAGS_new_executor_serial_run',
-                        'FLAGS_new_executor_sequential_run',
-                    ]
-                    for flag in schedule_flag:
-                        value = os.getenv(flag, False)
-                        if isinstance(value, str):
-                            value = value.lower()
-                            value = True if value == 'true' else False
-                        stored_flag[flag] = bool(value)
-                    set_flags({f: True for f in schedule_flag})
+            stored_flag = _set_sequential_run_flags(program)
 
             program, new_exe = self._executor_cache.get_program_and_executor(
                 program,
@@ -1648,30 +2161,7 @@ class Executor:
             )
 
             self._feed_data(program, feed, feed_var_name, scope)
-
-            if hasattr(program, 'lr_scheduler'):
-                from paddle.optimizer.lr import LRScheduler
-
-                assert isinstance(
-                    program.lr_scheduler, LRScheduler
-                ), "must be LRScheduler"
-                lr_scheduler = program.lr_scheduler
-                lr_value = lr_scheduler()
-                lr_var = program.global_block().vars[lr_scheduler._var_name]
-                data = np.array([lr_value]).astype(convert_dtype(lr_var.dtype))
-                tensor = core.get_variable_tensor(scope, lr_scheduler._var_name)
-                # NOTE(dev): `tensor.set(data, self.place)` always call TensorCopySync that is a blocking behavior. So we use `_copy_from` to replace it.
-                cpu_tensor = _as_lodtensor(data, core.CPUPlace())
-                if core.is_cuda_graph_capturing():
-                    warnings.warn(
-                        "Caution!!! When capturing CUDA Graph, the learning rate scheduler would not "
-                        "take any effect! Please set the learning rate manually before each batch!"
-                    )
-                elif core.is_compiled_with_ipu():
-                    # for ipu, tensor is allocated on cpu
-                    tensor._copy_from(cpu_tensor, tensor._place())
-                else:
-                    tensor._copy_from(cpu_tensor, self.place)
+            self._update_lr_scheduler(program, scope)
 
             ret = new_exe.run(list(feed.keys()), return_numpy)
             set_flags(stored_flag)
@@ -2446,7 +2936,7 @@ class Executor:
                     micro_scope_list.append(cached_scope.new_scope())
 
             self._prepare_fleet_executor_carrier(
-                cache_key,
+                _get_fleet_executor_carrier_id(cache_key),
                 program=cached_program,
                 scope=cached_scope,
                 fleet_opt=fleet_opt,
@@ -2473,7 +2963,7 @@ class Executor:
             )
             tensor.set(data, self.place)
 
-        self._fleet_executor.run(cache_key)
+        self._fleet_executor.run(_get_fleet_executor_carrier_id(cache_key))
         if "fetch_var" in fleet_opt:
             # If we speed up the generation in evaluation, we need to generate
             # multiple queries at the same time. Each query will in separate scope in order
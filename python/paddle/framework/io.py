@@ -17,6 +17,7 @@ import copyreg
 import os
 import pickle
 import sys
+import threading
 import warnings
 from collections.abc import Iterable
 
@@ -43,9 +44,18 @@ from .io_utils import (
     _legacy_static_save,
     _open_file_buffer,
     _pack_loaded_dict,
+    _pickle_load_mmap,
     _pickle_loads_mac,
     _unpack_saved_dict,
 )
+from .tensor_container import (
+    TensorContainer,
+    _is_sharded_manifest,
+    _is_tensor_container,
+    _load_sharded_container,
+    _save_sharded_container,
+    _save_tensor_container,
+)
 
 __all__ = []
 
@@ -228,6 +238,7 @@ def _parse_load_config(configs):
         'params_filename',
         'keep_name_table',
         'return_numpy',
+        'mmap',
     ]
 
     # input check
@@ -248,12 +259,19 @@ def _parse_load_config(configs):
     inner_config.params_filename = configs.get('params_filename', None)
     inner_config.keep_name_table = configs.get('keep_name_table', None)
     inner_config.return_numpy = configs.get('return_numpy', False)
+    inner_config.mmap = configs.get('mmap', False)
 
     return inner_config
 
 
 def _parse_save_config(configs):
-    supported_configs = ['use_binary_format', 'pickle_protocol']
+    supported_configs = [
+        'use_binary_format',
+        'pickle_protocol',
+        'format',
+        'max_shard_size',
+        'num_workers',
+    ]
 
     # input check
     for key in configs:
@@ -271,6 +289,9 @@ def _parse_save_config(configs):
     inner_config = _SaveLoadConfig()
     inner_config.use_binary_format = configs.get('use_binary_format', False)
     inner_config.pickle_protocol = configs.get('pickle_protocol', None)
+    inner_config.format = configs.get('format', 'pickle')
+    inner_config.max_shard_size = configs.get('max_shard_size', None)
+    inner_config.num_workers = configs.get('num_workers', 1)
 
     return inner_config
 
@@ -669,6 +690,17 @@ def save(obj, path, protocol=4, **configs):
           use_binary_format(bool): When the saved object is static graph variable, you can specify ``use_binary_for_var``.
           If True, save the file in the c++ binary format when saving a single static graph variable; otherwise, save it in pickle format.
           Default: False
+          format(str): The format of the saved file, ``'pickle'`` or ``'container'``. ``'container'`` saves a nested
+          structure of Tensor, numpy.ndarray, dict, list, tuple and python scalars without pickle: a JSON header
+          records the name, dtype, shape and offset of every tensor, followed by the aligned raw bytes of tensors.
+          It can be loaded by ``paddle.load``, or read tensor by tensor with ``paddle.framework.TensorContainer``.
+          Default: 'pickle'
+          num_workers(int): Only used when ``format='container'``. If it is greater than 1, the tensors are
+          split into shard files named ``{path}.shard-xxxxx-of-xxxxx`` which are written by ``num_workers``
+          threads concurrently, and ``path`` is a manifest written after all the shards. Default: 1
+          max_shard_size(int): Only used when ``format='container'``. If given, the tensors are split into shard
+          files of at most ``max_shard_size`` bytes (unless a single tensor is larger) as ``num_workers`` does.
+          Default: None
 
     Returns:
         None
@@ -804,8 +836,22 @@ def save(obj, path, protocol=4, **configs):
             )
         )
 
+    if config.format not in ('pickle', 'container'):
+        raise ValueError(
+            "The `format` of `paddle.save` should be 'pickle' or 'container', but received {}.".format(
+                config.format
+            )
+        )
+
     if config.use_binary_format:
         _save_binary_var(obj, path)
+    elif config.format == 'container':
+        if config.num_workers > 1 or config.max_shard_size is not None:
+            _save_sharded_container(
+                obj, path, config.max_shard_size, config.num_workers
+            )
+        else:
+            _save_tensor_container(obj, path)
     else:
         # `protocol` need to be used, `pickle_protocol` is a deprecated arg.
         if config.pickle_protocol is not None:
@@ -829,6 +875,100 @@ def save(obj, path, protocol=4, **configs):
                 _pickle_save(obj, f, protocol)
 
 
+_async_save_tasks = []
+_async_save_errors = []
+
+
+def _snapshot_to_host(obj):
+    """
+    Copy the tensors in ``obj`` to host, the containers are copied as well so
+    that ``obj`` is not modified.
+    """
+    if isinstance(obj, core.eager.Tensor):
+        host_tensor = obj._copy_to(core.CPUPlace(), True)
+        host_tensor.name = obj.name
+        return host_tensor
+    if isinstance(obj, core.LoDTensor):
+        tensor = core.LoDTensor()
+        tensor.set(np.array(obj), core.CPUPlace())
+        return tensor
+    if isinstance(obj, np.ndarray):
+        return obj.copy()
+    if type(obj) in (dict, collections.OrderedDict):
+        return type(obj)(
+            (key, _snapshot_to_host(value)) for key, value in obj.items()
+        )
+    if type(obj) in (list, tuple):
+        return type(obj)(_snapshot_to_host(value) for value in obj)
+    return obj
+
+
+def async_save(obj, path, protocol=4, sync_other_task=False, **configs):
+    """
+    Save an object to the specified path asynchronously. The tensors in ``obj``
+    are copied to host memory before returning, and the copy is saved by
+    ``paddle.save`` in a background thread, so that training can continue
+    while the file is being written.
+
+    Args:
+        obj(Object) : The object to be saved.
+        path(str) : The path of the object to be saved.
+        protocol(int, optional): The protocol version of pickle module. Default: 4
+        sync_other_task(bool, optional): If True, wait for the unfinished saving
+            tasks before starting this one. Default: False
+        **configs(dict, optional): The same as the configs of ``paddle.save``.
+
+    Returns:
+        threading.Thread, the thread saving the object.
+
+    Examples:
+        .. code-block:: python
+
+            >>> import paddle
+            >>> from paddle.framework import async_save, clear_async_save_task_queue
+
+            >>> emb = paddle.nn.Embedding(10, 10)
+            >>> async_save(emb.state_dict(), "emb.pdparams")
+            >>> # wait for all the saving tasks to finish
+            >>> clear_async_save_task_queue()
+    """
+    if not _is_file_path(path):
+        raise ValueError(
+            "`async_save` only supports saving objects to file, but got {}".format(
+                type(path)
+            )
+        )
+    if sync_other_task:
+        clear_async_save_task_queue()
+
+    host_obj = _snapshot_to_host(obj)
+
+    def _save():
+        try:
+            save(host_obj, path, protocol, **configs)
+        except Exception as e:
+            _async_save_errors.append(e)
+            raise
+
+    task = threading.Thread(target=_save)
+    task.start()
+    _async_save_tasks.append(task)
+    return task
+
+
+def clear_async_save_task_queue():
+    """
+    Wait for all the saving tasks started by ``async_save`` to finish, and
+    raise the first error raised by the tasks if any.
+    """
+    while _async_save_tasks:
+        _async_save_tasks.pop(0).join()
+    if _async_save_errors:
+        error = _async_save_errors[0]
+        _async_save_errors.clear()
+        raise RuntimeError("Failed to save asynchronously.") from error
+
+
 def _legacy_save(obj, path, protocol=2):
     # 1. input check
     if not isinstance(obj, dict):
@@ -931,6 +1071,13 @@ def load(path, **configs):
             by default.
             (3) return_numpy(bool): If specified as True, return tensor as numpy.ndarray, otherwise return tensor as paddle.Tensor.
             Default False.
+            (4) mmap(bool): If specified as True, the file saved by ``paddle.save`` is mapped into memory
+            instead of being read, and the large arrays are views of the mapped file. Only the pages
+            of the accessed arrays are read, so loading a subset of keys with ``return_numpy=True``
+            only touches those bytes, and ``Layer.set_state_dict`` copies the arrays directly into
+            the parameters. Only works when ``path`` is a file saved with pickle protocol 3 or 4,
+            or a file saved with ``format='container'``.
+            Default False.
 
     Returns:
         Object(Object): a target object can be used in paddle
@@ -1051,13 +1198,26 @@ def load(path, **configs):
 
     '''
 
+    if _is_tensor_container(path):
+        config = _parse_load_config(configs)
+        with TensorContainer(path, mmap=config.mmap) as container:
+            return container.load(return_numpy=config.return_numpy)
+
+    if _is_sharded_manifest(path):
+        config = _parse_load_config(configs)
+        return _load_sharded_container(
+            path, return_numpy=config.return_numpy, mmap=config.mmap
+        )
+
     if _is_memory_buffer(path) or os.path.isfile(path):
         config = _parse_load_config(configs)
         exception_type = pickle.UnpicklingError
         try:
             with _open_file_buffer(path, 'rb') as f:
+                if config.mmap and _is_file_path(path):
+                    load_result = _pickle_load_mmap(path)
                 # When value of dict is lager than 4GB ,there is a Bug on 'MAC python3'
-                if (
+                elif (
                     _is_file_path(path)
                     and sys.platform == 'darwin'
                     and sys.version_info.major == 3
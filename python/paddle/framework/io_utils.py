@@ -12,10 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 import logging
 import math
+import mmap
 import os
 import pickle
+import struct
 import sys
 from io import BytesIO
 
@@ -213,6 +216,155 @@ def _pickle_loads_mac(path, f):
     return load_result
 
 
+class _MmapArrayStub:
+    """
+    The placeholder returned for ``numpy.core.multiarray._reconstruct`` when
+    unpickling with :code:`_MmapUnpickler`, it is replaced by the real array
+    when its state is built.
+    """
+
+    def __init__(self, reconstruct, *args):
+        self.reconstruct = reconstruct
+        self.args = args
+
+    def build(self, state):
+        shape, dtype, is_fortran, rawdata = state[-4:]
+        if isinstance(rawdata, memoryview) and not dtype.hasobject:
+            array = np.frombuffer(rawdata, dtype=dtype)
+            return array.reshape(shape, order='F' if is_fortran else 'C')
+        array = self.reconstruct(*self.args)
+        array.__setstate__(state)
+        return array
+
+
+class _MmapUnpickler(pickle._Unpickler):
+    """
+    An unpickler which maps the file into memory and returns the large
+    numpy arrays as views of the mapped file instead of reading their bytes.
+    The pages of an array are only read when the array is accessed, so the
+    peak memory of loading is about one copy of the parameters, and the
+    arrays which are never accessed are never read.
+
+    The file is mapped with copy-on-write, so modifying the loaded arrays
+    does not change the file.
+    """
+
+    dispatch = pickle._Unpickler.dispatch.copy()
+
+    # The bytes smaller than it are read as usual.
+    MIN_MMAP_BYTES = 1 << 16
+
+    def __init__(self, file, **kwargs):
+        super().__init__(file, **kwargs)
+        self._mmap_file = file
+        self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        self._pending_views = set()
+        # the memo keys of the stubs, which are replaced by the built arrays
+        self._stub_memo_keys = {}
+
+    def find_class(self, module, name):
+        if name == '_reconstruct' and module in (
+            'numpy.core.multiarray',
+            'numpy._core.multiarray',
+        ):
+            return functools.partial(
+                _MmapArrayStub, super().find_class(module, name)
+            )
+        return super().find_class(module, name)
+
+    def _read_mmap_bytes(self, size):
+        frame = self._unframer.current_frame
+        if size < self.MIN_MMAP_BYTES or (
+            frame is not None and frame.tell() < len(frame.getbuffer())
+        ):
+            return self.read(size)
+        # NOTE: the large bytes are written outside of the pickle frames,
+        # so they can be located by the position of the file directly.
+        self._unframer.current_frame = None
+        offset = self._mmap_file.tell()
+        if offset + size > len(self._mmap):
+            raise pickle.UnpicklingError("pickle data was truncated")
+        self._mmap_file.seek(size, os.SEEK_CUR)
+        view = memoryview(self._mmap)[offset : offset + size]
+        self._pending_views.add(id(view))
+        return view
+
+    def load_binbytes(self):
+        (size,) = struct.unpack('<I', self.read(4))
+        self.append(self._read_mmap_bytes(size))
+
+    dispatch[pickle.BINBYTES[0]] = load_binbytes
+
+    def load_binbytes8(self):
+        (size,) = struct.unpack('<Q', self.read(8))
+        self.append(self._read_mmap_bytes(size))
+
+    dispatch[pickle.BINBYTES8[0]] = load_binbytes8
+
+    def _memoize(self, key):
+        if key < 0:
+            raise ValueError("negative PUT argument")
+        obj = self.stack[-1]
+        self.memo[key] = obj
+        if isinstance(obj, _MmapArrayStub):
+            self._stub_memo_keys.setdefault(id(obj), []).append(key)
+
+    def load_put(self):
+        self._memoize(int(self.readline()[:-1]))
+
+    dispatch[pickle.PUT[0]] = load_put
+
+    def load_binput(self):
+        self._memoize(self.read(1)[0])
+
+    dispatch[pickle.BINPUT[0]] = load_binput
+
+    def load_long_binput(self):
+        (key,) = struct.unpack('<I', self.read(4))
+        if key > sys.maxsize:
+            raise ValueError("negative LONG_BINPUT argument")
+        self._memoize(key)
+
+    dispatch[pickle.LONG_BINPUT[0]] = load_long_binput
+
+    def load_memoize(self):
+        self._memoize(len(self.memo))
+
+    dispatch[pickle.MEMOIZE[0]] = load_memoize
+
+    def load_build(self):
+        stack = self.stack
+        state = stack[-1]
+        inst = stack[-2]
+        if isinstance(inst, _MmapArrayStub):
+            stack.pop()
+            array = inst.build(state)
+            stack[-1] = array
+            # NOTE: the stub may be referenced again by the memo, e.g. an
+            # array saved twice, so the memo should refer to the array too
+            for key in self._stub_memo_keys.pop(id(inst), []):
+                self.memo[key] = array
+            self._pending_views.discard(id(state[-1]))
+            return
+        super().load_build()
+
+    dispatch[pickle.BUILD[0]] = load_build
+
+    def load(self):
+        result = super().load()
+        if self._pending_views:
+            # Some large bytes objects are not the data of numpy arrays, load
+            # the file as usual to keep their types.
+            self._mmap_file.seek(0)
+            result = pickle.load(self._mmap_file, encoding='latin1')
+        return result
+
+
+def _pickle_load_mmap(path):
+    with open(path, 'rb') as f:
+        return _MmapUnpickler(f, encoding='latin1').load()
+
+
 def _pack_loaded_dict(load_obj):
     if isinstance(load_obj, dict):
         unpack_info = 'UnpackBigParamInfor@@'
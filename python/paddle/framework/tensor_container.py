@@ -0,0 +1,614 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# This file implements the tensor container format of `paddle.save`, which
+# stores tensors without pickle. The layout of a container file is:
+#
+#   | magic (4B) | version (uint32) | header size (uint64) | header | data |
+#
+# The header is a JSON object padded with spaces so that the data section is
+# aligned to `_ALIGNMENT` bytes. It records the name, dtype, shape and offset
+# of every tensor, and the structure of the saved object in which tensors are
+# replaced by `{"__tensor__": index}`. Every tensor is stored as C-contiguous
+# raw bytes aligned to `_ALIGNMENT` bytes in the data section, so that it can
+# be read, mapped or inspected individually without parsing the others.
+
+import collections
+import json
+import mmap
+import os
+import struct
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from paddle.fluid import core
+from paddle.fluid.data_feeder import convert_dtype
+
+from .io_utils import _is_file_path, _is_memory_buffer, _open_file_buffer
+
+__all__ = []
+
+_MAGIC = b'PDTC'
+_VERSION = 1
+_ALIGNMENT = 64
+_PREFIX = struct.Struct('<4sIQ')
+_TENSOR_KEY = '__tensor__'
+_TUPLE_KEY = '__tuple__'
+_SEPARATOR = '/'
+_HAS_PREAD = hasattr(os, 'pread')
+_HAS_PREADV = hasattr(os, 'preadv')
+
+_SUPPORTED_DTYPES = {
+    'bool',
+    'float16',
+    'uint16',
+    'float32',
+    'float64',
+    'int8',
+    'int16',
+    'int32',
+    'int64',
+    'uint8',
+    'complex64',
+    'complex128',
+}
+
+
+def _align(size, alignment=_ALIGNMENT):
+    return (size + alignment - 1) // alignment * alignment
+
+
+def _is_tensor(value):
+    return isinstance(value, (core.eager.Tensor, core.LoDTensor, np.ndarray))
+
+
+def _tensor_dtype_and_shape(value):
+    if isinstance(value, np.ndarray):
+        return convert_dtype(value.dtype), list(value.shape)
+    if isinstance(value, core.LoDTensor):
+        return convert_dtype(value._dtype()), list(value.shape())
+    return convert_dtype(value.dtype), list(value.shape)
+
+
+def _tensor_to_numpy(value):
+    if isinstance(value, np.ndarray):
+        return np.ascontiguousarray(value)
+    if isinstance(value, core.eager.Tensor) and value.is_dist():
+        value = value._local_value()
+    return np.ascontiguousarray(np.array(value))
+
+
+def _flatten(obj, tensors, path=()):
+    """
+    Replace the tensors in ``obj`` with ``{"__tensor__": index}`` and append
+    ``(name, tensor)`` to ``tensors``, return the JSON serializable structure.
+    """
+    if _is_tensor(obj):
+        tensors.append((_SEPARATOR.join(path), obj))
+        return {_TENSOR_KEY: len(tensors) - 1}
+    if isinstance(obj, (dict, collections.OrderedDict)):
+        tree = {}
+        for key, value in obj.items():
+            if not isinstance(key, str):
+                raise TypeError(
+                    "The tensor container format only supports str keys, but "
+                    "received key {} of type {}.".format(key, type(key))
+                )
+            if key in (_TENSOR_KEY, _TUPLE_KEY):
+                raise ValueError(
+                    f"The key '{key}' is reserved by the tensor container format."
+                )
+            tree[key] = _flatten(value, tensors, path + (key,))
+        return tree
+    if isinstance(obj, (list, tuple)):
+        items = [
+            _flatten(value, tensors, path + (str(i),))
+            for i, value in enumerate(obj)
+        ]
+        return {_TUPLE_KEY: items} if isinstance(obj, tuple) else items
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(
+        "The tensor container format only supports Tensor, numpy.ndarray, "
+        "dict, list, tuple and python scalars, but received {}. Please use "
+        "format='pickle' to save it.".format(type(obj))
+    )
+
+
+def _check_tensor_names(tensors):
+    # the names join the keys of the path with '/', e.g. the key 'a/b' and
+    # the nested keys 'a' and 'b' give the same name
+    names = set()
+    for name, _ in tensors:
+        if name in names:
+            raise ValueError(
+                "The tensor name '{}' of the object is duplicated, the keys "
+                "joined by '{}' must be unique in the tensor container "
+                "format.".format(name, _SEPARATOR)
+            )
+        names.add(name)
+
+
+def _build_header(obj, metadata=None):
+    tensors = []
+    tree = _flatten(obj, tensors)
+    _check_tensor_names(tensors)
+    infos = []
+    offset = 0
+    for name, tensor in tensors:
+        dtype, shape = _tensor_dtype_and_shape(tensor)
+        nbytes = int(np.prod(shape, dtype='int64')) * np.dtype(dtype).itemsize
+        infos.append(
+            {
+                'name': name,
+                'dtype': dtype,
+                'shape': shape,
+                'offset': offset,
+                'nbytes': nbytes,
+            }
+        )
+        offset = _align(offset + nbytes)
+    header = {
+        'tensors': infos,
+        'tree': tree,
+        'metadata': metadata if metadata is not None else {},
+    }
+    return header, [tensor for _, tensor in tensors]
+
+
+def _encode_header(header):
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    # pad the header with spaces so that the data section is aligned
+    header_size = _align(_PREFIX.size + len(header_bytes)) - _PREFIX.size
+    header_bytes += b' ' * (header_size - len(header_bytes))
+    return _PREFIX.pack(_MAGIC, _VERSION, header_size) + header_bytes
+
+
+def _write_tensor_data(f, infos, tensors):
+    position = 0
+    for info, tensor in zip(infos, tensors):
+        if position < info['offset']:
+            f.write(b'\0' * (info['offset'] - position))
+            position = info['offset']
+        array = _tensor_to_numpy(tensor)
+        if array.nbytes != info['nbytes']:
+            raise ValueError(
+                "The size of tensor {} changed during saving.".format(
+                    info['name']
+                )
+            )
+        f.write(memoryview(array.reshape(-1).view(np.uint8)))
+        position += info['nbytes']
+
+
+def _save_tensor_container(obj, path, metadata=None):
+    """
+    Save ``obj``, a nested structure of Tensor, numpy.ndarray, dict, list,
+    tuple and python scalars, in the tensor container format.
+    """
+    header, tensors = _build_header(obj, metadata)
+    with _open_file_buffer(path, 'wb') as f:
+        f.write(_encode_header(header))
+        _write_tensor_data(f, header['tensors'], tensors)
+
+
+def _is_tensor_container(path):
+    if _is_file_path(path):
+        if not os.path.isfile(path) or os.path.getsize(path) < _PREFIX.size:
+            return False
+        with open(path, 'rb') as f:
+            return f.read(len(_MAGIC)) == _MAGIC
+    if _is_memory_buffer(path):
+        start = path.tell()
+        return bytes(path.getbuffer()[start : start + len(_MAGIC)]) == _MAGIC
+    return False
+
+
+class TensorContainer:
+    """
+    Reader of the file saved by ``paddle.save(obj, path, format='container')``.
+    The tensors can be accessed individually by name without reading the
+    others, and the whole object can be loaded with multiple threads.
+
+    Args:
+        path(str|BytesIO): The path or buffer of the saved file.
+        mmap(bool, optional): If True, the file is mapped into memory and the
+            tensors read as numpy arrays are views of the mapped file, which are
+            only read from disk when they are accessed. Default: False.
+
+    Examples:
+        .. code-block:: python
+
+            >>> import paddle
+            >>> from paddle.framework import TensorContainer
+
+            >>> layer = paddle.nn.Linear(3, 4)
+            >>> paddle.save(layer.state_dict(), 'linear.pdparams', format='container')
+            >>> container = TensorContainer('linear.pdparams')
+            >>> print(container.keys())
+            ['weight', 'bias']
+            >>> print(container.info('weight')['shape'])
+            [3, 4]
+            >>> bias = container.get_tensor('bias')
+    """
+
+    def __init__(self, path, mmap=False):
+        self._fd = None
+        self._buffer = None
+        self._from_memory = _is_memory_buffer(path)
+        if _is_file_path(path):
+            self._fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            self._file_size = os.fstat(self._fd).st_size
+            # NOTE: os.pread is not available on Windows, map the file instead.
+            if (mmap or not _HAS_PREAD) and self._file_size > 0:
+                self._buffer = memoryview(_mmap_file(self._fd, self._file_size))
+            prefix = self._read_bytes(0, _PREFIX.size)
+        elif _is_memory_buffer(path):
+            start = path.tell()
+            self._buffer = path.getbuffer()[start:]
+            self._file_size = len(self._buffer)
+            prefix = self._read_bytes(0, _PREFIX.size)
+        else:
+            raise ValueError(
+                "Only supports reading the tensor container from file and "
+                "`BytesIO`, but got {}".format(type(path))
+            )
+
+        if len(prefix) < _PREFIX.size:
+            raise ValueError("The tensor container file is truncated.")
+        magic, version, header_size = _PREFIX.unpack(prefix)
+        if magic != _MAGIC:
+            raise ValueError("The file is not a tensor container.")
+        if version > _VERSION:
+            raise ValueError(
+                "The version of the tensor container is {}, which is newer "
+                "than the supported version {}.".format(version, _VERSION)
+            )
+        self._data_offset = _PREFIX.size + header_size
+        if self._data_offset > self._file_size:
+            raise ValueError("The tensor container file is truncated.")
+        header = json.loads(
+            self._read_bytes(_PREFIX.size, header_size).decode('utf-8')
+        )
+        self._infos = header['tensors']
+        self._tree = header['tree']
+        self._metadata = header.get('metadata', {})
+        self._index = {}
+        end = self._data_offset
+        for i, info in enumerate(self._infos):
+            self._check_info(info)
+            if info['name'] in self._index:
+                raise ValueError(
+                    "The tensor name '{}' is duplicated in the tensor "
+                    "container file.".format(info['name'])
+                )
+            self._index[info['name']] = i
+            end = max(end, self._data_offset + info['offset'] + info['nbytes'])
+        if _is_memory_buffer(path):
+            # move the position to the end of this object like `pickle.load`
+            path.seek(start + end)
+
+    def _check_info(self, info):
+        if info['dtype'] not in _SUPPORTED_DTYPES:
+            raise ValueError(
+                "The dtype {} of tensor {} is not supported.".format(
+                    info['dtype'], info['name']
+                )
+            )
+        numel = int(np.prod(info['shape'], dtype='int64'))
+        if numel * np.dtype(info['dtype']).itemsize != info['nbytes']:
+            raise ValueError(
+                "The size of tensor {} does not match its shape.".format(
+                    info['name']
+                )
+            )
+        end = self._data_offset + info['offset'] + info['nbytes']
+        if info['offset'] < 0 or end > self._file_size:
+            raise ValueError(
+                "The data of tensor {} is out of the file.".format(info['name'])
+            )
+
+    def _read_bytes(self, offset, size):
+        if self._buffer is not None:
+            return self._buffer[offset : offset + size].tobytes()
+        return os.pread(self._fd, size, offset)
+
+    def _read_into(self, array, offset):
+        # NOTE: os.pread(v) releases the GIL, so that tensors can be read by
+        # multiple threads concurrently.
+        out = memoryview(array.reshape(-1).view(np.uint8))
+        total = len(out)
+        done = 0
+        while done < total:
+            if _HAS_PREADV:
+                n = os.preadv(self._fd, [out[done:]], offset + done)
+            else:
+                data = os.pread(
+                    self._fd, min(total - done, 1 << 30), offset + done
+                )
+                n = len(data)
+                out[done : done + n] = data
+            if n <= 0:
+                raise ValueError("The tensor container file is truncated.")
+            done += n
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        elif self._from_memory and self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __len__(self):
+        return len(self._infos)
+
+    @property
+    def metadata(self):
+        return self._metadata
+
+    def keys(self):
+        """
+        Return the names of all tensors, a name is the keys from the root of
+        the saved object to the tensor joined by '/'.
+        """
+        return [info['name'] for info in self._infos]
+
+    def info(self, name):
+        """
+        Return the dtype, shape, offset and nbytes of the tensor ``name``.
+        """
+        return dict(self._infos[self._index[name]])
+
+    def _get_array(self, index):
+        info = self._infos[index]
+        dtype = np.dtype(info['dtype'])
+        offset = self._data_offset + info['offset']
+        if self._buffer is not None:
+            array = np.frombuffer(
+                self._buffer,
+                dtype=dtype,
+                count=info['nbytes'] // dtype.itemsize,
+                offset=offset,
+            )
+            if self._from_memory:
+                # do not keep the BytesIO exported, otherwise it can not be
+                # written anymore
+                array = array.copy()
+        else:
+            array = np.empty(info['nbytes'] // dtype.itemsize, dtype=dtype)
+            self._read_into(array, offset)
+        return array.reshape(info['shape'])
+
+    def get_tensor(self, name, return_numpy=False):
+        """
+        Read the tensor ``name`` only.
+
+        Args:
+            name(str): The name of the tensor.
+            return_numpy(bool, optional): If True, return numpy.ndarray,
+                otherwise return Tensor. Default: False.
+        """
+        if name not in self._index:
+            raise KeyError(f"The tensor {name} is not in the container.")
+        return _array_to_tensor(
+            self._get_array(self._index[name]), return_numpy
+        )
+
+    def load(self, keys=None, num_workers=1, return_numpy=False):
+        """
+        Load the saved object.
+
+        Args:
+            keys(list, optional): If given, only load the tensors whose name is
+                in ``keys`` and return a dict maps the name to the tensor.
+                Default: None, load the whole object.
+            num_workers(int, optional): The number of threads to read the
+                tensors. Default: 1.
+            return_numpy(bool, optional): If True, return numpy.ndarray,
+                otherwise return Tensor. Default: False.
+        """
+        if keys is None:
+            indices = list(range(len(self._infos)))
+        else:
+            indices = [self._index[key] for key in keys]
+
+        if num_workers > 1 and self._buffer is None and len(indices) > 1:
+            with ThreadPoolExecutor(num_workers) as pool:
+                arrays = list(pool.map(self._get_array, indices))
+        else:
+            arrays = [self._get_array(i) for i in indices]
+        tensors = {
+            i: _array_to_tensor(array, return_numpy)
+            for i, array in zip(indices, arrays)
+        }
+
+        if keys is not None:
+            return {self._infos[i]['name']: tensors[i] for i in indices}
+        return _unflatten(self._tree, tensors)
+
+
+def _mmap_file(fd, size):
+    # NOTE: the file is mapped with copy-on-write, modifying the loaded
+    # arrays does not change the file.
+    return mmap.mmap(fd, size, access=mmap.ACCESS_COPY)
+
+
+def _array_to_tensor(array, return_numpy):
+    from .io import _ndarray_to_tensor
+
+    return _ndarray_to_tensor(array, return_numpy)
+
+
+def _unflatten(tree, tensors):
+    if isinstance(tree, dict):
+        if _TENSOR_KEY in tree:
+            return tensors[tree[_TENSOR_KEY]]
+        if _TUPLE_KEY in tree:
+            return tuple(_unflatten(v, tensors) for v in tree[_TUPLE_KEY])
+        return {key: _unflatten(value, tensors) for key, value in tree.items()}
+    if isinstance(tree, list):
+        return [_unflatten(value, tensors) for value in tree]
+    return tree
+
+
+# The manifest of a sharded container is a JSON file, it records the
+# structure of the saved object and which shard every tensor is stored in.
+_MANIFEST_KEY = 'paddle_sharded_container'
+_MANIFEST_PREFIX = ('{"%s":' % _MANIFEST_KEY).encode('utf-8')
+
+
+def _shard_file_name(path, index, num_shards):
+    return '{}.shard-{:05d}-of-{:05d}'.format(
+        os.path.basename(path), index, num_shards
+    )
+
+
+def _split_shards(infos, max_shard_size):
+    shards = []
+    current, size = [], 0
+    for i, info in enumerate(infos):
+        if current and size + info['nbytes'] > max_shard_size:
+            shards.append(current)
+            current, size = [], 0
+        current.append(i)
+        size += _align(info['nbytes'])
+    if current or not shards:
+        shards.append(current)
+    return shards
+
+
+def _save_sharded_container(obj, path, max_shard_size=None, num_workers=1):
+    """
+    Save ``obj`` into several tensor container files concurrently, and write
+    a manifest to ``path`` after all the shards are written.
+
+    The tensors are copied to host in the calling thread shard by shard, and
+    each shard is written by a thread of the pool, so that copying and
+    writing are overlapped. At most ``num_workers`` shards are pending, which
+    bounds the host memory used.
+    """
+    if not _is_file_path(path):
+        raise ValueError(
+            "Only supports saving the sharded tensor container to file, "
+            "but got {}".format(type(path))
+        )
+    header, tensors = _build_header(obj)
+    infos = header['tensors']
+    names = [info['name'] for info in infos]
+    if max_shard_size is None:
+        total_size = sum(_align(info['nbytes']) for info in infos)
+        max_shard_size = max(-(-total_size // max(num_workers, 1)), 1)
+    shards = _split_shards(infos, max_shard_size)
+
+    dirname = os.path.dirname(path)
+    shard_files = [
+        _shard_file_name(path, i, len(shards)) for i in range(len(shards))
+    ]
+    pending = set()
+    with ThreadPoolExecutor(max(num_workers, 1)) as pool:
+        for shard_file, indices in zip(shard_files, shards):
+            while len(pending) >= max(num_workers, 1):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            arrays = {names[i]: _tensor_to_numpy(tensors[i]) for i in indices}
+            pending.add(
+                pool.submit(
+                    _save_tensor_container,
+                    arrays,
+                    os.path.join(dirname, shard_file),
+                )
+            )
+        for future in pending:
+            future.result()
+
+    shard_of = {}
+    for shard_id, indices in enumerate(shards):
+        for i in indices:
+            shard_of[i] = shard_id
+    manifest = {
+        _MANIFEST_KEY: _VERSION,
+        'shards': shard_files,
+        'tensors': [
+            {
+                'name': info['name'],
+                'dtype': info['dtype'],
+                'shape': info['shape'],
+                'shard': shard_of[i],
+            }
+            for i, info in enumerate(infos)
+        ],
+        'tree': header['tree'],
+    }
+    with open(path, 'w') as f:
+        json.dump(manifest, f)
+
+
+def _is_sharded_manifest(path):
+    if not _is_file_path(path) or not os.path.isfile(path):
+        return False
+    with open(path, 'rb') as f:
+        return f.read(len(_MANIFEST_PREFIX)) == _MANIFEST_PREFIX
+
+
+def _load_sharded_container(
+    path, return_numpy=False, mmap=False, num_workers=None
+):
+    """
+    Load the object saved by ``_save_sharded_container``, the shards are read
+    by ``num_workers`` threads concurrently.
+    """
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    if manifest[_MANIFEST_KEY] > _VERSION:
+        raise ValueError(
+            "The version of the sharded tensor container is {}, which is newer "
+            "than the supported version {}.".format(
+                manifest[_MANIFEST_KEY], _VERSION
+            )
+        )
+    dirname = os.path.dirname(path)
+    shard_paths = [os.path.join(dirname, f) for f in manifest['shards']]
+    if num_workers is None:
+        num_workers = min(len(shard_paths), os.cpu_count() or 1)
+
+    def load_shard(shard_path):
+        with TensorContainer(shard_path, mmap=mmap) as container:
+            return container.load(return_numpy=True)
+
+    with ThreadPoolExecutor(max(num_workers, 1)) as pool:
+        shard_arrays = list(pool.map(load_shard, shard_paths))
+
+    tensors = {}
+    for i, info in enumerate(manifest['tensors']):
+        tensors[i] = _array_to_tensor(
+            shard_arrays[info['shard']][info['name']], return_numpy
+        )
+    return _unflatten(manifest['tree'], tensors)
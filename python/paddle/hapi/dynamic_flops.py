@@ -17,15 +17,18 @@ import warnings
 import numpy as np
 
 import paddle
-from paddle import nn
+from paddle import nn, profiler
 from paddle.jit.dy2static.program_translator import unwrap_decorators
+from paddle.profiler.profiler_statistic import _nodename2opname
+from paddle.utils.flops import flops as op_flops
+from paddle.utils.flops import memory_access
 
 from .static_flops import Table, static_flops
 
 __all__ = []
 
 
-def flops(net, input_size, custom_ops=None, print_detail=False):
+def flops(net, input_size, custom_ops=None, print_detail=False, by_op=False):
     """Print a table about the FLOPs of network.
 
     Args:
@@ -38,6 +41,11 @@ def flops(net, input_size, custom_ops=None, print_detail=False):
                     in following example code. Default is None.
         print_detail (bool, optional): Whether to print the detail information, like FLOPs per layer, about the net FLOPs.
                     Default is False.
+        by_op (bool, optional): Whether to count the FLOPs of the operators traced by the profiler instead of the
+                    layers, which also counts the functional operators such as the attention, see
+                    ``dynamic_op_flops``. Then the keys of ``custom_ops`` could also be the types of the operators
+                    with the functions counting their FLOPs by their input shapes and attributes. This argument
+                    only work when argument ``net`` is an instance of paddle.nn.Layer. Default is False.
 
     Returns:
         Int: A number about the FLOPs of total network.
@@ -109,6 +117,13 @@ def flops(net, input_size, custom_ops=None, print_detail=False):
         _, net.forward = unwrap_decorators(net.forward)
 
         inputs = paddle.randn(input_size)
+        if by_op:
+            return dynamic_op_flops(
+                net,
+                inputs=inputs,
+                custom_ops=custom_ops,
+                print_detail=print_detail,
+            )
         return dynamic_flops(
             net, inputs=inputs, custom_ops=custom_ops, print_detail=print_detail
         )
@@ -312,3 +327,205 @@ def dynamic_flops(model, inputs, custom_ops=None, print_detail=False):
         )
     )
     return int(total_ops)
+
+
+# the prefix of the names of the events recording the calls of the layers
+_LAYER_EVENT_PREFIX = 'dynamic_flops::'
+
+
+def _first_shape(tensors):
+    for t in paddle.utils.flatten(tensors):
+        if isinstance(t, paddle.Tensor):
+            return list(t.shape)
+    return []
+
+
+def layer_op_costs(model, inputs, custom_ops=None):
+    """Count the FLOPs and the bytes accessed by every layer of the model
+    from the operators traced by the profiler in a forward of the model.
+
+    The cost of an operator is counted by the functions registered in
+    ``paddle.utils.flops``, and accounted to the innermost layer calling it,
+    so the operators called in the forward of a layer, e.g. the matmul and
+    softmax of the attention, are accounted to the layer but the operators
+    of its sublayers are not. The bytes accessed are the elements read and
+    written by the operators times the size of the dtype of the parameters
+    of the model, since the dtypes of the operators are not traced.
+
+    Args:
+        model (paddle.nn.Layer): The model.
+        inputs (Tensor): The input of the model.
+        custom_ops (dict, optional): The functions counting the FLOPs. The
+            keys are the classes of the layers, with the functions like the
+            ones of ``paddle.flops``, which count the layers instead of their
+            operators, or the types of the operators, with the functions
+            returning the FLOPs by the input shapes and the attributes of the
+            operators. Default is None.
+
+    Returns:
+        list[dict]: The name, the type, the input and the output shapes, the
+        number of the parameters, the FLOPs, the bytes accessed and the
+        arithmetic intensity of every layer called, in FLOPs per byte.
+    """
+    if custom_ops is None:
+        custom_ops = {}
+    op_funcs = {k: v for k, v in custom_ops.items() if isinstance(k, str)}
+    params = model.parameters()
+    element_size = (
+        params[0].element_size()
+        if params
+        else paddle.zeros([1], dtype=paddle.get_default_dtype()).element_size()
+    )
+
+    layers = {}
+    handlers = []
+
+    def add_hooks(m):
+        event_name = _LAYER_EVENT_PREFIX + m.full_name()
+        record = {
+            'name': m.full_name(),
+            'type': type(m).__name__,
+            'input_shape': [],
+            'output_shape': [],
+            'params': sum(
+                int(p.numel()) for p in m.parameters(include_sublayers=False)
+            ),
+            'flops': 0,
+            'bytes': 0,
+            'custom': type(m) in custom_ops,
+        }
+        layers[event_name] = (m, record)
+        events = []
+
+        def pre_hook(layer, x):
+            record['input_shape'] = _first_shape(x)
+            events.append(profiler.RecordEvent(event_name))
+            events[-1].begin()
+
+        def post_hook(layer, x, y):
+            record['output_shape'] = _first_shape(y)
+            events.pop().end()
+
+        handlers.append(m.register_forward_pre_hook(pre_hook))
+        if record['custom']:
+            m.register_buffer('total_ops', paddle.zeros([1], dtype='int64'))
+            handlers.append(m.register_forward_post_hook(custom_ops[type(m)]))
+        handlers.append(m.register_forward_post_hook(post_hook))
+
+    for m in model.sublayers(include_self=True):
+        add_hooks(m)
+
+    training = model.training
+    model.eval()
+    prof = profiler.Profiler(
+        targets=[profiler.ProfilerTarget.CPU],
+        record_shapes=True,
+        on_trace_ready=lambda prof: None,
+    )
+    prof.start()
+    try:
+        with paddle.framework.no_grad():
+            model(inputs)
+    finally:
+        prof.stop()
+        if training:
+            model.train()
+        for handler in handlers:
+            handler.remove()
+
+    def op_cost(node):
+        op_type = _nodename2opname(node.name)
+        input_shapes = node.input_shapes
+        attrs = node.attributes
+        if op_type in op_funcs:
+            nflops = op_funcs[op_type](input_shapes, attrs)
+        else:
+            nflops = op_flops(op_type, input_shapes, attrs)
+        return nflops, memory_access(op_type, input_shapes, attrs)
+
+    def visit(node, record):
+        # returns whether an operator is counted in the subtree of the node
+        if node.name.startswith(_LAYER_EVENT_PREFIX):
+            record = layers[node.name][1]
+            if record['custom']:
+                return True
+        counted = False
+        for child in node.children_node:
+            counted = visit(child, record) or counted
+        if (
+            record is not None
+            and node.type == profiler.TracerEventType.Operator
+            and getattr(node, 'input_shapes', None)
+            and not counted
+        ):
+            # the operators composed of other operators, e.g. linear, are
+            # counted by their inner operators
+            nflops, nelements = op_cost(node)
+            record['flops'] += int(nflops)
+            record['bytes'] += int(nelements) * element_size
+            counted = True
+        return counted
+
+    for rootnode in prof.profiler_result.get_data().values():
+        visit(rootnode, None)
+
+    records = []
+    for m, record in layers.values():
+        if record['custom']:
+            record['flops'] = int(m.total_ops)
+            m._buffers.pop('total_ops')
+        record['intensity'] = (
+            record['flops'] / record['bytes'] if record['bytes'] else 0.0
+        )
+        record.pop('custom')
+        if record['input_shape'] or record['output_shape']:
+            records.append(record)
+    return records
+
+
+def dynamic_op_flops(model, inputs, custom_ops=None, print_detail=False):
+    """Count the FLOPs of the model from the operators traced by the
+    profiler, see ``layer_op_costs``, and print the FLOPs, the bytes
+    accessed and the arithmetic intensity of every layer for the roofline
+    analysis if ``print_detail`` is True. The FLOPs of a matmul are 2 times
+    its multiply-accumulates, unlike the FLOPs counted by the layers.
+
+    Returns:
+        int: The total FLOPs of the model.
+    """
+    records = layer_op_costs(model, inputs, custom_ops)
+    total_ops = sum(r['flops'] for r in records)
+    total_bytes = sum(r['bytes'] for r in records)
+    total_params = sum(int(p.numel()) for p in model.parameters())
+
+    if print_detail:
+        table = Table(
+            [
+                "Layer Name",
+                "Input Shape",
+                "Output Shape",
+                "Params",
+                "Flops",
+                "Bytes",
+                "Flops/Byte",
+            ]
+        )
+        for r in records:
+            table.add_row(
+                [
+                    r['name'],
+                    r['input_shape'],
+                    r['output_shape'],
+                    r['params'],
+                    r['flops'],
+                    r['bytes'],
+                    round(r['intensity'], 3),
+                ]
+            )
+        table.print_table()
+    print(
+        'Total Flops: {}     Total Bytes: {}     Total Params: {}'.format(
+            total_ops, total_bytes, total_params
+        )
+    )
+    return total_ops
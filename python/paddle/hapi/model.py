@@ -16,7 +16,9 @@ import contextlib
 import inspect
 import os
 import pickle
+import queue
 import socket
+import threading
 import time
 import warnings
 
@@ -39,6 +41,7 @@ from paddle.framework.io_utils import is_belong_to_optimizer
 from paddle.io import DataLoader, Dataset, DistributedBatchSampler
 from paddle.jit.translated_layer import INFER_MODEL_SUFFIX, INFER_PARAMS_SUFFIX
 from paddle.metric import Metric
+from paddle.metric.metrics import _StreamingMetric
 from paddle.static import InputSpec as Input
 
 from .callbacks import EarlyStopping, config_callbacks
@@ -67,6 +70,14 @@ def to_numpy(var):
     return np.array(t)
 
 
+def _update_metric(metric, metric_outs):
+    # the metrics keeping their state on device are updated with the Tensors
+    # without waiting for the device
+    if isinstance(metric, _StreamingMetric):
+        return metric.update(*metric_outs)
+    return metric.update(*[to_numpy(m) for m in metric_outs])
+
+
 def flatten_list(l):
     assert isinstance(l, list), "not a list"
     outl = []
@@ -98,6 +109,44 @@ def _all_gather(x):
     return output
 
 
+def _prefetch(iterable, size=2):
+    """
+    Yield the items of iterable loaded ahead by a thread, at most size of
+    them. The thread stops when the generator is closed.
+    """
+    items = queue.Queue(size)
+    stop = threading.Event()
+    end = object()
+
+    def _load():
+        try:
+            for item in iterable:
+                while not stop.is_set():
+                    try:
+                        items.put((item, None), timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if stop.is_set():
+                    return
+            items.put((end, None))
+        except Exception as e:
+            items.put((end, e))
+
+    thread = threading.Thread(target=_load, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is end:
+                return
+            yield item
+    finally:
+        stop.set()
+
+
 def wait_server_ready(endpoints):
     assert not isinstance(endpoints, str)
     while True:
@@ -814,7 +863,7 @@ class DynamicGraphAdapter:
         self.model.mode = value
 
     # TODO multi device in dygraph mode not implemented at present time
-    def train_batch(self, inputs, labels=None, update=True):
+    def train_batch(self, inputs, labels=None, update=True, return_numpy=True):
         assert (
             self.model._optimizer
         ), "model not ready, please call `model.prepare()` first"
@@ -855,10 +904,15 @@ class DynamicGraphAdapter:
                 self.model._optimizer.minimize(final_loss)
                 self.model.network.clear_gradients()
 
+        if not return_numpy:
+            return [l.detach() for l in losses], self._metric_outputs(
+                outputs, labels
+            )
+
         metrics = []
         for metric in self.model._metrics:
             metric_outs = metric.compute(*(to_list(outputs) + labels))
-            m = metric.update(*[to_numpy(m) for m in to_list(metric_outs)])
+            m = _update_metric(metric, to_list(metric_outs))
             metrics.append(m)
 
         return (
@@ -867,7 +921,21 @@ class DynamicGraphAdapter:
             else [to_numpy(l) for l in losses]
         )
 
-    def eval_batch(self, inputs, labels=None):
+    def _metric_outputs(self, outputs, labels):
+        # the metrics are updated by the caller once their outputs are
+        # fetched, which waits for the device, except the ones keeping their
+        # state on device, which are updated now
+        metric_outs = []
+        for metric in self.model._metrics:
+            outs = to_list(metric.compute(*(to_list(outputs) + labels)))
+            if isinstance(metric, _StreamingMetric):
+                metric.update(*outs)
+                metric_outs.append(None)
+            else:
+                metric_outs.append([m.detach() for m in outs])
+        return metric_outs
+
+    def eval_batch(self, inputs, labels=None, return_numpy=True):
         self.model.network.eval()
         self.mode = 'eval'
         inputs = to_list(inputs)
@@ -915,11 +983,15 @@ class DynamicGraphAdapter:
                     self._merge_count[self.mode + '_total'] += samples
                     self._merge_count[self.mode + '_batch'] = samples
 
+        if not return_numpy:
+            losses = losses if self.model._loss else []
+            return losses, self._metric_outputs(outputs, labels)
+
         metrics = []
         for metric in self.model._metrics:
             # cut off padding value.
             metric_outs = metric.compute(*(to_list(outputs) + labels))
-            m = metric.update(*[to_numpy(m) for m in to_list(metric_outs)])
+            m = _update_metric(metric, to_list(metric_outs))
             metrics.append(m)
 
         if self.model._loss and len(metrics):
@@ -929,7 +1001,7 @@ class DynamicGraphAdapter:
         else:
             return metrics
 
-    def predict_batch(self, inputs):
+    def predict_batch(self, inputs, return_numpy=True):
         self.model.network.eval()
         self.mode = 'test'
         inputs = [to_variable(x) for x in to_list(inputs)]
@@ -938,6 +1010,8 @@ class DynamicGraphAdapter:
         if self._nranks > 1 and isinstance(self.model._place, fluid.CUDAPlace):
             outputs = [_all_gather(o) for o in to_list(outputs)]
 
+        if not return_numpy:
+            return to_list(outputs)
         return [to_numpy(o) for o in to_list(outputs)]
 
     def parameters(self, *args, **kwargs):
@@ -1755,6 +1829,7 @@ class Model:
         callbacks=None,
         accumulate_grad_batches=1,
         num_iters=None,
+        sync_free=False,
     ):
         """
 
@@ -1803,6 +1878,13 @@ class Model:
             num_iters (int|None, optional): The number of iterations to evaluate the model.
                 If None, evaluate on whole input dataset, otherwise, evaluate `num_iters` times.
                 Default: None.
+            sync_free (bool, optional): Whether to keep the losses and the outputs of
+                the metrics of the training steps on the device, and only fetch them to
+                update the metrics and the logs every `log_freq` steps and at the end of
+                each epoch, so that the training steps do not wait for the device. The
+                logs of the other steps carry no loss or metric entries. It also
+                applies to the evaluation. Only takes effect in dynamic graph mode.
+                Default: False.
 
         Returns:
             None
@@ -1969,7 +2051,13 @@ class Model:
         cbks.on_begin('train')
         for epoch in range(epochs):
             cbks.on_epoch_begin(epoch)
-            logs = self._run_one_epoch(train_loader, cbks, 'train')
+            logs = self._run_one_epoch(
+                train_loader,
+                cbks,
+                'train',
+                sync_free=sync_free,
+                log_freq=log_freq,
+            )
             cbks.on_epoch_end(epoch, logs)
 
             if do_eval and epoch % eval_freq == 0:
@@ -1979,7 +2067,13 @@ class Model:
                     {'steps': eval_steps, 'metrics': self._metrics_name()},
                 )
 
-                eval_logs = self._run_one_epoch(eval_loader, cbks, 'eval')
+                eval_logs = self._run_one_epoch(
+                    eval_loader,
+                    cbks,
+                    'eval',
+                    sync_free=sync_free,
+                    log_freq=log_freq,
+                )
 
                 cbks.on_end('eval', eval_logs)
             if self.stop_training:
@@ -1997,6 +2091,7 @@ class Model:
         num_workers=0,
         callbacks=None,
         num_iters=None,
+        sync_free=False,
     ):
         """
         Evaluate the loss and metrics of the model on input dataset.
@@ -2022,6 +2117,12 @@ class Model:
             num_iters (int|None, optional): The number of iterations to evaluate the model.
                 If None, evaluate on whole input dataset, otherwise, evaluate `num_iters` times.
                 Default: None.
+            sync_free (bool, optional): Whether to keep the losses and the outputs of
+                the metrics on the device, and only fetch them to update the metrics and
+                the logs every `log_freq` steps and at the end, so that the next batches
+                are computed without waiting for the device. The batches of an iterable
+                which is not a DataLoader are also loaded ahead by a thread. Only takes
+                effect in dynamic graph mode. Default: False.
         Returns:
             dict: Result of metric. The key is the names of Metric,
                 value is a scalar or numpy.array.
@@ -2088,7 +2189,9 @@ class Model:
             'eval', {'steps': eval_steps, 'metrics': self._metrics_name()}
         )
 
-        logs = self._run_one_epoch(eval_loader, cbks, 'eval')
+        logs = self._run_one_epoch(
+            eval_loader, cbks, 'eval', sync_free=sync_free, log_freq=log_freq
+        )
 
         cbks.on_end('eval', logs)
 
@@ -2108,6 +2211,8 @@ class Model:
         stack_outputs=False,
         verbose=1,
         callbacks=None,
+        sync_free=False,
+        output_writer=None,
     ):
         """
         Compute the output predictions on testing data.
@@ -2130,6 +2235,15 @@ class Model:
             verbose (int, optional): The verbosity mode, should be 0, 1, or 2. 0 = silent,
                 1 = progress bar, 2 = one line per batch. Default: 1.
             callbacks(Callback, optional): A Callback instance, Default: None.
+            sync_free (bool, optional): Whether to fetch the outputs of a batch from the
+                device while the next batch is computed, instead of waiting for each batch.
+                The batches of an iterable which is not a DataLoader are also loaded ahead
+                by a thread. Only takes effect in dynamic graph mode. Default: False.
+            output_writer (callable, optional): A function called with the list of
+                numpy outputs of every batch in order, e.g. to write them to a file.
+                If set, the outputs are not kept and an empty list is returned, so that
+                the outputs of large datasets do not have to fit in memory.
+                Default: None.
 
         Returns:
             list: output of models.
@@ -2203,7 +2317,13 @@ class Model:
 
         outputs = []
 
-        logs, outputs = self._run_one_epoch(test_loader, cbks, 'predict')
+        logs, outputs = self._run_one_epoch(
+            test_loader,
+            cbks,
+            'predict',
+            sync_free=sync_free,
+            output_writer=output_writer,
+        )
 
         outputs = list(zip(*outputs))
 
@@ -2284,9 +2404,23 @@ class Model:
         data_loader,
         callbacks,
         mode,
-        logs={},
+        logs=None,
+        sync_free=False,
+        log_freq=1,
+        output_writer=None,
     ):
+        if logs is None:
+            logs = {}
         outputs = []
+        # the outputs of the steps are only fetched from the device every
+        # log_freq steps, or at the next step for predict
+        lazy = sync_free and in_dynamic_mode()
+        # the losses and outputs of the steps not fetched yet
+        losses, pending = None, []
+        prefetched = None
+        if lazy and mode != 'train' and not isinstance(data_loader, DataLoader):
+            # DataLoader loads the batches ahead by itself
+            data_loader = prefetched = _prefetch(data_loader)
         for step, data in enumerate(data_loader):
             # data might come from different types of data_loader and have
             # different format, as following:
@@ -2319,30 +2453,66 @@ class Model:
                         or step + 1 == len(data_loader)
                     )
 
-                outs = getattr(self, mode + '_batch')(*_inputs)
-
-                if self._metrics and self._loss:
-                    metrics = [[float(l) for l in outs[0]]]
-                elif self._loss:
-                    metrics = [[float(l) for l in outs]]
+                if lazy:
+                    guard = (
+                        no_grad()
+                        if mode == 'eval'
+                        else contextlib.nullcontext()
+                    )
+                    with guard:
+                        losses, metric_outs = getattr(
+                            self._adapter, mode + '_batch'
+                        )(*_inputs, return_numpy=False)
+                    if self._input_info is None:
+                        self._update_inputs()
+                    pending.append(metric_outs)
+                    if (step + 1) % log_freq == 0:
+                        self._update_lazy_logs(losses, pending, logs)
+                        losses = None
+                    else:
+                        # the metrics of this step are not fetched yet, drop
+                        # the ones of the last logging step so callbacks do
+                        # not record them again for this step
+                        for k in self._metrics_name():
+                            logs.pop(k, None)
                 else:
-                    metrics = []
+                    outs = getattr(self, mode + '_batch')(*_inputs)
+
+                    if self._metrics and self._loss:
+                        metrics = [[float(l) for l in outs[0]]]
+                    elif self._loss:
+                        metrics = [[float(l) for l in outs]]
+                    else:
+                        metrics = []
 
-                # metrics
-                for metric in self._metrics:
-                    res = metric.accumulate()
-                    metrics.extend(to_list(res))
+                    # metrics
+                    for metric in self._metrics:
+                        res = metric.accumulate()
+                        metrics.extend(to_list(res))
 
-                assert len(self._metrics_name()) == len(metrics)
-                for k, v in zip(self._metrics_name(), metrics):
-                    logs[k] = v
+                    assert len(self._metrics_name()) == len(metrics)
+                    for k, v in zip(self._metrics_name(), metrics):
+                        logs[k] = v
             else:
                 if self._inputs is not None:
-                    outs = self.predict_batch(data[: len(self._inputs)])
+                    data = data[: len(self._inputs)]
+                if lazy:
+                    with no_grad():
+                        outs = self._adapter.predict_batch(
+                            data, return_numpy=False
+                        )
+                    if self._input_info is None:
+                        self._update_inputs()
+                    # fetch the outputs of the last step while the device
+                    # computes this one
+                    for last in pending:
+                        self._write_outputs(
+                            [to_numpy(o) for o in last], outputs, output_writer
+                        )
+                    pending = [outs]
                 else:
                     outs = self.predict_batch(data)
-
-                outputs.append(outs)
+                    self._write_outputs(outs, outputs, output_writer)
 
             logs['step'] = step
             if (
@@ -2362,6 +2532,15 @@ class Model:
                     self.stop_training = True
                     del self.num_iters
                     break
+        if prefetched is not None:
+            prefetched.close()
+        if mode == 'predict':
+            for last in pending:
+                self._write_outputs(
+                    [to_numpy(o) for o in last], outputs, output_writer
+                )
+        elif losses is not None:
+            self._update_lazy_logs(losses, pending, logs)
         self._reset_metrics()
 
         if mode == 'predict':
@@ -2458,6 +2637,29 @@ class Model:
 
         return out_specs
 
+    def _write_outputs(self, outs, outputs, output_writer):
+        if output_writer is None:
+            outputs.append(outs)
+        else:
+            output_writer(outs)
+
+    def _update_lazy_logs(self, losses, pending, logs):
+        # fetch the outputs of the metrics of the steps in order, and the
+        # losses of the last step
+        for metric_outs in pending:
+            for metric, outs in zip(self._metrics, metric_outs):
+                if outs is not None:
+                    metric.update(*[to_numpy(m) for m in outs])
+        pending.clear()
+
+        metrics = [[float(l) for l in losses]] if self._loss else []
+        for metric in self._metrics:
+            metrics.extend(to_list(metric.accumulate()))
+
+        assert len(self._metrics_name()) == len(metrics)
+        for k, v in zip(self._metrics_name(), metrics):
+            logs[k] = v
+
     def _reset_metrics(self):
         for metric in self._metrics:
             metric.reset()
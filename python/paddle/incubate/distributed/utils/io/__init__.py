@@ -14,3 +14,4 @@
 
 from .dist_save import save, save_for_auto_inference
 from .dist_load import load
+from .delta_checkpoint import DeltaCheckpointManager
@@ -0,0 +1,358 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A delta checkpoint is a directory holding a chain of files in the tensor
+# container format of paddle.save:
+#
+#   manifest.json        the files of the chain in order, the first one is
+#                        the base, replaced atomically after every save
+#   base-{seq}.pdtc      all the tensors of the state dict
+#   delta-{seq}.pdtc     the tensors changed since the previous file, either
+#                        whole or only the changed rows with their indices
+#
+# Every file also records the structure of the state dict and its non-tensor
+# values. The changes are found from the contents of the tensors: a checksum
+# of every row is kept from the previous save, so the tensors changed by any
+# means, e.g. set_value or a broadcast, are saved, not only the ones updated
+# by inplace ops. The embeddings whose optimizer only updates the rows of
+# their SelectedRows gradients are saved by their changed rows. The chain is
+# compacted into a new base after a number of deltas or when the deltas get
+# as large as the base.
+
+import json
+import os
+import time
+
+import numpy as np
+
+from paddle.distributed.fleet.utils.log_util import logger
+from paddle.fluid import core
+from paddle.framework.tensor_container import (
+    TensorContainer,
+    _array_to_tensor,
+    _flatten,
+    _save_tensor_container,
+    _tensor_dtype_and_shape,
+    _unflatten,
+)
+from paddle.optimizer import SGD, Adam
+
+from .sharded_checkpoint import _name_tensor_leaves, _write_file, _write_json
+
+__all__ = []
+
+_MANIFEST_FILE = "manifest.json"
+_BASE = "base"
+_DELTA = "delta"
+_VERSION = 1
+# write the whole tensor if the changed rows are more than this ratio
+_MAX_ROWS_RATIO = 0.5
+
+
+def _nbytes(dtype, shape):
+    return int(np.prod(shape, dtype='int64')) * np.dtype(dtype).itemsize
+
+
+def _row_checksums(array):
+    # a checksum of the bytes of every row, it changes with any bit of the row
+    num_rows = array.shape[0] if array.ndim else 1
+    if array.size == 0:
+        return np.zeros([num_rows], dtype='uint64')
+    data = np.ascontiguousarray(array).view('uint8').reshape(num_rows, -1)
+    pad = -data.shape[1] % 8
+    if pad:
+        data = np.pad(data, [(0, 0), (0, pad)])
+    words = data.view('uint64')
+    weights = np.random.default_rng(0).integers(
+        0, 2**63, size=words.shape[1], dtype='uint64'
+    )
+    # the odd weights keep the change of every single word
+    return (words * (weights * 2 + 1)).sum(axis=1, dtype='uint64')
+
+
+def _params_of(optimizer):
+    params = optimizer._parameter_list or []
+    if params and isinstance(params[0], dict):
+        return [
+            (p, group.get('weight_decay', None) is not None)
+            for group in params
+            for p in group['params']
+        ]
+    return [(p, False) for p in params]
+
+
+def _updates_rows_only(optimizer):
+    # the optimizers whose update with a SelectedRows gradient only changes
+    # the rows of the gradient, in the parameter and the accumulators
+    if optimizer.regularization is not None:
+        return False
+    if type(optimizer) is SGD:
+        return True
+    return type(optimizer) is Adam and optimizer._lazy_mode
+
+
+class DeltaCheckpointManager:
+    """
+    Save a state dict, e.g. the state dicts of a model and its optimizer,
+    repeatedly into the directory ``path``. Only the first save writes all the
+    tensors, every later save writes the tensors changed since the previous
+    one, and only the changed rows of the embeddings tracked by ``watch``. The
+    chain of deltas is compacted into a new full checkpoint after
+    ``max_deltas`` deltas, or when the deltas are as large as the full one.
+
+    In distributed training, every rank should save its own state dict into
+    its own directory.
+
+    Args:
+        path(str): The directory of the checkpoint.
+        max_deltas(int, optional): The maximum number of deltas after a full
+            checkpoint. Default: 10.
+
+    Examples:
+        .. code-block:: python
+
+            >>> import paddle
+            >>> from paddle.incubate.distributed.utils.io import DeltaCheckpointManager
+
+            >>> emb = paddle.nn.Embedding(10000, 16, sparse=True)
+            >>> sgd = paddle.optimizer.SGD(parameters=emb.parameters())
+            >>> manager = DeltaCheckpointManager('path/to/ckpt')
+            >>> manager.watch(sgd)
+            >>> for step in range(10):
+            ...     emb(paddle.randint(0, 10000, [32])).mean().backward()
+            ...     sgd.step()
+            ...     sgd.clear_grad()
+            ...     manager.save({'model': emb.state_dict(), 'opt': sgd.state_dict()}, step=step)
+            >>> state_dict = manager.load()
+            >>> emb.set_state_dict(state_dict['model'])
+    """
+
+    def __init__(self, path, max_deltas=10):
+        if max_deltas < 0:
+            raise ValueError(
+                f"max_deltas should be non-negative, but got {max_deltas}."
+            )
+        self._path = path
+        self._max_deltas = max_deltas
+        # the name of a tensor in the state dict -> (dtype, shape, checksums
+        # of its rows) when it was saved last time
+        self._versions = {}
+        # the names of the parameters saved by their changed rows
+        self._row_params = set()
+        # the names of the accumulators and master weights saved by rows
+        self._row_owners = set()
+        self._optimizers = []
+
+    def watch(self, optimizer):
+        """
+        Save the parameters of ``optimizer`` updated by SelectedRows
+        gradients, e.g. of ``paddle.nn.Embedding(sparse=True)``, and their
+        accumulators by their changed rows. Only takes effect for ``SGD`` and
+        ``Adam`` with ``lazy_mode=True`` without weight decay, other
+        optimizers change all the rows of the parameters and their tensors
+        are saved whole when they change.
+
+        Args:
+            optimizer(Optimizer): The optimizer of the parameters.
+        """
+        if not _updates_rows_only(optimizer):
+            logger.warning(
+                "{} updates all the rows of a parameter, the rows of its "
+                "parameters are not tracked.".format(type(optimizer).__name__)
+            )
+            return
+        for param, has_decay in _params_of(optimizer):
+            if has_decay or param.regularizer is not None:
+                continue
+            self._row_params.add(param.name)
+
+        self._optimizers.append(optimizer)
+
+    def unwatch(self):
+        """
+        Stop saving the parameters of the watched optimizers by rows.
+        """
+        self._row_params = set()
+        self._row_owners = set()
+        self._optimizers = []
+
+    def _update_row_owners(self):
+        # the accumulators are created at the first step of the optimizer
+        for optimizer in self._optimizers:
+            for accumulators in optimizer._accumulators.values():
+                for param_name, acc in accumulators.items():
+                    if param_name in self._row_params:
+                        self._row_owners.add(acc.name)
+            for param_name, master in getattr(
+                optimizer, '_master_weights', {}
+            ).items():
+                if param_name in self._row_params:
+                    self._row_owners.add(master.name)
+
+    def _saved_by_rows(self, tensor):
+        name = getattr(tensor, 'name', None)
+        return name in self._row_params or name in self._row_owners
+
+    def _read_manifest(self):
+        manifest_path = os.path.join(self._path, _MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return {"version": _VERSION, "next": 0, "chain": []}
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    def save(self, state_dict, step=None):
+        """
+        Save ``state_dict``, writing only the changes since the previous save
+        by this manager unless the chain is compacted.
+
+        Args:
+            state_dict(dict): The state dict to save, a nested structure of
+                Tensor, numpy.ndarray, dict, list, tuple and python scalars.
+            step(int, optional): The training step recorded with the
+                checkpoint. Default: None.
+
+        Returns:
+            The number of bytes of the tensors written.
+        """
+        os.makedirs(self._path, exist_ok=True)
+        manifest = self._read_manifest()
+        chain = manifest["chain"]
+        tensors = []
+        tree = _name_tensor_leaves(_flatten(state_dict, tensors), tensors)
+        self._update_row_owners()
+
+        base_nbytes = sum(
+            _nbytes(*_tensor_dtype_and_shape(t)) for _, t in tensors
+        )
+        delta_nbytes = sum(f["nbytes"] for f in chain[1:])
+        kind = _DELTA
+        if (
+            not chain
+            or not self._versions
+            or len(chain) - 1 >= self._max_deltas
+            or delta_nbytes >= base_nbytes
+        ):
+            kind = _BASE
+
+        whole, rows, versions = [], [], {}
+        nbytes = 0
+        for name, t in tensors:
+            dtype, shape = _tensor_dtype_and_shape(t)
+            array = t.numpy() if isinstance(t, core.eager.Tensor) else t
+            checksums = _row_checksums(np.asarray(array))
+            versions[name] = (dtype, shape, checksums)
+            last = self._versions.get(name)
+            if (
+                kind == _DELTA
+                and last is not None
+                and last[:2]
+                == (
+                    dtype,
+                    shape,
+                )
+            ):
+                changed = np.nonzero(checksums != last[2])[0]
+                if len(changed) == 0:
+                    continue
+                if (
+                    self._saved_by_rows(t)
+                    and len(shape) > 0
+                    and len(changed) <= _MAX_ROWS_RATIO * shape[0]
+                ):
+                    values = np.asarray(array)[changed]
+                    rows.append((name, changed, values))
+                    nbytes += changed.nbytes + values.nbytes
+                    continue
+            whole.append((name, t))
+            nbytes += _nbytes(dtype, shape)
+
+        seq = manifest["next"]
+        file_name = f"{kind}-{seq:08d}.pdtc"
+        obj = {
+            "tensors": [t for _, t in whole],
+            "rows": [[index, values] for _, index, values in rows],
+        }
+        metadata = {
+            "kind": kind,
+            "step": step,
+            "time": time.time(),
+            "tree": tree,
+            "tensors": [name for name, _ in whole],
+            "rows": [name for name, _, _ in rows],
+        }
+        _write_file(
+            os.path.join(self._path, file_name),
+            lambda p: _save_tensor_container(obj, p, metadata=metadata),
+        )
+
+        entry = {
+            "file": file_name,
+            "kind": kind,
+            "step": step,
+            "nbytes": nbytes,
+        }
+        old_files = [f["file"] for f in chain] if kind == _BASE else []
+        manifest["chain"] = [entry] if kind == _BASE else chain + [entry]
+        manifest["next"] = seq + 1
+        _write_file(
+            os.path.join(self._path, _MANIFEST_FILE), _write_json(manifest)
+        )
+        # the old chain is only removed after the new base is committed
+        for old in old_files:
+            old_path = os.path.join(self._path, old)
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+        self._versions = versions
+        logger.debug(
+            f"save {kind} checkpoint {file_name} of {nbytes} bytes, "
+            f"{len(whole)} tensors whole and {len(rows)} by rows"
+        )
+        return nbytes
+
+    def load(self, return_numpy=False):
+        """
+        Load the latest state dict by applying the deltas of the chain to the
+        full checkpoint in order. The next save writes a full checkpoint.
+
+        Args:
+            return_numpy(bool, optional): If True, return numpy.ndarray instead
+                of Tensor. Default: False.
+        """
+        chain = self._read_manifest()["chain"]
+        if not chain:
+            raise ValueError(f"There is no checkpoint in {self._path}.")
+        arrays = {}
+        tree = None
+        for entry in chain:
+            with TensorContainer(os.path.join(self._path, entry["file"])) as c:
+                metadata = c.metadata
+                if entry["kind"] == _BASE:
+                    arrays = {}
+                for i, name in enumerate(metadata["tensors"]):
+                    arrays[name] = c.get_tensor(
+                        f"tensors/{i}", return_numpy=True
+                    )
+                for i, name in enumerate(metadata["rows"]):
+                    index = c.get_tensor(f"rows/{i}/0", return_numpy=True)
+                    values = c.get_tensor(f"rows/{i}/1", return_numpy=True)
+                    arrays[name][index] = values
+                tree = metadata["tree"]
+
+        self._versions = {}
+        loaded = {
+            name: _array_to_tensor(array, return_numpy)
+            for name, array in arrays.items()
+        }
+        return _unflatten(tree, loaded)
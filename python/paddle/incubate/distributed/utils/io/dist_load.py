@@ -20,6 +20,8 @@ import paddle.distributed as dist
 from paddle.distributed import fleet
 from paddle.fluid.framework import dygraph_only
 
+from .sharded_checkpoint import _is_sharded_checkpoint, _load_sharded
+
 
 @dygraph_only
 def load(path, **configs):
@@ -40,6 +42,19 @@ def load(path, **configs):
             The following options are currently supported:
                 (1) place: where to place the loaded state dict.
                      If the state dict is too large, the palce should be set 'cpu'.
+            (2) keys: only used when ``path`` is a sharded checkpoint saved with ``sharded=True``.
+                     A list of the tensor names to load, a name is the keys from the root of the
+                     state dict joined by '/', and a key also selects all the tensors under it. Only
+                     these tensors are read and returned in a flat dict. Default is None, load all.
+            (3) state_dict: only used when ``path`` is a sharded checkpoint. The state dict of the
+                     current model or optimizer, which may be in a different tensor parallel, sharding or
+                     data parallel layout from the saved one. Every tensor in it is loaded as the part of
+                     the saved global tensor it holds now, reading only these bytes, and the result has the
+                     structure of ``state_dict``.
+            (4) parameters: only used with ``state_dict``. The parameters of the model, to find the
+                     split axis of the optimizer states of the parameters split by model parallel.
+            (5) return_numpy: only used when ``path`` is a sharded checkpoint, return numpy.ndarray
+                     instead of Tensor.
             Note:
                 Other config value may cause some error.Please don't use any more config options.
     Returns:
@@ -65,7 +80,23 @@ def load(path, **configs):
         optimizer_state_dict = paddle.incubate.distributed.utils.io.load(path="path/to/load.pdopt")
         dist_optimizer.set_state_dict(optimizer_state_dict)
 
+        # load the master weights from a sharded checkpoint only
+        master_weights = paddle.incubate.distributed.utils.io.load(path="path/to/opt_ckpt", keys=["master_weights"])
+
+        # load a sharded checkpoint saved in another parallel layout
+        optimizer_state_dict = paddle.incubate.distributed.utils.io.load(
+            path="path/to/opt_ckpt", state_dict=dist_optimizer.state_dict(), parameters=model.parameters())
+
     """
+    if _is_sharded_checkpoint(path):
+        return _load_sharded(
+            path,
+            keys=configs.get("keys", None),
+            state_dict=configs.get("state_dict", None),
+            parameters=configs.get("parameters", None),
+            return_numpy=configs.get("return_numpy", False),
+        )
+
     if dist.get_world_size() == 1:
         return paddle.load(path, **configs)
 
@@ -23,6 +23,7 @@ from paddle.distributed.fleet.utils.log_util import logger
 from paddle.fluid.framework import dygraph_only
 
 from .save_for_auto import save_for_auto_inference
+from .sharded_checkpoint import _save_sharded
 
 __all__ = ["save", "save_for_auto_inference"]
 
@@ -63,6 +64,19 @@ def save(state_dict, path, **configs):
           (4)max_grouped_size(str|int):
             To limit the max size(how many bits) a object group to be transfered a time.
             If str, the format must be as num+'G/M/K', for example, 3G, 2K, 10M, etc. Default is 3G.
+          (5)sharded(bool):
+            If True, ``path`` is a directory on a file system shared by all ranks, every rank writes the
+            tensors it holds into its own shard file instead of gathering them, a tensor held by several
+            ranks is written once. The other configs are ignored. Default is False.
+          (6)async_save(bool):
+            Only used when ``sharded`` is True. If True, the tensors are copied to host memory and written
+            in a background thread, the checkpoint is complete after ``paddle.framework.clear_async_save_task_queue()``
+            returns on every rank. Default is True.
+          (7)parameters(list):
+            Only used when ``sharded`` is True. The parameters of the model. The tensors of the parameters split by
+            model parallel layers are saved as slices of the global tensors, passing the parameters lets the states
+            of the optimizer of these parameters be saved as slices too, so that they can be loaded into a different
+            model parallel degree. Default is None.
     Returns:
         None
     Examples:
@@ -85,7 +99,19 @@ def save(state_dict, path, **configs):
         # save optimizer state dict on rank 0
         paddle.incubate.distributed.utils.io.save(optimizer.state_dict(), path="path/to/save.pdopt", gather=0, state_type="opt")
 
+        # every rank writes its own shard in the background
+        paddle.incubate.distributed.utils.io.save(optimizer.state_dict(), path="path/to/opt_ckpt", sharded=True, parameters=model.parameters())
+        # wait for the writing before the next checkpoint or exiting
+        paddle.framework.clear_async_save_task_queue()
+
     '''
+    if configs.get("sharded", False):
+        return _save_sharded(
+            state_dict,
+            path,
+            async_save=configs.get("async_save", True),
+            parameters=configs.get("parameters", None),
+        )
 
     gather_to = configs.get("gather_to", None)
     if dist.get_world_size() == 1 or gather_to is None:
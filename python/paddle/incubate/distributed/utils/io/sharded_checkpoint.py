@@ -0,0 +1,508 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# A sharded checkpoint is a directory on a file system shared by all ranks:
+#
+#   metadata.json      the structure of the state dict, and the dtype, global
+#                      shape and shard locations of every tensor
+#   rank_{r}.distcp    the tensors written by rank r, in the tensor container
+#                      format of paddle.save
+#   COMMIT             written by rank 0 after all the shards are complete
+#
+# A tensor held by several ranks (e.g. replicated by data parallel) is only
+# written once, the writers are chosen to balance the bytes across ranks. The
+# ranks only exchange the names and shapes of their tensors, the data is
+# never gathered, and every rank writes its shard in a background thread from
+# a host snapshot so that training continues while the files are written.
+#
+# A tensor split by model parallel is saved as slices, the metadata records
+# its global shape and the offset of every slice. When loading into another
+# layout, every rank computes the region of the global tensor it needs and
+# copies the overlapping parts of the saved slices from the mapped files, so
+# only these bytes are read and no rank materializes the full tensor.
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+import paddle.distributed as dist
+from paddle.distributed import fleet
+from paddle.distributed.fleet.utils.log_util import logger
+from paddle.framework import io as paddle_io
+from paddle.framework.tensor_container import (
+    _TENSOR_KEY,
+    _TUPLE_KEY,
+    TensorContainer,
+    _array_to_tensor,
+    _flatten,
+    _save_tensor_container,
+    _tensor_dtype_and_shape,
+    _unflatten,
+)
+
+_METADATA_FILE = "metadata.json"
+_COMMIT_FILE = "COMMIT"
+_SHARD_FILE = "rank_{}.distcp"
+_VERSION = 1
+
+
+def _is_sharded_checkpoint(path):
+    return isinstance(path, str) and os.path.isfile(
+        os.path.join(path, _METADATA_FILE)
+    )
+
+
+def _name_tensor_leaves(tree, tensors):
+    """
+    Replace the tensor indices in the tree built by ``_flatten`` with the
+    tensor names, which are the same on all ranks.
+    """
+    if isinstance(tree, dict):
+        if _TENSOR_KEY in tree:
+            return {_TENSOR_KEY: tensors[tree[_TENSOR_KEY]][0]}
+        return {k: _name_tensor_leaves(v, tensors) for k, v in tree.items()}
+    if isinstance(tree, list):
+        return [_name_tensor_leaves(v, tensors) for v in tree]
+    return tree
+
+
+def _merge_tree(dst, src):
+    if not isinstance(dst, dict) or not isinstance(src, dict):
+        return dst
+    if _TENSOR_KEY in dst or _TENSOR_KEY in src:
+        return dst
+    for key, value in src.items():
+        dst[key] = _merge_tree(dst[key], value) if key in dst else value
+    return dst
+
+
+def _mp_rank_and_degree():
+    hcg = getattr(fleet.fleet, "_hcg", None)
+    if hcg is None or not hasattr(hcg, "get_model_parallel_rank"):
+        return 0, 1
+    return (
+        hcg.get_model_parallel_rank(),
+        hcg.get_model_parallel_world_size(),
+    )
+
+
+def _split_axis(name, tensor, parameters):
+    """
+    Return the axis along which ``tensor`` is split by model parallel, or None.
+    The tensors of the parameters split by the model parallel layers are
+    marked with ``split_axis``. Other tensors, e.g. the optimizer states of
+    these parameters, are matched with ``parameters`` by name and shape.
+    """
+    if getattr(tensor, "is_distributed", False):
+        return getattr(tensor, "split_axis", None)
+    basename = name.split("/")[-1]
+    shape = list(tensor.shape)
+    for param in parameters or []:
+        if not getattr(param, "is_distributed", False):
+            continue
+        if getattr(param, "split_axis", None) is None:
+            continue
+        if (
+            basename == param.name or basename.startswith(param.name + "_")
+        ) and shape == list(param.shape):
+            return param.split_axis
+    return None
+
+
+def _plan_writers(local_infos):
+    """
+    ``local_infos[rank]`` maps every tensor name of the rank to its
+    (dtype, shape, split), split is None or (axis, index, num) meaning the
+    tensor is the index-th of num slices along axis. Check that the ranks
+    agree and every slice is held by some rank, then choose the rank that
+    writes every slice so that every rank writes about the same bytes.
+
+    Return ({name: {index: rank}}, {name: (dtype, shape, axis, num)}).
+    """
+    infos = {}
+    holders = {}
+    for rank, local in enumerate(local_infos):
+        for name, (dtype, shape, split) in local.items():
+            axis, index, num = split if split is not None else (None, 0, 1)
+            info = (dtype, list(shape), axis, num)
+            if name in infos and infos[name] != info:
+                raise ValueError(
+                    "Tensor {} is (dtype, shape, split axis, split num) {} on "
+                    "rank {}, but {} on rank {}.".format(
+                        name,
+                        info,
+                        rank,
+                        infos[name],
+                        next(iter(holders[name].values()))[0],
+                    )
+                )
+            infos[name] = info
+            holders.setdefault(name, {}).setdefault(index, []).append(rank)
+
+    for name, (_, _, _, num) in infos.items():
+        if sorted(holders[name]) != list(range(num)):
+            raise ValueError(
+                "Only the slices {} of the {} slices of tensor {} are "
+                "held by the ranks.".format(sorted(holders[name]), num, name)
+            )
+
+    def nbytes(name):
+        dtype, shape = infos[name][:2]
+        return int(np.prod(shape, dtype='int64')) * np.dtype(dtype).itemsize
+
+    loads = [0] * len(local_infos)
+    plan = {name: {} for name in infos}
+    units = [(name, index) for name in infos for index in holders[name]]
+    for name, index in sorted(units, key=lambda u: (-nbytes(u[0]), u)):
+        rank = min(holders[name][index], key=lambda r: (loads[r], r))
+        plan[name][index] = rank
+        loads[rank] += nbytes(name)
+    return plan, infos
+
+
+def _build_metadata(trees, plan, infos, world_size):
+    tree = {}
+    for t in trees:
+        tree = _merge_tree(tree, t) if tree else t
+    tensors = {}
+    for name, writers in plan.items():
+        dtype, shape, axis, num = infos[name]
+        global_shape = list(shape)
+        if axis is not None:
+            global_shape[axis] *= num
+        shards = []
+        for index in range(num):
+            offset = [0] * len(shape)
+            if axis is not None:
+                offset[axis] = index * shape[axis]
+            shards.append(
+                {
+                    "file": _SHARD_FILE.format(writers[index]),
+                    "offset": offset,
+                    "shape": shape,
+                }
+            )
+        tensors[name] = {
+            "dtype": dtype,
+            "global_shape": global_shape,
+            "shards": shards,
+        }
+    return {
+        "version": _VERSION,
+        "world_size": world_size,
+        "tree": tree,
+        "tensors": tensors,
+    }
+
+
+def _write_file(path, write):
+    # write to a temporary file first, readers never see a partial file
+    tmp_path = path + ".tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_json(obj):
+    def write(path):
+        with open(path, "w") as f:
+            json.dump(obj, f)
+
+    return write
+
+
+def _clear_checkpoint(path):
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name in (_METADATA_FILE, _COMMIT_FILE) or name.endswith(
+            (".distcp", ".distcp.tmp")
+        ):
+            os.remove(os.path.join(path, name))
+
+
+def _wait_for_files(paths, timeout):
+    end = time.time() + timeout
+    for p in paths:
+        while not os.path.exists(p):
+            if time.time() > end:
+                raise RuntimeError(
+                    "Timeout waiting for {}, the checkpoint is not "
+                    "committed.".format(p)
+                )
+            time.sleep(0.1)
+
+
+def _save_sharded(
+    state_dict,
+    path,
+    async_save=True,
+    parameters=None,
+    group=None,
+    timeout=1800,
+):
+    """
+    Save ``state_dict`` as a sharded checkpoint directory ``path``, every rank
+    writes the tensors assigned to it. Return the thread writing the shard of
+    this rank if ``async_save``, otherwise wait for the writing.
+    """
+    rank = dist.get_rank(group)
+    world_size = dist.get_world_size(group)
+    mp_rank, mp_degree = _mp_rank_and_degree()
+
+    tensors = []
+    tree = _name_tensor_leaves(_flatten(state_dict, tensors), tensors)
+    local_infos = {}
+    for name, t in tensors:
+        split = None
+        axis = _split_axis(name, t, parameters)
+        if axis is not None and mp_degree > 1:
+            split = (axis, mp_rank, mp_degree)
+        local_infos[name] = (*_tensor_dtype_and_shape(t), split)
+
+    if rank == 0:
+        _clear_checkpoint(path)
+    if world_size > 1:
+        # the gathering is also the barrier after rank 0 cleared the path
+        gathered = []
+        dist.all_gather_object(gathered, (local_infos, tree), group=group)
+    else:
+        gathered = [(local_infos, tree)]
+
+    plan, infos = _plan_writers([g[0] for g in gathered])
+    metadata = _build_metadata(
+        [g[1] for g in gathered], plan, infos, world_size
+    )
+
+    def _is_writer(name):
+        split = local_infos[name][2]
+        return plan[name][split[1] if split else 0] == rank
+
+    own = {name: t for name, t in tensors if _is_writer(name)}
+    if async_save:
+        own = paddle_io._snapshot_to_host(own)
+    shard_path = os.path.join(path, _SHARD_FILE.format(rank))
+    logger.debug(f"rank {rank} writes {len(own)} tensors to {shard_path}")
+
+    def _save():
+        try:
+            _write_file(shard_path, lambda p: _save_tensor_container(own, p))
+            if rank == 0:
+                _write_file(
+                    os.path.join(path, _METADATA_FILE), _write_json(metadata)
+                )
+                _wait_for_files(
+                    [
+                        os.path.join(path, _SHARD_FILE.format(r))
+                        for r in range(world_size)
+                    ],
+                    timeout,
+                )
+                _write_file(
+                    os.path.join(path, _COMMIT_FILE),
+                    _write_json({"time": time.time()}),
+                )
+        except Exception as e:
+            paddle_io._async_save_errors.append(e)
+            raise
+
+    if not async_save:
+        _save()
+        return None
+
+    task = threading.Thread(target=_save)
+    task.start()
+    paddle_io._async_save_tasks.append(task)
+    return task
+
+
+def _load_metadata(path):
+    if not os.path.exists(os.path.join(path, _COMMIT_FILE)):
+        raise ValueError(
+            "The checkpoint {} is not committed, the saving may be unfinished "
+            "or failed.".format(path)
+        )
+    with open(os.path.join(path, _METADATA_FILE)) as f:
+        return json.load(f)
+
+
+def _select_names(names, keys):
+    if keys is None:
+        return list(names)
+    selected = []
+    for key in keys:
+        matched = [n for n in names if n == key or n.startswith(key + "/")]
+        if not matched:
+            raise KeyError(f"{key} is not in the checkpoint.")
+        selected.extend(matched)
+    return selected
+
+
+def _read_region(path, entry, offset, shape, containers):
+    """
+    Read the region [offset, offset + shape) of the global tensor described
+    by ``entry`` from the slices overlapping with it.
+    """
+    out = np.empty(shape, dtype=entry["dtype"])
+    covered = 0
+    for shard in entry["shards"]:
+        src, dst = [], []
+        for o, n, so, sn in zip(offset, shape, shard["offset"], shard["shape"]):
+            begin, end = max(o, so), min(o + n, so + sn)
+            if begin >= end:
+                break
+            src.append(slice(begin - so, end - so))
+            dst.append(slice(begin - o, end - o))
+        else:
+            container = containers.get(shard["file"])
+            if container is None:
+                container = TensorContainer(
+                    os.path.join(path, shard["file"]), mmap=True
+                )
+                containers[shard["file"]] = container
+            # a view of the mapped file, only the pages copied are read
+            array = container._get_array(container._index[entry["name"]])
+            out[tuple(dst)] = array[tuple(src)]
+            covered += int(np.prod([s.stop - s.start for s in dst]))
+    if covered != int(np.prod(shape, dtype='int64')):
+        raise ValueError(
+            "The region {} + {} of tensor {} is not covered by the saved "
+            "slices.".format(offset, shape, entry["name"])
+        )
+    return out
+
+
+def _target_region(name, tensor, global_shape, parameters, mp):
+    """
+    Return the region of the global tensor that ``tensor`` holds in the
+    current layout.
+    """
+    shape = list(tensor.shape)
+    if shape == global_shape:
+        return [0] * len(shape), shape
+    mp_rank, mp_degree = mp
+    axis = _split_axis(name, tensor, parameters)
+    if axis is None:
+        # e.g. the optimizer states of a split parameter, infer the axis
+        diffs = [
+            i for i, (n, g) in enumerate(zip(shape, global_shape)) if n != g
+        ]
+        if len(shape) == len(global_shape) and len(diffs) == 1:
+            axis = diffs[0]
+    if (
+        axis is None
+        or len(shape) != len(global_shape)
+        or shape[axis] * mp_degree != global_shape[axis]
+        or any(
+            n != g
+            for i, (n, g) in enumerate(zip(shape, global_shape))
+            if i != axis
+        )
+    ):
+        raise ValueError(
+            "Can not load tensor {} of global shape {} into shape {} with "
+            "model parallel degree {}.".format(
+                name, global_shape, shape, mp_degree
+            )
+        )
+    offset = [0] * len(shape)
+    offset[axis] = mp_rank * shape[axis]
+    return offset, shape
+
+
+def _fill_template(template, saved, tensors):
+    """
+    Build the structure of ``template``, whose tensor leaves are named, with
+    the loaded ``tensors`` and the other values from ``saved``.
+    """
+    if isinstance(template, dict):
+        if _TENSOR_KEY in template:
+            return tensors[template[_TENSOR_KEY]]
+        saved = saved if isinstance(saved, dict) else {}
+        if _TUPLE_KEY in template:
+            items = saved.get(_TUPLE_KEY, [])
+            return tuple(
+                _fill_template(v, items[i] if i < len(items) else None, tensors)
+                for i, v in enumerate(template[_TUPLE_KEY])
+            )
+        return {
+            k: _fill_template(v, saved.get(k), tensors)
+            for k, v in template.items()
+        }
+    if isinstance(template, list):
+        saved = saved if isinstance(saved, list) else []
+        return [
+            _fill_template(v, saved[i] if i < len(saved) else None, tensors)
+            for i, v in enumerate(template)
+        ]
+    if saved is None or isinstance(saved, (dict, list)):
+        return template
+    return saved
+
+
+def _load_sharded(
+    path, keys=None, state_dict=None, parameters=None, return_numpy=False
+):
+    """
+    Load the sharded checkpoint ``path``. The shard files are mapped, only the
+    bytes of the loaded tensors are read.
+
+    If ``state_dict`` is given, it is used as the template: every tensor in it
+    is loaded as the region of the saved global tensor it holds in the current
+    model parallel layout, and the result has the structure of
+    ``state_dict``. If ``keys`` is given, only the tensors whose name is a key,
+    or starts with a key followed by '/', are loaded as global tensors and
+    returned in a flat dict. Otherwise the whole state dict is loaded.
+    """
+    metadata = _load_metadata(path)
+    saved = metadata["tensors"]
+    if state_dict is not None:
+        tensors = []
+        tree = _name_tensor_leaves(_flatten(state_dict, tensors), tensors)
+        mp = _mp_rank_and_degree()
+        regions = {}
+        for name, t in tensors:
+            if name not in saved:
+                raise KeyError(f"{name} is not in the checkpoint.")
+            regions[name] = _target_region(
+                name, t, saved[name]["global_shape"], parameters, mp
+            )
+    else:
+        names = _select_names(saved.keys(), keys)
+        regions = {
+            name: (
+                [0] * len(saved[name]["global_shape"]),
+                saved[name]["global_shape"],
+            )
+            for name in names
+        }
+
+    containers = {}
+    loaded = {}
+    try:
+        for name, (offset, shape) in regions.items():
+            array = _read_region(
+                path, dict(saved[name], name=name), offset, shape, containers
+            )
+            loaded[name] = _array_to_tensor(array, return_numpy)
+    finally:
+        for container in containers.values():
+            container.close()
+
+    if state_dict is not None:
+        return _fill_template(tree, metadata["tree"], loaded)
+    if keys is not None:
+        return loaded
+    return _unflatten(metadata["tree"], loaded)
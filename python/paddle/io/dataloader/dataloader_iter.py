@@ -26,7 +26,7 @@ import numpy as np
 import paddle
 from paddle import profiler
 from paddle.fluid.framework import _current_expected_place, _set_expected_place
-from paddle.profiler.timer import benchmark
+from paddle.profiler.timer import benchmark, split_reader_cost
 from paddle.profiler.utils import in_profiler_mode
 
 from ...framework import core, in_dynamic_mode
@@ -146,6 +146,21 @@ class _DataLoaderIterBase:
         if self._blocking_queue:
             self._blocking_queue.kill()
 
+    def _reader_stages(self, start, num):
+        # NOTE: _stage_infos records the stamps of the batches in the order
+        # of pushing to blocking_queue, the reader cost of an output is split
+        # by the batch ready the last, the others are loaded meanwhile
+        stamps = [
+            self._stage_infos.pop(0)
+            for _ in range(min(num, len(self._stage_infos)))
+        ]
+        stamps = [s for s in stamps if s is not None]
+        if not stamps:
+            return None
+        return split_reader_cost(
+            start, time.time(), max(stamps, key=lambda s: s[-1])
+        )
+
 
 class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
     """
@@ -171,6 +186,8 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
         # can record the data structure sequencely in a list without
         # recording the send and recv index
         self._structure_infos = []
+        # the stamps of the stages of the batches, see _reader_stages
+        self._stage_infos = []
 
         # NOTE: len(self._places) batch data compose as an output
         # iteration, set blocking_queue can cache "self._prefetch_factor" iteration datas
@@ -232,9 +249,15 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
                 # read data from dataset in mini-batch
                 # with paddle.fluid.dygraph.guard(place=paddle.CPUPlace()):
                 # read data from dataset in mini-batch
+                fetch_start = time.time()
                 batch = self._dataset_fetcher.fetch(
                     indices, self._thread_done_event
                 )
+                stamps = (
+                    fetch_start,
+                    self._dataset_fetcher.collate_start,
+                    time.time(),
+                )
             except StopIteration:
                 self._exit_thread_expectedly()
                 return
@@ -266,6 +289,7 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
                     break
 
                 try:
+                    self._stage_infos.append(stamps + (time.time(),))
                     self._blocking_queue.push(array)
                 except:
                     self._exit_thread_expectedly()
@@ -286,6 +310,7 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
         try:
             benchmark().check_if_need_record(self)
             benchmark().before_reader()
+            reader_start = time.time()
             if in_dynamic_mode():
                 data = core.eager.read_next_tensor_list(
                     self._reader.read_next_list()[0]
@@ -309,7 +334,8 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
                         data = data[0]
                 else:
                     data = self._reader.read_next()
-            benchmark().after_reader()
+            num = 1 if in_dynamic_mode() else len(self._places)
+            benchmark().after_reader(self._reader_stages(reader_start, num))
 
             return data
         except StopIteration:
@@ -379,6 +405,9 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         self._batches_outstanding = 0
         self._task_infos = {}
         self._structure_infos = []
+        # the stamps of the stages of the batches, see _reader_stages
+        self._stage_infos = []
+        self._batch_stamps = None
 
         # indices outstand as _outstanding_capacity at first, and
         # blocking_queue capacity is also _outstanding_capacity.
@@ -551,6 +580,7 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         self._batches_outstanding = 0
         self._task_infos = {}
         self._structure_infos = []
+        self._stage_infos = []
 
         # set all worker status available
         self._worker_status = [True] * self._num_workers
@@ -630,6 +660,12 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                                     slot = tmp
                                 array.append(slot)
 
+                        if self._batch_stamps is None:
+                            self._stage_infos.append(None)
+                        else:
+                            self._stage_infos.append(
+                                self._batch_stamps + (time.time(),)
+                            )
                         if not self._blocking_queue.push(array):
                             self._blocking_queue.close()
                     except Exception as e:
@@ -649,7 +685,7 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
             if self._dataset_kind == _DatasetKind.ITER:
                 while self._rcvd_idx < self._send_idx:
                     info = self._task_infos[self._rcvd_idx]
-                    if len(info) == 3 or self._worker_status[info[0]]:
+                    if len(info) == 4 or self._worker_status[info[0]]:
                         break
                     del self._task_infos[self._rcvd_idx]
                     self._rcvd_idx += 1
@@ -675,10 +711,11 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
 
             if (
                 self._rcvd_idx in self._task_infos
-                and len(self._task_infos[self._rcvd_idx]) == 3
+                and len(self._task_infos[self._rcvd_idx]) == 4
             ):
                 info = self._task_infos.pop(self._rcvd_idx)
                 self._structure_infos.append(info[2])
+                self._batch_stamps = info[3]
                 return info[1]
 
             try:
@@ -738,7 +775,7 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                     self._try_put_indices()
                     continue
 
-                idx, batch, structure = data
+                idx, batch, structure, stamps = data
 
                 if (
                     isinstance(idx, _ResumeIteration)
@@ -755,9 +792,10 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                     if idx in self._task_infos:
                         del self._task_infos[idx]
                     self._structure_infos.append(structure)
+                    self._batch_stamps = stamps
                     return batch
                 else:
-                    self._task_infos[idx] += (batch, structure)
+                    self._task_infos[idx] += (batch, structure, stamps)
                     continue
 
     def _try_put_indices(self):
@@ -807,6 +845,7 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         try:
             benchmark().check_if_need_record(self)
             benchmark().before_reader()
+            reader_start = time.time()
             # _batches_outstanding here record the total batch data number
             # in 'from after _try_put_indices to beforeoutput data', this
             # value should be _outstanding_capacity if data is not drained,
@@ -844,7 +883,8 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                 else:
                     data = self._reader.read_next()
             self._on_output_batch()
-            benchmark().after_reader()
+            num = 1 if in_dynamic_mode() else len(self._places)
+            benchmark().after_reader(self._reader_stages(reader_start, num))
             return data
         except StopIteration:
             if not self._persistent_workers:
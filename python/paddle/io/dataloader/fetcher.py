@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 
 class _DatasetFetcher:
     def __init__(self, dataset, auto_collate_batch, collate_fn, drop_last):
@@ -19,6 +21,9 @@ class _DatasetFetcher:
         self.auto_collate_batch = auto_collate_batch
         self.collate_fn = collate_fn
         self.drop_last = drop_last
+        # the time the last fetch started collating, the reader cost of
+        # the profiler benchmark is split into reading and collating by it
+        self.collate_start = None
 
     # NOTE: fetch function here perform the whole pipeline of dataset
     #       reading and data trasforms of a batch in each calling, this
@@ -60,6 +65,7 @@ class _IterableDatasetFetcher(_DatasetFetcher):
         else:
             data = next(self.dataset_iter)
 
+        self.collate_start = time.time()
         if self.collate_fn:
             data = self.collate_fn(data)
         return data
@@ -81,6 +87,7 @@ class _MapDatasetFetcher(_DatasetFetcher):
         else:
             data = self.dataset[batch_indices]
 
+        self.collate_start = time.time()
         if self.collate_fn:
             data = self.collate_fn(data)
         return data
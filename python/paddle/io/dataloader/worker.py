@@ -15,6 +15,7 @@
 import os
 import queue
 import sys
+import time
 import traceback
 
 import numpy as np
@@ -341,7 +342,7 @@ def _worker_loop(
                 continue
 
             if isinstance(data, _ResumeIteration):
-                out_queue.put((data, None, None))
+                out_queue.put((data, None, None, None))
                 iterator_drained = False
                 fetcher = _DatasetKind.create_fetcher(
                     dataset_kind, dataset, auto_collate_batch, collate_fn, True
@@ -360,6 +361,7 @@ def _worker_loop(
                 continue
 
             idx, indices = data
+            stamps = None
             try:
                 if init_exception is not None:
                     batch = init_exception
@@ -371,7 +373,16 @@ def _worker_loop(
                     #       CPU tensor operation, so we add CPUPlace guard here
                     #       to make sure tensor will be operated only on CPU
                     with paddle.fluid.dygraph.guard(place=paddle.CPUPlace()):
+                        fetch_start = time.time()
                         batch = fetcher.fetch(indices)
+                        # the wall clock is shared by the processes, the
+                        # reader of the main process splits its reader cost
+                        # into the stages of the batch by these stamps
+                        stamps = (
+                            fetch_start,
+                            fetcher.collate_start,
+                            time.time(),
+                        )
             except Exception as e:
                 if (
                     isinstance(e, StopIteration)
@@ -380,10 +391,12 @@ def _worker_loop(
                     out_queue.put(_IterableDatasetStopIteration(worker_id))
                     iterator_drained = True
                 else:
-                    out_queue.put((idx, _WorkerException(worker_id), None))
+                    out_queue.put(
+                        (idx, _WorkerException(worker_id), None, None)
+                    )
             else:
                 if isinstance(batch, _WorkerException):
-                    out_queue.put((idx, batch, None))
+                    out_queue.put((idx, batch, None, None))
                 batch, structure = _flatten_batch(batch)
                 if use_shared_memory:
 
@@ -398,9 +411,9 @@ def _worker_loop(
                         else b.get_tensor()
                         for b in batch
                     ]
-                    out_queue.put((idx, tensor_list, structure))
+                    out_queue.put((idx, tensor_list, structure, stamps))
                 else:
-                    out_queue.put((idx, batch, structure))
+                    out_queue.put((idx, batch, structure, stamps))
     except KeyboardInterrupt:
         # NOTE: Main process will raise KeyboardInterrupt anyways, ignore it in child process
         pass
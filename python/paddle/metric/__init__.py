@@ -17,6 +17,9 @@ from .metrics import Accuracy  # noqa: F401
 from .metrics import Precision  # noqa: F401
 from .metrics import Recall  # noqa: F401
 from .metrics import Auc  # noqa: F401
+from .metrics import TopkAccuracy  # noqa: F401
+from .metrics import ConfusionMatrix  # noqa: F401
+from .metrics import PrecisionRecallF1  # noqa: F401
 from .metrics import accuracy  # noqa: F401
 
 __all__ = [  # noqa
@@ -25,5 +28,8 @@ __all__ = [  # noqa
     'Precision',
     'Recall',
     'Auc',
+    'TopkAccuracy',
+    'ConfusionMatrix',
+    'PrecisionRecallF1',
     'accuracy',
 ]
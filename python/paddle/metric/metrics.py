@@ -31,6 +31,10 @@ def _is_numpy_(var):
     return isinstance(var, (np.ndarray, np.generic))
 
 
+def _is_tensor_(var):
+    return isinstance(var, (paddle.Tensor, paddle.fluid.core.eager.Tensor))
+
+
 class Metric(metaclass=abc.ABCMeta):
     r"""
     Base class for metric, encapsulates metric logic and APIs
@@ -602,7 +606,9 @@ class Auc(Metric):
     """
     The auc metric is for binary classification.
     Refer to https://en.wikipedia.org/wiki/Receiver_operating_characteristic#Area_under_the_curve.
-    Please notice that the auc metric is implemented with python, which may be a little bit slow.
+    The predictions given as Tensor in dynamic graph mode are binned on their
+    device without waiting for it, and the statistics of the ranks can be
+    summed with ``distributed_reduce`` before ``accumulate``.
 
     The `auc` function creates four local variables, `true_positives`,
     `true_negatives`, `false_positives` and `false_negatives` that are used to
@@ -689,6 +695,9 @@ class Auc(Metric):
         _num_pred_buckets = num_thresholds + 1
         self._stat_pos = np.zeros(_num_pred_buckets)
         self._stat_neg = np.zeros(_num_pred_buckets)
+        # the statistics of the Tensor inputs on their device, in the shape
+        # of (2, num_thresholds + 1) for the positives and the negatives
+        self._device_stat = None
         self._name = name
 
     def update(self, preds, labels):
@@ -696,31 +705,100 @@ class Auc(Metric):
         Update the auc curve with the given predictions and labels.
 
         Args:
-            preds (numpy.array): An numpy array in the shape of
-                (batch_size, 2), preds[i][j] denotes the probability of
+            preds (numpy.array|Tensor): An numpy array or Tensor in the shape
+                of (batch_size, 2), preds[i][j] denotes the probability of
                 classifying the instance i into the class j.
-            labels (numpy.array): an numpy array in the shape of
-                (batch_size, 1), labels[i] is either o or 1,
+            labels (numpy.array|Tensor): an numpy array or Tensor in the shape
+                of (batch_size, 1), labels[i] is either o or 1,
                 representing the label of the instance i.
         """
-        if isinstance(labels, (paddle.Tensor, paddle.fluid.core.eager.Tensor)):
+        is_tensor = (paddle.Tensor, paddle.fluid.core.eager.Tensor)
+        if (
+            isinstance(preds, is_tensor)
+            and isinstance(labels, is_tensor)
+            and in_dynamic_mode()
+        ):
+            self._update_tensor(preds, labels)
+            return
+
+        if isinstance(labels, is_tensor):
             labels = np.array(labels)
         elif not _is_numpy_(labels):
             raise ValueError("The 'labels' must be a numpy ndarray or Tensor.")
 
-        if isinstance(preds, (paddle.Tensor, paddle.fluid.core.eager.Tensor)):
+        if isinstance(preds, is_tensor):
             preds = np.array(preds)
         elif not _is_numpy_(preds):
             raise ValueError("The 'preds' must be a numpy ndarray or Tensor.")
 
-        for i, lbl in enumerate(labels):
-            value = preds[i, 1]
-            bin_idx = int(value * self._num_thresholds)
-            assert bin_idx <= self._num_thresholds
-            if lbl:
-                self._stat_pos[bin_idx] += 1.0
-            else:
-                self._stat_neg[bin_idx] += 1.0
+        bins = (preds[:, 1] * self._num_thresholds).astype('int64')
+        assert bins.size == 0 or bins.max() <= self._num_thresholds
+        pos = np.asarray(labels).reshape(-1) != 0
+        num_buckets = self._num_thresholds + 1
+        self._stat_pos += np.bincount(bins[pos], minlength=num_buckets)
+        self._stat_neg += np.bincount(bins[~pos], minlength=num_buckets)
+
+    def _update_tensor(self, preds, labels):
+        # bincount needs the max bin on host, scatter_nd_add does not
+        preds, labels = preds.detach(), labels.detach()
+        bins = paddle.cast(preds[:, 1] * self._num_thresholds, 'int64')
+        # scatter_nd_add does not check the indices, the predictions out of
+        # [0, 1] are counted in the first or the last bucket
+        bins = paddle.clip(bins, 0, self._num_thresholds)
+        neg = paddle.cast(paddle.reshape(labels, [-1]) == 0, 'int64')
+        if self._device_stat is None:
+            self._device_stat = paddle.zeros(
+                [2, self._num_thresholds + 1], dtype='int64'
+            )
+        self._device_stat = paddle.scatter_nd_add(
+            self._device_stat,
+            paddle.stack([neg, bins], axis=1),
+            paddle.ones_like(bins),
+        )
+
+    def _fold_device_stat(self):
+        if self._device_stat is not None:
+            stat = self._device_stat.numpy()
+            self._stat_pos += stat[0]
+            self._stat_neg += stat[1]
+            self._device_stat = None
+
+    def merge(self, other):
+        """
+        Add the statistics of another Auc metric with the same number of
+        thresholds, e.g. of another shard of the data, to this one.
+
+        Args:
+            other (Auc): The metric to merge.
+        """
+        if other._num_thresholds != self._num_thresholds:
+            raise ValueError(
+                "Can not merge Auc metrics with {} and {} thresholds.".format(
+                    self._num_thresholds, other._num_thresholds
+                )
+            )
+        self._fold_device_stat()
+        other._fold_device_stat()
+        self._stat_pos += other._stat_pos
+        self._stat_neg += other._stat_neg
+
+    def distributed_reduce(self, group=None):
+        """
+        Sum the statistics of all the ranks of ``group`` into this metric on
+        every rank with one all-reduce, so that ``accumulate`` returns the
+        auc of all the data. It should be called once, after the updates of
+        the epoch.
+
+        Args:
+            group (Group, optional): The communication group. Default: None,
+                the global group.
+        """
+        self._fold_device_stat()
+        stat = paddle.to_tensor(np.stack([self._stat_pos, self._stat_neg]))
+        paddle.distributed.all_reduce(stat, group=group)
+        stat = stat.numpy()
+        self._stat_pos = stat[0]
+        self._stat_neg = stat[1]
 
     @staticmethod
     def trapezoid_area(x1, x2, y1, y2):
@@ -733,21 +811,21 @@ class Auc(Metric):
         Return:
             float: the area under auc curve
         """
-        tot_pos = 0.0
-        tot_neg = 0.0
-        auc = 0.0
-
-        idx = self._num_thresholds
-        while idx >= 0:
-            tot_pos_prev = tot_pos
-            tot_neg_prev = tot_neg
-            tot_pos += self._stat_pos[idx]
-            tot_neg += self._stat_neg[idx]
-            auc += self.trapezoid_area(
-                tot_neg, tot_neg_prev, tot_pos, tot_pos_prev
+        self._fold_device_stat()
+        # the totals above every threshold, from the highest one
+        tot_pos = np.cumsum(self._stat_pos[::-1])
+        tot_neg = np.cumsum(self._stat_neg[::-1])
+        tot_pos_prev = np.concatenate([[0.0], tot_pos[:-1]])
+        tot_neg_prev = np.concatenate([[0.0], tot_neg[:-1]])
+        auc = float(
+            np.sum(
+                self.trapezoid_area(
+                    tot_neg, tot_neg_prev, tot_pos, tot_pos_prev
+                )
             )
-            idx -= 1
+        )
 
+        tot_pos, tot_neg = float(tot_pos[-1]), float(tot_neg[-1])
         return (
             auc / tot_pos / tot_neg if tot_pos > 0.0 and tot_neg > 0.0 else 0.0
         )
@@ -759,6 +837,304 @@ class Auc(Metric):
         _num_pred_buckets = self._num_thresholds + 1
         self._stat_pos = np.zeros(_num_pred_buckets)
         self._stat_neg = np.zeros(_num_pred_buckets)
+        self._device_stat = None
+
+    def name(self):
+        """
+        Returns metric name
+        """
+        return self._name
+
+
+def _class_label(label):
+    # the class ids of the labels in the shape of [batch_size, d0, ..., 1],
+    # or [batch_size, d0, ..., num_classes] in one hot representation
+    if (len(label.shape) == 1) or (
+        len(label.shape) == 2 and label.shape[-1] == 1
+    ):
+        return paddle.reshape(label, (-1, 1))
+    if label.shape[-1] != 1:
+        return paddle.argmax(label, axis=-1, keepdim=True)
+    return label
+
+
+class _StreamingMetric(Metric):
+    """
+    Base class of the metrics whose state is a small int64 array of counts.
+    The counts of the Tensor inputs in dynamic graph mode are added up on the
+    device of the inputs, and only copied to host by ``accumulate``, so that
+    ``update`` does not wait for the device. The counts of the numpy inputs,
+    e.g. fetched in static graph mode, are added up on host.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._state = None
+
+    @abc.abstractmethod
+    def _state_size(self):
+        """
+        Return the number of the counts of the state.
+        """
+        raise NotImplementedError(
+            "function '_state_size' not implemented in {}.".format(
+                self.__class__.__name__
+            )
+        )
+
+    def _state_tensor(self):
+        if self._state is None:
+            return paddle.zeros([self._state_size()], dtype='int64')
+        if isinstance(self._state, np.ndarray):
+            return paddle.to_tensor(self._state)
+        return self._state
+
+    def _add_state(self, counts):
+        if _is_tensor_(counts):
+            self._state = paddle.add(self._state_tensor(), counts)
+        elif self._state is None or isinstance(self._state, np.ndarray):
+            self._state = self._state_numpy() + counts
+        else:
+            self._state = paddle.add(self._state, paddle.to_tensor(counts))
+
+    def _state_numpy(self):
+        if self._state is None:
+            return np.zeros([self._state_size()], dtype='int64')
+        return np.array(self._state)
+
+    def distributed_reduce(self, group=None):
+        """
+        Sum the state of all the ranks of ``group`` into this metric on every
+        rank with one all-reduce, so that ``accumulate`` returns the metric of
+        all the data. It should be called once, after the updates of the
+        epoch.
+
+        Args:
+            group (Group, optional): The communication group. Default: None,
+                the global group.
+        """
+        state = self._state_tensor()
+        paddle.distributed.all_reduce(state, group=group)
+        self._state = state
+
+    def reset(self):
+        """
+        Resets all of the metric state.
+        """
+        self._state = None
+
+
+class TopkAccuracy(_StreamingMetric):
+    """
+    Encapsulates top-k accuracy metric logic like :code:`Accuracy`, while
+    the counts of the correct predictions are kept on device.
+
+    Args:
+        topk (list[int]|tuple[int]): Number of top elements to look at
+            for computing accuracy. Default is (1,).
+        name (str, optional): String name of the metric instance. Default
+            is `acc`.
+
+    Examples:
+        .. code-block:: python
+
+            >>> import paddle
+
+            >>> x = paddle.to_tensor([
+            ...     [0.1, 0.2, 0.3, 0.4],
+            ...     [0.1, 0.4, 0.3, 0.2],
+            ...     [0.1, 0.2, 0.4, 0.3],
+            ...     [0.1, 0.2, 0.3, 0.4]])
+            >>> y = paddle.to_tensor([[0], [1], [2], [3]])
+
+            >>> m = paddle.metric.TopkAccuracy(topk=(1, 2))
+            >>> m.update(m.compute(x, y))
+            >>> res = m.accumulate()
+            >>> print(res)
+            [0.75, 1.0]
+    """
+
+    def __init__(self, topk=(1,), name=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.topk = topk
+        self.maxk = max(topk)
+        name = name or 'acc'
+        if self.maxk != 1:
+            self._name = [f'{name}_top{k}' for k in self.topk]
+        else:
+            self._name = [name]
+
+    def _state_size(self):
+        # the correct counts of every k and the number of samples
+        return len(self.topk) + 1
+
+    def compute(self, pred, label, *args):
+        """
+        Compute whether the label is in the top-k predictions for every k.
+
+        Args:
+            pred (Tensor): The predicted value is a Tensor with dtype
+                float32 or float64. Shape is [batch_size, d0, ..., dN].
+            label (Tensor): The ground truth value is Tensor with dtype
+                int64. Shape is [batch_size, d0, ..., 1], or
+                [batch_size, d0, ..., num_classes] in one hot representation.
+
+        Return:
+            Tensor: Correct mask of dtype int64 in the shape of
+            [batch_size, d0, ..., len(topk)].
+        """
+        _, indices = paddle.topk(pred, self.maxk)
+        correct = paddle.cast(indices == _class_label(label), 'int64')
+        correct = paddle.cumsum(correct, axis=-1)
+        return paddle.concat([correct[..., k - 1 : k] for k in self.topk], -1)
+
+    def update(self, correct, *args):
+        """
+        Add the correct counts of the mask computed by ``compute``. A Tensor
+        mask is counted on its device in dynamic graph mode.
+
+        Args:
+            correct (Tensor|numpy.ndarray): Correct mask in the shape of
+                [batch_size, d0, ..., len(topk)].
+        """
+        if _is_tensor_(correct) and in_dynamic_mode():
+            correct = paddle.reshape(
+                paddle.cast(correct.detach(), 'int64'), [-1, len(self.topk)]
+            )
+            counts = paddle.concat(
+                [
+                    paddle.sum(correct, axis=0),
+                    paddle.full([1], correct.shape[0], dtype='int64'),
+                ]
+            )
+        else:
+            correct = np.array(correct).reshape(-1, len(self.topk))
+            counts = np.append(correct.sum(axis=0), len(correct))
+        self._add_state(counts)
+
+    def accumulate(self):
+        """
+        Computes and returns the accumulated metric.
+        """
+        state = self._state_numpy()
+        count = int(state[-1])
+        res = [float(t) / count if count > 0 else 0.0 for t in state[:-1]]
+        return res[0] if len(self.topk) == 1 else res
+
+    def name(self):
+        """
+        Return name of metric instance.
+        """
+        return self._name
+
+
+class ConfusionMatrix(_StreamingMetric):
+    """
+    The confusion matrix of multi-class classification, whose counts are
+    kept on device. The element [i, j] of the matrix is the number of the
+    instances of the class i predicted as the class j.
+
+    Args:
+        num_classes (int): The number of the classes.
+        name (str, optional): String name of the metric instance. Default
+            is `confusion_matrix`.
+
+    Examples:
+        .. code-block:: python
+
+            >>> import paddle
+
+            >>> x = paddle.to_tensor([
+            ...     [0.1, 0.2, 0.7],
+            ...     [0.6, 0.3, 0.1],
+            ...     [0.2, 0.5, 0.3],
+            ...     [0.1, 0.1, 0.8]])
+            >>> y = paddle.to_tensor([[2], [0], [2], [1]])
+
+            >>> m = paddle.metric.ConfusionMatrix(num_classes=3)
+            >>> m.update(m.compute(x, y))
+            >>> print(m.accumulate())
+            [[1 0 0]
+             [0 0 1]
+             [0 1 1]]
+    """
+
+    def __init__(self, num_classes, name='confusion_matrix', *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if num_classes < 1:
+            raise ValueError(
+                f"num_classes should be positive, but got {num_classes}."
+            )
+        self.num_classes = num_classes
+        self._name = name
+
+    def _state_size(self):
+        return self.num_classes * self.num_classes
+
+    def compute(self, pred, label, *args):
+        """
+        Compute the index of every instance in the flattened confusion matrix.
+
+        Args:
+            pred (Tensor): The predicted scores of the classes in the shape of
+                [batch_size, d0, ..., num_classes].
+            label (Tensor): The ground truth value is Tensor with dtype
+                int64. Shape is [batch_size, d0, ..., 1], or
+                [batch_size, d0, ..., num_classes] in one hot representation.
+
+        Return:
+            Tensor: The indices of dtype int64 in the shape of [N, 1], where N
+            is the number of the instances.
+        """
+        pred = paddle.reshape(paddle.argmax(pred, axis=-1), (-1, 1))
+        label = paddle.reshape(_class_label(label), (-1, 1))
+        return paddle.cast(label, 'int64') * self.num_classes + pred
+
+    def update(self, indices, *args):
+        """
+        Count the indices computed by ``compute``. Tensor indices are counted
+        on their device in dynamic graph mode, where the indices out of the
+        matrix, e.g. of the labels of ignore_index, are not counted. Otherwise
+        they raise ValueError.
+
+        Args:
+            indices (Tensor|numpy.ndarray): The indices in the flattened
+                confusion matrix.
+        """
+        if _is_tensor_(indices) and in_dynamic_mode():
+            # bincount needs the max index on host, scatter_nd_add does not
+            size = self._state_size()
+            indices = paddle.reshape(
+                paddle.cast(indices.detach(), 'int64'), [-1, 1]
+            )
+            # scatter_nd_add does not check the indices, the ones out of the
+            # matrix are moved into it and added by 0
+            valid = paddle.logical_and(indices >= 0, indices < size)
+            self._state = paddle.scatter_nd_add(
+                self._state_tensor(),
+                paddle.clip(indices, 0, size - 1),
+                paddle.cast(paddle.reshape(valid, [-1]), 'int64'),
+            )
+            return
+        indices = np.array(indices).reshape(-1)
+        size = self._state_size()
+        if indices.size and (indices.min() < 0 or indices.max() >= size):
+            raise ValueError(
+                "The labels and the predictions should be in [0, {}).".format(
+                    self.num_classes
+                )
+            )
+        self._add_state(np.bincount(indices, minlength=size))
+
+    def accumulate(self):
+        """
+        Return the confusion matrix.
+
+        Return:
+            numpy.ndarray: The confusion matrix in the shape of
+            [num_classes, num_classes].
+        """
+        return self._state_numpy().reshape(self.num_classes, self.num_classes)
 
     def name(self):
         """
@@ -767,6 +1143,82 @@ class Auc(Metric):
         return self._name
 
 
+class PrecisionRecallF1(ConfusionMatrix):
+    """
+    The precision, recall and F1 score of multi-class classification,
+    computed from the confusion matrix kept on device.
+
+    Args:
+        num_classes (int): The number of the classes.
+        average (str, optional): 'macro' to average the scores of the
+            classes, or 'micro' to compute them from the counts of all the
+            classes. Default is 'macro'.
+        name (str, optional): The prefix of the names of the scores. Default
+            is None, the names are `precision`, `recall` and `f1`.
+
+    Examples:
+        .. code-block:: python
+
+            >>> import paddle
+
+            >>> x = paddle.to_tensor([
+            ...     [0.1, 0.2, 0.7],
+            ...     [0.6, 0.3, 0.1],
+            ...     [0.2, 0.5, 0.3],
+            ...     [0.1, 0.1, 0.8]])
+            >>> y = paddle.to_tensor([[2], [0], [2], [1]])
+
+            >>> m = paddle.metric.PrecisionRecallF1(num_classes=3)
+            >>> m.update(m.compute(x, y))
+            >>> precision, recall, f1 = m.accumulate()
+    """
+
+    def __init__(
+        self, num_classes, average='macro', name=None, *args, **kwargs
+    ):
+        if average not in ('macro', 'micro'):
+            raise ValueError(
+                f"average should be 'macro' or 'micro', but got {average}."
+            )
+        names = ['precision', 'recall', 'f1']
+        if name is not None:
+            names = [f'{name}_{n}' for n in names]
+        super().__init__(num_classes, names, *args, **kwargs)
+        self.average = average
+
+    def accumulate(self):
+        """
+        Return the precision, recall and F1 score.
+
+        Return:
+            list[float]: The precision, recall and F1 score.
+        """
+        matrix = super().accumulate().astype('float64')
+        tp = np.diag(matrix)
+        num_pred = matrix.sum(axis=0)
+        num_true = matrix.sum(axis=1)
+        if self.average == 'micro':
+            tp, num_pred, num_true = tp.sum(), num_pred.sum(), num_true.sum()
+        # the scores of the classes without instances are 0
+        precision = np.divide(
+            tp, num_pred, out=np.zeros_like(tp), where=num_pred > 0
+        )
+        recall = np.divide(
+            tp, num_true, out=np.zeros_like(tp), where=num_true > 0
+        )
+        f1 = np.divide(
+            2 * precision * recall,
+            precision + recall,
+            out=np.zeros_like(tp),
+            where=precision + recall > 0,
+        )
+        return [
+            float(np.mean(precision)),
+            float(np.mean(recall)),
+            float(np.mean(f1)),
+        ]
+
+
 def accuracy(input, label, k=1, correct=None, total=None, name=None):
     """
     accuracy layer.
@@ -19,6 +19,9 @@ from .profiler import SummaryView
 from .profiler import TracerEventType
 from .utils import RecordEvent, load_profiler_result
 from .profiler_statistic import SortedKeys
+from .step_recorder import StepRecorder
+from .layer_profiler import LayerProfiler
+from .chrome_tracing import export_chrome_tracing_stream, merge_chrome_traces
 
 __all__ = [
     'ProfilerState',
@@ -31,4 +34,8 @@ __all__ = [
     'load_profiler_result',
     'SortedKeys',
     'SummaryView',
+    'StepRecorder',
+    'LayerProfiler',
+    'export_chrome_tracing_stream',
+    'merge_chrome_traces',
 ]
@@ -0,0 +1,614 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# The chrome tracing files written here have one event per line between a
+# header line and a footer line, so that they are written and merged event by
+# event without holding the whole trace in memory, and are still valid json
+# opened by chrome://tracing and Perfetto.
+
+import argparse
+import collections
+import gzip
+import json
+import os
+import socket
+from typing import Callable, List, Optional
+from warnings import warn
+
+import numpy as np
+
+from paddle.fluid.core import TracerEventType
+
+_TRACE_INFO = 'paddle_trace_info'
+_PYTHON_EVENT_TYPES = [
+    TracerEventType.ProfileStep,
+    TracerEventType.Forward,
+    TracerEventType.Backward,
+    TracerEventType.Dataloader,
+    TracerEventType.Optimization,
+    TracerEventType.PythonOp,
+    TracerEventType.PythonUserDefined,
+]
+
+
+def _open_trace(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class ChromeTraceWriter:
+    r"""
+    Write chrome tracing events to files incrementally, optionally gzip
+    compressed and split into the files of time windows.
+
+    Args:
+        prefix(str): The path of the files without the suffix, the files are
+            named ``{prefix}_chunk{index}.paddle_trace.json[.gz]`` if
+            ``chunk_ms`` is set, else ``{prefix}.paddle_trace.json[.gz]``.
+        compress(bool, optional): Whether to gzip the files. Default: True.
+        chunk_ms(float, optional): The length of the time window of every
+            file in milliseconds, None to write a single file. Default: None.
+        origin_us(float, optional): The start of the first time window in
+            microseconds. Default: 0.
+        info(dict, optional): The information written into the header of
+            every file, used to merge the files. Default: None.
+        max_open_files(int, optional): The maximum number of files kept open,
+            the least recently written one is closed and reopened to append
+            when more are written at the same time. Default: 64.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        compress: bool = True,
+        chunk_ms: Optional[float] = None,
+        origin_us: float = 0,
+        info: Optional[dict] = None,
+        max_open_files: int = 64,
+    ):
+        if chunk_ms is not None and chunk_ms <= 0:
+            raise ValueError(
+                f"chunk_ms should be positive, but got {chunk_ms}."
+            )
+        if max_open_files < 1:
+            raise ValueError(
+                f"max_open_files should be positive, but got {max_open_files}."
+            )
+        self.prefix = prefix
+        self.compress = compress
+        self.chunk_us = None if chunk_ms is None else chunk_ms * 1000.0
+        self.origin_us = origin_us
+        self.info = dict(info or {})
+        self.max_open_files = max_open_files
+        self.paths = []
+        # index -> [file, path, whether no event is written, number of the
+        # metadata events written], in the order of the last writing
+        self._files = collections.OrderedDict()
+        # the entries of the files closed to bound the open files
+        self._closed = {}
+        self._metadata = []
+
+    def _open(self, index):
+        if index in self._closed:
+            # append to the file, a gzip file gets a new member
+            entry = self._closed.pop(index)
+            entry[0] = _open_trace(entry[1], 'a')
+        else:
+            path = self.prefix
+            info = dict(self.info)
+            if self.chunk_us is not None:
+                path += f'_chunk{index}'
+                start = self.origin_us + index * self.chunk_us
+                info['window_us'] = [start, start + self.chunk_us]
+            path += '.paddle_trace.json' + ('.gz' if self.compress else '')
+            f = _open_trace(path, 'w')
+            f.write(
+                '{{"{}": {}, "displayTimeUnit": "ms", "traceEvents": ['.format(
+                    _TRACE_INFO, json.dumps(info)
+                )
+            )
+            entry = [f, path, True, 0]
+            self.paths.append(path)
+        while len(self._files) >= self.max_open_files:
+            closed_index, closed_entry = self._files.popitem(last=False)
+            closed_entry[0].close()
+            closed_entry[0] = None
+            self._closed[closed_index] = closed_entry
+        self._files[index] = entry
+        # every file opens on its own, so it has all the metadata events
+        for event in self._metadata[entry[3] :]:
+            self._write_line(index, event)
+        return index
+
+    def _write_line(self, index, event):
+        entry = self._files[index]
+        entry[0].write(('\n' if entry[2] else ',\n') + json.dumps(event))
+        entry[2] = False
+        if event.get('ph') == 'M':
+            entry[3] += 1
+
+    def write(self, event: dict):
+        r"""
+        Write an event, the metadata events are written into every file.
+        """
+        if event.get('ph') == 'M':
+            self._metadata.append(event)
+            for index in self._files:
+                self._write_line(index, event)
+            return
+        index = 0
+        if self.chunk_us is not None:
+            index = max(
+                int(
+                    (event.get('ts', self.origin_us) - self.origin_us)
+                    // self.chunk_us
+                ),
+                0,
+            )
+        if index not in self._files:
+            self._open(index)
+        else:
+            self._files.move_to_end(index)
+        self._write_line(index, event)
+
+    def close(self) -> List[str]:
+        r"""
+        Finish the files.
+
+        Returns:
+            list[str]: The paths of the files written.
+        """
+        if not self._files and not self._closed:
+            self._open(0)
+        for f, *_ in self._files.values():
+            f.write('\n]}\n')
+            f.close()
+        self._files.clear()
+        for index in list(self._closed):
+            # reopened one by one with the metadata events written since
+            self._open(index)
+            f = self._files.pop(index)[0]
+            f.write('\n]}\n')
+            f.close()
+        return self.paths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_chrome_trace(path: str):
+    r"""
+    Read the information in the header of a file written by
+    ``ChromeTraceWriter``, and the generator of its events.
+
+    Args:
+        path(str): The path of the file.
+
+    Returns:
+        tuple: The information of the file, and the generator of its events.
+    """
+    with _open_trace(path, 'r') as f:
+        header = f.readline()
+    info = json.loads(header[: header.rindex('[')] + '[]}')[_TRACE_INFO]
+
+    def events():
+        with _open_trace(path, 'r') as f:
+            f.readline()
+            for line in f:
+                line = line.rstrip().rstrip(',')
+                if line and line != ']}':
+                    yield json.loads(line)
+
+    return info, events()
+
+
+def _node_events(host_node, tid):
+    # the events of a host node, its runtime, device and memory nodes
+    event = {
+        'name': host_node.name,
+        'pid': host_node.process_id,
+        'tid': tid,
+        'ts': host_node.start_ns / 1000.0,
+        'dur': (host_node.end_ns - host_node.start_ns) / 1000.0,
+        'ph': 'X',
+        'cat': host_node.type.name,
+    }
+    if getattr(host_node, 'input_shapes', None):
+        event['args'] = {
+            'input_shapes': dict(host_node.input_shapes),
+            'input_dtypes': dict(host_node.dtypes),
+            'callstack': host_node.callstack,
+        }
+    yield event
+    for runtime_node in host_node.runtime_node:
+        correlation_id = runtime_node.correlation_id
+        yield {
+            'name': runtime_node.name,
+            'pid': runtime_node.process_id,
+            'tid': f'{runtime_node.thread_id}(C++)',
+            'ts': runtime_node.start_ns / 1000.0,
+            'dur': (runtime_node.end_ns - runtime_node.start_ns) / 1000.0,
+            'ph': 'X',
+            'cat': runtime_node.type.name,
+            'args': {'correlation id': correlation_id},
+        }
+        if runtime_node.device_node:
+            yield {
+                'name': 'launch',
+                'id': correlation_id,
+                'pid': runtime_node.process_id,
+                'tid': f'{runtime_node.thread_id}(C++)',
+                'ts': runtime_node.start_ns / 1000.0,
+                'ph': 's',
+                'cat': 'async',
+            }
+        for device_node in runtime_node.device_node:
+            yield {
+                'name': 'launch',
+                'id': correlation_id,
+                'pid': device_node.device_id,
+                'tid': device_node.stream_id,
+                'ts': device_node.start_ns / 1000.0,
+                'ph': 'f',
+                'cat': 'async',
+                'bp': 'e',
+            }
+            yield _device_event(device_node)
+    for device_node in host_node.device_node:
+        yield _device_event(device_node)
+    for mem_node in host_node.mem_node:
+        yield {
+            'name': '[memory]',
+            'pid': mem_node.process_id,
+            'tid': f'{mem_node.thread_id}(C++)',
+            'ts': mem_node.timestamp_ns / 1000.0,
+            'ph': 'i',
+            'cat': mem_node.type.name,
+            'args': {
+                'place': mem_node.place,
+                'addr': str(mem_node.addr),
+                'increase_bytes': mem_node.increase_bytes,
+                'current_allocated': mem_node.current_allocated,
+                'current_reserved': mem_node.current_reserved,
+                'peak_allocated': mem_node.peak_allocated,
+                'peak_reserved': mem_node.peak_reserved,
+            },
+        }
+
+
+def _device_event(device_node):
+    args = {
+        'device': device_node.device_id,
+        'context': device_node.context_id,
+        'stream': device_node.stream_id,
+        'correlation id': device_node.correlation_id,
+    }
+    if device_node.type == TracerEventType.Kernel:
+        args['grid'] = [
+            device_node.grid_x,
+            device_node.grid_y,
+            device_node.grid_z,
+        ]
+        args['block'] = [
+            device_node.block_x,
+            device_node.block_y,
+            device_node.block_z,
+        ]
+    return {
+        'name': device_node.name,
+        'pid': device_node.device_id,
+        'tid': device_node.stream_id,
+        'ts': device_node.start_ns / 1000.0,
+        'dur': (device_node.end_ns - device_node.start_ns) / 1000.0,
+        'ph': 'X',
+        'cat': device_node.type.name,
+        'args': args,
+    }
+
+
+def trace_events(nodetrees):
+    r"""
+    Generate the chrome tracing events of the profiler result trees one by
+    one, the metadata events naming the processes and threads first.
+
+    Args:
+        nodetrees(dict): The profiler result trees by thread id, returned by
+            ``get_data`` of the profiler result.
+    """
+    devices = set()
+    for thread_id, root_node in nodetrees.items():
+        pid = root_node.process_id
+        for suffix in ['Python', 'C++']:
+            tid = f'{thread_id}({suffix})'
+            yield {
+                'name': 'process_name',
+                'pid': pid,
+                'tid': tid,
+                'ph': 'M',
+                'args': {'name': f'Process {pid} (CPU)'},
+            }
+            yield {
+                'name': 'thread_name',
+                'pid': pid,
+                'tid': tid,
+                'ph': 'M',
+                'args': {'name': f'thread {thread_id}({suffix})'},
+            }
+    for root_node in nodetrees.values():
+        stack = list(reversed(root_node.children_node))
+        while stack:
+            node = stack.pop()
+            suffix = 'Python' if node.type in _PYTHON_EVENT_TYPES else 'C++'
+            for event in _node_events(node, f'{node.thread_id}({suffix})'):
+                if event['ph'] == 'X' and event['pid'] not in devices:
+                    if 'device' in event.get('args', {}):
+                        devices.add(event['pid'])
+                        yield {
+                            'name': 'process_name',
+                            'pid': event['pid'],
+                            'tid': event['tid'],
+                            'ph': 'M',
+                            'args': {'name': 'Device {}'.format(event['pid'])},
+                        }
+                yield event
+            stack.extend(reversed(node.children_node))
+
+
+def _step_starts(nodetrees):
+    # the start time in microseconds of the profile steps at the top level
+    starts = {}
+    for root_node in nodetrees.values():
+        for node in root_node.children_node:
+            if node.type == TracerEventType.ProfileStep:
+                starts[node.name] = node.start_ns / 1000.0
+    return starts
+
+
+def _start_us(nodetrees):
+    starts = [
+        node.start_ns
+        for root_node in nodetrees.values()
+        for node in root_node.children_node
+    ]
+    return min(starts) / 1000.0 if starts else 0.0
+
+
+def export_chrome_tracing_stream(
+    dir_name: str,
+    worker_name: Optional[str] = None,
+    compress: bool = True,
+    chunk_ms: Optional[float] = None,
+    rank: Optional[int] = None,
+) -> Callable:
+    r"""
+    Return a callable writing the tracing data to chrome tracing files event
+    by event, instead of the single json file of ``export_chrome_tracing``,
+    so that the traces of long runs are written with little memory and can
+    be opened piece by piece. Every call writes the files of one span of
+    the scheduler, named by the worker, the rank, the span and the chunk, and
+    the files of all the ranks can be merged into one timeline by
+    ``merge_chrome_traces``.
+
+    Args:
+        dir_name(str): Directory to save profiling data.
+        worker_name(str, optional): Prefix of the file name saved, default is
+            `[hostname]_[pid]`.
+        compress(bool, optional): Whether to gzip the files. Default: True.
+        chunk_ms(float, optional): Split the trace into the files of time
+            windows of this length in milliseconds, None to write a file for
+            every span. Default: None.
+        rank(int, optional): The rank of the worker written into the files,
+            default is the environment variable ``PADDLE_TRAINER_ID`` or 0.
+
+    Returns:
+        A callable, which takes a Profiler object as parameter and writes its
+        tracing data.
+
+    Examples:
+        The return value can be used as parameter ``on_trace_ready`` in :ref:`Profiler <api_paddle_profiler_Profiler>` .
+
+        .. code-block:: python
+
+            # required: gpu
+            import paddle.profiler as profiler
+            with profiler.Profiler(
+                    targets=[profiler.ProfilerTarget.CPU, profiler.ProfilerTarget.GPU],
+                    scheduler = (3, 10),
+                    on_trace_ready=profiler.export_chrome_tracing_stream('./log', chunk_ms=1000)) as p:
+                for iter in range(10):
+                    #train()
+                    p.step()
+    """
+    if not os.path.exists(dir_name):
+        try:
+            os.makedirs(dir_name, exist_ok=True)
+        except Exception:
+            raise RuntimeError(
+                "Can not create directory '{}' for saving profiling results.".format(
+                    dir_name
+                )
+            )
+    if rank is None:
+        rank = int(os.getenv('PADDLE_TRAINER_ID', '0'))
+    span = 0
+
+    def handle_fn(prof):
+        nonlocal worker_name, span
+        if not worker_name:
+            worker_name = "host_{}pid_{}".format(
+                socket.gethostname(), str(os.getpid())
+            )
+        if not prof.profiler_result:
+            return
+        nodetrees = prof.profiler_result.get_data()
+        info = {
+            'rank': rank,
+            'worker': worker_name,
+            'span': span,
+            'step_starts': _step_starts(nodetrees),
+        }
+        prefix = os.path.join(dir_name, f'{worker_name}_rank{rank}_span{span}')
+        with ChromeTraceWriter(
+            prefix, compress, chunk_ms, _start_us(nodetrees), info
+        ) as writer:
+            for event in trace_events(nodetrees):
+                writer.write(event)
+        span += 1
+
+    return handle_fn
+
+
+def _clock_offsets(infos):
+    # align the clocks of the ranks to the lowest one, by the median of the
+    # differences of the start time of their common profile steps
+    step_starts = {}
+    for info in infos:
+        step_starts.setdefault(info.get('rank', 0), {}).update(
+            info.get('step_starts', {})
+        )
+    ranks = sorted(step_starts)
+    reference = step_starts[ranks[0]]
+    offsets = {}
+    for rank in ranks:
+        steps = sorted(set(reference) & set(step_starts[rank]))
+        if not steps:
+            warn(
+                "Rank {} has no profile step in common with rank {}, its "
+                "clock is not aligned.".format(rank, ranks[0])
+            )
+            offsets[rank] = 0.0
+            continue
+        offsets[rank] = float(
+            np.median([reference[s] - step_starts[rank][s] for s in steps])
+        )
+    return offsets
+
+
+def merge_chrome_traces(
+    paths: List[str],
+    output: str,
+    align: bool = True,
+    chunk_ms: Optional[float] = None,
+) -> List[str]:
+    r"""
+    Merge the chrome tracing files written by ``export_chrome_tracing_stream``
+    of several ranks into one timeline, event by event. The processes of
+    every rank are renamed with the rank, and the clocks of the ranks are
+    aligned on the start time of their common profile steps, which are
+    synchronized by the collective communication in data parallel training.
+
+    Args:
+        paths(list[str]): The paths of the files to merge.
+        output(str): The path of the merged file, it is gzip compressed if
+            it ends with ``.gz``.
+        align(bool, optional): Whether to align the clocks of the ranks.
+            Default: True.
+        chunk_ms(float, optional): Split the merged trace into the files of
+            time windows of this length in milliseconds. Default: None.
+
+    Returns:
+        list[str]: The paths of the merged files.
+
+    Examples:
+        .. code-block:: python
+
+            >>> # doctest: +SKIP('the traces of the ranks are needed')
+            >>> import glob
+            >>> import paddle.profiler as profiler
+            >>> profiler.merge_chrome_traces(
+            ...     glob.glob('./log/*.paddle_trace.json.gz'), './merged.json.gz')
+    """
+    inputs = [read_chrome_trace(path) for path in paths]
+    if not inputs:
+        raise ValueError("No trace file to merge.")
+    infos = [info for info, _ in inputs]
+    offsets = _clock_offsets(infos) if align else {}
+    ranks = sorted({info.get('rank', 0) for info in infos})
+
+    compress = output.endswith('.gz')
+    prefix = output[: -len('.gz')] if compress else output
+    for suffix in ['.paddle_trace.json', '.json']:
+        if prefix.endswith(suffix):
+            prefix = prefix[: -len(suffix)]
+            break
+    origin_us = min(
+        (
+            info['window_us'][0] + offsets.get(info.get('rank', 0), 0.0)
+            for info in infos
+            if 'window_us' in info
+        ),
+        default=0.0,
+    )
+    writer = ChromeTraceWriter(
+        prefix,
+        compress,
+        chunk_ms,
+        origin_us,
+        {'ranks': ranks, 'clock_offsets_us': offsets},
+    )
+    # the metadata events repeated in the files of a rank are written once
+    seen_metadata = set()
+    with writer:
+        for info, events in inputs:
+            rank = info.get('rank', 0)
+            offset = offsets.get(rank, 0.0)
+            for event in events:
+                # the pids of the ranks on different hosts may collide, and
+                # the pids are less than 2**22 on linux
+                event['pid'] = (rank << 22) + event.get('pid', 0)
+                if event.get('ph') == 'M':
+                    key = json.dumps(event, sort_keys=True)
+                    if key in seen_metadata:
+                        continue
+                    seen_metadata.add(key)
+                    if event.get('name') == 'process_name':
+                        event['args'] = {
+                            'name': 'Rank {}: {}'.format(
+                                rank, event['args']['name']
+                            )
+                        }
+                elif 'ts' in event:
+                    event['ts'] += offset
+                writer.write(event)
+    if chunk_ms is None and writer.paths[0] != output:
+        os.replace(writer.paths[0], output)
+        writer.paths = [output]
+    return writer.paths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge the chrome tracing files of several ranks."
+    )
+    parser.add_argument('output', help="the path of the merged file")
+    parser.add_argument('paths', nargs='+', help="the files to merge")
+    parser.add_argument(
+        '--no_align', action='store_true', help="not align the clocks"
+    )
+    parser.add_argument(
+        '--chunk_ms', type=float, default=None, help="the time window"
+    )
+    args = parser.parse_args()
+    for path in merge_chrome_traces(
+        args.paths, args.output, not args.no_align, args.chunk_ms
+    ):
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import timeit
+from typing import Optional
+
+import paddle
+from paddle.fluid import core
+
+_SORTED_KEYS = [
+    'forward_time',
+    'backward_time',
+    'output_bytes',
+    'allocated_increase',
+    'peak_increase',
+]
+
+
+def _memory_stats(place):
+    # the allocated and the peak allocated bytes of the place
+    if isinstance(place, core.CPUPlace):
+        return (
+            core.host_memory_stat_current_value("Allocated", 0),
+            core.host_memory_stat_peak_value("Allocated", 0),
+        )
+    device_id = place.get_device_id()
+    return (
+        core.device_memory_stat_current_value("Allocated", device_id),
+        core.device_memory_stat_peak_value("Allocated", device_id),
+    )
+
+
+def _tensors(nest):
+    return [
+        t
+        for t in paddle.utils.flatten(nest)
+        if isinstance(t, (paddle.Tensor, core.eager.Tensor))
+    ]
+
+
+class _Call:
+    # a forward call of a layer, waiting for its backward
+    def __init__(self):
+        self.backward_start = None
+        self.backward_end = None
+        self.input_grads = False
+
+
+class _LayerStat:
+    def __init__(self, name, layer):
+        self.name = name
+        self.type = type(layer).__name__
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.forward_time = 0.0
+        self.backward_calls = 0
+        self.backward_time = 0.0
+        self.output_bytes = 0
+        self.allocated_increase = 0
+        self.peak_increase = 0
+        self._forward_starts = []
+        self._pending = []
+
+    def record(self):
+        return {
+            'name': self.name,
+            'type': self.type,
+            'calls': self.calls,
+            'forward_time': self.forward_time,
+            'backward_calls': self.backward_calls,
+            'backward_time': self.backward_time,
+            'output_bytes': self.output_bytes,
+            'allocated_increase': self.allocated_increase,
+            'peak_increase': self.peak_increase,
+        }
+
+
+class LayerProfiler:
+    r"""
+    A lightweight per-layer profiler working without the tracer. It adds the
+    forward pre and post hooks to every sublayer of ``layer``, and gradient
+    hooks to their inputs, outputs and parameters, to record for every layer
+    the wall time of its forward and backward, the bytes of its outputs, the
+    increase of the allocated memory over its forward, which is kept for the
+    backward, and the increase of the peak allocated memory.
+
+    The times of a layer include the times of its sublayers. The backward of
+    a call starts when the gradient of its first output is computed, and
+    ends when the gradients of all its inputs, or of its parameters if no
+    input requires gradient, are computed. The times are measured on host,
+    set ``synchronize`` to wait for the device in every hook to measure the
+    device time, which slows down the training.
+
+    Args:
+        layer (paddle.nn.Layer): The model to profile.
+        max_depth (int, optional): Only profile the sublayers up to this depth,
+            the depth of ``layer`` is 0. Default: None, all the sublayers.
+        synchronize (bool, optional): Whether to synchronize the device in
+            every hook. Default: False.
+
+    Examples:
+        .. code-block:: python
+
+            >>> import paddle
+            >>> import paddle.profiler as profiler
+
+            >>> model = paddle.nn.Sequential(
+            ...     paddle.nn.Linear(16, 32), paddle.nn.ReLU(), paddle.nn.Linear(32, 4))
+            >>> with profiler.LayerProfiler(model) as prof:
+            ...     for i in range(4):
+            ...         loss = model(paddle.randn([8, 16])).mean()
+            ...         loss.backward()
+            ...         prof.step()
+            >>> print(prof.summary(sorted_by='forward_time'))
+    """
+
+    def __init__(
+        self,
+        layer,
+        max_depth: Optional[int] = None,
+        synchronize: bool = False,
+    ):
+        self.layer = layer
+        self.max_depth = max_depth
+        self.synchronize = synchronize
+        self.num_steps = 0
+        self._stats = {}
+        self._hooks = []
+        self._running = False
+        for name, sublayer in layer.named_sublayers(include_self=True):
+            depth = 0 if not name else name.count('.') + 1
+            if max_depth is not None and depth > max_depth:
+                continue
+            self._stats[id(sublayer)] = (
+                sublayer,
+                _LayerStat(name or type(layer).__name__, sublayer),
+            )
+
+    def _now(self):
+        if self.synchronize:
+            paddle.device.synchronize()
+        return timeit.default_timer()
+
+    def start(self):
+        r"""
+        Add the hooks, it is also called by entering the context of the
+        profiler.
+        """
+        if self._running:
+            return
+        self._running = True
+        place = paddle.framework._current_expected_place()
+        param_stats = {}
+        for sublayer, stat in self._stats.values():
+            self._hooks.append(
+                sublayer.register_forward_pre_hook(
+                    self._make_pre_hook(stat, place)
+                )
+            )
+            self._hooks.append(
+                sublayer.register_forward_post_hook(
+                    self._make_post_hook(stat, place)
+                )
+            )
+            for param in sublayer.parameters():
+                if not param.stop_gradient:
+                    param_stats.setdefault(id(param), (param, []))[1].append(
+                        stat
+                    )
+        for param, stats in param_stats.values():
+            self._hooks.append(
+                param.register_hook(self._make_param_hook(stats))
+            )
+
+    def stop(self):
+        r"""
+        Remove the hooks, the records are kept until ``reset``.
+        """
+        if not self._running:
+            return
+        self._running = False
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+        self._finish_backward()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _make_pre_hook(self, stat, place):
+        def pre_hook(layer, inputs):
+            allocated, peak = _memory_stats(place)
+            stat._forward_starts.append((self._now(), allocated, peak))
+
+        return pre_hook
+
+    def _make_post_hook(self, stat, place):
+        def post_hook(layer, inputs, outputs):
+            start, allocated, peak = stat._forward_starts.pop()
+            stat.forward_time += self._now() - start
+            stat.calls += 1
+            allocated_after, peak_after = _memory_stats(place)
+            stat.allocated_increase += allocated_after - allocated
+            stat.peak_increase = max(stat.peak_increase, peak_after - peak)
+
+            call = _Call()
+            for t in _tensors(outputs):
+                stat.output_bytes += t._numel() * core.size_of_dtype(t.dtype)
+                if not t.stop_gradient:
+                    t.register_hook(self._make_output_grad_hook(call))
+            for t in _tensors(inputs):
+                if not t.stop_gradient:
+                    call.input_grads = True
+                    t.register_hook(self._make_input_grad_hook(call))
+            stat._pending.append(call)
+
+        return post_hook
+
+    def _make_output_grad_hook(self, call):
+        def hook(grad):
+            if call.backward_start is None:
+                call.backward_start = self._now()
+
+        return hook
+
+    def _make_input_grad_hook(self, call):
+        def hook(grad):
+            call.backward_end = self._now()
+
+        return hook
+
+    def _make_param_hook(self, stats):
+        def hook(grad):
+            now = None
+            for stat in stats:
+                for call in stat._pending:
+                    if call.backward_start is not None and not call.input_grads:
+                        now = now or self._now()
+                        call.backward_end = now
+
+        return hook
+
+    def _finish_backward(self):
+        for _, stat in self._stats.values():
+            for call in stat._pending:
+                if (
+                    call.backward_start is not None
+                    and call.backward_end is not None
+                ):
+                    stat.backward_calls += 1
+                    stat.backward_time += max(
+                        call.backward_end - call.backward_start, 0.0
+                    )
+            stat._pending = []
+
+    def step(self):
+        r"""
+        Finish a training step, the backward of the calls of this step should
+        be done.
+        """
+        self._finish_backward()
+        self.num_steps += 1
+
+    def reset(self):
+        r"""
+        Clear the records.
+        """
+        self.num_steps = 0
+        for _, stat in self._stats.values():
+            stat.reset()
+
+    def records(self):
+        r"""
+        Return the records of the layers in the order of ``named_sublayers``.
+
+        Returns:
+            list[dict]: The name, the type, the number of the forward and the
+            backward calls, the total forward and backward time in seconds,
+            the total bytes of the outputs, the total increase of the
+            allocated bytes over the forward, and the max increase of the
+            peak allocated bytes of every layer.
+        """
+        return [stat.record() for _, stat in self._stats.values()]
+
+    def summary(
+        self, sorted_by: str = 'forward_time', top: Optional[int] = None
+    ):
+        r"""
+        Return the table of the records averaged per step, the times in
+        milliseconds and the sizes in MB.
+
+        Args:
+            sorted_by (str, optional): The column to sort the layers by in
+                descending order, one of 'forward_time', 'backward_time',
+                'output_bytes', 'allocated_increase' and 'peak_increase', or
+                None to keep the order of the layers. Default: 'forward_time'.
+            top (int, optional): Only show the first layers. Default: None.
+
+        Returns:
+            str: The table.
+        """
+        if sorted_by is not None and sorted_by not in _SORTED_KEYS:
+            raise ValueError(
+                "sorted_by should be one of {} or None, but got {}.".format(
+                    _SORTED_KEYS, sorted_by
+                )
+            )
+        records = self.records()
+        if sorted_by is not None:
+            records.sort(key=lambda r: r[sorted_by], reverse=True)
+        if top is not None:
+            records = records[:top]
+
+        steps = max(self.num_steps, 1)
+        headers = [
+            'Layer',
+            'Type',
+            'Calls',
+            'Forward(ms)',
+            'Backward(ms)',
+            'Output(MB)',
+            'Allocated+(MB)',
+            'Peak+(MB)',
+        ]
+        rows = [
+            [
+                r['name'],
+                r['type'],
+                str(r['calls'] // steps),
+                '{:.3f}'.format(r['forward_time'] * 1000 / steps),
+                '{:.3f}'.format(r['backward_time'] * 1000 / steps),
+                '{:.3f}'.format(r['output_bytes'] / steps / 2**20),
+                '{:.3f}'.format(r['allocated_increase'] / steps / 2**20),
+                '{:.3f}'.format(r['peak_increase'] / 2**20),
+            ]
+            for r in records
+        ]
+        widths = [
+            max(len(row[i]) for row in rows + [headers])
+            for i in range(len(headers))
+        ]
+        lines = [
+            '  '.join(
+                h.ljust(w) if i < 2 else h.rjust(w)
+                for i, (h, w) in enumerate(zip(headers, widths))
+            )
+        ]
+        lines.append('-' * len(lines[0]))
+        for row in rows:
+            lines.append(
+                '  '.join(
+                    c.ljust(w) if i < 2 else c.rjust(w)
+                    for i, (c, w) in enumerate(zip(row, widths))
+                )
+            )
+        return '\n'.join(lines)
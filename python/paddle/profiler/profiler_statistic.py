@@ -15,13 +15,16 @@ import collections
 import re
 from enum import Enum
 
+import numpy as np
+
 from paddle.fluid.core import TracerEventType, TracerMemEventType
 from paddle.utils.flops import flops
 
 from .statistic_helper import (
     intersection_ranges,
     merge_ranges,
-    merge_self_ranges,
+    merge_ranges_array,
+    ranges_array_to_list,
     sum_ranges,
 )
 
@@ -45,6 +48,14 @@ _AllTracerEventType = [
 
 _CommunicationOpName = ['allreduce', 'broadcast', 'rpc']
 
+_ModelPerspectiveNames = {
+    TracerEventType.Forward: 'Forward',
+    TracerEventType.Backward: 'Backward',
+    TracerEventType.Optimization: 'Optimization',
+    TracerEventType.Dataloader: 'Dataloader',
+    TracerEventType.ProfileStep: 'ProfileStep',
+}
+
 
 class SortedKeys(Enum):
     r"""
@@ -335,6 +346,238 @@ def wrap_tree(nodetrees):
     return node_statistic_tree, newresults
 
 
+def flatten_tree(nodetrees):
+    '''
+    Flatten the profiler result trees into a NodeTable in a single traversal.
+    '''
+    return NodeTable(nodetrees)
+
+
+class NodeTable:
+    r'''
+    The nodes of the profiler result trees as columnar numpy arrays. The host
+    nodes of all the threads are in the order of ``traverse_tree``, a preorder
+    that visits the children from the last one, so that the summaries keep the
+    order of their items, and the subtree of the host node i is the range
+    [i, subtree_end[i]). The runtime, device and memory nodes refer to their
+    host node. The names, types, threads and places are stored as indices
+    into the lists of their distinct values.
+    The time ranges of the root nodes are not kept.
+    '''
+
+    def __init__(self, nodetrees):
+        names, types, threads = {}, {}, {}
+        places, mem_types = {}, {}
+        self.host_nodes = []
+        start, end, host_type, name, parent, depth, thread = (
+            [] for _ in range(7)
+        )
+        rt_start, rt_end, rt_type, rt_host = [], [], [], []
+        dev_start, dev_end, dev_type, dev_name = [], [], [], []
+        dev_host, dev_runtime, dev_device_id, dev_stream_id = [], [], [], []
+        mem_host, mem_type, mem_bytes, mem_place = [], [], [], []
+        mem_peak_allocated, mem_peak_reserved = [], []
+
+        def add_device(devicenode, host, runtime):
+            dev_start.append(devicenode.start_ns)
+            dev_end.append(devicenode.end_ns)
+            dev_type.append(types.setdefault(devicenode.type, len(types)))
+            dev_name.append(names.setdefault(devicenode.name, len(names)))
+            dev_host.append(host)
+            dev_runtime.append(runtime)
+            dev_device_id.append(devicenode.device_id)
+            dev_stream_id.append(devicenode.stream_id)
+
+        for rootnode in nodetrees.values():
+            stack = [(rootnode, -1, 0)]
+            while stack:
+                node, parent_index, node_depth = stack.pop()
+                index = len(self.host_nodes)
+                self.host_nodes.append(node)
+                if parent_index < 0:
+                    start.append(0)
+                    end.append(0)
+                else:
+                    start.append(node.start_ns)
+                    end.append(node.end_ns)
+                host_type.append(types.setdefault(node.type, len(types)))
+                name.append(names.setdefault(node.name, len(names)))
+                parent.append(parent_index)
+                depth.append(node_depth)
+                thread.append(threads.setdefault(node.thread_id, len(threads)))
+                for runtimenode in node.runtime_node:
+                    runtime = len(rt_host)
+                    rt_start.append(runtimenode.start_ns)
+                    rt_end.append(runtimenode.end_ns)
+                    rt_type.append(
+                        types.setdefault(runtimenode.type, len(types))
+                    )
+                    rt_host.append(index)
+                    for devicenode in runtimenode.device_node:
+                        add_device(devicenode, index, runtime)
+                for devicenode in node.device_node:
+                    add_device(devicenode, index, -1)
+                for memnode in node.mem_node:
+                    mem_host.append(index)
+                    mem_type.append(
+                        mem_types.setdefault(memnode.type, len(mem_types))
+                    )
+                    mem_bytes.append(memnode.increase_bytes)
+                    mem_place.append(
+                        places.setdefault(memnode.place, len(places))
+                    )
+                    mem_peak_allocated.append(memnode.peak_allocated)
+                    mem_peak_reserved.append(memnode.peak_reserved)
+                for childnode in node.children_node:
+                    stack.append((childnode, index, node_depth + 1))
+
+        def array(values):
+            return np.array(values, dtype='int64')
+
+        self.names = list(names)
+        self.types = list(types)
+        self.thread_ids = list(threads)
+        self.places = list(places)
+        self.mem_types = list(mem_types)
+        self._type_codes = types
+        self._mem_type_codes = mem_types
+
+        self.start, self.end = array(start), array(end)
+        self.type, self.name = array(host_type), array(name)
+        self.parent, self.depth = array(parent), array(depth)
+        self.thread = array(thread)
+        self.rt_start, self.rt_end = array(rt_start), array(rt_end)
+        self.rt_type, self.rt_host = array(rt_type), array(rt_host)
+        self.dev_start, self.dev_end = array(dev_start), array(dev_end)
+        self.dev_type, self.dev_name = array(dev_type), array(dev_name)
+        self.dev_host, self.dev_runtime = array(dev_host), array(dev_runtime)
+        self.dev_device_id = array(dev_device_id)
+        self.dev_stream_id = array(dev_stream_id)
+        self.mem_host, self.mem_type = array(mem_host), array(mem_type)
+        self.mem_bytes, self.mem_place = array(mem_bytes), array(mem_place)
+        self.mem_peak_allocated = array(mem_peak_allocated)
+        self.mem_peak_reserved = array(mem_peak_reserved)
+
+        self.num_hosts = len(self.host_nodes)
+        self.is_root = self.parent < 0
+        # the host nodes of every depth
+        order = np.argsort(self.depth, kind='stable')
+        max_depth = int(self.depth.max()) if self.num_hosts else -1
+        bounds = np.searchsorted(self.depth[order], np.arange(max_depth + 2))
+        self.levels = [
+            order[bounds[d] : bounds[d + 1]] for d in range(max_depth + 1)
+        ]
+        size = np.ones(self.num_hosts, dtype='int64')
+        for level in reversed(self.levels[1:]):
+            np.add.at(size, self.parent[level], size[level])
+        self.subtree_end = np.arange(self.num_hosts) + size
+        # orders the host nodes of a tree in preorder with the children in
+        # their order, which is the reverse of the postorder of the table
+        self.forward_order = self.depth - self.subtree_end
+
+    def type_code(self, event_type):
+        return self._type_codes.get(event_type, -1)
+
+    def is_type(self, codes, *event_types):
+        return np.isin(codes, [self.type_code(t) for t in event_types])
+
+    def is_mem_type(self, *mem_types):
+        return np.isin(
+            self.mem_type, [self._mem_type_codes.get(t, -1) for t in mem_types]
+        )
+
+    def name_flags(self, predicate):
+        r'''
+        Evaluate ``predicate`` once for every distinct name.
+        '''
+        return np.array([predicate(n) for n in self.names], dtype=bool)
+
+    def subtree_sum(self, values):
+        r'''
+        Sum ``values`` of the host nodes over the subtree of every host node.
+        '''
+        prefix = np.zeros(self.num_hosts + 1, dtype=values.dtype)
+        np.cumsum(values, out=prefix[1:])
+        return prefix[self.subtree_end] - prefix[:-1]
+
+    def in_subtrees(self, mask):
+        r'''
+        Whether every host node is in the subtree of a host node in ``mask``.
+        '''
+        index = np.flatnonzero(mask)
+        count = np.zeros(self.num_hosts + 1, dtype='int64')
+        np.add.at(count, index, 1)
+        np.add.at(count, self.subtree_end[index], -1)
+        return np.cumsum(count[:-1]) > 0
+
+
+def _group_by(keys):
+    # the groups of the keys numbered in the order of their first occurrence,
+    # and the index of the first element of every group
+    if len(keys) == 0:
+        return np.zeros(0, dtype='int64'), np.zeros(0, dtype='int64')
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.reshape(-1)], first[order]
+
+
+class _GroupReducer:
+    # reduce the values of the elements by their groups
+    def __init__(self, groups, num_groups):
+        self._order = np.argsort(groups, kind='stable')
+        self._starts = np.searchsorted(
+            groups[self._order], np.arange(num_groups)
+        )
+        self.count = np.diff(np.append(self._starts, len(groups))).tolist()
+
+    def sum(self, values):
+        if len(self._starts) == 0:
+            return []
+        return np.add.reduceat(values[self._order], self._starts).tolist()
+
+    def stats(self, values):
+        if len(self._starts) == 0:
+            return [], [], []
+        values = values[self._order]
+        return (
+            np.add.reduceat(values, self._starts).tolist(),
+            np.maximum.reduceat(values, self._starts).tolist(),
+            np.minimum.reduceat(values, self._starts).tolist(),
+        )
+
+
+def _split_ranges(keys, starts, ends):
+    # split the ranges by the keys, the ranges of every split are sorted by
+    # their starts
+    if len(starts) == 0:
+        return
+    order = np.lexsort((starts,) + tuple(reversed(keys)))
+    keys = [k[order] for k in keys]
+    changed = np.zeros(len(order), dtype=bool)
+    changed[0] = True
+    for k in keys:
+        changed[1:] |= k[1:] != k[:-1]
+    bounds = np.append(np.flatnonzero(changed), len(order))
+    starts, ends = starts[order], ends[order]
+    for begin, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        yield (
+            tuple(int(k[begin]) for k in keys),
+            starts[begin:stop],
+            ends[begin:stop],
+        )
+
+
+def _merged_ranges_list(starts, ends):
+    order = np.argsort(starts, kind='stable')
+    return ranges_array_to_list(*merge_ranges_array(starts[order], ends[order]))
+
+
+def _num_distinct_ranges(starts, ends):
+    return len(np.unique(np.stack([starts, ends], axis=1), axis=0))
+
+
 class TimeRangeSummary:
     r"""
     Analyse time ranges for each TracerEventType, and summarize the time.
@@ -351,58 +594,77 @@ class TimeRangeSummary:
         )
         self.call_times = collections.defaultdict(int)
 
-    def parse(self, nodetrees):
+    def parse(self, nodetrees, table=None):
         r"""
         Analysis node trees in profiler result, and get time range for different tracer event type.
         """
-        thread2hostnodes = traverse_tree(nodetrees)
-        for threadid, hostnodes in thread2hostnodes.items():
-            CPUTimeRange = collections.defaultdict(list)
-            GPUTimeRange = collections.defaultdict(
-                lambda: collections.defaultdict(
-                    lambda: collections.defaultdict(list)
-                )
-            )  # device_id/type/stream_id
-            for hostnode in hostnodes[1:]:  # skip root node
-                CPUTimeRange[hostnode.type].append(
-                    (hostnode.start_ns, hostnode.end_ns)
-                )
-                self.call_times[hostnode.type] += 1
-                for runtimenode in hostnode.runtime_node:
-                    CPUTimeRange[runtimenode.type].append(
-                        (runtimenode.start_ns, runtimenode.end_ns)
-                    )
-                    self.call_times[runtimenode.type] += 1
-                    for devicenode in runtimenode.device_node:
-                        GPUTimeRange[devicenode.device_id][devicenode.type][
-                            devicenode.stream_id
-                        ].append((devicenode.start_ns, devicenode.end_ns))
-                        self.call_times[devicenode.type] += 1
-
-            for event_type, time_ranges in CPUTimeRange.items():
-                time_ranges = merge_self_ranges(time_ranges, is_sorted=False)
-                self.CPUTimeRange[event_type] = merge_ranges(
-                    self.CPUTimeRange[event_type], time_ranges, is_sorted=True
-                )
-            for device_id, device_time_ranges in GPUTimeRange.items():
-                for event_type, event_time_ranges in device_time_ranges.items():
-                    for stream_id, time_ranges in event_time_ranges.items():
-                        time_ranges = merge_self_ranges(
-                            time_ranges, is_sorted=False
-                        )
-                        self.GPUTimeRange[device_id][event_type] = merge_ranges(
-                            self.GPUTimeRange[device_id][event_type],
-                            time_ranges,
-                            is_sorted=True,
-                        )
-
-        for event_type, time_ranges in self.CPUTimeRange.items():
-            self.CPUTimeRangeSum[event_type] = sum_ranges(time_ranges)
-        for device_id, device_time_ranges in self.GPUTimeRange.items():
-            for event_type, time_ranges in device_time_ranges.items():
-                self.GPUTimeRangeSum[device_id][event_type] = sum_ranges(
-                    time_ranges
-                )
+        if table is None:
+            table = flatten_tree(nodetrees)
+        # skip the root nodes and their runtime nodes
+        host_mask = ~table.is_root
+        rt_mask = ~table.is_root[table.rt_host]
+        dev_mask = (table.dev_runtime >= 0) & ~table.is_root[table.dev_host]
+        cpu_type = np.concatenate(
+            [table.type[host_mask], table.rt_type[rt_mask]]
+        )
+        cpu_start = np.concatenate(
+            [table.start[host_mask], table.rt_start[rt_mask]]
+        )
+        cpu_end = np.concatenate([table.end[host_mask], table.rt_end[rt_mask]])
+        call_times = np.bincount(
+            np.concatenate([cpu_type, table.dev_type[dev_mask]]),
+            minlength=len(table.types),
+        )
+        for code, count in enumerate(call_times.tolist()):
+            if count > 0:
+                self.call_times[table.types[code]] += count
+
+        # the ranges of all the threads are merged together, the event types
+        # and the devices are added in the order they are met in the trees
+        cpu_ranges = {
+            code: merge_ranges_array(starts, ends)
+            for (code,), starts, ends in _split_ranges(
+                [cpu_type], cpu_start, cpu_end
+            )
+        }
+        cpu_order = np.lexsort(
+            (
+                np.append(
+                    np.full(np.count_nonzero(host_mask), -1),
+                    np.flatnonzero(rt_mask),
+                ),
+                np.append(np.flatnonzero(host_mask), table.rt_host[rt_mask]),
+            )
+        )
+        _, first = _group_by(cpu_type[cpu_order])
+        for code in cpu_type[cpu_order[first]].tolist():
+            event_type = table.types[code]
+            starts, ends = cpu_ranges[code]
+            self.CPUTimeRange[event_type] = ranges_array_to_list(starts, ends)
+            self.CPUTimeRangeSum[event_type] = int(np.sum(ends - starts))
+
+        device_ids = table.dev_device_id[dev_mask]
+        dev_types = table.dev_type[dev_mask]
+        gpu_ranges = {
+            key: merge_ranges_array(starts, ends)
+            for key, starts, ends in _split_ranges(
+                [device_ids, dev_types],
+                table.dev_start[dev_mask],
+                table.dev_end[dev_mask],
+            )
+        }
+        _, first = _group_by(device_ids * len(table.types) + dev_types)
+        for device_id, code in zip(
+            device_ids[first].tolist(), dev_types[first].tolist()
+        ):
+            event_type = table.types[code]
+            starts, ends = gpu_ranges[(device_id, code)]
+            self.GPUTimeRange[device_id][event_type] = ranges_array_to_list(
+                starts, ends
+            )
+            self.GPUTimeRangeSum[device_id][event_type] = int(
+                np.sum(ends - starts)
+            )
 
     def get_gpu_devices(self):
         return self.GPUTimeRange.keys()
@@ -429,78 +691,97 @@ class DistributedSummary:
         self.cpu_calls = 0
         self.gpu_calls = 0
 
-    def parse(self, nodetrees):
+    def parse(self, nodetrees, table=None):
         '''
         Collect all communication and computation time ranges.
         '''
-        thread2hostnodes = traverse_tree(nodetrees)
-        for threadid, hostnodes in thread2hostnodes.items():
-            for hostnode in hostnodes[1:]:  # skip root node
-                # case 1: TracerEventType is Communication
-                if hostnode.type == TracerEventType.Communication:
-                    self.cpu_communication_range.append(
-                        (hostnode.start_ns, hostnode.end_ns)
-                    )
-                    device_nodes = get_device_nodes(hostnode)
-                    for device_node in device_nodes:
-                        if device_node.type == TracerEventType.Kernel:
-                            self.gpu_communication_range.append(
-                                (device_node.start_ns, device_node.end_ns)
-                            )
-
-                # case 2: TracerEventType is Operator but is communication op
-                elif hostnode.type == TracerEventType.Operator and any(
-                    name in hostnode.name.lower()
-                    for name in _CommunicationOpName
-                ):
-                    self.cpu_communication_range.append(
-                        (hostnode.start_ns, hostnode.end_ns)
-                    )
-                    device_nodes = get_device_nodes(hostnode)
-                    for device_node in device_nodes:
-                        if device_node.type == TracerEventType.Kernel:
-                            self.gpu_communication_range.append(
-                                (device_node.start_ns, device_node.end_ns)
-                            )
-
-                # case 3: Others, filter kernels named with nccl
-                else:
-                    for runtimenode in hostnode.runtime_node:
-                        for devicenode in runtimenode.device_node:
-                            if devicenode.type == TracerEventType.Kernel:
-                                kernel_name = devicenode.name.lower()
-                                if (
-                                    'nccl' in kernel_name
-                                    or 'xccl' in kernel_name
-                                ):
-                                    self.gpu_communication_range.append(
-                                        (devicenode.start_ns, devicenode.end_ns)
-                                    )
-                                else:
-                                    self.computation_range.append(
-                                        (devicenode.start_ns, devicenode.end_ns)
-                                    )
-        self.cpu_calls = len(set(self.cpu_communication_range))
-        self.gpu_calls = len(set(self.gpu_communication_range))
-        self.cpu_communication_range = merge_self_ranges(
-            self.cpu_communication_range, is_sorted=False
+        if table is None:
+            table = flatten_tree(nodetrees)
+        not_root = ~table.is_root
+        is_comm_op = table.name_flags(
+            lambda name: any(n in name.lower() for n in _CommunicationOpName)
         )
-        self.gpu_communication_range = merge_self_ranges(
-            self.gpu_communication_range, is_sorted=False
+        # case 1: TracerEventType is Communication
+        # case 2: TracerEventType is Operator but is communication op
+        comm = not_root & (
+            table.is_type(table.type, TracerEventType.Communication)
+            | (
+                table.is_type(table.type, TracerEventType.Operator)
+                & is_comm_op[table.name]
+            )
+        )
+        kernel = (table.dev_runtime >= 0) & table.is_type(
+            table.dev_type, TracerEventType.Kernel
+        )
+        # all the kernels called in the communication
+        comm_kernel = kernel & table.in_subtrees(comm)[table.dev_host]
+        # case 3: Others, filter kernels named with nccl
+        other_kernel = kernel & (not_root & ~comm)[table.dev_host]
+        is_nccl = table.name_flags(
+            lambda name: 'nccl' in name.lower() or 'xccl' in name.lower()
+        )[table.dev_name]
+        gpu_comm = comm_kernel | (other_kernel & is_nccl)
+        computation = other_kernel & ~is_nccl
+
+        self.cpu_calls = _num_distinct_ranges(
+            table.start[comm], table.end[comm]
+        )
+        self.gpu_calls = _num_distinct_ranges(
+            table.dev_start[gpu_comm], table.dev_end[gpu_comm]
+        )
+        self.cpu_communication_range = _merged_ranges_list(
+            table.start[comm], table.end[comm]
+        )
+        self.gpu_communication_range = _merged_ranges_list(
+            table.dev_start[gpu_comm], table.dev_end[gpu_comm]
         )
         self.communication_range = merge_ranges(
             self.cpu_communication_range,
             self.gpu_communication_range,
             is_sorted=True,
         )
-        self.computation_range = merge_self_ranges(
-            self.computation_range, is_sorted=False
+        self.computation_range = _merged_ranges_list(
+            table.dev_start[computation], table.dev_end[computation]
         )
         self.overlap_range = intersection_ranges(
             self.communication_range, self.computation_range, is_sorted=True
         )
 
 
+def _grouped_items(
+    item_type,
+    names,
+    groups,
+    num_groups,
+    cpu_time=None,
+    gpu_time=None,
+    general_gpu_time=None,
+    flops=None,
+):
+    # the summary items of the groups, with the statistics of their nodes
+    reducer = _GroupReducer(groups, num_groups)
+    items = [item_type(name) for name in names]
+    for item, call in zip(items, reducer.count):
+        item.call = call
+    for field, values in (
+        ('cpu_time', cpu_time),
+        ('gpu_time', gpu_time),
+        ('general_gpu_time', general_gpu_time),
+    ):
+        if values is None:
+            continue
+        for item, total, max_value, min_value in zip(
+            items, *reducer.stats(values)
+        ):
+            setattr(item, field, total)
+            setattr(item, 'max_' + field, max_value)
+            setattr(item, 'min_' + field, min_value)
+    if flops is not None:
+        for item, total in zip(items, reducer.sum(flops)):
+            item._flops = total
+    return items
+
+
 class EventSummary:
     r"""
     Analyse operator event in profiling data, correlate with its device event.
@@ -631,58 +912,238 @@ class EventSummary:
         self.memory_manipulation_items = {}  # for memory manipulation summary
         self.kernel_items = {}  # for kernel summary
 
-    def parse(self, nodetrees):
+    def parse(self, nodetrees, table=None):
         r"""
         Analysis operator event in the nodetress.
         """
-        node_statistic_trees, thread2host_statistic_nodes = wrap_tree(nodetrees)
-        for (
-            threadid,
-            host_statistic_nodes,
-        ) in thread2host_statistic_nodes.items():
-            for host_statistic_node in host_statistic_nodes[
-                1:
-            ]:  # skip root node
-                if host_statistic_node.type == TracerEventType.Operator:
-                    self.add_operator_item(host_statistic_node)
-                if (
-                    host_statistic_node.type == TracerEventType.UserDefined
-                    or host_statistic_node.type
-                    == TracerEventType.PythonUserDefined
-                ):
-                    if (
-                        'memcpy' in host_statistic_node.name.lower()
-                        or 'memorycopy' in host_statistic_node.name.lower()
-                        or 'memset' in host_statistic_node.name.lower()
-                    ):
-                        self.add_memory_manipulation_item(host_statistic_node)
-                    else:
-                        if (
-                            host_statistic_node.type
-                            == TracerEventType.PythonUserDefined
-                        ):
-                            self.add_userdefined_item(host_statistic_node)
-            self.add_kernel_item(host_statistic_nodes[0])
-
-        for threadid, root_statistic_node in node_statistic_trees.items():
-            deque = collections.deque()
-            deque.append(root_statistic_node)
-            while deque:
-                current_node = deque.popleft()
-                for child in current_node.children_node:
-                    if (
-                        child.type == TracerEventType.Forward
-                        or child.type == TracerEventType.Dataloader
-                        or child.type == TracerEventType.Backward
-                        or child.type == TracerEventType.Optimization
-                    ):
-                        self.add_model_perspective_item(
-                            child
-                        )  # find first model perspective node
-                    else:
-                        if child.type == TracerEventType.ProfileStep:
-                            self.add_model_perspective_item(child)
-                        deque.append(child)
+        if table is None:
+            table = flatten_tree(nodetrees)
+        not_root = ~table.is_root
+        # the time of the kernels and of all the device events launched by
+        # every host node and its subtree
+        dev_time = table.dev_end - table.dev_start
+        is_kernel = table.is_type(table.dev_type, TracerEventType.Kernel)
+        self_gpu_time = np.bincount(
+            table.dev_host,
+            weights=np.where(is_kernel, dev_time, 0),
+            minlength=table.num_hosts,
+        ).astype('int64')
+        self_general_gpu_time = np.bincount(
+            table.dev_host, weights=dev_time, minlength=table.num_hosts
+        ).astype('int64')
+        is_operator = not_root & table.is_type(
+            table.type, TracerEventType.Operator
+        )
+        self_flops = np.zeros(table.num_hosts, dtype='int64')
+        for index in np.flatnonzero(is_operator).tolist():
+            node = table.host_nodes[index]
+            if hasattr(node, 'input_shapes'):
+                self_flops[index] = flops(
+                    _nodename2opname(node.name),
+                    node.input_shapes,
+                    node.attributes,
+                )
+        stats = {
+            'cpu_time': table.end - table.start,
+            'gpu_time': table.subtree_sum(self_gpu_time),
+            'general_gpu_time': table.subtree_sum(self_general_gpu_time),
+        }
+
+        num_names = len(table.names)
+        self._add_operator_items(
+            table,
+            np.where(is_operator, table.name, -1),
+            dict(stats, flops=table.subtree_sum(self_flops)),
+            lambda host: self.items,
+        )
+        self._add_operator_items(
+            table,
+            np.where(is_operator, table.thread * num_names + table.name, -1),
+            dict(stats, flops=table.subtree_sum(self_flops)),
+            lambda host: self.thread_items[
+                table.thread_ids[table.thread[host]]
+            ],
+        )
+
+        def add_general_items(hosts, get_items):
+            groups, first = _group_by(table.name[hosts])
+            items = _grouped_items(
+                EventSummary.GeneralItem,
+                [table.names[c] for c in table.name[hosts[first]].tolist()],
+                groups,
+                len(first),
+                **{key: values[hosts] for key, values in stats.items()},
+            )
+            for host, item in zip(hosts[first].tolist(), items):
+                get_items(host)[item.name] = item
+
+        is_memory_manipulation = table.name_flags(
+            lambda name: 'memcpy' in name.lower()
+            or 'memorycopy' in name.lower()
+            or 'memset' in name.lower()
+        )[table.name]
+        memory_hosts = np.flatnonzero(
+            not_root
+            & table.is_type(
+                table.type,
+                TracerEventType.UserDefined,
+                TracerEventType.PythonUserDefined,
+            )
+            & is_memory_manipulation
+        )
+        add_general_items(
+            memory_hosts, lambda host: self.memory_manipulation_items
+        )
+        userdefined_hosts = np.flatnonzero(
+            not_root
+            & table.is_type(table.type, TracerEventType.PythonUserDefined)
+            & ~is_memory_manipulation
+        )
+        add_general_items(
+            userdefined_hosts, lambda host: self.userdefined_items
+        )
+        for thread in range(len(table.thread_ids)):
+            hosts = userdefined_hosts[table.thread[userdefined_hosts] == thread]
+            add_general_items(
+                hosts,
+                lambda host: self.userdefined_thread_items[
+                    table.thread_ids[thread]
+                ],
+            )
+
+        # the first model perspective nodes, and all the profile steps not
+        # under them
+        is_first = not_root & table.is_type(
+            table.type,
+            TracerEventType.Forward,
+            TracerEventType.Dataloader,
+            TracerEventType.Backward,
+            TracerEventType.Optimization,
+        )
+        model_hosts = np.flatnonzero(
+            not_root & table.is_type(table.type, *_ModelPerspectiveNames.keys())
+        )
+        model_hosts = model_hosts[
+            ~table.in_subtrees(is_first)[table.parent[model_hosts]]
+        ]
+        # the trees are searched breadth first
+        model_hosts = model_hosts[
+            np.lexsort(
+                (
+                    table.forward_order[model_hosts],
+                    table.depth[model_hosts],
+                    table.thread[model_hosts],
+                )
+            )
+        ]
+        groups, first = _group_by(table.type[model_hosts])
+        items = _grouped_items(
+            EventSummary.GeneralItem,
+            [
+                _ModelPerspectiveNames[table.types[c]]
+                for c in table.type[model_hosts[first]].tolist()
+            ],
+            groups,
+            len(first),
+            **{key: values[model_hosts] for key, values in stats.items()},
+        )
+        for item in items:
+            self.model_perspective_items[item.name] = item
+
+        kernels = np.flatnonzero((table.dev_runtime >= 0) & is_kernel)
+        groups, first = _group_by(table.dev_name[kernels])
+        items = _grouped_items(
+            EventSummary.DeviceItem,
+            [table.names[c] for c in table.dev_name[kernels[first]].tolist()],
+            groups,
+            len(first),
+            gpu_time=dev_time[kernels],
+        )
+        for item in items:
+            self.kernel_items[item.name] = item
+
+    def _add_operator_items(self, table, top_keys, stats, get_items):
+        # the operators are summarized by their top keys, the nodes of the
+        # other types under them are summarized as their operator_inners by
+        # the names on the path from the operator
+        num_names = len(table.names)
+        path = np.full(table.num_hosts, -1, dtype='int64')
+        top = np.full(table.num_hosts, -1, dtype='int64')
+        path_parent = []
+        interned = {}
+
+        def intern(inner, keys):
+            uniques, inverse = np.unique(keys, return_inverse=True)
+            ids = []
+            for key in uniques.tolist():
+                if (inner, key) not in interned:
+                    interned[(inner, key)] = len(path_parent)
+                    path_parent.append(key // num_names if inner else -1)
+                ids.append(interned[(inner, key)])
+            return np.array(ids, dtype='int64')[inverse.reshape(-1)]
+
+        for level in table.levels:
+            operators = level[top_keys[level] >= 0]
+            if len(operators) > 0:
+                path[operators] = intern(False, top_keys[operators])
+                top[operators] = operators
+            inner = level[(top_keys[level] < 0) & (table.parent[level] >= 0)]
+            inner = inner[path[table.parent[inner]] >= 0]
+            if len(inner) > 0:
+                path[inner] = intern(
+                    True,
+                    path[table.parent[inner]] * num_names + table.name[inner],
+                )
+                top[inner] = top[table.parent[inner]]
+
+        # the items are added in the order of the operators, and the inner
+        # items in the order of the children under every operator
+        hosts = np.flatnonzero(path >= 0)
+        hosts = hosts[np.lexsort((table.forward_order[hosts], top[hosts]))]
+        groups, first = _group_by(path[hosts])
+        items = _grouped_items(
+            EventSummary.OperatorItem,
+            [table.names[c] for c in table.name[hosts[first]].tolist()],
+            groups,
+            len(first),
+            **{key: values[hosts] for key, values in stats.items()},
+        )
+        path_items = {}
+        for p, host, item in zip(
+            path[hosts[first]].tolist(), hosts[first].tolist(), items
+        ):
+            if path_parent[p] < 0:
+                get_items(host)[item.name] = item
+            else:
+                path_items[path_parent[p]].operator_inners[item.name] = item
+            path_items[p] = item
+
+        devices = np.flatnonzero(
+            (table.dev_runtime >= 0) & (path[table.dev_host] >= 0)
+        )
+        device_host = table.dev_host[devices]
+        devices = devices[
+            np.lexsort(
+                (
+                    devices,
+                    table.forward_order[device_host],
+                    top[device_host],
+                )
+            )
+        ]
+        device_path = path[table.dev_host[devices]]
+        groups, first = _group_by(
+            device_path * num_names + table.dev_name[devices]
+        )
+        items = _grouped_items(
+            EventSummary.DeviceItem,
+            [table.names[c] for c in table.dev_name[devices[first]].tolist()],
+            groups,
+            len(first),
+            gpu_time=table.dev_end[devices] - table.dev_start[devices],
+        )
+        for p, item in zip(device_path[first].tolist(), items):
+            path_items[p].devices[item.name] = item
 
     def add_forward_item(self, operator_node):
         pass
@@ -839,19 +1300,88 @@ class MemorySummary:
                 self.peak_reserved_values[memnode.place], memnode.peak_reserved
             )
 
-    def parse(self, nodetrees):
+    def parse(self, nodetrees, table=None):
         r"""
         Analyse memory event in the nodetress.
         """
-        thread2hostnodes = traverse_tree(nodetrees)
-        for threadid, host_nodes in thread2hostnodes.items():
-            for host_node in host_nodes[1:]:  # skip root node
-                if host_node.type == TracerEventType.OperatorInner:
-                    continue
-                if host_node.type == TracerEventType.Operator:
-                    for child in host_node.children_node:
-                        self._analyse_node_memory(host_node.name, child)
-                self._analyse_node_memory(host_node.name, host_node)
+        if table is None:
+            table = flatten_tree(nodetrees)
+        # the memory nodes are accounted to their host node, and to the
+        # operator the host node is called in
+        host = table.mem_host
+        parent = table.parent[host]
+        to_self = ~table.is_root[host] & ~table.is_type(
+            table.type[host], TracerEventType.OperatorInner
+        )
+        to_parent = (parent >= 0) & table.is_type(
+            table.type[np.maximum(parent, 0)], TracerEventType.Operator
+        )
+        to_parent &= ~table.is_root[np.maximum(parent, 0)]
+        rows = np.concatenate(
+            [np.flatnonzero(to_parent), np.flatnonzero(to_self)]
+        )
+        owners = np.concatenate([parent[to_parent], host[to_self]])
+        # the children of an operator are accounted before the operator
+        is_self = np.arange(len(rows)) >= np.count_nonzero(to_parent)
+        order = np.lexsort(
+            (rows, table.forward_order[host[rows]], is_self, owners)
+        )
+        rows, owners = rows[order], owners[order]
+
+        place = table.mem_place[rows]
+        num_places = len(table.places)
+        peak_allocated = np.full(num_places, -1, dtype='int64')
+        np.maximum.at(peak_allocated, place, table.mem_peak_allocated[rows])
+        peak_reserved = np.full(num_places, -1, dtype='int64')
+        np.maximum.at(peak_reserved, place, table.mem_peak_reserved[rows])
+        _, first = _group_by(place)
+        for code in place[first].tolist():
+            self.peak_allocation_values[table.places[code]] = max(
+                int(peak_allocated[code]), 0
+            )
+            self.peak_reserved_values[table.places[code]] = max(
+                int(peak_reserved[code]), 0
+            )
+
+        is_allocate = table.is_mem_type(
+            TracerMemEventType.Allocate, TracerMemEventType.ReservedAllocate
+        )[rows]
+        is_free = table.is_mem_type(
+            TracerMemEventType.Free, TracerMemEventType.ReservedFree
+        )[rows]
+        is_reserved = table.is_mem_type(
+            TracerMemEventType.ReservedAllocate, TracerMemEventType.ReservedFree
+        )[rows]
+        recorded = is_allocate | is_free
+        rows, owners = rows[recorded], owners[recorded]
+        place, is_reserved = place[recorded], is_reserved[recorded]
+        is_allocate, is_free = is_allocate[recorded], is_free[recorded]
+        num_names = len(table.names)
+        groups, first = _group_by(
+            (place * num_names + table.name[owners]) * 2 + is_reserved
+        )
+        reducer = _GroupReducer(groups, len(first))
+        size = table.mem_bytes[rows]
+        allocation_count = reducer.sum(is_allocate.astype('int64'))
+        allocation_size = reducer.sum(np.where(is_allocate, size, 0))
+        free_count = reducer.sum(is_free.astype('int64'))
+        free_size = reducer.sum(np.where(is_free, -size, 0))
+        for i, index in enumerate(first.tolist()):
+            event_name = table.names[table.name[owners[index]]]
+            memory_place = table.places[place[index]]
+            if is_reserved[index]:
+                items, memory_type = self.reserved_items, 'Reserved'
+            else:
+                items, memory_type = self.allocated_items, 'Allocated'
+            item = MemorySummary.MemoryItem(
+                event_name, memory_place, memory_type
+            )
+            item.allocation_count = allocation_count[i]
+            item.allocation_size = allocation_size[i]
+            item.free_count = free_count[i]
+            item.free_size = free_size[i]
+            item.increase_size = item.allocation_size - item.free_size
+            items[memory_place][event_name] = item
 
 
 class StatisticData:
@@ -866,10 +1396,12 @@ class StatisticData:
         self.event_summary = EventSummary()
         self.distributed_summary = DistributedSummary()
         self.memory_summary = MemorySummary()
-        self.time_range_summary.parse(node_trees)
-        self.event_summary.parse(node_trees)
-        self.distributed_summary.parse(node_trees)
-        self.memory_summary.parse(node_trees)
+        # the trees are flattened once for all the summaries
+        table = flatten_tree(node_trees)
+        self.time_range_summary.parse(node_trees, table)
+        self.event_summary.parse(node_trees, table)
+        self.distributed_summary.parse(node_trees, table)
+        self.memory_summary.parse(node_trees, table)
 
 
 def _build_table(
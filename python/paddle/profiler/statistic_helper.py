@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
+
 
 def sum_ranges(ranges):
     result = 0
@@ -226,3 +228,23 @@ def subtract_ranges(range_list1, range_list2, is_sorted=False):
             if indx1 != len1:
                 range1 = range_list1[indx1]
     return result_range
+
+
+def merge_ranges_array(starts, ends):
+    r'''
+    The union of the ranges sorted by their starts in numpy arrays, which is
+    the same as merge_self_ranges.
+    '''
+    if len(starts) == 0:
+        return starts, ends
+    max_ends = np.maximum.accumulate(ends)
+    is_first = np.empty(len(starts), dtype=bool)
+    is_first[0] = True
+    is_first[1:] = starts[1:] > max_ends[:-1]
+    first = np.flatnonzero(is_first)
+    last = np.append(first[1:] - 1, len(starts) - 1)
+    return starts[first], max_ends[last]
+
+
+def ranges_array_to_list(starts, ends):
+    return list(zip(starts.tolist(), ends.tolist()))
@@ -0,0 +1,345 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import signal
+import socket
+import time
+import timeit
+from typing import Iterable, Optional
+from warnings import warn
+
+import numpy as np
+
+from .timer import Hook, benchmark
+
+# the columns always recorded, the named regions follow them
+_STEP_COST = 'step_cost'
+_READER_COST = 'reader_cost'
+# the steps between two updates of the median step cost
+_MEDIAN_INTERVAL = 16
+
+
+class _Region:
+    # times a region of the current step into a column of the recorder
+    def __init__(self, recorder, column):
+        self._recorder = recorder
+        self._column = column
+        self._start = None
+
+    def __enter__(self):
+        self._start = timeit.default_timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._recorder._current[self._column] += (
+            timeit.default_timer() - self._start
+        )
+
+
+class StepRecorder(Hook):
+    r"""
+    A lightweight recorder that keeps the timings of the last ``capacity``
+    steps in a ring buffer, so that it can be left on in long training jobs.
+    Every step records the step cost, the cost of loading data by the
+    DataLoader and the cost of a small fixed set of regions, either timed by
+    ``record`` or the forward of the layers given to ``watch``. The recorded
+    steps are written to a json file by ``dump``, when the signal
+    ``dump_signal`` is received, or when the cost of a step is larger than
+    ``anomaly_factor`` times the median step cost.
+
+    The timings are measured on host, the costs of the asynchronous device
+    work are accounted to the step or the region waiting for it.
+
+    Args:
+        capacity (int, optional): The number of the last steps kept.
+            Default: 200.
+        regions (list[str], optional): The names of the regions recorded.
+            Default: None.
+        anomaly_factor (float|None, optional): The steps costing more than
+            this times the median step cost are dumped, None to disable it.
+            Default: 3.0.
+        warmup_steps (int, optional): The number of the first steps not
+            checked for anomaly. Default: 20.
+        dump_dir (str, optional): The directory of the dumped files.
+            Default: './profiler_log/'.
+        dump_signal (int|None, optional): The signal to dump on, e.g.
+            ``signal.SIGUSR1``. It can only be set in the main thread.
+            Default: None.
+
+    Examples:
+        .. code-block:: python
+
+            >>> import paddle
+            >>> import paddle.profiler as profiler
+
+            >>> linear = paddle.nn.Linear(16, 16)
+            >>> sgd = paddle.optimizer.SGD(parameters=linear.parameters())
+            >>> recorder = profiler.StepRecorder(regions=['backward', 'optimizer'])
+            >>> recorder.watch(linear)
+            >>> with recorder:
+            ...     for i in range(10):
+            ...         loss = linear(paddle.randn([4, 16])).mean()
+            ...         with recorder.record('backward'):
+            ...             loss.backward()
+            ...         with recorder.record('optimizer'):
+            ...             sgd.step()
+            ...             sgd.clear_grad()
+            ...         recorder.step()
+            >>> path = recorder.dump()
+    """
+
+    def __init__(
+        self,
+        capacity: int = 200,
+        regions: Optional[Iterable[str]] = None,
+        anomaly_factor: Optional[float] = 3.0,
+        warmup_steps: int = 20,
+        dump_dir: str = './profiler_log/',
+        dump_signal: Optional[int] = None,
+    ):
+        if capacity < 1:
+            raise ValueError(
+                f"capacity should be positive, but got {capacity}."
+            )
+        self.capacity = capacity
+        self.anomaly_factor = anomaly_factor
+        self.warmup_steps = warmup_steps
+        self.dump_dir = dump_dir
+        self.dump_signal = dump_signal
+
+        self._columns = [_STEP_COST, _READER_COST]
+        self._regions = {}
+        self._buffer = np.zeros([capacity, len(self._columns)])
+        self._step_ids = np.zeros([capacity], dtype='int64')
+        self._stamps = np.zeros([capacity])
+        self._current = np.zeros([len(self._columns)])
+        for name in regions or []:
+            self._add_region(name)
+
+        self.step_num = 0
+        self._num_recorded = 0
+        self._median = None
+        # no anomaly is dumped until this step, to not dump the same steps
+        self._quiet_until = 0
+        self._step_start = None
+        self._reader_start = None
+        self._running = False
+        self._watched = []
+        self._layer_hooks = []
+        self._prev_handler = None
+
+    def _add_region(self, name):
+        if name in self._regions:
+            return self._regions[name]
+        self._columns.append(name)
+        self._buffer = np.pad(self._buffer, [(0, 0), (0, 1)])
+        self._current = np.append(self._current, 0.0)
+        self._regions[name] = _Region(self, len(self._columns) - 1)
+        return self._regions[name]
+
+    def record(self, name: str):
+        r"""
+        Return a context manager timing a region of the current step. The
+        cost of a region entered several times in a step is summed.
+
+        Args:
+            name (str): The name of the region.
+        """
+        region = self._regions.get(name)
+        return region if region is not None else self._add_region(name)
+
+    def watch(self, layer, name: Optional[str] = None):
+        r"""
+        Time the forward of ``layer`` in every step while recording.
+
+        Args:
+            layer (paddle.nn.Layer): The layer to time, e.g. a block of the
+                model. Timing every sublayer costs more than a few blocks.
+            name (str, optional): The name of the region. Default: None, the
+                full name of the layer.
+        """
+        region = self._add_region(name or layer.full_name())
+        self._watched.append((layer, region))
+        if self._running:
+            self._hook_layer(layer, region)
+
+    def _hook_layer(self, layer, region):
+        def pre_hook(layer, inputs):
+            region.__enter__()
+
+        def post_hook(layer, inputs, outputs):
+            region.__exit__(None, None, None)
+
+        self._layer_hooks.append(layer.register_forward_pre_hook(pre_hook))
+        self._layer_hooks.append(layer.register_forward_post_hook(post_hook))
+
+    def start(self):
+        r"""
+        Start recording, it is also called by entering the context of the
+        recorder.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._step_start = timeit.default_timer()
+        self._current[:] = 0.0
+        benchmark().hooks[f'step_recorder_{id(self)}'] = self
+        for layer, region in self._watched:
+            self._hook_layer(layer, region)
+        if self.dump_signal is not None:
+            self._prev_handler = signal.signal(
+                self.dump_signal, self._on_signal
+            )
+
+    def stop(self):
+        r"""
+        Stop recording, the recorded steps are kept until the next start.
+        """
+        if not self._running:
+            return
+        self._running = False
+        benchmark().hooks.pop(f'step_recorder_{id(self)}', None)
+        for hook in self._layer_hooks:
+            hook.remove()
+        self._layer_hooks = []
+        if self.dump_signal is not None:
+            prev = self._prev_handler
+            signal.signal(
+                self.dump_signal, signal.SIG_DFL if prev is None else prev
+            )
+            self._prev_handler = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def step(self, num_samples: Optional[int] = None):
+        r"""
+        Finish the current step. It is not needed when the steps are signaled
+        by ``Profiler.step``, which also finishes the steps of the recorder.
+
+        Args:
+            num_samples (int|None, optional): The batch size of the step, used
+                by the timer of ``Profiler``. Default: None.
+        """
+        benchmark().step(num_samples)
+
+    def before_reader(self, benchmark):
+        self._reader_start = timeit.default_timer()
+
+    def after_reader(self, benchmark):
+        if self._reader_start is not None:
+            self._current[1] += timeit.default_timer() - self._reader_start
+            self._reader_start = None
+
+    def after_step(self, benchmark):
+        now = timeit.default_timer()
+        step_cost = now - self._step_start
+        self._step_start = now
+        self._current[0] = step_cost
+
+        index = self._num_recorded % self.capacity
+        self._buffer[index] = self._current
+        self._step_ids[index] = self.step_num
+        self._stamps[index] = time.time()
+        self._current[:] = 0.0
+        self._num_recorded += 1
+        self.step_num += 1
+        self._check_anomaly(step_cost)
+
+    def _check_anomaly(self, step_cost):
+        if self.anomaly_factor is None or self.step_num <= self.warmup_steps:
+            return
+        if self._median is None or self._num_recorded % _MEDIAN_INTERVAL == 0:
+            num = min(self._num_recorded, self.capacity)
+            self._median = float(np.median(self._buffer[:num, 0]))
+        if (
+            step_cost > self.anomaly_factor * self._median
+            and self.step_num >= self._quiet_until
+        ):
+            path = self.dump(reason='anomaly')
+            warn(
+                "Step {} cost {:.5f} s, more than {} times the median step "
+                "cost {:.5f} s, the last steps are dumped to {}.".format(
+                    self.step_num - 1,
+                    step_cost,
+                    self.anomaly_factor,
+                    self._median,
+                    path,
+                )
+            )
+            self._quiet_until = self.step_num + self.capacity
+
+    def _on_signal(self, signum, frame):
+        self.dump(reason=f'signal {signum}')
+
+    def records(self):
+        r"""
+        Return the recorded steps from the oldest one.
+
+        Returns:
+            list[dict]: The step id, the timestamp and the costs in seconds of
+            every step.
+        """
+        num = min(self._num_recorded, self.capacity)
+        start = self._num_recorded - num
+        records = []
+        for i in range(start, self._num_recorded):
+            index = i % self.capacity
+            record = {
+                'step': int(self._step_ids[index]),
+                'time': float(self._stamps[index]),
+            }
+            record.update(zip(self._columns, self._buffer[index].tolist()))
+            records.append(record)
+        return records
+
+    def dump(self, path: Optional[str] = None, reason: str = 'api'):
+        r"""
+        Write the recorded steps to a json file.
+
+        Args:
+            path (str, optional): The path of the file. Default: None, a file
+                named by the host, the pid and the step in ``dump_dir``.
+            reason (str, optional): The reason of the dump written to the
+                file. Default: 'api'.
+
+        Returns:
+            str: The path of the file.
+        """
+        if path is None:
+            os.makedirs(self.dump_dir, exist_ok=True)
+            path = os.path.join(
+                self.dump_dir,
+                "host_{}pid_{}_step_{}.step_record.json".format(
+                    socket.gethostname(), os.getpid(), self.step_num
+                ),
+            )
+        content = {
+            'reason': reason,
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'rank': int(os.getenv('PADDLE_TRAINER_ID', '0')),
+            'step': self.step_num,
+            'columns': list(self._columns),
+            'records': self.records(),
+        }
+        with open(path, 'w') as f:
+            json.dump(content, f)
+        return path
@@ -15,6 +15,33 @@
 import timeit
 from collections import OrderedDict
 
+# The stages of loading a batch by the DataLoader in the order of the
+# pipeline: waiting for a worker to start on the batch, reading the samples
+# from the dataset, collating them, passing the batch through the shared
+# memory, the result queue and the reader thread to the blocking queue, and
+# reading it from the blocking queue, which copies it to the device.
+READER_STAGES = ['wait_worker', 'fetch', 'collate', 'transfer', 'h2d']
+
+
+def split_reader_cost(start, end, stamps):
+    """
+    Split the reader cost of a step, from ``start`` to ``end``, into
+    `READER_STAGES` by the stamps of the batch read, which are the wall
+    clock times the fetch started, the collate started, the fetch ended and
+    the batch is pushed to the blocking queue. Only the part of a stage in
+    the reader cost is accounted to it, the stages done before the step
+    started reading are overlapped with the training and cost nothing.
+    """
+
+    bounds = [start]
+    for stamp in stamps:
+        bounds.append(min(max(stamp, bounds[-1]), end))
+    bounds.append(end)
+    return {
+        stage: bounds[i + 1] - bounds[i]
+        for i, stage in enumerate(READER_STAGES)
+    }
+
 
 class Stack:
     """
@@ -54,6 +81,13 @@ class Event:
         self.total_iters = 0
         self.skip_iter = 10
         self.reader_records = {'max': 0, 'min': float('inf'), 'total': 0}
+        self.reader_stage_averagers = {
+            stage: TimeAverager() for stage in READER_STAGES
+        }
+        self.reader_stage_records = {
+            stage: {'max': 0, 'min': float('inf'), 'total': 0}
+            for stage in READER_STAGES
+        }
         self.batch_records = {'max': 0, 'min': float('inf'), 'total': 0}
         self.speed_records = {'max': 0, 'min': float('inf')}
         self.reader = None
@@ -68,11 +102,21 @@ class Event:
     def reset(self):
         self.reader_cost_averager.reset()
         self.batch_cost_averager.reset()
+        for averager in self.reader_stage_averagers.values():
+            averager.reset()
 
-    def record_reader(self, usetime):
+    def record_reader(self, usetime, stages=None):
         self.reader_cost_averager.record(usetime)
         if self.total_iters >= self.skip_iter:
             self._update_records(usetime, self.reader_records)
+        if stages is None:
+            return
+        for stage, stage_time in stages.items():
+            self.reader_stage_averagers[stage].record(stage_time)
+            if self.total_iters >= self.skip_iter:
+                self._update_records(
+                    stage_time, self.reader_stage_records[stage]
+                )
 
     def record_batch(self, usetime, num_samples=None):
         if num_samples is None:
@@ -101,6 +145,12 @@ class Event:
     def reader_average(self):
         return self.reader_cost_averager.get_average()
 
+    def reader_stages_average(self):
+        return {
+            stage: averager.get_average()
+            for stage, averager in self.reader_stage_averagers.items()
+        }
+
     def batch_average(self):
         return self.batch_cost_averager.get_average()
 
@@ -141,9 +191,20 @@ class Event:
             'min': self.speed_records['min'],
             'avg': speed_avg,
         }
+        # the stages are not recorded for the readers other than DataLoader
+        reader_stages_summary = {
+            stage: {
+                'max': records['max'],
+                'min': records['min'],
+                'avg': records['total'] / float(self.total_iters),
+            }
+            for stage, records in self.reader_stage_records.items()
+            if records['total'] > 0
+        }
         reader_ratio = (reader_avg / batch_avg) * 100
         summary = {
             'reader_summary': reader_summary,
+            'reader_stages_summary': reader_stages_summary,
             'batch_summary': batch_summary,
             'ips_summary': ips_summary,
             'reader_ratio': reader_ratio,
@@ -205,9 +266,10 @@ class TimerHook(Hook):
 
     def after_reader(self, benchmark):
         """
-        Record the cost of dataloader for the current step. Since the skipped steps
-        are 10, it will update the maximum, minimum and the total time from the step
-        11 to the current step. This function will be called at the end of `next`
+        Record the cost of dataloader for the current step, and its stages
+        reported by the dataloader. Since the skipped steps are 10, it will
+        update the maximum, minimum and the total time from the step 11 to the
+        current step. This function will be called at the end of `next`
         method in `_DataLoaderIterMultiProcess` or `_DataLoaderIterSingleProcess`.
 
         """
@@ -219,7 +281,9 @@ class TimerHook(Hook):
             or (reader_cost == 0)
         ):
             return
-        benchmark.current_event.record_reader(reader_cost)
+        benchmark.current_event.record_reader(
+            reader_cost, benchmark.reader_stages
+        )
 
     def after_step(self, benchmark):
         """
@@ -279,6 +343,11 @@ class TimerHook(Hook):
         # if DataLoader is not called, reader_summary is unnecessary.
         if summary['reader_summary']['avg'] != 0:
             self._print_stats('reader_cost', summary['reader_summary'])
+            for stage in READER_STAGES:
+                if stage in summary['reader_stages_summary']:
+                    self._print_stats(
+                        '- ' + stage, summary['reader_stages_summary'][stage]
+                    )
         self._print_stats('batch_cost', summary['batch_summary'])
         self._print_stats('ips', summary['ips_summary'])
 
@@ -356,6 +425,9 @@ class Benchmark:
 
     def __init__(self):
         self.num_samples = None
+        # the stages of the reader cost of the current step, see
+        # `split_reader_cost`, None if they are not reported by the reader
+        self.reader_stages = None
         self.hooks = OrderedDict(timer_hook=TimerHook())
         self.current_event = None
         self.events = Stack()
@@ -403,7 +475,8 @@ class Benchmark:
         for hook in self.hooks.values():
             hook.before_reader(self)
 
-    def after_reader(self):
+    def after_reader(self, reader_stages=None):
+        self.reader_stages = reader_stages
         for hook in self.hooks.values():
             hook.after_reader(self)
 
@@ -15,6 +15,7 @@
 import copy
 
 _FLOPS_COMPUTE_FUNC_MAP = {}
+_MEMORY_COMPUTE_FUNC_MAP = {}
 
 
 def prod(s):
@@ -24,6 +25,17 @@ def prod(s):
     return p
 
 
+def _shape(input_shapes, *names):
+    # The static operators record their inputs by the capitalized names of
+    # the operator definition, e.g. X, while the dygraph apis record them by
+    # the lower case names of the api, e.g. x, so try all the names.
+    for name in names:
+        shapes = input_shapes.get(name)
+        if shapes:
+            return shapes[0]
+    raise KeyError(f"None of the inputs {names} is found.")
+
+
 def flops(op_type: str, input_shapes: dict, attrs: dict) -> int:
     """
     count FLOPs for operation.
@@ -61,6 +73,48 @@ def register_flops(op_type):
     return register
 
 
+def memory_access(op_type: str, input_shapes: dict, attrs: dict) -> int:
+    """
+    count the elements read and written by operation.
+
+    Args:
+        op_type (str): the type of operation.
+        input_shapes (dict): the shapes of inputs.
+        attrs (dict): the attributes of the operation.
+
+    Returns:
+        the total number of the elements read and written by the operation.
+        The operations not registered read their inputs and write an output
+        as large as their largest input.
+    """
+
+    func = _MEMORY_COMPUTE_FUNC_MAP.get(op_type, _default_memory_access)
+    try:
+        return func(input_shapes, attrs)
+    except Exception as e:
+        return 0
+
+
+def register_memory_access(op_type):
+    """
+    register memory access computation function for operation.
+    """
+
+    def register(func):
+        global _MEMORY_COMPUTE_FUNC_MAP
+        _MEMORY_COMPUTE_FUNC_MAP[op_type] = func
+        return func
+
+    return register
+
+
+def _default_memory_access(input_shapes, attrs):
+    numels = [
+        prod(shape) for shapes in input_shapes.values() for shape in shapes
+    ]
+    return sum(numels) + max(numels, default=0)
+
+
 @register_flops("c_embedding")
 def _c_embedding_flops(input_shapes, attrs):
     """FLOPs computation for c_embedding op.
@@ -82,11 +136,11 @@ def _conv2d_flops(input_shapes, attrs):
 
     bias = (
         input_shapes.get('Bias')[0]
-        if len(input_shapes.get('Bias')) > 0
+        if len(input_shapes.get('Bias', [])) > 0
         else None
     )
-    input = input_shapes.get('Input')[0]
-    weight = input_shapes.get('Filter')[0]
+    input = _shape(input_shapes, 'Input', 'input')
+    weight = _shape(input_shapes, 'Filter', 'filter')
 
     padding = attrs.get('paddings')
     stride = attrs.get('strides')
@@ -159,8 +213,8 @@ def _dropout_flops(input_shapes, attrs):
 
 
 def _elementwise_flops_compute(input_shapes, attrs):
-    input_x = input_shapes.get("X")[0]
-    input_y = input_shapes.get("Y")[0]
+    input_x = _shape(input_shapes, "X", "x")
+    input_y = _shape(input_shapes, "Y", "y")
     dim_x = len(input_x)
     dim_y = len(input_y)
     dim_output = max(dim_x, dim_y)
@@ -208,13 +262,57 @@ def _elementwise_div_flops(input_shapes, attrs):
     return _elementwise_flops_compute(input_shapes, attrs)
 
 
+@register_flops("add")
+@register_flops("subtract")
+@register_flops("multiply")
+@register_flops("divide")
+@register_flops("maximum")
+@register_flops("minimum")
+@register_flops("elementwise_sub")
+@register_flops("elementwise_max")
+@register_flops("elementwise_min")
+def _elementwise_binary_flops(input_shapes, attrs):
+    """FLOPs computation for the other elementwise binary ops.
+    For add/subtract/multiply/divide/maximum/minimum(input,other), and the
+    elementwise_sub/elementwise_max/elementwise_min ops:
+        equation: flops = numel of the broadcast output
+    """
+    return _elementwise_flops_compute(input_shapes, attrs)
+
+
+@register_memory_access("add")
+@register_memory_access("subtract")
+@register_memory_access("multiply")
+@register_memory_access("divide")
+@register_memory_access("maximum")
+@register_memory_access("minimum")
+@register_memory_access("elementwise_add")
+@register_memory_access("elementwise_sub")
+@register_memory_access("elementwise_mul")
+@register_memory_access("elementwise_div")
+@register_memory_access("elementwise_max")
+@register_memory_access("elementwise_min")
+def _elementwise_memory_access(input_shapes, attrs):
+    """Memory access computation for elementwise binary ops.
+    For elementwise(input,other):
+        equation: elements = numel(input) + numel(other) + numel(broadcast output)
+    """
+    input_x = _shape(input_shapes, "X", "x")
+    input_y = _shape(input_shapes, "Y", "y")
+    return (
+        prod(input_x)
+        + prod(input_y)
+        + _elementwise_flops_compute(input_shapes, attrs)
+    )
+
+
 @register_flops("gelu")
 def _gelu_flops(input_shapes, attrs):
     """FLOPs computation for gelu op.
     For gelu(input):
         equation: flops = 5 * (numel)total number of elements in the input tensor.
     """
-    input = input_shapes.get('X')[0]
+    input = _shape(input_shapes, 'X', 'x')
     return prod(input) * 5
 
 
@@ -226,7 +324,7 @@ def _layer_norm_flops(input_shapes, attrs):
         1): WITHOUT epsilon flops = 7 * (numel)total number of elements in the input tensor.
         2): WITH epsilon flops = 8 * (numel)total number of elements in the input tensor.
     """
-    input = input_shapes.get('X')[0]
+    input = _shape(input_shapes, 'X', 'x')
     flops = prod(input) * 7
     if attrs.get('epsilon'):
         flops += prod(input)
@@ -281,8 +379,8 @@ def _matmul_v2_flops(input_shapes, attrs):
         shape_of_output = [dim1, dim2 ... max(dim(n-m), odim(n-m)), max(dim(n-m+1), odim(n-m+1))...dim_n_1, dim_m]
         equation: flops = 2 * numel(outputs) * dim_n
     """
-    x_shape = copy.deepcopy(input_shapes.get('X')[0])
-    y_shape = copy.deepcopy(input_shapes.get('Y')[0])
+    x_shape = copy.deepcopy(_shape(input_shapes, 'X', 'x'))
+    y_shape = copy.deepcopy(_shape(input_shapes, 'Y', 'y'))
     if attrs.get('trans_x'):
         x_shape[-1], x_shape[-2] = x_shape[-2], x_shape[-1]
     if attrs.get('trans_y'):
@@ -305,7 +403,7 @@ def _relu_class_flops(input_shapes, attrs):
     For elu/leaky_relu/prelu/relu/relu6/silu (input):
         equation: flops = (numel)total number of elements in the input tensor.
     """
-    input = input_shapes.get('X')[0]
+    input = _shape(input_shapes, 'X', 'x')
     return prod(input)
 
 
@@ -354,7 +452,7 @@ def _softmax_flops(input_shapes, attrs):
     For softmax(input):
         equation: flops = 3 * (numel)total number of elements in the input tensor.
     """
-    input = input_shapes.get('X')[0]
+    input = _shape(input_shapes, 'X', 'x')
     return prod(input) * 3
 
 
@@ -373,5 +471,175 @@ def _pool_flops(input_shapes, attrs):
     For pool(input):
         equation: flops = (numel)total number of elements in the input tensor.
     """
-    input = input_shapes.get('X')[0]
+    input = _shape(input_shapes, 'X', 'x')
     return prod(input)
+
+
+@register_flops("sigmoid")
+@register_flops("tanh")
+@register_flops("exp")
+@register_flops("sqrt")
+@register_flops("rsqrt")
+@register_flops("square")
+@register_flops("scale")
+@register_flops("swish")
+@register_flops("hardswish")
+def _unary_flops(input_shapes, attrs):
+    """FLOPs computation for elementwise unary ops.
+    For sigmoid/tanh/exp/sqrt/rsqrt/square/scale/swish/hardswish(input):
+        equation: flops = (numel)total number of elements in the input tensor.
+    """
+    input = _shape(input_shapes, 'X', 'x')
+    return prod(input)
+
+
+@register_flops("embedding")
+@register_flops("lookup_table_v2")
+def _embedding_flops(input_shapes, attrs):
+    """FLOPs computation for embedding op.
+    For embedding(input,weight):
+        equation: flops = 0
+    """
+    return 0
+
+
+@register_memory_access("embedding")
+@register_memory_access("lookup_table_v2")
+@register_memory_access("c_embedding")
+def _embedding_memory_access(input_shapes, attrs):
+    """Memory access computation for embedding op.
+    For embedding(input,weight):
+        only the rows of the ids in input are read from weight
+        equation: elements = numel(input) + 2 * numel(input) * embedding_dim
+    """
+    ids = _shape(input_shapes, 'Ids', 'x')
+    weight = _shape(input_shapes, 'W', 'weight')
+    return prod(ids) + 2 * prod(ids) * weight[-1]
+
+
+def _matmul_dims(input_shapes, attrs):
+    # the numel of the broadcast batch dims, M, K and N of a matmul
+    x_shape = copy.deepcopy(_shape(input_shapes, 'X', 'x'))
+    y_shape = copy.deepcopy(_shape(input_shapes, 'Y', 'y'))
+    if len(x_shape) == 1:
+        x_shape = [1] + x_shape
+    if len(y_shape) == 1:
+        y_shape = y_shape + [1]
+    if (
+        attrs.get('transpose_X')
+        or attrs.get('transpose_x')
+        or attrs.get('trans_x')
+    ):
+        x_shape[-1], x_shape[-2] = x_shape[-2], x_shape[-1]
+    if (
+        attrs.get('transpose_Y')
+        or attrs.get('transpose_y')
+        or attrs.get('trans_y')
+    ):
+        y_shape[-1], y_shape[-2] = y_shape[-2], y_shape[-1]
+    dim_x = len(x_shape)
+    dim_y = len(y_shape)
+    batch = 1
+    for idx in range(max(dim_x, dim_y), 2, -1):
+        x_idx = x_shape[dim_x - idx] if idx <= dim_x else 1
+        y_idx = y_shape[dim_y - idx] if idx <= dim_y else 1
+        batch *= max(x_idx, y_idx)
+    return batch, x_shape[-2], x_shape[-1], y_shape[-1]
+
+
+@register_memory_access("matmul")
+@register_memory_access("matmul_v2")
+def _matmul_memory_access(input_shapes, attrs):
+    """Memory access computation for matmul op.
+    For matmul(input,other):
+        equation: elements = numel(input) + numel(other) + numel(output)
+    """
+    batch, m, k, n = _matmul_dims(input_shapes, attrs)
+    x_shape = _shape(input_shapes, 'X', 'x')
+    y_shape = _shape(input_shapes, 'Y', 'y')
+    return prod(x_shape) + prod(y_shape) + batch * m * n
+
+
+@register_flops("flash_attn")
+@register_flops("memory_efficient_attention")
+def _attention_flops(input_shapes, attrs):
+    """FLOPs computation for flash_attn and memory_efficient_attention ops.
+    For flash_attn(q,k,v):
+        shape_of_q = [batch_size, seqlen_q, num_heads, head_dim]
+        shape_of_k = [batch_size, seqlen_k, num_heads_k, head_dim]
+        scores = batch_size * num_heads * seqlen_q * seqlen_k
+        equation: flops = 2 * 2 * scores * head_dim + 3 * scores
+        which are the matmuls of q and k, of the probabilities and v, and the
+        softmax, the flops is halved for the causal attention.
+    """
+    q = _shape(input_shapes, 'q', 'query')
+    k = _shape(input_shapes, 'k', 'key')
+    batch_size, seqlen_q, num_heads, head_dim = q
+    scores = batch_size * num_heads * seqlen_q * k[1]
+    flops = 4 * scores * head_dim + 3 * scores
+    if attrs.get('causal'):
+        flops //= 2
+    return flops
+
+
+@register_memory_access("flash_attn")
+@register_memory_access("memory_efficient_attention")
+def _attention_memory_access(input_shapes, attrs):
+    """Memory access computation for flash_attn and memory_efficient_attention ops.
+    For flash_attn(q,k,v):
+        the scores are not written to memory
+        equation: elements = 2 * numel(q) + numel(k) + numel(v)
+    """
+    q = _shape(input_shapes, 'q', 'query')
+    k = _shape(input_shapes, 'k', 'key')
+    v = _shape(input_shapes, 'v', 'value')
+    return 2 * prod(q) + prod(k) + prod(v)
+
+
+# the elementwise flops of the gates per hidden unit in a step of rnn
+_RNN_GATE_FLOPS = {'LSTM': 9, 'GRU': 8, 'RNN_TANH': 1, 'RNN_RELU': 1}
+
+
+@register_flops("rnn")
+def _rnn_flops(input_shapes, attrs):
+    """FLOPs computation for rnn op.
+    For rnn(input,pre_state,weight_list):
+        shape_of_input = [seq_len, batch_size, input_size]
+        weight_list has the weights [gate_size, input_size] and
+        [gate_size, hidden_size] and the biases [gate_size] of every layer
+        and direction, gate_size = num_gates * hidden_size
+        gate_flops = 9 for LSTM, 8 for GRU and 1 for RNN_TANH and RNN_RELU
+        equation: flops = seq_len * batch_size * (2 * numel(weights)
+                    + numel(biases) + gate_flops * hidden_size * num_layers * num_directions)
+    """
+    input = _shape(input_shapes, 'Input', 'x')
+    weights = input_shapes.get('WeightList') or input_shapes.get('weight_list')
+    seq_len, batch_size = input[0], input[1]
+    num_directions = 2 if attrs.get('is_bidirec') else 1
+    matmul_flops = 0
+    for weight in weights:
+        matmul_flops += (2 if len(weight) > 1 else 1) * prod(weight)
+    gate_flops = (
+        _RNN_GATE_FLOPS[attrs.get('mode')]
+        * attrs.get('hidden_size')
+        * attrs.get('num_layers')
+        * num_directions
+    )
+    return seq_len * batch_size * (matmul_flops + gate_flops)
+
+
+@register_memory_access("reshape")
+@register_memory_access("reshape2")
+@register_memory_access("squeeze")
+@register_memory_access("squeeze2")
+@register_memory_access("unsqueeze")
+@register_memory_access("unsqueeze2")
+@register_memory_access("flatten")
+@register_memory_access("flatten_contiguous_range")
+def _view_memory_access(input_shapes, attrs):
+    """Memory access computation for reshape_like ops.
+    For reshape/squeeze/unsqueeze/flatten(input):
+        the output shares the memory of the input
+        equation: elements = 0
+    """
+    return 0
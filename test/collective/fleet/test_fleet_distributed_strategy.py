@@ -114,6 +114,24 @@ class TestStrategyConfig(unittest.TestCase):
             strategy.sync_param_name, ["embedding", "layer_norm", ".w", ".b_"]
         )
 
+    def test_hybrid_parallel_pp_configs(self):
+        strategy = paddle.distributed.fleet.DistributedStrategy()
+        strategy.hybrid_configs = {
+            "dp_degree": 2,
+            "mp_degree": 1,
+            "pp_degree": 4,
+            "pp_configs": {
+                "dp_comm_overlap": True,
+                "comm_buffer_reorder": True,
+            },
+        }
+        self.assertEqual(
+            strategy.hybrid_configs["pp_configs"].dp_comm_overlap, True
+        )
+        self.assertEqual(
+            strategy.hybrid_configs["pp_configs"].comm_buffer_reorder, True
+        )
+
     def test_hybrid_parallel_configs_order(self):
         strategy = paddle.distributed.fleet.DistributedStrategy()
         strategy.hybrid_configs = {
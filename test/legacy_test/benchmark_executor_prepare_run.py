@@ -0,0 +1,68 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Benchmark the latency of Executor.prepare_run against Executor.run on a
+# small program, e.g.
+#   python benchmark_executor_prepare_run.py --iters 1000
+
+import argparse
+import time
+
+import numpy as np
+
+import paddle
+from paddle import fluid
+
+
+def timeit(name, func, iters):
+    func()
+    start = time.perf_counter()
+    for _ in range(iters):
+        func()
+    print(f'{name:<24}{(time.perf_counter() - start) / iters * 1e6:10.1f} us')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iters', type=int, default=1000)
+    parser.add_argument('--batch_size', type=int, default=1)
+    args = parser.parse_args()
+
+    paddle.enable_static()
+    main_program = fluid.Program()
+    startup_program = fluid.Program()
+    with fluid.program_guard(main_program, startup_program):
+        x = paddle.static.data(name='x', shape=[-1, 8], dtype='float32')
+        y = paddle.static.data(name='y', shape=[-1, 8], dtype='float32')
+        out = paddle.add(x, y)
+    exe = fluid.Executor(paddle.CPUPlace())
+    exe.run(startup_program)
+
+    feed = {
+        'x': np.random.random((args.batch_size, 8)).astype('float32'),
+        'y': np.random.random((args.batch_size, 8)).astype('float32'),
+    }
+    prepared = exe.prepare_run(main_program, feed=feed, fetch_list=[out])
+    timeit('Executor.prepare_run', lambda: prepared.run(feed), args.iters)
+    timeit(
+        'Executor.run',
+        lambda: exe.run(
+            main_program, feed=feed, fetch_list=[out], use_program_cache=True
+        ),
+        args.iters,
+    )
+
+
+if __name__ == '__main__':
+    main()
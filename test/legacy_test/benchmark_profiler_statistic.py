@@ -0,0 +1,67 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Benchmark the summaries of the profiler on a synthetic trace, e.g.
+#   python benchmark_profiler_statistic.py --num_events 1000000
+
+import argparse
+import time
+
+from test_profiler_statistic import gen_random_trees
+
+from paddle.profiler import profiler_statistic
+
+
+def count_events(trees):
+    num_events = 0
+    for nodes in profiler_statistic.traverse_tree(trees).values():
+        for node in nodes:
+            num_events += 1 + len(node.mem_node)
+            for runtime in node.runtime_node:
+                num_events += 1 + len(runtime.device_node)
+    return num_events
+
+
+def timeit(name, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print(f'{name:<24}{time.perf_counter() - start:10.3f} s')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num_events', type=int, default=1000000)
+    parser.add_argument('--num_threads', type=int, default=4)
+    args = parser.parse_args()
+
+    # every host node comes with about 3 runtime, device and memory nodes
+    trees = gen_random_trees(
+        0, args.num_threads, args.num_events // (4 * args.num_threads)
+    )
+    print(f'{count_events(trees)} events in {len(trees)} threads')
+
+    table = timeit('flatten_tree', profiler_statistic.flatten_tree, trees)
+    for summary in [
+        profiler_statistic.TimeRangeSummary(),
+        profiler_statistic.DistributedSummary(),
+        profiler_statistic.EventSummary(),
+        profiler_statistic.MemorySummary(),
+    ]:
+        timeit(type(summary).__name__, summary.parse, trees, table)
+    timeit('StatisticData', profiler_statistic.StatisticData, trees, {})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from paddle.distributed.communication import serialization_utils
+from paddle.distributed.communication.serialization_utils import (
+    _INLINE_SIZE,
+    _deserialize_object,
+    _pack_inline,
+    _parse_meta,
+    _serialize_object,
+    _split_buffers,
+    _unpack_inline,
+    convert_object_to_tensor,
+    convert_tensor_to_object,
+)
+
+
+class TestObjectSerialization(unittest.TestCase):
+    @unittest.skipIf(
+        sys.version_info < (3, 8), "out-of-band pickling needs python 3.8"
+    )
+    def test_out_of_band(self):
+        weight = np.random.random([256, 256]).astype('float32')
+        obj = {'weight': weight, 'step': 10, 'ids': np.arange(8)}
+        meta, buffers = _serialize_object(obj)
+        # only the large array is sent out-of-band
+        self.assertEqual([b.size for b in buffers], [weight.nbytes])
+        self.assertLess(meta.size, _INLINE_SIZE)
+
+        size, inlined = _unpack_inline(_pack_inline(meta))
+        self.assertEqual(size, meta.size)
+        payload, sizes = _parse_meta(inlined)
+        data = np.concatenate(buffers + [np.zeros([16], dtype=np.uint8)])
+        out = _deserialize_object(payload, _split_buffers(data, sizes))
+        np.testing.assert_array_equal(out['weight'], weight)
+        np.testing.assert_array_equal(out['ids'], obj['ids'])
+        self.assertEqual(out['step'], 10)
+        # the array is a view of the received buffer
+        self.assertTrue(np.shares_memory(out['weight'], data))
+
+    def test_large_meta(self):
+        obj = [str(i) for i in range(2000)]
+        meta, buffers = _serialize_object(obj)
+        self.assertEqual(buffers, [])
+        size, inlined = _unpack_inline(_pack_inline(meta))
+        self.assertEqual(size, meta.size)
+        self.assertIsNone(inlined)
+        self.assertEqual(_deserialize_object(_parse_meta(meta)[0], []), obj)
+
+    def test_in_band(self):
+        # the path of python 3.7, where pickle has no out-of-band buffers
+        weight = np.random.random([256, 256]).astype('float32')
+        obj = {'weight': weight, 'step': 10}
+        with mock.patch.object(serialization_utils, '_OUT_OF_BAND', False):
+            meta, buffers = _serialize_object(obj)
+            self.assertEqual(buffers, [])
+            self.assertGreater(meta.size, weight.nbytes)
+            size, inlined = _unpack_inline(_pack_inline(meta))
+            self.assertEqual(size, meta.size)
+            self.assertIsNone(inlined)
+            payload, sizes = _parse_meta(meta)
+            self.assertEqual(sizes, [])
+            out = _deserialize_object(payload, [])
+        np.testing.assert_array_equal(out['weight'], weight)
+        self.assertEqual(out['step'], 10)
+
+    def test_convert_tensor(self):
+        obj = {'foo': [1, 2, 3], 'bar': (4.0, 'x')}
+        tensor, size = convert_object_to_tensor(obj)
+        self.assertEqual(convert_tensor_to_object(tensor, size.item()), obj)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle.incubate.distributed.utils.io import DeltaCheckpointManager
+
+
+class SparseModel(paddle.nn.Layer):
+    def __init__(self):
+        super().__init__()
+        self.emb = paddle.nn.Embedding(10000, 16, sparse=True)
+        self.fc = paddle.nn.Linear(16, 1)
+
+    def forward(self, ids):
+        return self.fc(self.emb(ids)).mean()
+
+
+class TestDeltaCheckpoint(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'ckpt')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def train(self, model, opt, steps):
+        for _ in range(steps):
+            model(paddle.randint(0, 10000, [32])).backward()
+            opt.step()
+            opt.clear_grad()
+
+    def check_state_dict(self, loaded, expected):
+        for key, value in expected.items():
+            if isinstance(value, paddle.Tensor):
+                np.testing.assert_array_equal(
+                    loaded[key].numpy(), value.numpy()
+                )
+
+    def test_sparse_rows(self):
+        for opt_cls, kwargs in [
+            (paddle.optimizer.SGD, {}),
+            (paddle.optimizer.Adam, {'lazy_mode': True}),
+        ]:
+            path = os.path.join(self.temp_dir.name, opt_cls.__name__)
+            model = SparseModel()
+            opt = opt_cls(parameters=model.parameters(), **kwargs)
+            manager = DeltaCheckpointManager(path, max_deltas=3)
+            manager.watch(opt)
+
+            self.train(model, opt, 1)
+            full = manager.save(
+                {'model': model.state_dict(), 'opt': opt.state_dict()}
+            )
+            for step in range(3):
+                self.train(model, opt, 1)
+                delta = manager.save(
+                    {'model': model.state_dict(), 'opt': opt.state_dict()},
+                    step=step,
+                )
+                # only the rows looked up are written for the embedding
+                self.assertLess(delta * 10, full)
+
+            loaded = DeltaCheckpointManager(path).load()
+            self.check_state_dict(loaded['model'], model.state_dict())
+            self.check_state_dict(loaded['opt'], opt.state_dict())
+
+            # compacted into a new full checkpoint
+            self.train(model, opt, 1)
+            manager.save({'model': model.state_dict(), 'opt': opt.state_dict()})
+            self.assertEqual(
+                sorted(os.listdir(path)),
+                ['base-00000004.pdtc', 'manifest.json'],
+            )
+            manager.unwatch()
+
+    def test_unchanged_tensors(self):
+        model = SparseModel()
+        opt = paddle.optimizer.Adam(parameters=model.parameters())
+        # Adam without lazy_mode updates all the rows
+        manager = DeltaCheckpointManager(self.path)
+        manager.watch(opt)
+        self.train(model, opt, 1)
+        manager.save({'model': model.state_dict(), 'epoch': 0})
+        self.assertEqual(
+            manager.save({'model': model.state_dict(), 'epoch': 1}), 0
+        )
+        self.train(model, opt, 1)
+        self.assertGreater(
+            manager.save({'model': model.state_dict(), 'epoch': 2}),
+            model.emb.weight.numpy().nbytes,
+        )
+        loaded = manager.load(return_numpy=True)
+        self.assertEqual(loaded['epoch'], 2)
+        np.testing.assert_array_equal(
+            loaded['model']['emb.weight'], model.emb.weight.numpy()
+        )
+
+    def test_set_value(self):
+        model = SparseModel()
+        opt = paddle.optimizer.SGD(parameters=model.parameters())
+        manager = DeltaCheckpointManager(self.path)
+        manager.watch(opt)
+        manager.save({'model': model.state_dict()})
+        # set_value does not bump the inplace version of the tensors
+        weight = np.random.random([16, 1]).astype('float32')
+        model.fc.weight.set_value(weight)
+        self.assertEqual(
+            manager.save({'model': model.state_dict()}), weight.nbytes
+        )
+        # the rows changed out of the optimizer are found too
+        emb = model.emb.weight.numpy()
+        emb[[3, 7]] = 1.0
+        model.emb.weight.set_value(emb)
+        self.assertGreater(manager.save({'model': model.state_dict()}), 0)
+
+        loaded = DeltaCheckpointManager(self.path).load(return_numpy=True)
+        np.testing.assert_array_equal(loaded['model']['fc.weight'], weight)
+        np.testing.assert_array_equal(loaded['model']['emb.weight'], emb)
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            DeltaCheckpointManager(self.path).load()
+
+
+if __name__ == '__main__':
+    unittest.main()
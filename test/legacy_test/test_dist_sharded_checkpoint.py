@@ -0,0 +1,185 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import paddle
+from paddle.framework import clear_async_save_task_queue
+from paddle.framework.tensor_container import _save_tensor_container
+from paddle.incubate.distributed.utils.io import load, save, sharded_checkpoint
+from paddle.incubate.distributed.utils.io.sharded_checkpoint import (
+    _COMMIT_FILE,
+    _METADATA_FILE,
+    _SHARD_FILE,
+    _build_metadata,
+    _plan_writers,
+)
+
+
+class TestPlanWriters(unittest.TestCase):
+    def test_replicated_written_once(self):
+        # two data parallel ranks holding the same params, and a sharded
+        # optimizer state on each rank
+        params = {'w%d' % i: ('float32', [64, 64], None) for i in range(4)}
+        infos = [
+            dict(params, **{'moment_0': ('float32', [64, 64], None)}),
+            dict(params, **{'moment_1': ('float32', [64, 64], None)}),
+        ]
+        plan, merged = _plan_writers(infos)
+        self.assertEqual(len(plan), 6)
+        self.assertEqual(plan['moment_0'], {0: 0})
+        self.assertEqual(plan['moment_1'], {0: 1})
+        writers = [w[0] for w in plan.values()]
+        self.assertEqual([writers.count(r) for r in range(2)], [3, 3])
+        self.assertEqual(merged['w0'], ('float32', [64, 64], None, 1))
+
+    def test_split(self):
+        # mp=2 x dp=2, the slices are written by different ranks
+        infos = [{'w': ('float32', [8, 4], (1, r % 2, 2))} for r in range(4)]
+        plan, _ = _plan_writers(infos)
+        self.assertEqual(sorted(plan['w'].keys()), [0, 1])
+        self.assertEqual(plan['w'][0] % 2, 0)
+        self.assertEqual(plan['w'][1] % 2, 1)
+
+    def test_mismatch(self):
+        infos = [
+            {'w': ('float32', [2, 2], None)},
+            {'w': ('float32', [2, 3], None)},
+        ]
+        with self.assertRaises(ValueError):
+            _plan_writers(infos)
+        infos = [{'w': ('float32', [2, 2], (0, 0, 2))}]
+        with self.assertRaises(ValueError):
+            _plan_writers(infos)
+
+
+class TestShardedCheckpoint(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_save_load(self):
+        layer = paddle.nn.Linear(16, 32)
+        scheduler = paddle.optimizer.lr.StepDecay(0.1, step_size=2)
+        adam = paddle.optimizer.Adam(
+            learning_rate=scheduler, parameters=layer.parameters()
+        )
+        layer(paddle.rand([4, 16])).mean().backward()
+        adam.step()
+        state_dict = {'model': layer.state_dict(), 'opt': adam.state_dict()}
+        path = os.path.join(self.temp_dir.name, 'ckpt')
+
+        save(state_dict, path, sharded=True)
+        weight = layer.weight.numpy()
+        # training continues while the shard is being written
+        paddle.assign(paddle.zeros_like(layer.weight), layer.weight)
+        clear_async_save_task_queue()
+        self.assertTrue(os.path.exists(os.path.join(path, _COMMIT_FILE)))
+
+        load_dict = load(path)
+        np.testing.assert_array_equal(
+            load_dict['model']['weight'].numpy(), weight
+        )
+        self.assertEqual(
+            load_dict['opt']['LR_Scheduler'], state_dict['opt']['LR_Scheduler']
+        )
+        new_adam = paddle.optimizer.Adam(parameters=layer.parameters())
+        new_adam.set_state_dict(load_dict['opt'])
+
+        subset = load(path, keys=['model/bias'], return_numpy=True)
+        self.assertEqual(list(subset.keys()), ['model/bias'])
+        np.testing.assert_array_equal(subset['model/bias'], layer.bias.numpy())
+        self.assertEqual(len(load(path, keys=['model'])), 2)
+        with self.assertRaises(KeyError):
+            load(path, keys=['not_exist'])
+
+    def _save_mp(self, path, weight, bias, mp_degree):
+        # simulate the ranks of a model parallel job saving their slices
+        local_infos = []
+        shards = []
+        for r in range(mp_degree):
+            w = np.split(weight, mp_degree, axis=1)[r]
+            b = np.split(bias, mp_degree, axis=0)[r]
+            shards.append({'w': w, 'b': b})
+            local_infos.append(
+                {
+                    'w': ('float32', list(w.shape), (1, r, mp_degree)),
+                    'b': ('float32', list(b.shape), (0, r, mp_degree)),
+                }
+            )
+        plan, infos = _plan_writers(local_infos)
+        tree = {'w': {'__tensor__': 'w'}, 'b': {'__tensor__': 'b'}, 'step': 5}
+        metadata = _build_metadata([tree], plan, infos, mp_degree)
+        os.makedirs(path)
+        for r in range(mp_degree):
+            _save_tensor_container(
+                shards[r], os.path.join(path, _SHARD_FILE.format(r))
+            )
+        for name, obj in [(_METADATA_FILE, metadata), (_COMMIT_FILE, {})]:
+            with open(os.path.join(path, name), 'w') as f:
+                json.dump(obj, f)
+
+    def test_reshard(self):
+        weight = np.random.random([6, 8]).astype('float32')
+        bias = np.random.random([8]).astype('float32')
+        path = os.path.join(self.temp_dir.name, 'ckpt')
+        self._save_mp(path, weight, bias, 2)
+
+        # mp 2 -> 1
+        template = {'w': paddle.zeros([6, 8]), 'b': paddle.zeros([8])}
+        load_dict = load(path, state_dict=template, return_numpy=True)
+        np.testing.assert_array_equal(load_dict['w'], weight)
+        np.testing.assert_array_equal(load_dict['b'], bias)
+
+        # mp 2 -> 4, the split axes are inferred from the shapes
+        for r in range(4):
+            template = {
+                'w': paddle.zeros([6, 2]),
+                'b': paddle.zeros([2]),
+                'step': 0,
+            }
+            with mock.patch.object(
+                sharded_checkpoint, '_mp_rank_and_degree', return_value=(r, 4)
+            ):
+                load_dict = load(path, state_dict=template)
+            np.testing.assert_array_equal(
+                load_dict['w'].numpy(), weight[:, 2 * r : 2 * r + 2]
+            )
+            np.testing.assert_array_equal(
+                load_dict['b'].numpy(), bias[2 * r : 2 * r + 2]
+            )
+            self.assertEqual(load_dict['step'], 5)
+
+        with self.assertRaises(ValueError):
+            load(path, state_dict={'w': paddle.zeros([6, 3])})
+
+    def test_not_committed(self):
+        path = os.path.join(self.temp_dir.name, 'ckpt')
+        save({'x': paddle.rand([3])}, path, sharded=True, async_save=False)
+        os.remove(os.path.join(path, _COMMIT_FILE))
+        with self.assertRaises(ValueError):
+            load(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
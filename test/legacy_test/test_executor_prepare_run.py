@@ -0,0 +1,98 @@
+#   Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle import fluid
+
+paddle.enable_static()
+
+
+class TestExecutorPrepareRun(unittest.TestCase):
+    def setUp(self):
+        self.main_program = fluid.Program()
+        self.startup_program = fluid.Program()
+        with fluid.program_guard(self.main_program, self.startup_program):
+            x = paddle.static.data(name='x', shape=[-1, 8], dtype='float32')
+            y = paddle.static.data(name='y', shape=[-1, 8], dtype='float32')
+            self.out = paddle.add(x, y)
+        self.place = paddle.CPUPlace()
+        self.exe = fluid.Executor(self.place)
+        self.exe.run(self.startup_program)
+
+    def test_prepared_run(self):
+        x_np = np.random.random((4, 8)).astype('float32')
+        y_np = np.random.random((4, 8)).astype('float32')
+        prepared = self.exe.prepare_run(
+            self.main_program,
+            feed={'x': x_np, 'y': y_np},
+            fetch_list=[self.out],
+        )
+        for batch_size in [4, 2, 4]:
+            x_np = np.random.random((batch_size, 8)).astype('float32')
+            y_np = np.random.random((batch_size, 8)).astype('float32')
+            (res,) = prepared.run({'x': x_np, 'y': y_np})
+            np.testing.assert_allclose(res, x_np + y_np, rtol=1e-05)
+
+    def test_fallback_conversion(self):
+        x_np = np.random.random((4, 8)).astype('float32')
+        y_np = np.random.random((4, 8)).astype('float32')
+        prepared = self.exe.prepare_run(
+            self.main_program,
+            feed={'x': x_np, 'y': y_np},
+            fetch_list=[self.out],
+        )
+        # non-contiguous arrays and lists are converted as Executor.run does
+        x_np = np.random.random((8, 4)).astype('float32').T
+        y_list = np.random.random((4, 8)).astype('float32').tolist()
+        (res,) = prepared.run({'x': x_np, 'y': y_list})
+        np.testing.assert_allclose(res, x_np + np.array(y_list), rtol=1e-05)
+
+    def test_shape_check(self):
+        x_np = np.random.random((4, 8)).astype('float32')
+        y_np = np.random.random((4, 8)).astype('float32')
+        prepared = self.exe.prepare_run(
+            self.main_program,
+            feed={'x': x_np, 'y': y_np},
+            fetch_list=[self.out],
+        )
+        with self.assertRaises(ValueError):
+            prepared.run(
+                {'x': np.ones((4, 3), dtype='float32'), 'y': y_np},
+            )
+
+    def test_sequential_run(self):
+        build_strategy = paddle.static.BuildStrategy()
+        build_strategy.sequential_run = True
+        program = paddle.static.CompiledProgram(
+            self.main_program, build_strategy=build_strategy
+        )
+        flag = 'FLAGS_new_executor_sequential_run'
+        stored = paddle.get_flags(flag)[flag]
+        x_np = np.random.random((4, 8)).astype('float32')
+        y_np = np.random.random((4, 8)).astype('float32')
+        prepared = self.exe.prepare_run(
+            program, feed={'x': x_np, 'y': y_np}, fetch_list=[self.out]
+        )
+        (res,) = prepared.run({'x': x_np, 'y': y_np})
+        np.testing.assert_allclose(res, x_np + y_np, rtol=1e-05)
+        # the flags are set only while running as Executor.run does
+        self.assertEqual(paddle.get_flags(flag)[flag], stored)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#   Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle import fluid
+from paddle.fluid.executor import _LRUCache
+
+paddle.enable_static()
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction_order(self):
+        evicted = []
+        cache = _LRUCache(
+            2, on_evict=lambda key, value: evicted.append(key), sizeof=len
+        )
+        cache.put('a', [1])
+        cache.put('b', [1, 2])
+        self.assertEqual(cache.get('a'), [1])
+        cache.put('c', [1, 2, 3])
+        self.assertEqual(evicted, ['b'])
+        self.assertNotIn('b', cache)
+        self.assertIsNone(cache.get('b'))
+
+        stats = cache.stats()
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['bytes'], 4)
+
+    def test_evict_if_and_clear(self):
+        cache = _LRUCache()
+        for i in range(10):
+            cache.put((i % 2, i), i)
+        self.assertEqual(cache.evict_if(lambda key: key[0] == 0), 5)
+        self.assertEqual(len(cache), 5)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+class TestExecutorCacheInfo(unittest.TestCase):
+    def build_program(self):
+        main_program = fluid.Program()
+        startup_program = fluid.Program()
+        with fluid.program_guard(main_program, startup_program):
+            x = paddle.static.data(name='x', shape=[-1, 4], dtype='float32')
+            out = paddle.scale(x, scale=2.0)
+        return main_program, out
+
+    def test_cache_info_and_clear(self):
+        exe = fluid.Executor(paddle.CPUPlace())
+        x_np = np.random.random((2, 4)).astype('float32')
+        programs = []
+        for _ in range(3):
+            program, out = self.build_program()
+            programs.append(program)
+            for _ in range(2):
+                (res,) = exe.run(program, feed={'x': x_np}, fetch_list=[out])
+                np.testing.assert_allclose(res, x_np * 2.0, rtol=1e-05)
+
+        info = exe.cache_info()['executor']
+        self.assertEqual(info['size'], 3)
+        self.assertEqual(info['hits'], 3)
+        self.assertEqual(info['misses'], 3)
+        self.assertGreater(info['bytes'], 0)
+
+        self.assertEqual(exe.clear_cache(programs[0]), 1)
+        self.assertEqual(exe.cache_info()['executor']['size'], 2)
+        exe.clear_cache()
+        self.assertEqual(exe.cache_info()['executor']['size'], 0)
+
+    def test_capacity_env(self):
+        os.environ['PADDLE_EXECUTOR_PROGRAM_CACHE_CAPACITY'] = '4'
+        try:
+            exe = fluid.Executor(paddle.CPUPlace())
+        finally:
+            del os.environ['PADDLE_EXECUTOR_PROGRAM_CACHE_CAPACITY']
+        self.assertEqual(exe.program_caches.capacity, 4)
+        self.assertEqual(fluid.Executor().program_caches.capacity, 128)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,6 +18,7 @@ import numpy as np
 
 import paddle
 from paddle import fluid
+from paddle.fluid.executor import _get_fleet_executor_carrier_id
 
 paddle.enable_static()
 
@@ -42,6 +43,17 @@ class TestFleetExecutor(unittest.TestCase):
         return fleet_opt
 
     def run_fleet_executor(self, place, x_data, y_data):
+        exe, program, fetch_list = self.build_fleet_program(
+            place, x_data, y_data
+        )
+        res = exe.run(
+            program,
+            feed={'x': x_data, 'y': y_data},
+            fetch_list=fetch_list,
+        )
+        return res
+
+    def build_fleet_program(self, place, x_data, y_data):
         exe = paddle.static.Executor(place)
         empty_program = paddle.static.Program()
         with fluid.program_guard(empty_program, empty_program):
@@ -74,12 +86,7 @@ class TestFleetExecutor(unittest.TestCase):
             "fleet_opt": self.fake_fleet_opt(),
             "section_program": empty_program,
         }
-        res = exe.run(
-            empty_program,
-            feed={'x': x_data, 'y': y_data},
-            fetch_list=[z.name, a.name],
-        )
-        return res
+        return exe, empty_program, [z.name, a.name]
 
     def test_executor_on_single_device(self):
         if fluid.is_compiled_with_cuda():
@@ -92,6 +99,31 @@ class TestFleetExecutor(unittest.TestCase):
             np.testing.assert_allclose(res[0], z_data, rtol=1e-05)
             np.testing.assert_allclose(res[1], a_data, rtol=1e-05)
 
+    def test_cached_run_on_single_device(self):
+        if fluid.is_compiled_with_cuda():
+            shape = (100, 32)
+            x_data = np.random.rand(*shape)
+            y_data = np.random.rand(*shape)
+            exe, program, fetch_list = self.build_fleet_program(
+                fluid.CUDAPlace(0), x_data, y_data
+            )
+            # the second run reuses the carrier of the cached program
+            for _ in range(2):
+                res = exe.run(
+                    program,
+                    feed={'x': x_data, 'y': y_data},
+                    fetch_list=fetch_list,
+                )
+                np.testing.assert_allclose(res[0], x_data + y_data, rtol=1e-05)
+
+    def test_carrier_id(self):
+        cache_key = (1, -2, 'x', 'y')
+        carrier_id = _get_fleet_executor_carrier_id(cache_key)
+        self.assertIsInstance(carrier_id, str)
+        self.assertNotEqual(
+            carrier_id, _get_fleet_executor_carrier_id((1, -2, 'x', 'z'))
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,274 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from paddle.distributed.fleet.utils.fs import (
+    FSFileExistsError,
+    FSFileNotExistsError,
+    WebHDFSClient,
+)
+
+
+class WebHDFSHandler(BaseHTTPRequestHandler):
+    """A WebHDFS stand-in that serves a local directory."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.stats['connections'] += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, obj=None, data=None, headers=None):
+        if obj is not None:
+            data = json.dumps(obj).encode()
+        data = data or b''
+        self.send_response(code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_found(self, path):
+        self._reply(
+            404,
+            {
+                'RemoteException': {
+                    'exception': 'FileNotFoundException',
+                    'message': f'File does not exist: {path}',
+                }
+            },
+        )
+
+    def _status(self, local, name):
+        st = os.stat(local)
+        is_dir = os.path.isdir(local)
+        return {
+            'pathSuffix': name,
+            'type': 'DIRECTORY' if is_dir else 'FILE',
+            'length': 0 if is_dir else st.st_size,
+        }
+
+    def _handle(self, method):
+        url = urllib.parse.urlparse(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        path = urllib.parse.unquote(url.path[len('/webhdfs/v1') :])
+        local = os.path.join(self.server.root, path.lstrip('/'))
+        op = query['op']
+        self.server.stats[op] += 1
+        body = b''
+        if 'Content-Length' in self.headers:
+            body = self.rfile.read(int(self.headers['Content-Length']))
+
+        if op in ('CREATE', 'OPEN') and 'datanode' not in query:
+            location = f'{self.path}&datanode=true'
+            self._reply(307, headers={'Location': location})
+        elif op == 'GETFILESTATUS':
+            if not os.path.exists(local):
+                return self._not_found(path)
+            self._reply(200, {'FileStatus': self._status(local, '')})
+        elif op == 'LISTSTATUS':
+            if not os.path.exists(local):
+                return self._not_found(path)
+            statuses = [
+                self._status(os.path.join(local, name), name)
+                for name in sorted(os.listdir(local))
+            ]
+            self._reply(200, {'FileStatuses': {'FileStatus': statuses}})
+        elif op == 'MKDIRS':
+            os.makedirs(local, exist_ok=True)
+            self._reply(200, {'boolean': True})
+        elif op == 'CREATE':
+            if os.path.exists(local) and query['overwrite'] != 'true':
+                return self._reply(
+                    403,
+                    {
+                        'RemoteException': {
+                            'exception': 'FileAlreadyExistsException'
+                        }
+                    },
+                )
+            os.makedirs(os.path.dirname(local), exist_ok=True)
+            with open(local, 'wb') as f:
+                f.write(body)
+            self._reply(201)
+        elif op == 'OPEN':
+            if not os.path.isfile(local):
+                return self._not_found(path)
+            with open(local, 'rb') as f:
+                f.seek(int(query.get('offset', 0)))
+                data = f.read(int(query.get('length', -1)))
+            self._reply(200, data=data)
+        elif op == 'CONCAT':
+            with open(local, 'ab') as f:
+                for source in query['sources'].split(','):
+                    source = os.path.join(self.server.root, source.lstrip('/'))
+                    with open(source, 'rb') as src:
+                        f.write(src.read())
+                    os.remove(source)
+            self._reply(200)
+        elif op == 'RENAME':
+            dst = os.path.join(
+                self.server.root, query['destination'].lstrip('/')
+            )
+            if not os.path.exists(local) or os.path.exists(dst):
+                return self._reply(200, {'boolean': False})
+            os.rename(local, dst)
+            self._reply(200, {'boolean': True})
+        elif op == 'DELETE':
+            if os.path.isdir(local):
+                shutil.rmtree(local)
+            elif os.path.exists(local):
+                os.remove(local)
+            self._reply(200, {'boolean': True})
+        else:
+            self._reply(400)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+class TestWebHDFSClient(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.remote_root = os.path.join(self.temp_dir.name, 'remote')
+        self.local_root = os.path.join(self.temp_dir.name, 'local')
+        os.makedirs(self.remote_root)
+        os.makedirs(self.local_root)
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), WebHDFSHandler)
+        self.server.daemon_threads = True
+        self.server.root = self.remote_root
+        self.server.stats = collections.Counter()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.client = WebHDFSClient(
+            'http://127.0.0.1:%d' % self.server.server_port,
+            user='test',
+            time_out=10 * 1000,
+            sleep_inter=100,
+            chunk_size=1000,
+            num_threads=4,
+        )
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def test_dirs_and_files(self):
+        client = self.client
+        client.mkdirs('hdfs:/ckpt/step_1')
+        self.assertTrue(client.is_dir('hdfs:/ckpt/step_1'))
+        self.assertFalse(client.is_file('hdfs:/ckpt/step_1'))
+
+        client.touch('hdfs:/ckpt/step_1/done')
+        self.assertTrue(client.is_file('/ckpt/step_1/done'))
+        with self.assertRaises(FSFileExistsError):
+            client.touch('/ckpt/step_1/done', exist_ok=False)
+        self.assertEqual(client.ls_dir('/ckpt'), (['step_1'], []))
+        self.assertEqual(client.ls_dir('/ckpt/step_1'), ([], ['done']))
+        self.assertEqual(client.ls_dir('/not_exist'), ([], []))
+
+        client.mv('/ckpt/step_1', '/ckpt/step_2')
+        self.assertFalse(client.is_exist('/ckpt/step_1'))
+        self.assertEqual(client.list_dirs('/ckpt'), ['step_2'])
+        with self.assertRaises(FSFileNotExistsError):
+            client.mv('/ckpt/step_1', '/ckpt/step_3')
+
+        client.delete('/ckpt/step_2')
+        self.assertFalse(client.is_exist('/ckpt/step_2'))
+        self.assertEqual(client.ls_dir('/ckpt'), ([], []))
+
+    def test_metadata_cache(self):
+        self.client.mkdirs('/ckpt')
+        for i in range(10):
+            self.client.touch(f'/ckpt/file_{i}')
+        self.client.clear_cache()
+        self.server.stats.clear()
+
+        dirs, files = self.client.ls_dir('/ckpt')
+        self.assertEqual(len(files), 10)
+        for name in files:
+            self.assertTrue(self.client.is_file('/ckpt/' + name))
+        self.assertEqual(self.server.stats['LISTSTATUS'], 1)
+        self.assertEqual(self.server.stats['GETFILESTATUS'], 1)
+        # the connection is kept alive between calls
+        self.assertEqual(self.server.stats['connections'], 0)
+
+    def test_parallel_transfer(self):
+        src = os.path.join(self.local_root, 'model')
+        big = os.urandom(4500)
+        self._write(os.path.join(src, 'big.pdparams'), big)
+        for i in range(8):
+            self._write(os.path.join(src, 'shards', f'shard_{i}'), b'%d' % i)
+
+        self.client.upload(src, 'hdfs:/ckpt')
+        remote = os.path.join(self.remote_root, 'ckpt')
+        with open(os.path.join(remote, 'big.pdparams'), 'rb') as f:
+            self.assertEqual(f.read(), big)
+        self.assertEqual(self.server.stats['CONCAT'], 1)
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(remote, 'shards'))),
+            [f'shard_{i}' for i in range(8)],
+        )
+        # uploading into an existing directory
+        self.client.upload(src, '/ckpt/')
+        self.assertTrue(self.client.is_file('/ckpt/model/big.pdparams'))
+        with self.assertRaises(FSFileExistsError):
+            self.client.upload(src, '/ckpt/')
+        self.client.upload(src, '/ckpt', overwrite=True)
+
+        dst = os.path.join(self.local_root, 'restore')
+        self.client.download('/ckpt', dst)
+        with open(os.path.join(dst, 'big.pdparams'), 'rb') as f:
+            self.assertEqual(f.read(), big)
+        with open(os.path.join(dst, 'shards', 'shard_3'), 'rb') as f:
+            self.assertEqual(f.read(), b'3')
+        self.assertGreaterEqual(self.server.stats['OPEN'], 5 + 8)
+        self.assertEqual(self.client.cat('/ckpt/shards/shard_5'), '5')
+
+        with self.assertRaises(FSFileNotExistsError):
+            self.client.download('/not_exist', dst)
+
+
+if __name__ == '__main__':
+    unittest.main()
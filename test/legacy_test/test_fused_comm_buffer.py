@@ -14,10 +14,15 @@
 
 import unittest
 
+import numpy as np
+
 import paddle
+import paddle.distributed as dist
 from paddle.distributed.fleet.utils.tensor_fusion_helper import (
     HOOK_ACTION,
     FusedCommBuffer,
+    ReorderedCommBuffers,
+    assign_group_by_size,
 )
 
 
@@ -48,5 +53,50 @@ class TestFusedCommBufferGradChecker(unittest.TestCase):
             pass
 
 
+def train_reordered_buffers():
+    dist.init_parallel_env()
+    paddle.seed(2023)
+    model = paddle.nn.Sequential(
+        paddle.nn.Linear(16, 32),
+        paddle.nn.Linear(32, 32),
+        paddle.nn.Linear(32, 1),
+    )
+    params = model.parameters()
+    comm_group = dist.new_group(list(range(dist.get_world_size())))
+    buffers = ReorderedCommBuffers(
+        params, comm_group, group_size=4 * 1024, auto_size=False
+    )
+    declared = [p.name for p in params]
+    for step in range(3):
+        x = paddle.rand([4, 16]) * (dist.get_rank() + 1)
+        model(x).mean().backward()
+        buffers.scale_grads()
+        grads = [p.grad.numpy() for p in params]
+        # the gradients are averaged over the ranks
+        gathered = []
+        dist.all_gather_object(gathered, grads)
+        for other in gathered:
+            for g, o in zip(grads, other):
+                np.testing.assert_allclose(g, o, rtol=1e-6)
+        if step == 0:
+            # the gradients of the last layer are ready first, and are put
+            # in the first bucket after rebuilding
+            assert set(buffers.ready_order[:2]) == set(declared[-2:])
+            assert buffers.buffers[0]._params[0].name in declared[-2:]
+        for p in params:
+            p.clear_gradient()
+
+
+class TestReorderedCommBuffers(unittest.TestCase):
+    def test_ready_order(self):
+        linear = paddle.nn.Linear(10, 10)
+        w, b = linear.weight, linear.bias
+        groups = assign_group_by_size([w, b], 10**9, ready_order=[b.name])
+        self.assertEqual([p.name for p in groups[0]], [b.name, w.name])
+
+    def test_gloo(self):
+        dist.spawn(train_reordered_buffers, backend='gloo', nprocs=2)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,113 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+import paddle
+from paddle.distributed.fleet.meta_parallel.sharding.group_sharded_offload import (
+    OffloadPrefetcher,
+    StagingBufferPool,
+)
+
+
+def _param(name, size):
+    return SimpleNamespace(
+        name=name,
+        fw_storage=paddle.rand([size], dtype='float32'),
+        bw_storage=None,
+        status="part",
+    )
+
+
+class TestOffloadPrefetcher(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        paddle.set_device('cpu')
+        self.layers = [
+            [_param(f"w{i}", 64), _param(f"b{i}", 16)] for i in range(6)
+        ]
+        self.param2dtype = {
+            p.name: paddle.float16 for params in self.layers for p in params
+        }
+
+    def run_forward(self, offloader):
+        for i, params in enumerate(self.layers):
+            offloader.prefetch(self.layers[i + 1 : i + 1 + offloader.depth])
+            for p in params:
+                src = p.fw_storage
+                p.fw_storage = offloader.fetch(p)
+                self.assertEqual(p.fw_storage.dtype, paddle.float16)
+                np.testing.assert_array_equal(
+                    p.fw_storage.numpy(), src.numpy().astype('float16')
+                )
+                p.fw_storage = None
+                offloader.release(p)
+                p.fw_storage = offloader.restore(p)
+                self.assertIs(p.fw_storage, src)
+
+    def test_prefetch(self):
+        depth = 2
+        offloader = OffloadPrefetcher(
+            paddle.CPUPlace(), self.param2dtype, depth
+        )
+        for _ in range(3):
+            self.run_forward(offloader)
+            offloader.discard()
+        # only the first layer of every pass is not fetched ahead
+        self.assertEqual(offloader.num_missed, 3 * 2)
+        self.assertEqual(offloader.num_prefetched, 3 * 5 * 2)
+        # the buffers of at most depth + 1 layers are in flight
+        pool = offloader._device_pool
+        self.assertLessEqual(pool.num_allocated, (depth + 1) * 2)
+        self.assertEqual(pool.num_allocated + pool.num_reused, 3 * 6 * 2)
+
+    def test_replaced_storage(self):
+        offloader = OffloadPrefetcher(paddle.CPUPlace(), self.param2dtype, 1)
+        offloader.prefetch(self.layers[:1])
+        p = self.layers[0][0]
+        p.fw_storage = paddle.ones([64], dtype='float32')
+        np.testing.assert_array_equal(
+            offloader.fetch(p).numpy(), np.ones([64], dtype='float16')
+        )
+        self.assertEqual(offloader.num_missed, 1)
+
+    def test_write_back(self):
+        offloader = OffloadPrefetcher(paddle.CPUPlace(), self.param2dtype, 1)
+        p = self.layers[0][0]
+        grads = [paddle.rand([64]).astype('float16') for _ in range(2)]
+        for g in grads:
+            offloader.write_back(p, g)
+        offloader.flush()
+        self.assertEqual(p.bw_storage.dtype, paddle.float32)
+        np.testing.assert_allclose(
+            p.bw_storage.numpy(),
+            sum(g.astype('float32').numpy() for g in grads),
+            rtol=1e-6,
+        )
+
+    def test_pool(self):
+        pool = StagingBufferPool(paddle.CPUPlace())
+        a = pool.acquire(paddle.float32, 8)
+        pool.release(a)
+        self.assertIs(pool.acquire(paddle.float32, 8), a)
+        self.assertIsNot(pool.acquire(paddle.float32, 8), a)
+        self.assertEqual(pool.acquire(paddle.float16, 8).dtype, paddle.float16)
+        self.assertEqual((pool.num_allocated, pool.num_reused), (3, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
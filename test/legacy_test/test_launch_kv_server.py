@@ -0,0 +1,207 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import multiprocessing
+import socket
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from paddle.distributed.launch.context.node import Node
+from paddle.distributed.launch.context.status import Status
+from paddle.distributed.launch.controllers.master import HTTPMaster
+from paddle.distributed.launch.utils.kv_client import KVClient
+from paddle.distributed.launch.utils.kv_server import (
+    KVServer,
+    KVStore,
+    pack_kv,
+    unpack_kv,
+)
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('', 0))
+        return s.getsockname()[1]
+
+
+def _rendezvous(endpoint, name, size, queue, barrier, fanout=32):
+    ctx = SimpleNamespace(
+        args=SimpleNamespace(
+            master=endpoint, rank=-1, sort_ip=False, rendezvous_fanout=fanout
+        ),
+        node=Node(),
+        status=Status(),
+        logger=logging.getLogger('test_launch_kv_server'),
+    )
+    master = HTTPMaster(ctx)
+    value = json.dumps({'name': name})
+    peers, rank = master.sync_peers('/job/info', name, value, size)
+    queue.put((value, rank, peers))
+    # the pod running the server exits last
+    barrier.wait()
+    master.stop()
+
+
+class TestKVStore(unittest.TestCase):
+    def test_prefix(self):
+        store = KVStore()
+        for i in range(100):
+            store.put(f'/job/{i % 3}/{i}', b'%d' % i)
+        store.put('/jobs', b'x')
+        _, kv = store.get_prefix('/job/1/')
+        self.assertEqual(len(kv), 33)
+        self.assertTrue(all(k.startswith('/job/1/') for k in kv))
+        self.assertEqual(len(store.get_prefix('/job')[1]), 101)
+
+        self.assertTrue(store.delete('/job/1/1'))
+        self.assertFalse(store.delete('/job/1/1'))
+        self.assertEqual(len(store.get_prefix('/job/1/')[1]), 32)
+        self.assertEqual(store.keys, sorted(store.kv))
+
+    def test_wait(self):
+        store = KVStore()
+        threading.Timer(0.2, store.put, args=('/peers/0', b'a')).start()
+        threading.Timer(0.4, store.put, args=('/peers/1', b'b')).start()
+        begin = time.time()
+        _, kv = store.get_prefix('/peers', min_count=2, timeout=10)
+        self.assertEqual(len(kv), 2)
+        self.assertLess(time.time() - begin, 5)
+
+        # returns what exists when the wait times out
+        _, kv = store.get_prefix('/peers', min_count=3, timeout=0.1)
+        self.assertEqual(len(kv), 2)
+
+    def test_pack(self):
+        kv = {'/peers/%d' % i: ('peer%d' % i).encode() for i in range(100)}
+        kv['/peers/empty'] = b''
+        ret = unpack_kv(pack_kv(kv))
+        self.assertEqual(ret, {k: v.decode() for k, v in kv.items()})
+
+
+class TestKVServer(unittest.TestCase):
+    def setUp(self):
+        self.port = _free_port()
+        self.server = KVServer(self.port)
+        self.server.start()
+        self.client = KVClient(f'127.0.0.1:{self.port}')
+        self.assertTrue(self.client.wait_server_ready(timeout=10))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_put_get_delete(self):
+        self.assertTrue(self.client.put('/workers/1', 'rank1'))
+        self.assertTrue(self.client.put('/workers/2', 'rank2'))
+        self.assertEqual(
+            self.client.get_prefix('/workers'),
+            {'/workers/1': 'rank1', '/workers/2': 'rank2'},
+        )
+        self.assertEqual(self.client.get('/workers/1'), 'rank1')
+        self.assertTrue(self.client.delete('/workers/1'))
+        self.assertFalse(self.client.delete('/workers/1'))
+        self.assertEqual(self.client.get_prefix('/workers/1'), None)
+
+    def test_sync_peers(self):
+        num_peers = 64
+        results = [None] * num_peers
+
+        def peer(rank):
+            client = KVClient(f'127.0.0.1:{self.port}')
+            client.put(f'/rendezvous/{rank}', f'peer{rank}')
+            results[rank] = client.get_prefix(
+                '/rendezvous', min_count=num_peers, timeout=30
+            )
+
+        begin = time.time()
+        threads = [
+            threading.Thread(target=peer, args=(i,)) for i in range(num_peers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # the peers are woken up by the last put, not by the poll timeout
+        self.assertLess(time.time() - begin, 15)
+        for ret in results:
+            self.assertEqual(len(ret), num_peers)
+        packed = self.client.get_prefix('/rendezvous', packed=True)
+        self.assertEqual(packed, results[0])
+
+    def test_index(self):
+        for i in [3, 1, 2]:
+            self.client.put(f'/index/{i}', '')
+        self.assertEqual(self.client.get_index('/index', '/index/2'), (1, 3))
+        self.assertEqual(self.client.get_index('/index', '/index/4'), (-1, 3))
+        threading.Timer(0.2, self.client.put, args=('/index/0', '')).start()
+        self.assertEqual(
+            self.client.get_index(
+                '/index', '/index/2', min_count=4, timeout=10
+            ),
+            (2, 4),
+        )
+
+
+class TestHTTPMasterRendezvous(unittest.TestCase):
+    def run_pods(self, endpoint, num_pods, fanout=32):
+        queue = multiprocessing.Queue()
+        barrier = multiprocessing.Barrier(num_pods)
+        procs = [
+            multiprocessing.Process(
+                target=_rendezvous,
+                args=(endpoint, f'pod{i}', num_pods, queue, barrier, fanout),
+            )
+            for i in range(num_pods)
+        ]
+        for p in procs:
+            p.start()
+        results = [queue.get(timeout=120) for _ in range(num_pods)]
+        for p in procs:
+            p.join()
+
+        peers = results[0][2]
+        self.assertEqual(len(peers), num_pods)
+        self.assertEqual(
+            sorted(rank for _, rank, _ in results), list(range(num_pods))
+        )
+        for value, rank, ret in results:
+            self.assertEqual(ret, peers)
+            self.assertEqual(peers[rank], value)
+
+    def test_processes(self):
+        self.run_pods(f'127.0.0.1:{_free_port()}', 8)
+
+    def test_tree(self):
+        port = _free_port()
+        server = KVServer(port)
+        server.start()
+        try:
+            # 12 pods in groups of 3, 4 groups and then 2 at the next levels
+            self.run_pods(f'127.0.0.1:{port}', 12, fanout=3)
+            # the values are merged by the group leaders, the master only
+            # keeps the keys and the endpoints of the leaders
+            peers = {k: v for k, v in server.kv.items() if k.startswith('/job')}
+            self.assertEqual(len(peers), 12)
+            self.assertTrue(all(v == b'' for v in peers.values()))
+            leaders = [k for k in server.kv if k.startswith('/_tree/job/info')]
+            self.assertEqual(len(leaders), 4 + 1 + 1)
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
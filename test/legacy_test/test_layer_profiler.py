@@ -0,0 +1,91 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import paddle
+from paddle import profiler
+
+
+class TestLayerProfiler(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.model = paddle.nn.Sequential(
+            paddle.nn.Linear(16, 32),
+            paddle.nn.ReLU(),
+            paddle.nn.Sequential(paddle.nn.Linear(32, 32), paddle.nn.Tanh()),
+            paddle.nn.Linear(32, 4),
+        )
+
+    def run_steps(self, prof, num_steps):
+        for _ in range(num_steps):
+            loss = self.model(paddle.randn([8, 16])).mean()
+            loss.backward()
+            self.model.clear_gradients()
+            prof.step()
+
+    def test_records(self):
+        prof = profiler.LayerProfiler(self.model)
+        with prof:
+            self.run_steps(prof, 3)
+        # the hooks are removed by stop
+        self.model(paddle.randn([8, 16]))
+
+        records = {r['name']: r for r in prof.records()}
+        self.assertEqual(
+            list(records), ['Sequential', '0', '1', '2', '2.0', '2.1', '3']
+        )
+        for name, r in records.items():
+            self.assertEqual(r['calls'], 3)
+            self.assertGreater(r['forward_time'], 0.0)
+            # the backward of every call is timed, by the parameters of the
+            # first layer whose input does not require gradient
+            self.assertEqual(r['backward_calls'], 3)
+            self.assertGreater(r['backward_time'], 0.0)
+        self.assertEqual(records['0']['output_bytes'], 3 * 8 * 32 * 4)
+        self.assertEqual(records['3']['output_bytes'], 3 * 8 * 4 * 4)
+        self.assertEqual(records['Sequential']['type'], 'Sequential')
+        # the times include the sublayers
+        self.assertGreaterEqual(
+            records['2']['forward_time'], records['2.0']['forward_time']
+        )
+
+        table = prof.summary(sorted_by='backward_time', top=3)
+        self.assertEqual(len(table.splitlines()), 2 + 3)
+        with self.assertRaises(ValueError):
+            prof.summary(sorted_by='calls')
+        prof.reset()
+        self.assertEqual(prof.records()[0]['calls'], 0)
+
+    def test_max_depth(self):
+        prof = profiler.LayerProfiler(self.model, max_depth=1)
+        with prof:
+            self.run_steps(prof, 1)
+        self.assertEqual(
+            [r['name'] for r in prof.records()],
+            ['Sequential', '0', '1', '2', '3'],
+        )
+
+    def test_no_grad(self):
+        prof = profiler.LayerProfiler(self.model)
+        with prof, paddle.no_grad():
+            self.model(paddle.randn([8, 16]))
+            prof.step()
+        for r in prof.records():
+            self.assertEqual(r['calls'], 1)
+            self.assertEqual(r['backward_calls'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -355,6 +355,182 @@ class TestAuc(unittest.TestCase):
         m.reset()
         self.assertEqual(m.accumulate(), 0.0)
 
+    def reference_auc(self, preds, labels, num_thresholds):
+        stat_pos = [0] * (num_thresholds + 1)
+        stat_neg = [0] * (num_thresholds + 1)
+        for p, l in zip(preds[:, 1], labels.reshape(-1)):
+            bin_idx = int(p * num_thresholds)
+            if l:
+                stat_pos[bin_idx] += 1.0
+            else:
+                stat_neg[bin_idx] += 1.0
+        tot_pos, tot_neg, auc = 0.0, 0.0, 0.0
+        for idx in range(num_thresholds, -1, -1):
+            tot_pos_prev, tot_neg_prev = tot_pos, tot_neg
+            tot_pos += stat_pos[idx]
+            tot_neg += stat_neg[idx]
+            auc += abs(tot_neg - tot_neg_prev) * (tot_pos + tot_pos_prev) / 2
+        return auc / tot_pos / tot_neg
+
+    def random_data(self, n):
+        class1 = np.random.random([n, 1])
+        preds = np.concatenate([1 - class1, class1], axis=1)
+        labels = np.random.randint(0, 2, [n, 1])
+        return preds, labels
+
+    def test_auc_vectorized(self):
+        preds, labels = self.random_data(1000)
+        for num_thresholds in [1, 200, 4095]:
+            m = paddle.metric.Auc(num_thresholds=num_thresholds)
+            m.update(preds, labels)
+            np.testing.assert_allclose(
+                m.accumulate(),
+                self.reference_auc(preds, labels, num_thresholds),
+                rtol=1e-10,
+            )
+
+    def test_auc_tensor_on_device(self):
+        paddle.disable_static()
+        m_np = paddle.metric.Auc()
+        m_tensor = paddle.metric.Auc()
+        for _ in range(3):
+            preds, labels = self.random_data(100)
+            m_np.update(preds, labels)
+            m_tensor.update(paddle.to_tensor(preds), paddle.to_tensor(labels))
+        self.assertIsNotNone(m_tensor._device_stat)
+        self.assertAlmostEqual(m_tensor.accumulate(), m_np.accumulate())
+        np.testing.assert_array_equal(m_tensor._stat_pos, m_np._stat_pos)
+        np.testing.assert_array_equal(m_tensor._stat_neg, m_np._stat_neg)
+
+    def test_auc_tensor_out_of_range(self):
+        paddle.disable_static()
+        preds, labels = self.random_data(100)
+        preds[:5, 1] = 1.5
+        preds[5:10, 1] = -0.5
+        m = paddle.metric.Auc()
+        m.update(paddle.to_tensor(preds), paddle.to_tensor(labels))
+        # counted in the first and the last bucket on device
+        m_np = paddle.metric.Auc()
+        m_np.update(np.clip(preds, 0, 1), labels)
+        np.testing.assert_array_equal(m.accumulate(), m_np.accumulate())
+        np.testing.assert_array_equal(m._stat_pos, m_np._stat_pos)
+        np.testing.assert_array_equal(m._stat_neg, m_np._stat_neg)
+
+    def test_auc_merge(self):
+        paddle.disable_static()
+        preds, labels = self.random_data(200)
+        m = paddle.metric.Auc()
+        m.update(preds, labels)
+        m1 = paddle.metric.Auc()
+        m1.update(preds[:120], labels[:120])
+        m2 = paddle.metric.Auc()
+        m2.update(paddle.to_tensor(preds[120:]), paddle.to_tensor(labels[120:]))
+        m1.merge(m2)
+        self.assertAlmostEqual(m1.accumulate(), m.accumulate())
+
+        with self.assertRaises(ValueError):
+            m1.merge(paddle.metric.Auc(num_thresholds=200))
+
+
+class TestStreamingMetrics(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.num_classes = 5
+        self.batches = [
+            (
+                np.random.random([32, self.num_classes]).astype('float32'),
+                np.random.randint(0, self.num_classes, [32, 1]),
+            )
+            for _ in range(3)
+        ]
+
+    def run_metric(self, m, to_numpy=False):
+        for x, y in self.batches:
+            correct = m.compute(paddle.to_tensor(x), paddle.to_tensor(y))
+            m.update(correct.numpy() if to_numpy else correct)
+        return m.accumulate()
+
+    def test_topk_accuracy(self):
+        m = paddle.metric.TopkAccuracy(topk=(1, 3), name='my_acc')
+        self.assertEqual(m.name(), ['my_acc_top1', 'my_acc_top3'])
+        res = self.run_metric(m)
+        # the counts are kept on device
+        self.assertIsInstance(m._state, paddle.Tensor)
+        x = np.concatenate([x for x, _ in self.batches])
+        y = np.concatenate([y for _, y in self.batches])
+        np.testing.assert_allclose(res, accuracy(x, y, (1, 3)))
+        m.reset()
+        np.testing.assert_allclose(self.run_metric(m, True), res)
+
+        m = paddle.metric.TopkAccuracy()
+        self.assertEqual(m.accumulate(), 0.0)
+        y_one_hot = paddle.to_tensor(one_hot(y.reshape(-1), 5))
+        m.update(m.compute(paddle.to_tensor(x), y_one_hot))
+        self.assertAlmostEqual(m.accumulate(), accuracy(x, y)[0])
+
+    def test_confusion_matrix(self):
+        m = paddle.metric.ConfusionMatrix(self.num_classes)
+        matrix = self.run_metric(m)
+        self.assertIsInstance(m._state, paddle.Tensor)
+        expected = np.zeros([self.num_classes, self.num_classes])
+        for x, y in self.batches:
+            for p, l in zip(x.argmax(-1), y.reshape(-1)):
+                expected[l, p] += 1
+        np.testing.assert_array_equal(matrix, expected)
+        m.reset()
+        np.testing.assert_array_equal(self.run_metric(m, True), expected)
+
+        with self.assertRaises(ValueError):
+            m.update(np.array([self.num_classes**2]))
+
+        # the labels out of range, e.g. ignore_index, are not counted on device
+        m.reset()
+        x, y = self.batches[0]
+        y = y.copy()
+        y[:4] = -1
+        y[4:6] = self.num_classes
+        m.update(m.compute(paddle.to_tensor(x), paddle.to_tensor(y)))
+        expected = np.zeros([self.num_classes, self.num_classes])
+        for p, l in zip(x.argmax(-1)[6:], y.reshape(-1)[6:]):
+            expected[l, p] += 1
+        np.testing.assert_array_equal(m.accumulate(), expected)
+
+    def test_abstract_state_size(self):
+        class NoState(paddle.metric.metrics._StreamingMetric):
+            def reset(self):
+                pass
+
+            def update(self, *args):
+                pass
+
+            def accumulate(self):
+                pass
+
+            def name(self):
+                return 'no_state'
+
+        with self.assertRaises(TypeError):
+            NoState()
+
+    def test_precision_recall_f1(self):
+        x = np.array([[0.1, 0.2, 0.7], [0.6, 0.3, 0.1], [0.2, 0.5, 0.3]])
+        y = np.array([[2], [0], [2]])
+        m = paddle.metric.PrecisionRecallF1(3)
+        self.assertEqual(m.name(), ['precision', 'recall', 'f1'])
+        m.update(m.compute(paddle.to_tensor(x), paddle.to_tensor(y)))
+        # the class 1 is predicted once without instances
+        np.testing.assert_allclose(
+            m.accumulate(), [2.0 / 3, 0.5, (1 + 2.0 / 3) / 3]
+        )
+
+        m = paddle.metric.PrecisionRecallF1(3, average='micro', name='m')
+        self.assertEqual(m.name(), ['m_precision', 'm_recall', 'm_f1'])
+        m.update(m.compute(paddle.to_tensor(x), paddle.to_tensor(y)))
+        np.testing.assert_allclose(m.accumulate(), [2.0 / 3] * 3)
+
+        with self.assertRaises(ValueError):
+            paddle.metric.PrecisionRecallF1(3, average='weighted')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -21,6 +21,7 @@ import numpy as np
 
 import paddle
 from paddle import Model, fluid, jit, to_tensor
+from paddle.hapi import dynamic_flops
 from paddle.hapi.model import prepare_distributed_context
 from paddle.io import Dataset, DistributedBatchSampler
 from paddle.metric import Accuracy
@@ -812,6 +813,38 @@ class TestModelFunction(unittest.TestCase):
             print_detail=True,
         )
 
+    def test_dynamic_op_flops(self):
+        class Net(paddle.nn.Layer):
+            def __init__(self):
+                super().__init__()
+                self.fc = paddle.nn.Linear(8, 16)
+
+            def forward(self, x):
+                # the functional operators are counted by the op registry
+                return paddle.nn.functional.softmax(self.fc(x))
+
+        net = Net()
+        FLOPs = paddle.flops(net, [1, 8], by_op=True, print_detail=True)
+        # matmul 2 * 8 * 16, the add of bias 16 and softmax 3 * 16
+        self.assertEqual(FLOPs, 256 + 16 + 48)
+
+        records = dynamic_flops.layer_op_costs(net, paddle.randn([1, 8]))
+        self.assertEqual([r['type'] for r in records], ['Net', 'Linear'])
+        self.assertEqual(records[0]['flops'], 48)
+        self.assertEqual(records[1]['flops'], 272)
+        self.assertEqual(records[1]['params'], 8 * 16 + 16)
+        self.assertEqual(records[1]['bytes'], (152 + 48) * 4)
+        self.assertAlmostEqual(records[1]['intensity'], 272 / 800)
+
+        # the custom functions of the operators override the registry
+        FLOPs = paddle.flops(
+            net,
+            [1, 8],
+            custom_ops={'softmax': lambda input_shapes, attrs: 0},
+            by_op=True,
+        )
+        self.assertEqual(FLOPs, 272)
+
     def test_export_deploy_model(self):
         self.set_seed()
         np.random.seed(201)
@@ -954,6 +987,151 @@ class TestModelFunction(unittest.TestCase):
             np.testing.assert_almost_equal(losses[0], losses[1], decimal=4)
             np.testing.assert_almost_equal(losses[0], losses[2], decimal=4)
 
+    def test_fit_sync_free(self):
+        class LogRecorder(paddle.callbacks.Callback):
+            def __init__(self):
+                super().__init__()
+                self.batch_logs = {}
+                self.epoch_logs = []
+
+            def on_train_batch_end(self, step, logs=None):
+                if (step + 1) % 4 == 0:
+                    self.batch_logs[step] = dict(logs)
+
+            def on_epoch_end(self, epoch, logs=None):
+                self.epoch_logs.append(dict(logs))
+
+        fluid.enable_dygraph(paddle.CPUPlace())
+        data = np.random.random(size=(40, 20)).astype(np.float32)
+        label = np.random.randint(0, 10, size=(40, 1)).astype(np.int64)
+
+        class FixedDataset(Dataset):
+            def __getitem__(self, idx):
+                return data[idx], label[idx]
+
+            def __len__(self):
+                return len(data)
+
+        dataset = FixedDataset()
+
+        recorders = []
+        for sync_free in [False, True]:
+            self.set_seed()
+            net = MyModel()
+            optim = paddle.optimizer.SGD(
+                learning_rate=0.001, parameters=net.parameters()
+            )
+            model = Model(net)
+            model.prepare(
+                optim, loss=CrossEntropyLoss(), metrics=Accuracy(topk=(1, 2))
+            )
+            recorder = LogRecorder()
+            model.fit(
+                dataset,
+                batch_size=3,
+                epochs=2,
+                shuffle=False,
+                log_freq=4,
+                verbose=0,
+                callbacks=[recorder],
+                sync_free=sync_free,
+            )
+            recorders.append(recorder)
+
+        # the logs are the same on the logging steps and the epoch ends
+        batch_logs = [recorder.batch_logs for recorder in recorders]
+        self.assertEqual(sorted(batch_logs[0]), sorted(batch_logs[1]))
+        pairs = [(batch_logs[0][k], batch_logs[1][k]) for k in batch_logs[0]]
+        pairs += list(zip(recorders[0].epoch_logs, recorders[1].epoch_logs))
+        self.assertEqual(len(pairs), 3 + 2)
+        for logs, lazy_logs in pairs:
+            for name in ['loss', 'acc_top1', 'acc_top2']:
+                np.testing.assert_allclose(
+                    np.array(logs[name], dtype='float32'),
+                    np.array(lazy_logs[name], dtype='float32'),
+                    rtol=1e-6,
+                )
+        fluid.disable_dygraph()
+
+    def test_fit_sync_free_skipped_steps(self):
+        class LogRecorder(paddle.callbacks.Callback):
+            def __init__(self):
+                super().__init__()
+                self.train_logs = []
+
+            def on_train_batch_end(self, step, logs=None):
+                self.train_logs.append((step, dict(logs)))
+
+        fluid.enable_dygraph(paddle.CPUPlace())
+        self.set_seed()
+        data = np.random.random(size=(12, 20)).astype(np.float32)
+        label = np.random.randint(0, 10, size=(12, 1)).astype(np.int64)
+        batches = [(data[i : i + 3], label[i : i + 3]) for i in range(0, 12, 3)]
+
+        net = MyModel()
+        optim = paddle.optimizer.SGD(
+            learning_rate=0.001, parameters=net.parameters()
+        )
+        model = Model(net)
+        model.prepare(optim, loss=CrossEntropyLoss(), metrics=Accuracy())
+        recorder = LogRecorder()
+        model.fit(
+            batches,
+            batches,
+            epochs=2,
+            log_freq=2,
+            verbose=0,
+            callbacks=[recorder],
+            sync_free=True,
+        )
+
+        # the steps between the logging steps carry no metrics, neither the
+        # ones of the last logging step nor the ones of the evaluation
+        self.assertEqual(len(recorder.train_logs), 8)
+        for step, logs in recorder.train_logs:
+            self.assertEqual(logs['step'], step)
+            if (step + 1) % 2 == 0:
+                self.assertIn('loss', logs)
+                self.assertIn('acc', logs)
+            else:
+                self.assertNotIn('loss', logs)
+                self.assertNotIn('acc', logs)
+        fluid.disable_dygraph()
+
+    def test_eval_predict_sync_free(self):
+        fluid.enable_dygraph(paddle.CPUPlace())
+        self.set_seed()
+        data = np.random.random(size=(20, 20)).astype(np.float32)
+        label = np.random.randint(0, 10, size=(20, 1)).astype(np.int64)
+        # an iterable which is not a DataLoader is loaded ahead by a thread
+        eval_batches = [
+            (data[i : i + 4], label[i : i + 4]) for i in range(0, 20, 4)
+        ]
+        test_batches = [(data[i : i + 4],) for i in range(0, 20, 4)]
+
+        model = Model(MyModel())
+        model.prepare(loss=CrossEntropyLoss(), metrics=Accuracy())
+        results = [
+            model.evaluate(eval_batches, log_freq=2, verbose=0, sync_free=s)
+            for s in [False, True]
+        ]
+        self.assertEqual(results[0], results[1])
+
+        expected = model.predict(test_batches, stack_outputs=True, verbose=0)
+        written = []
+        outputs = model.predict(
+            test_batches,
+            verbose=0,
+            sync_free=True,
+            output_writer=written.append,
+        )
+        self.assertEqual(outputs, [])
+        self.assertEqual(len(written), 5)
+        np.testing.assert_allclose(
+            np.vstack([outs[0] for outs in written]), expected[0], rtol=1e-6
+        )
+        fluid.disable_dygraph()
+
 
 class TestModelWithLRScheduler(unittest.TestCase):
     def test_fit_by_step(self):
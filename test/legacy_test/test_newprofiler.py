@@ -14,6 +14,7 @@
 
 import os
 import tempfile
+import time
 import unittest
 
 import numpy as np
@@ -22,7 +23,9 @@ import paddle
 import paddle.nn.functional as F
 from paddle import nn, profiler
 from paddle.io import DataLoader, Dataset
+from paddle.io.dataloader.collate import default_collate_fn
 from paddle.profiler import utils
+from paddle.profiler.timer import benchmark, split_reader_cost
 
 
 class TestProfiler(unittest.TestCase):
@@ -414,5 +417,58 @@ class TestTimerOnly(unittest.TestCase):
         p.stop()
 
 
+class SlowDataset(RandomDataset):
+    def __getitem__(self, idx):
+        time.sleep(0.005)
+        return super().__getitem__(idx)
+
+
+def slow_collate_fn(batch):
+    time.sleep(0.02)
+    return default_collate_fn(batch)
+
+
+class TestReaderStages(unittest.TestCase):
+    def test_split_reader_cost(self):
+        # the worker starts the batch after the step starts reading
+        stages = split_reader_cost(10.0, 20.0, (12.0, 15.0, 16.0, 19.0))
+        self.assertEqual(
+            stages,
+            {
+                'wait_worker': 2.0,
+                'fetch': 3.0,
+                'collate': 1.0,
+                'transfer': 3.0,
+                'h2d': 1.0,
+            },
+        )
+        # the batch is ready before the step starts reading
+        stages = split_reader_cost(10.0, 11.0, (5.0, 6.0, 7.0, 8.0))
+        self.assertEqual(stages['h2d'], 1.0)
+        self.assertEqual(sum(stages.values()), 1.0)
+
+    def test_with_workers(self):
+        for num_workers in [0, 1]:
+            loader = DataLoader(
+                SlowDataset(4 * 16),
+                batch_size=4,
+                num_workers=num_workers,
+                collate_fn=slow_collate_fn,
+            )
+            p = profiler.Profiler(timer_only=True)
+            p.start()
+            for image, label in loader():
+                p.step()
+            stages = benchmark().current_event.reader_stages_average()
+            reader_cost = benchmark().current_event.reader_average()
+            p.stop()
+            # the steps cost nothing, the reader waits for every batch
+            self.assertGreater(stages['fetch'], 0.01)
+            self.assertGreater(stages['collate'], 0.01)
+            self.assertAlmostEqual(
+                sum(stages.values()), reader_cost, delta=0.005
+            )
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,63 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle.framework import async_save, clear_async_save_task_queue
+
+
+class TestAsyncSave(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_snapshot(self):
+        layer = paddle.nn.Linear(16, 16)
+        state_dict = layer.state_dict()
+        expected = {k: v.numpy() for k, v in state_dict.items()}
+        paths = []
+        for format in ['pickle', 'container']:
+            path = os.path.join(self.temp_dir.name, f'{format}.pdparams')
+            async_save(state_dict, path, format=format, num_workers=2)
+            paths.append(path)
+        # the parameters updated after async_save do not affect the saved file
+        with paddle.no_grad():
+            layer.weight.set_value(paddle.zeros([16, 16]))
+        self.assertIs(state_dict['weight'], layer.weight)
+        clear_async_save_task_queue()
+
+        for path in paths:
+            load_state_dict = paddle.load(path)
+            for key, value in expected.items():
+                np.testing.assert_array_equal(
+                    load_state_dict[key].numpy(), value
+                )
+
+    def test_error(self):
+        path = os.path.join(self.temp_dir.name, 'obj.pdtc')
+        async_save({'x': object()}, path, format='container')
+        with self.assertRaises(RuntimeError):
+            clear_async_save_task_queue()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+import paddle
+
+
+class TestLoadMmap(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_load_state_dict(self):
+        layer = paddle.nn.Linear(256, 512)
+        path = os.path.join(self.temp_dir.name, 'linear.pdparams')
+        paddle.save(layer.state_dict(), path)
+
+        state_dict = paddle.load(path, mmap=True, return_numpy=True)
+        weight = state_dict['weight']
+        self.assertIsInstance(weight, np.ndarray)
+        # the large array is a view of the mapped file
+        self.assertIsNotNone(weight.base)
+        np.testing.assert_array_equal(weight, layer.weight.numpy())
+
+        new_layer = paddle.nn.Linear(256, 512)
+        new_layer.set_state_dict(state_dict)
+        np.testing.assert_array_equal(
+            new_layer.weight.numpy(), layer.weight.numpy()
+        )
+        np.testing.assert_array_equal(
+            new_layer.bias.numpy(), layer.bias.numpy()
+        )
+
+        # modifying the loaded array does not change the file
+        weight[0, 0] = weight[0, 0] + 1.0
+        reloaded = paddle.load(path, mmap=True)
+        np.testing.assert_array_equal(
+            reloaded['weight'].numpy(), layer.weight.numpy()
+        )
+
+    def test_load_nested_object(self):
+        obj = {
+            'model': {'w': paddle.rand([128, 256])},
+            'epoch': 3,
+            'raw': b'\x01' * (1 << 17),
+        }
+        path = os.path.join(self.temp_dir.name, 'obj.pdparams')
+        paddle.save(obj, path)
+
+        load_obj = paddle.load(path, mmap=True)
+        self.assertEqual(load_obj['epoch'], 3)
+        self.assertIsInstance(load_obj['raw'], bytes)
+        self.assertEqual(load_obj['raw'], obj['raw'])
+        np.testing.assert_array_equal(
+            load_obj['model']['w'].numpy(), obj['model']['w'].numpy()
+        )
+
+    def test_load_protocol(self):
+        data = {'x': np.random.random([300, 300]).astype('float32')}
+        for protocol in [2, 3, 4]:
+            path = os.path.join(self.temp_dir.name, f'x_{protocol}.pkl')
+            with open(path, 'wb') as f:
+                pickle.dump(data, f, protocol=protocol)
+            load_data = paddle.load(path, mmap=True, return_numpy=True)
+            np.testing.assert_array_equal(load_data['x'], data['x'])
+
+    def test_load_shared_array(self):
+        # an array referenced twice is pickled once and referred by the memo
+        for shape in [[4, 4], [300, 300]]:
+            x = np.random.random(shape).astype('float32')
+            path = os.path.join(self.temp_dir.name, 'shared.pdparams')
+            paddle.save({'x': x, 'y': x, 'z': [x]}, path)
+            load_data = paddle.load(path, mmap=True, return_numpy=True)
+            for value in [load_data['x'], load_data['y'], load_data['z'][0]]:
+                self.assertIsInstance(value, np.ndarray)
+                np.testing.assert_array_equal(value, x)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import unittest
+from io import BytesIO
+
+import numpy as np
+
+import paddle
+from paddle.framework import TensorContainer
+
+
+class TestSaveLoadContainer(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_state_dict(self):
+        layer = paddle.nn.Linear(16, 32)
+        adam = paddle.optimizer.Adam(parameters=layer.parameters())
+        layer(paddle.rand([4, 16])).mean().backward()
+        adam.step()
+        obj = {
+            'model': layer.state_dict(),
+            'opt': adam.state_dict(),
+            'epoch': 3,
+        }
+        path = os.path.join(self.temp_dir.name, 'model.pdparams')
+        paddle.save(obj, path, format='container')
+
+        load_obj = paddle.load(path)
+        self.assertEqual(load_obj['epoch'], 3)
+        for key, value in layer.state_dict().items():
+            np.testing.assert_array_equal(
+                load_obj['model'][key].numpy(), value.numpy()
+            )
+        new_layer = paddle.nn.Linear(16, 32)
+        new_layer.set_state_dict(load_obj['model'])
+        np.testing.assert_array_equal(
+            new_layer.weight.numpy(), layer.weight.numpy()
+        )
+        new_adam = paddle.optimizer.Adam(parameters=new_layer.parameters())
+        new_adam.set_state_dict(load_obj['opt'])
+
+        load_numpy = paddle.load(path, return_numpy=True, mmap=True)
+        self.assertIsInstance(load_numpy['model']['weight'], np.ndarray)
+
+    def test_random_access(self):
+        obj = {
+            'a': np.random.random([64, 64]).astype('float32'),
+            'b': [paddle.rand([8]), (1, 'x')],
+            'c': np.arange(10).astype('int64'),
+        }
+        path = os.path.join(self.temp_dir.name, 'obj.pdtc')
+        paddle.save(obj, path, format='container')
+
+        for mmap in [False, True]:
+            with TensorContainer(path, mmap=mmap) as container:
+                self.assertEqual(container.keys(), ['a', 'b/0', 'c'])
+                info = container.info('a')
+                self.assertEqual(info['dtype'], 'float32')
+                self.assertEqual(info['shape'], [64, 64])
+                self.assertEqual(info['offset'] % 64, 0)
+                np.testing.assert_array_equal(
+                    container.get_tensor('c', return_numpy=True), obj['c']
+                )
+                subset = container.load(keys=['a'], return_numpy=True)
+                self.assertEqual(list(subset.keys()), ['a'])
+                np.testing.assert_array_equal(subset['a'], obj['a'])
+
+                load_obj = container.load(num_workers=4)
+                self.assertEqual(load_obj['b'][1], (1, 'x'))
+                np.testing.assert_array_equal(
+                    load_obj['b'][0].numpy(), obj['b'][0].numpy()
+                )
+
+    def test_sharded(self):
+        layer = paddle.nn.Sequential(
+            *[paddle.nn.Linear(32, 32) for _ in range(4)]
+        )
+        obj = {'model': layer.state_dict(), 'step': 10}
+        path = os.path.join(self.temp_dir.name, 'sharded', 'model.pdparams')
+        os.makedirs(os.path.dirname(path))
+        paddle.save(obj, path, format='container', num_workers=3)
+        files = os.listdir(os.path.dirname(path))
+        self.assertGreater(len(files), 2)
+
+        paddle.save(obj, path + '.2', format='container', max_shard_size=4096)
+        for load_path in [path, path + '.2']:
+            load_obj = paddle.load(load_path)
+            self.assertEqual(load_obj['step'], 10)
+            for key, value in layer.state_dict().items():
+                np.testing.assert_array_equal(
+                    load_obj['model'][key].numpy(), value.numpy()
+                )
+
+    def test_memory_buffer(self):
+        byio = BytesIO()
+        x = paddle.rand([3, 4])
+        paddle.save({'x': x}, byio, format='container')
+        paddle.save({'y': 1}, byio, format='container')
+        byio.seek(0)
+        np.testing.assert_array_equal(paddle.load(byio)['x'].numpy(), x.numpy())
+        self.assertEqual(paddle.load(byio), {'y': 1})
+
+    def test_unsupported(self):
+        path = os.path.join(self.temp_dir.name, 'obj.pdtc')
+        with self.assertRaises(TypeError):
+            paddle.save({'x': object()}, path, format='container')
+        with self.assertRaises(TypeError):
+            paddle.save({1: paddle.rand([2])}, path, format='container')
+        with self.assertRaises(ValueError):
+            paddle.save({'x': paddle.rand([2])}, path, format='json')
+
+    def test_duplicated_names(self):
+        path = os.path.join(self.temp_dir.name, 'obj.pdtc')
+        # both of the tensors are named 'a/b'
+        obj = {'a/b': paddle.rand([2]), 'a': {'b': paddle.rand([3])}}
+        with self.assertRaises(ValueError):
+            paddle.save(obj, path, format='container')
+        with self.assertRaises(ValueError):
+            paddle.save(obj, path, format='container', num_workers=2)
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
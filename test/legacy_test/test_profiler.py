@@ -15,7 +15,7 @@
 import unittest
 
 import paddle
-from paddle.utils.flops import flops
+from paddle.utils.flops import flops, memory_access
 
 
 class TestFLOPSAPI(unittest.TestCase):
@@ -169,6 +169,61 @@ class TestFLOPSAPI(unittest.TestCase):
             == 14400
         )
 
+    def test_dygraph_op_flops(self):
+        # the dygraph apis record the inputs by the lower case names
+        self.assertTrue(
+            flops('matmul', {'x': [[2, 3, 4]], 'y': [[4, 5]]}, {})
+            == 2 * 2 * 3 * 4 * 5
+        )
+        self.assertTrue(flops('add', {'x': [[2, 3]], 'y': [[3]]}, {}) == 2 * 3)
+        self.assertTrue(
+            flops('layer_norm', {'x': [[2, 8]]}, {'epsilon': 1e-5}) == 8 * 2 * 8
+        )
+        self.assertTrue(flops('softmax', {'x': [[2, 8]]}, {}) == 3 * 2 * 8)
+        self.assertTrue(
+            flops(
+                'flash_attn',
+                {'q': [[2, 16, 4, 8]], 'k': [[2, 16, 4, 8]]},
+                {'causal': True},
+            )
+            == (4 * 2 * 4 * 16 * 16 * 8 + 3 * 2 * 4 * 16 * 16) // 2
+        )
+        self.assertTrue(
+            flops(
+                'rnn',
+                {
+                    'x': [[5, 2, 3]],
+                    'weight_list': [[16, 3], [16, 4], [16], [16]],
+                },
+                {
+                    'mode': 'LSTM',
+                    'hidden_size': 4,
+                    'num_layers': 1,
+                    'is_bidirec': False,
+                },
+            )
+            == 5 * 2 * (2 * (48 + 64) + 32 + 9 * 4)
+        )
+
+    def test_memory_access(self):
+        self.assertTrue(
+            memory_access('matmul', {'x': [[2, 3, 4]], 'y': [[4, 5]]}, {})
+            == 24 + 20 + 30
+        )
+        self.assertTrue(
+            memory_access('add', {'x': [[2, 3]], 'y': [[3]]}, {}) == 6 + 3 + 6
+        )
+        self.assertTrue(
+            memory_access('embedding', {'x': [[2, 5]], 'weight': [[9, 16]]}, {})
+            == 10 + 2 * 10 * 16
+        )
+        self.assertTrue(memory_access('reshape', {'x': [[2, 5]]}, {}) == 0)
+        # the operators not registered write an output like the largest input
+        self.assertTrue(
+            memory_access('unknown', {'x': [[2, 5]], 'y': [[5]]}, {})
+            == 10 + 5 + 10
+        )
+
 
 if __name__ == '__main__':
     paddle.enable_static()
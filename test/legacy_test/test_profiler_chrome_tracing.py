@@ -0,0 +1,158 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import glob
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import paddle
+from paddle import profiler
+from paddle.profiler.chrome_tracing import ChromeTraceWriter, read_chrome_trace
+
+
+class TestChromeTracingStream(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_export(self):
+        x = paddle.to_tensor(np.random.randn(4, 4), place=paddle.CPUPlace())
+        with profiler.Profiler(
+            targets=[profiler.ProfilerTarget.CPU],
+            scheduler=(1, 4),
+            on_trace_ready=profiler.export_chrome_tracing_stream(
+                self.temp_dir.name, 'worker', chunk_ms=0.1, rank=3
+            ),
+        ) as prof:
+            for _ in range(5):
+                y = paddle.matmul(x, x) / 2.0
+                prof.step()
+
+        paths = glob.glob(os.path.join(self.temp_dir.name, '*'))
+        self.assertGreater(len(paths), 1)
+        names = set()
+        for path in paths:
+            self.assertTrue(path.endswith('.paddle_trace.json.gz'))
+            # every chunk is a whole chrome tracing file
+            with gzip.open(path, 'rt') as f:
+                content = json.load(f)
+            info = content['paddle_trace_info']
+            self.assertEqual(info['rank'], 3)
+            self.assertEqual(
+                sorted(info['step_starts']),
+                ['ProfileStep#1', 'ProfileStep#2', 'ProfileStep#3'],
+            )
+            # the events before the first window are in the first chunk
+            end = info['window_us'][1]
+            for event in content['traceEvents']:
+                names.add(event['name'])
+                if event['ph'] == 'X':
+                    self.assertLess(event['ts'], end)
+        self.assertIn('ProfileStep#2', names)
+        self.assertIn('process_name', names)
+
+    def test_max_open_files(self):
+        for compress in [True, False]:
+            prefix = os.path.join(self.temp_dir.name, f'open{compress}')
+            writer = ChromeTraceWriter(
+                prefix, compress=compress, chunk_ms=1, max_open_files=2
+            )
+            # the events of 5 windows interleaved, with metadata in between
+            for i in range(20):
+                if i == 7:
+                    writer.write({'name': 'process_name', 'ph': 'M', 'pid': 7})
+                writer.write(
+                    {'name': f'e{i}', 'ts': 1000.0 * (i % 5), 'ph': 'X'}
+                )
+                self.assertLessEqual(len(writer._files), 2)
+            paths = writer.close()
+            self.assertEqual(len(paths), 5)
+            for index, path in enumerate(paths):
+                opener = gzip.open if compress else open
+                with opener(path, 'rt') as f:
+                    content = json.load(f)
+                self.assertEqual(
+                    content['traceEvents'], list(read_chrome_trace(path)[1])
+                )
+                names = [e['name'] for e in content['traceEvents']]
+                self.assertEqual(names.count('process_name'), 1)
+                self.assertEqual(
+                    sorted(n for n in names if n != 'process_name'),
+                    sorted(f'e{i}' for i in range(index, 20, 5)),
+                )
+
+    def write_rank(self, rank, offset_us):
+        prefix = os.path.join(self.temp_dir.name, f'rank{rank}')
+        step_starts = {
+            f'ProfileStep#{i}': 1000.0 * i + offset_us for i in range(3)
+        }
+        info = {'rank': rank, 'step_starts': step_starts}
+        with ChromeTraceWriter(prefix, compress=rank == 0, info=info) as writer:
+            writer.write(
+                {
+                    'name': 'process_name',
+                    'pid': 7,
+                    'tid': 0,
+                    'ph': 'M',
+                    'args': {'name': 'Process 7 (CPU)'},
+                }
+            )
+            for name, start in step_starts.items():
+                writer.write(
+                    {
+                        'name': name,
+                        'pid': 7,
+                        'tid': '1(Python)',
+                        'ts': start,
+                        'dur': 900.0,
+                        'ph': 'X',
+                    }
+                )
+        return writer.paths
+
+    def test_merge(self):
+        paths = self.write_rank(0, 0.0) + self.write_rank(1, 250.0)
+        info, events = read_chrome_trace(paths[1])
+        self.assertEqual(info['rank'], 1)
+        self.assertEqual(len(list(events)), 4)
+
+        output = os.path.join(self.temp_dir.name, 'merged.json')
+        self.assertEqual(profiler.merge_chrome_traces(paths, output), [output])
+        with open(output) as f:
+            content = json.load(f)
+        starts = {}
+        process_names = []
+        for event in content['traceEvents']:
+            rank = event['pid'] >> 22
+            if event['ph'] == 'M':
+                process_names.append(event['args']['name'])
+            else:
+                starts.setdefault(rank, []).append(event['ts'])
+        # the clock of rank 1 is aligned to rank 0
+        self.assertEqual(starts[0], starts[1])
+        self.assertEqual(
+            process_names,
+            ['Rank 0: Process 7 (CPU)', 'Rank 1: Process 7 (CPU)'],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import random
 import unittest
 
 from paddle import profiler
 from paddle.profiler import profiler_statistic
+from paddle.profiler.statistic_helper import merge_self_ranges
 
 
 class HostPythonNode:
@@ -73,6 +75,119 @@ class MemPythonNode:
         self.peak_reserved = peak_reserved
 
 
+def gen_random_trees(seed, num_threads=2, num_nodes=200, max_depth=5):
+    r"""
+    Generate the node trees of a random trace with nested host nodes, their
+    runtime, device and memory nodes.
+    """
+    rng = random.Random(seed)
+    event_types = profiler.TracerEventType
+    mem_types = profiler_statistic.TracerMemEventType
+    host_types = [
+        event_types.Operator,
+        event_types.OperatorInner,
+        event_types.UserDefined,
+        event_types.PythonUserDefined,
+        event_types.Forward,
+        event_types.Backward,
+        event_types.Dataloader,
+        event_types.Optimization,
+        event_types.ProfileStep,
+        event_types.Communication,
+    ]
+    host_names = ['matmul', 'relu', 'c_allreduce_sum', 'infer_shape']
+    host_names += ['compute', 'memcpy', 'user']
+    kernel_names = ['gemm', 'relu_kernel', 'ncclAllReduce', 'memcpy_kernel']
+
+    def build(node, thread_id, start, end, depth, budget):
+        while start < end and budget[0] > 0 and depth < max_depth:
+            child_start = start + rng.randint(0, 5)
+            child_end = min(end, child_start + rng.randint(1, 60))
+            if child_start >= child_end:
+                break
+            budget[0] -= 1
+            child = HostPythonNode(
+                rng.choice(host_names),
+                rng.choice(host_types),
+                child_start,
+                child_end,
+                1000,
+                thread_id,
+            )
+            node.children_node.append(child)
+            for _ in range(rng.randint(0, 2)):
+                runtime = HostPythonNode(
+                    'cudaLaunchKernel',
+                    event_types.CudaRuntime,
+                    child_start,
+                    child_start + 1,
+                    1000,
+                    thread_id,
+                )
+                for _ in range(rng.randint(0, 2)):
+                    kernel_start = rng.randint(0, 10 * end)
+                    runtime.device_node.append(
+                        DevicePythonNode(
+                            rng.choice(kernel_names),
+                            rng.choice(
+                                [event_types.Kernel, event_types.Memcpy]
+                            ),
+                            kernel_start,
+                            kernel_start + rng.randint(1, 30),
+                            rng.randint(0, 1),
+                            0,
+                            rng.randint(0, 2),
+                        )
+                    )
+                child.runtime_node.append(runtime)
+            for _ in range(rng.randint(0, 2)):
+                mem_type = rng.choice(
+                    [
+                        mem_types.Allocate,
+                        mem_types.Free,
+                        mem_types.ReservedAllocate,
+                        mem_types.ReservedFree,
+                    ]
+                )
+                size = rng.randint(1, 100)
+                if mem_type in (mem_types.Free, mem_types.ReservedFree):
+                    size = -size
+                child.mem_node.append(
+                    MemPythonNode(
+                        child_start,
+                        0,
+                        mem_type,
+                        1000,
+                        thread_id,
+                        size,
+                        rng.choice(['Place(gpu:0)', 'Place(cpu)']),
+                        0,
+                        0,
+                        rng.randint(0, 1000),
+                        rng.randint(0, 1000),
+                    )
+                )
+            if rng.random() < 0.6:
+                build(
+                    child, thread_id, child_start, child_end, depth + 1, budget
+                )
+            start = child_end
+
+    trees = {}
+    for thread_id in range(num_threads):
+        root_node = HostPythonNode(
+            f'Thread {thread_id}',
+            event_types.UserDefined,
+            0,
+            float('inf'),
+            1000,
+            thread_id,
+        )
+        build(root_node, thread_id, 0, 10**9, 0, [num_nodes])
+        trees[thread_id] = root_node
+    return trees
+
+
 class TestProfilerStatistic(unittest.TestCase):
     def test_statistic_case1(self):
         root_node = HostPythonNode(
@@ -1044,6 +1159,77 @@ class TestProfilerStatistic(unittest.TestCase):
                 )
             )
 
+    def test_statistic_random_trees(self):
+        for seed in range(5):
+            trees = gen_random_trees(seed)
+            statistic_data = profiler.profiler_statistic.StatisticData(
+                trees, {}
+            )
+            # the summary built node by node from the wrapped trees
+            reference = profiler.profiler_statistic.EventSummary()
+            _, thread2nodes = profiler.profiler_statistic.wrap_tree(trees)
+            for nodes in thread2nodes.values():
+                for node in nodes[1:]:
+                    if node.type == profiler.TracerEventType.Operator:
+                        reference.add_operator_item(node)
+                reference.add_kernel_item(nodes[0])
+            event_summary = statistic_data.event_summary
+            self.assertEqual(
+                self.summarize(event_summary.items),
+                self.summarize(reference.items),
+            )
+            self.assertEqual(
+                self.summarize(event_summary.kernel_items),
+                self.summarize(reference.kernel_items),
+            )
+            for thread_id, items in reference.thread_items.items():
+                self.assertEqual(
+                    self.summarize(event_summary.thread_items[thread_id]),
+                    self.summarize(items),
+                )
+
+            cpu_ranges = {}
+            gpu_devices = []
+            for nodes in profiler.profiler_statistic.traverse_tree(
+                trees
+            ).values():
+                for node in nodes[1:]:
+                    cpu_ranges.setdefault(node.type, []).append(
+                        (node.start_ns, node.end_ns)
+                    )
+                    for runtime_node in node.runtime_node:
+                        for device_node in runtime_node.device_node:
+                            if device_node.device_id not in gpu_devices:
+                                gpu_devices.append(device_node.device_id)
+            time_range_summary = statistic_data.time_range_summary
+            self.assertEqual(
+                list(time_range_summary.get_gpu_devices()), gpu_devices
+            )
+            for event_type, ranges in cpu_ranges.items():
+                self.assertEqual(
+                    time_range_summary.CPUTimeRange[event_type],
+                    merge_self_ranges(ranges, is_sorted=False),
+                )
+
+    def summarize(self, items):
+        # the items are listed in their order, which is the order of the rows
+        # with equal sort keys in the tables
+        return [
+            (
+                name,
+                item.call,
+                item.cpu_time,
+                item.max_cpu_time,
+                item.gpu_time,
+                item.min_gpu_time,
+                item.general_gpu_time,
+                item.flops,
+                self.summarize(item.operator_inners),
+                self.summarize(item.devices),
+            )
+            for name, item in items.items()
+        ]
+
 
 if __name__ == '__main__':
     unittest.main()
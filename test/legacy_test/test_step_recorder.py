@@ -0,0 +1,100 @@
+# Copyright (c) 2023 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import signal
+import tempfile
+import time
+import unittest
+import warnings
+
+import paddle
+from paddle import profiler
+
+
+class TestStepRecorder(unittest.TestCase):
+    def setUp(self):
+        paddle.disable_static()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_ring_buffer(self):
+        linear = paddle.nn.Linear(8, 8)
+        recorder = profiler.StepRecorder(
+            capacity=5, regions=['backward'], anomaly_factor=None
+        )
+        recorder.watch(linear, 'linear')
+        with recorder:
+            for _ in range(12):
+                loss = linear(paddle.randn([4, 8])).mean()
+                with recorder.record('backward'):
+                    loss.backward()
+                recorder.step()
+        # the forward hooks are removed by stop
+        linear(paddle.randn([4, 8]))
+
+        records = recorder.records()
+        self.assertEqual([r['step'] for r in records], [7, 8, 9, 10, 11])
+        for r in records:
+            self.assertGreater(r['linear'], 0.0)
+            self.assertGreater(r['backward'], 0.0)
+            self.assertGreaterEqual(r['step_cost'], r['linear'] + r['backward'])
+
+    def test_dump_on_anomaly(self):
+        recorder = profiler.StepRecorder(
+            capacity=8,
+            anomaly_factor=20.0,
+            warmup_steps=10,
+            dump_dir=self.temp_dir.name,
+        )
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            with recorder:
+                for i in range(30):
+                    time.sleep(0.2 if i in (15, 16) else 0.002)
+                    recorder.step()
+        # the steps dumped once are not dumped again
+        self.assertEqual(len(w), 1)
+        files = os.listdir(self.temp_dir.name)
+        self.assertEqual(len(files), 1)
+        with open(os.path.join(self.temp_dir.name, files[0])) as f:
+            content = json.load(f)
+        self.assertEqual(content['reason'], 'anomaly')
+        self.assertEqual(content['records'][-1]['step'], 15)
+        self.assertEqual(len(content['records']), 8)
+
+    def test_dump_on_signal(self):
+        recorder = profiler.StepRecorder(
+            dump_dir=self.temp_dir.name, dump_signal=signal.SIGUSR1
+        )
+        prof = profiler.Profiler(timer_only=True)
+        with recorder, prof:
+            for _ in range(3):
+                # the steps of the profiler are recorded
+                prof.step()
+            os.kill(os.getpid(), signal.SIGUSR1)
+        self.assertEqual(signal.getsignal(signal.SIGUSR1), signal.SIG_DFL)
+        files = os.listdir(self.temp_dir.name)
+        self.assertEqual(len(files), 1)
+        with open(os.path.join(self.temp_dir.name, files[0])) as f:
+            content = json.load(f)
+        self.assertEqual(content['reason'], f'signal {int(signal.SIGUSR1)}')
+        self.assertEqual(len(content['records']), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -104,6 +104,31 @@ class TestSingleProcessRpc(RpcTestBase):
         out = dist.rpc.rpc_async(worker_name(0), paddle_add, args=args).wait()
         np.testing.assert_allclose(out, res, rtol=1e-05)
 
+    def test_batching_rpc_paddle_add(self):
+        a = np.random.random((10, 100))
+        b = np.random.random((10, 100))
+        client = dist.rpc.BatchingRpcClient(max_batch_size=8)
+        futs = [
+            client.rpc_async(worker_name(0), paddle_add, args=(a, b * i))
+            for i in range(20)
+        ]
+        for i, fut in enumerate(futs):
+            np.testing.assert_allclose(fut.wait(), a + b * i, rtol=1e-05)
+        out = client.rpc_sync(worker_name(0), paddle_add, args=(a, b))
+        np.testing.assert_allclose(out, a + b, rtol=1e-05)
+        # the error of a call is raised by its own future only
+        fut = client.rpc_async(worker_name(0), paddle_add, args=(a,))
+        ok = client.rpc_async(worker_name(0), paddle_add, args=(a, b))
+        with self.assertRaises(TypeError):
+            fut.wait()
+        np.testing.assert_allclose(ok.wait(), a + b, rtol=1e-05)
+        client.close()
+
+        stats = client.latency_stats()[worker_name(0)]
+        self.assertEqual(stats["calls"], 23)
+        self.assertLess(stats["batches"], stats["calls"])
+        self.assertEqual(sum(stats["histogram"].values()), stats["batches"])
+
     def test_get_worker_info(self):
         info = dist.rpc.get_worker_info(worker_name(0))
         self.assertEqual(info.name, worker_name(0))